@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""メモリ予算付きキャッシュマネージャ（2026-01-20追加）
+
+以前はキャッシュごとに件数上限のLRU（_cache 100件、filtered_data 100件、batch_cache 200件、
+_gap_cache 50件、GeoJSON 3件）で管理し、_preload_cache は無制限だった。
+1件が数行のDataFrameから都道府県まるごとまで大きく異なるため、件数上限ではメモリ使用量を制御できず、
+Render（512MB）でOOMの原因になっていた。
+
+このモジュールは全キャッシュを名前空間単位で1つのバイト予算にまとめる:
+    - サイズ: DataFrameは memory_usage(deep=True)、ndarrayは nbytes、dict/list は再帰的に推定
+    - 予算超過時: 重み付きLRUで追い出し（名前空間ごとの最古エントリのうち
+      「最終アクセスからの経過 / 重み」が最大のものを破棄。重みが大きいほど残りやすい）
+    - 統計: 名前空間ごとの hit / miss / eviction / bytes（db_helper.get_cache_stats() に含まれる）
+
+使用例:
+    from cache_manager import cache_manager
+
+    cache_manager.register("gap_data", weight=1.0)
+    cache_manager.set("gap_data", key, df)
+    df = cache_manager.get("gap_data", key)
+
+環境変数:
+    CACHE_MEMORY_BUDGET_MB: 全キャッシュ合計のバイト予算（デフォルト192MB）
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+DEFAULT_BUDGET_MB = 192  # Render 512MB: アプリ本体・CSVデータ・GeoJSON処理の余裕を残す
+
+_SAMPLE_ITEMS = 64  # 大きなlist/dictはこの件数をサンプリングして全体を推定
+_MAX_DEPTH = 6
+
+
+def estimate_size(obj: Any, _depth: int = 0) -> int:
+    """オブジェクトのおおよそのメモリ使用量（バイト）
+
+    DataFrame/Series は memory_usage(deep=True) で文字列の実体まで含めて計測する。
+    list/tuple/dict は先頭 _SAMPLE_ITEMS 件の平均から全体を推定する（マーカー数千件でも高速）。
+    """
+    if obj is None:
+        return 0
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (str, bytes, int, float, bool)):
+        return sys.getsizeof(obj)
+
+    size = sys.getsizeof(obj)
+    if _depth >= _MAX_DEPTH:
+        return size
+    if isinstance(obj, dict):
+        n = len(obj)
+        if n == 0:
+            return size
+        sample = 0
+        for i, (k, v) in enumerate(obj.items()):
+            if i >= _SAMPLE_ITEMS:
+                break
+            sample += estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+        return size + sample * n // min(n, _SAMPLE_ITEMS)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        n = len(obj)
+        if n == 0:
+            return size
+        sample = 0
+        for i, item in enumerate(obj):
+            if i >= _SAMPLE_ITEMS:
+                break
+            sample += estimate_size(item, _depth + 1)
+        return size + sample * n // min(n, _SAMPLE_ITEMS)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "size", "created", "tick")
+
+    def __init__(self, value: Any, size: int, tick: int):
+        self.value = value
+        self.size = size
+        self.created = time.monotonic()
+        self.tick = tick
+
+
+class _Namespace:
+    """名前空間ごとの設定・エントリ（LRU順）・統計"""
+
+    def __init__(self, name: str, weight: float, ttl_seconds: Optional[float]):
+        self.name = name
+        self.weight = weight
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict = OrderedDict()  # key → _Entry（先頭が最も古い）
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+
+class CacheManager:
+    """全キャッシュ共通のバイト予算を重み付きLRUで管理（スレッドセーフ）"""
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = int(budget_bytes)
+        self._namespaces: dict = {}
+        self._lock = threading.RLock()
+        self._tick = 0
+        self._rejected = 0
+
+    # ---------- 設定 ----------
+
+    def register(self, namespace: str, weight: float = 1.0, ttl_seconds: Optional[float] = None) -> None:
+        """名前空間を登録（既に登録済みの場合は設定のみ更新し、エントリは保持）
+
+        Args:
+            namespace: 名前空間名（統計の表示名にもなる）
+            weight: 追い出しの重み（2.0なら同じ経過時間でも1.0の名前空間より残りやすい）
+            ttl_seconds: 有効期限（秒）。Noneは無期限（予算超過時のみ破棄）
+        """
+        if weight <= 0:
+            raise ValueError(f"weight must be positive: {weight}")
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None:
+                self._namespaces[namespace] = _Namespace(namespace, weight, ttl_seconds)
+            else:
+                ns.weight = weight
+                ns.ttl_seconds = ttl_seconds
+
+    def set_budget(self, budget_bytes: int) -> None:
+        """予算を変更（縮小した場合は即座に追い出し）"""
+        with self._lock:
+            self.budget_bytes = int(budget_bytes)
+            self._evict_to_budget()
+
+    def _ns(self, namespace: str) -> _Namespace:
+        ns = self._namespaces.get(namespace)
+        if ns is None:
+            ns = self._namespaces[namespace] = _Namespace(namespace, 1.0, None)
+        return ns
+
+    # ---------- 取得・保存 ----------
+
+    def get(self, namespace: str, key: Hashable, default: Any = None, max_age: Optional[float] = None) -> Any:
+        """キャッシュから取得（LRU更新付き）
+
+        Args:
+            max_age: この呼び出しだけ有効期限（秒）を上書き（Noneは名前空間のTTL）
+        """
+        with self._lock:
+            ns = self._ns(namespace)
+            entry = ns.entries.get(key)
+            if entry is None:
+                ns.misses += 1
+                return default
+            ttl = max_age if max_age is not None else ns.ttl_seconds
+            if ttl is not None and time.monotonic() - entry.created > ttl:
+                self._remove(ns, key)
+                ns.expired += 1
+                ns.misses += 1
+                return default
+            self._tick += 1
+            entry.tick = self._tick
+            ns.entries.move_to_end(key)
+            ns.hits += 1
+            return entry.value
+
+    def contains(self, namespace: str, key: Hashable) -> bool:
+        """統計・LRU順を変えずに存在確認"""
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            return ns is not None and key in ns.entries
+
+    def set(self, namespace: str, key: Hashable, value: Any, size: Optional[int] = None) -> bool:
+        """キャッシュに保存し、予算超過分を追い出す
+
+        Args:
+            size: バイト数（省略時は estimate_size で計測）
+
+        Returns:
+            bool: 保存した場合True（単体で予算を超える場合は保存しない）
+        """
+        if size is None:
+            size = estimate_size(value)
+        with self._lock:
+            ns = self._ns(namespace)
+            if key in ns.entries:
+                self._remove(ns, key)
+            if size > self.budget_bytes:
+                self._rejected += 1
+                print(f"[CACHE] Not cached {namespace}:{key} ({size / 1024 / 1024:.1f}MB > budget {self.budget_bytes / 1024 / 1024:.0f}MB)")
+                return False
+            self._tick += 1
+            ns.entries[key] = _Entry(value, size, self._tick)
+            ns.bytes += size
+            self._evict_to_budget(protect=(ns, key))
+            return True
+
+    def pop(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None or key not in ns.entries:
+                return default
+            return self._remove(ns, key).value
+
+    def keys(self, namespace: str) -> list:
+        """名前空間のキー一覧（古い順）"""
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            return list(ns.entries) if ns else []
+
+    def evict_where(self, namespace: str, predicate: Callable[[Hashable], bool]) -> int:
+        """条件に一致するキーを破棄（職種単位の破棄など）。破棄した件数を返す"""
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None:
+                return 0
+            keys = [k for k in ns.entries if predicate(k)]
+            for key in keys:
+                self._remove(ns, key)
+            return len(keys)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """名前空間（Noneの場合は全名前空間）のエントリを破棄。統計は保持する"""
+        with self._lock:
+            targets = [self._namespaces[namespace]] if namespace in self._namespaces else (
+                list(self._namespaces.values()) if namespace is None else [])
+            for ns in targets:
+                ns.entries.clear()
+                ns.bytes = 0
+
+    # ---------- 追い出し ----------
+
+    def _remove(self, ns: _Namespace, key: Hashable) -> _Entry:
+        entry = ns.entries.pop(key)
+        ns.bytes -= entry.size
+        return entry
+
+    def _used_bytes(self) -> int:
+        return sum(ns.bytes for ns in self._namespaces.values())
+
+    def _evict_to_budget(self, protect: Optional[tuple] = None) -> None:
+        """予算内に収まるまで重み付きLRUで追い出す
+
+        各名前空間の最古エントリ（OrderedDictの先頭）だけを比較するため、
+        1回の選択は名前空間数に比例（エントリ数に依存しない）。
+        """
+        used = self._used_bytes()
+        while used > self.budget_bytes:
+            victim = None
+            best_score = -1.0
+            for ns in self._namespaces.values():
+                for key, entry in ns.entries.items():
+                    if protect is not None and protect[0] is ns and protect[1] == key:
+                        continue  # 保存直後のエントリは対象外（次に古いものを候補にする）
+                    score = (self._tick - entry.tick) / ns.weight
+                    if score > best_score:
+                        victim, best_score = (ns, key), score
+                    break
+            if victim is None:
+                break
+            ns, key = victim
+            entry = self._remove(ns, key)
+            ns.evictions += 1
+            used -= entry.size
+            print(f"[CACHE] Evicted {ns.name}:{key} ({entry.size / 1024:.0f}KB, used {used / 1024 / 1024:.1f}/{self.budget_bytes / 1024 / 1024:.0f}MB)")
+
+    # ---------- 統計 ----------
+
+    def stats(self) -> dict:
+        """予算・使用量と名前空間ごとの統計"""
+        with self._lock:
+            namespaces = {
+                name: {
+                    "entries": len(ns.entries),
+                    "bytes": ns.bytes,
+                    "hits": ns.hits,
+                    "misses": ns.misses,
+                    "evictions": ns.evictions,
+                    "expired": ns.expired,
+                    "weight": ns.weight,
+                }
+                for name, ns in self._namespaces.items()
+            }
+            return {
+                "budget_bytes": self.budget_bytes,
+                "used_bytes": self._used_bytes(),
+                "rejected": self._rejected,
+                "namespaces": namespaces,
+            }
+
+
+# アプリ全体で共有するインスタンス（db_helper / main.py / choropleth_helper が利用）
+cache_manager = CacheManager(int(float(os.getenv("CACHE_MEMORY_BUDGET_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024))
+
+
+def _cache_metrics():
+    """/metrics 用（instrumentation のコレクタ）: 名前空間ごとのヒット率・使用量"""
+    stats = cache_manager.stats()
+    namespaces = stats["namespaces"]
+
+    def per_namespace(field):
+        return [({"namespace": name}, ns[field]) for name, ns in sorted(namespaces.items())]
+
+    hit_ratio = [({"namespace": name}, ns["hits"] / (ns["hits"] + ns["misses"]) if ns["hits"] + ns["misses"] else 0.0)
+                 for name, ns in sorted(namespaces.items())]
+    return [
+        ("cache_hits_total", "counter", "Cache hits", per_namespace("hits")),
+        ("cache_misses_total", "counter", "Cache misses (including expired entries)", per_namespace("misses")),
+        ("cache_evictions_total", "counter", "Entries evicted to stay within the byte budget", per_namespace("evictions")),
+        ("cache_hit_ratio", "gauge", "hits / (hits + misses) since start", hit_ratio),
+        ("cache_bytes", "gauge", "Estimated bytes held", per_namespace("bytes")),
+        ("cache_budget_bytes", "gauge", "Byte budget shared by all namespaces", [({}, stats["budget_bytes"])]),
+    ]
+
+
+instrumentation.register_collector(_cache_metrics)
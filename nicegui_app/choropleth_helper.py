@@ -6,8 +6,14 @@ test_choropleth_v3.pyのロジックを拡張し、47都道府県のGeoJSONに
 NiceGUI Leafletウィジェットで使用。
 """
 import json
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
+
+import numpy as np
+
+import instrumentation
+from cache_manager import cache_manager
 
 # GeoJSONディレクトリ
 GEOJSON_DIR = Path(__file__).parent / "static" / "geojson"
@@ -154,10 +160,11 @@ PREF_CENTERS = {
     "沖縄県": (26.2124, 127.6809),
 }
 
-# GeoJSONキャッシュ（LRU方式、最大3都道府県 - Render 512MB対応）
-_geojson_cache: Dict[str, dict] = {}
-_cache_order: List[str] = []  # LRU順序追跡
-_CACHE_MAX_SIZE = 3  # Renderメモリ制限対応（512MB）
+# GeoJSONキャッシュ（cache_managerの共通バイト予算で管理 - Render 512MB対応）
+# 2026-01-20変更: 件数上限3 → バイト予算。小さい県は多く保持し、大きい県（北海道等）は予算内でのみ保持
+# ファイル読込 + JSONパースが重いため、重みを高めにして他のキャッシュより残りやすくする
+cache_manager.register("geojson", weight=3.0)
+cache_manager.register("geojson_merged", weight=3.0)  # load_multiple_geojson の結合結果
 
 
 def get_geojson_path(prefecture: str) -> Optional[Path]:
@@ -172,17 +179,12 @@ def get_geojson_path(prefecture: str) -> Optional[Path]:
     return path if path.exists() else None
 
 
+@instrumentation.timed("choropleth.load_geojson")
 def load_geojson(prefecture: str) -> Optional[dict]:
-    """GeoJSONを読み込む（LRUキャッシュ付き、最大10件）"""
-    global _cache_order
-
-    # キャッシュヒット
-    if prefecture in _geojson_cache:
-        # LRU更新（最近使用したものを末尾に移動）
-        if prefecture in _cache_order:
-            _cache_order.remove(prefecture)
-        _cache_order.append(prefecture)
-        return _geojson_cache[prefecture]
+    """GeoJSONを読み込む（メモリ予算付きLRUキャッシュ）"""
+    cached = cache_manager.get("geojson", prefecture)
+    if cached is not None:
+        return cached
 
     path = get_geojson_path(prefecture)
     if not path:
@@ -193,16 +195,11 @@ def load_geojson(prefecture: str) -> Optional[dict]:
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
 
-        # キャッシュサイズ制限（LRU削除）
-        while len(_geojson_cache) >= _CACHE_MAX_SIZE and _cache_order:
-            oldest = _cache_order.pop(0)
-            if oldest in _geojson_cache:
-                del _geojson_cache[oldest]
-                print(f"[CHOROPLETH] Evicted from cache: {oldest}")
-
-        _geojson_cache[prefecture] = data
-        _cache_order.append(prefecture)
-        print(f"[CHOROPLETH] Loaded GeoJSON for {prefecture}: {len(data.get('features', []))} features (cache: {len(_geojson_cache)}/{_CACHE_MAX_SIZE})")
+        cache_manager.set("geojson", prefecture, data)
+        get_spatial_index(data)  # マップクリック用のインデックスを読み込み時に構築
+        stats = cache_manager.stats()["namespaces"]["geojson"]
+        print(f"[CHOROPLETH] Loaded GeoJSON for {prefecture}: {len(data.get('features', []))} features "
+              f"(cache: {stats['entries']} prefectures, {stats['bytes'] / 1024 / 1024:.1f}MB)")
         return data
     except Exception as e:
         print(f"[CHOROPLETH] Error loading GeoJSON for {prefecture}: {e}")
@@ -211,12 +208,38 @@ def load_geojson(prefecture: str) -> Optional[dict]:
 
 def clear_geojson_cache():
     """キャッシュをクリア"""
-    global _cache_order
-    _geojson_cache.clear()
-    _cache_order = []
+    cache_manager.clear("geojson")
+    cache_manager.clear("geojson_merged")
     print("[CHOROPLETH] Cache cleared")
 
 
+@instrumentation.timed("choropleth.load_multiple_geojson")
+def load_multiple_geojson(prefectures: List[str]) -> Optional[dict]:
+    """複数都道府県のGeoJSONを1つのFeatureCollectionに結合（流入元モード用）
+
+    featureはキャッシュ済みGeoJSONのオブジェクトを共有する（コピーしない）。
+    結合結果は都道府県の組（順序込み）ごとにキャッシュし、描画のたびに同じオブジェクトを返す
+    （空間インデックス get_spatial_index も1回だけ構築される）。
+    """
+    key = tuple(prefectures)
+    cached = cache_manager.get("geojson_merged", key)
+    # 構成する都道府県が追い出し・再読み込みされていたら作り直す（古いfeatureを保持し続けない）
+    if cached is not None and all(cache_manager.contains("geojson", pref) for pref in key):
+        return cached
+
+    features = []
+    for pref in prefectures:
+        data = load_geojson(pref)
+        if data:
+            features.extend(data.get("features", []))
+    if not features:
+        return None
+    merged = {"type": "FeatureCollection", "features": features}
+    # featureは都道府県ごとのキャッシュ（"geojson"）に計上済みのため、結合リスト分のみ計上
+    cache_manager.set("geojson_merged", key, merged, size=sys.getsizeof(features))
+    return merged
+
+
 def preload_geojson(prefectures: List[str]):
     """複数の都道府県を事前ロード"""
     for pref in prefectures:
@@ -242,78 +265,147 @@ def get_color_by_value(value: float, max_value: float, mode: str = "count") -> s
     return _get_color_from_config(ratio, mode)
 
 
+# ============================================================
+# スタイル計算（2026-01-20: 一括計算に変更）
+# ============================================================
+# 以前は feature ごとに municipality_data 全体の max() を再計算し、流入元・競合地域も
+# リストの線形探索だったため、スタイル付けが O(feature数 × 市区町村数) になっていた。
+# 現在はスケール（最大値）をモードごとに1回だけ計算し、色は numpy で一括判定、
+# ハイライト判定は set で行う。
+
+
+def _style_value(data: dict, mode: str) -> float:
+    """市区町村データから色分けに使う値を取得（モード別）"""
+    if mode == "inflow":
+        return data.get("inflow", 0)
+    if mode == "balance":
+        return data.get("inflow", 0) - data.get("outflow", 0) + 50  # 0-100スケールに正規化
+    if mode == "competition":
+        return data.get("competition", 0)
+    return data.get("count", 0)
+
+
+def compute_style_scale(municipality_data: Dict[str, dict], mode: str = "count") -> float:
+    """色分けの最大値（スケール）を計算（1回のスタイル付けにつき1回だけ呼ぶ）"""
+    if not municipality_data:
+        return 1
+    if mode not in ("count", "inflow", "competition"):  # balance（未知のモードも従来どおりbalanceの式）
+        return max(abs(d.get("inflow", 0) - d.get("outflow", 0)) + 50 for d in municipality_data.values())
+    return max(_style_value(d, mode) for d in municipality_data.values())
+
+
+def colors_for_values(values: Iterable[float], max_value: float, mode: str = "count") -> List[str]:
+    """値の配列に対して色を一括計算（get_color_by_value のベクトル版）
+
+    Args:
+        values: 色分けする値
+        max_value: スケール（compute_style_scale の戻り値等）
+        mode: COLOR_CONFIGのモード
+
+    Returns:
+        valuesと同じ順序の色リスト
+    """
+    values = np.asarray(list(values), dtype=float)
+    if max_value == 0:
+        return [SPECIAL_COLORS["default"]] * len(values)
+    config = COLOR_CONFIG.get(mode, COLOR_CONFIG["count"])
+    ratio = np.minimum(values / max_value, 1.0)
+    colors = np.select(
+        [ratio >= threshold for threshold, _ in config],
+        [color for _, color in config],
+        default=config[-1][1],
+    )
+    return colors.tolist()
+
+
+def _base_style() -> dict:
+    return {
+        "color": "#ffffff",      # 境界線の色
+        "weight": 1,
+        "fillColor": SPECIAL_COLORS["default"],
+        "fillOpacity": 0.6,
+    }
+
+
+def _highlight_style(muni_name: str, selected_muni: Optional[str],
+                     inflow_set: frozenset, competing_set: frozenset) -> Optional[dict]:
+    """選択中・流入元・競合地域のスタイル（該当しない場合はNone）"""
+    if selected_muni and muni_name == selected_muni:
+        return {"color": "#ffffff", "weight": 3, "fillColor": SPECIAL_COLORS["selected"], "fillOpacity": 0.8}
+    if muni_name in inflow_set:
+        return {"color": "#ffffff", "weight": 2, "fillColor": SPECIAL_COLORS["inflow_highlight"], "fillOpacity": 0.7}
+    if muni_name in competing_set:
+        return {"color": "#ffffff", "weight": 2, "fillColor": SPECIAL_COLORS["competition_highlight"], "fillOpacity": 0.7}
+    return None
+
+
+def style_features(
+    features: List[dict],
+    municipality_data: Dict[str, dict],
+    mode: str = "count",
+    selected_muni: Optional[str] = None,
+    inflow_sources: Optional[Iterable[str]] = None,
+    competing_areas: Optional[Iterable[str]] = None
+) -> List[dict]:
+    """全featureのスタイルを一括計算（featuresと同じ順序のスタイルdictのリスト）
+
+    スケールは1回だけ計算し、通常の色分けは colors_for_values でまとめて判定する。
+    """
+    inflow_set = frozenset(inflow_sources or ())
+    competing_set = frozenset(competing_areas or ())
+    max_val = compute_style_scale(municipality_data, mode)
+
+    styles: List[Optional[dict]] = []
+    pending_idx: List[int] = []  # 通常の色分けが必要なfeatureの位置
+    pending_values: List[float] = []
+    for feature in features:
+        muni_name = feature.get("properties", {}).get("N03_004", "")  # 市区町村名
+        if not muni_name:
+            styles.append(_base_style())
+            continue
+        highlight = _highlight_style(muni_name, selected_muni, inflow_set, competing_set)
+        if highlight is not None:
+            styles.append(highlight)
+            continue
+        pending_idx.append(len(styles))
+        pending_values.append(_style_value(municipality_data.get(muni_name, {}), mode))
+        styles.append(None)
+
+    for i, color in zip(pending_idx, colors_for_values(pending_values, max_val, mode)):
+        style = _base_style()
+        style["fillColor"] = color
+        styles[i] = style
+    return styles
+
+
 def style_geojson_feature(
     feature: dict,
     municipality_data: Dict[str, dict],
     mode: str = "count",
     selected_muni: Optional[str] = None,
     inflow_sources: Optional[List[str]] = None,
-    competing_areas: Optional[List[str]] = None
+    competing_areas: Optional[List[str]] = None,
+    max_value: Optional[float] = None
 ) -> dict:
     """GeoJSON featureにスタイルを適用
 
     色はSPECIAL_COLORSおよびCOLOR_CONFIGから取得（単一ソース）。
+    複数featureをまとめて処理する場合は style_features を使用する
+    （単体で呼ぶ場合も max_value を渡せばスケールの再計算を省略できる）。
     """
-    props = feature.get("properties", {})
-    muni_name = props.get("N03_004", "")  # 市区町村名
-
-    # デフォルトスタイル（SPECIAL_COLORSから取得）
-    style = {
-        "color": "#ffffff",      # 境界線の色
-        "weight": 1,
-        "fillColor": SPECIAL_COLORS["default"],
-        "fillOpacity": 0.6,
-    }
-
+    muni_name = feature.get("properties", {}).get("N03_004", "")  # 市区町村名
     if not muni_name:
-        return style
+        return _base_style()
 
-    # 選択中の市区町村（SPECIAL_COLORSから取得）
-    if selected_muni and muni_name == selected_muni:
-        style["fillColor"] = SPECIAL_COLORS["selected"]
-        style["weight"] = 3
-        style["fillOpacity"] = 0.8
-        return style
-
-    # 流入元（SPECIAL_COLORSから取得）
-    if inflow_sources and muni_name in inflow_sources:
-        style["fillColor"] = SPECIAL_COLORS["inflow_highlight"]
-        style["weight"] = 2
-        style["fillOpacity"] = 0.7
-        return style
-
-    # 競合地域（SPECIAL_COLORSから取得）
-    if competing_areas and muni_name in competing_areas:
-        style["fillColor"] = SPECIAL_COLORS["competition_highlight"]
-        style["weight"] = 2
-        style["fillOpacity"] = 0.7
-        return style
-
-    # 通常の色分け
-    data = municipality_data.get(muni_name, {})
-    if mode == "count":
-        value = data.get("count", 0)
-    elif mode == "inflow":
-        value = data.get("inflow", 0)
-    elif mode == "balance":
-        inflow = data.get("inflow", 0)
-        outflow = data.get("outflow", 0)
-        value = inflow - outflow + 50  # 0-100スケールに正規化
-    elif mode == "competition":
-        value = data.get("competition", 0)
-    else:
-        value = data.get("count", 0)
-
-    # 最大値を取得
-    max_val = max(
-        (d.get("count", 0) if mode == "count" else
-         d.get("inflow", 0) if mode == "inflow" else
-         d.get("competition", 0) if mode == "competition" else
-         abs(d.get("inflow", 0) - d.get("outflow", 0)) + 50)
-        for d in municipality_data.values()
-    ) if municipality_data else 1
-
-    style["fillColor"] = get_color_by_value(value, max_val, mode)
+    highlight = _highlight_style(muni_name, selected_muni,
+                                 frozenset(inflow_sources or ()), frozenset(competing_areas or ()))
+    if highlight is not None:
+        return highlight
+
+    if max_value is None:
+        max_value = compute_style_scale(municipality_data, mode)
+    style = _base_style()
+    style["fillColor"] = get_color_by_value(_style_value(municipality_data.get(muni_name, {}), mode), max_value, mode)
     return style
 
 
@@ -325,27 +417,25 @@ def prepare_styled_geojson(
     inflow_sources: Optional[List[str]] = None,
     competing_areas: Optional[List[str]] = None
 ) -> Optional[dict]:
-    """スタイル付きGeoJSONを準備"""
+    """スタイル付きGeoJSONを準備
+
+    geometry はキャッシュ済みGeoJSONのオブジェクトを共有する（座標はコピーしない）。
+    properties は新しいdictを作成するため、キャッシュ側のfeatureは変更されない。
+    """
     geojson = load_geojson(prefecture)
     if not geojson:
         return None
 
-    styled_features = []
-    for feature in geojson.get("features", []):
-        styled_feature = feature.copy()
-        style = style_geojson_feature(
-            feature,
-            municipality_data,
-            mode,
-            selected_muni,
-            inflow_sources,
-            competing_areas
-        )
-        # プロパティにスタイルを追加
-        if "properties" not in styled_feature:
-            styled_feature["properties"] = {}
-        styled_feature["properties"]["_style"] = style
-        styled_features.append(styled_feature)
+    features = geojson.get("features", [])
+    styles = style_features(features, municipality_data, mode, selected_muni, inflow_sources, competing_areas)
+    styled_features = [
+        {
+            "type": feature.get("type", "Feature"),
+            "geometry": feature.get("geometry"),
+            "properties": {**feature.get("properties", {}), "_style": style},
+        }
+        for feature, style in zip(features, styles)
+    ]
 
     return {
         "type": "FeatureCollection",
@@ -382,9 +472,130 @@ def point_in_polygon(lat: float, lng: float, polygon_coords: list) -> bool:
     return inside
 
 
+# ============================================================
+# 空間インデックス（マップクリックの市区町村判定、2026-01-20追加）
+# ============================================================
+# 以前は find_municipality_at_point がクリックごとに全featureを走査し、リングごとに
+# [lat, lng] リストを作り直して純Pythonのレイキャストを行っていた（北海道で数十ms）。
+# 現在はGeoJSONごとに1回だけ、リングをNumPy配列化してバウンディングボックスのグリッドに登録し、
+# クリック時は該当セルの候補リングのみをベクトル化したレイキャストで判定する。
+#
+# 内側リングについて: 国土数値情報のGeoJSONは離島を同じPolygonの追加リングとして持つため、
+# ポリゴン単位で「点を含むリング数が奇数なら内側」（even-odd、Leafletの描画と同じ規則）で判定する。
+# これにより穴（外周リングの内側のリング）は除外され、離島のリングは含まれる。
+_GRID_MIN = 8
+_GRID_MAX = 128
+cache_manager.register("geojson_index", weight=3.0)
+
+
+def _ring_contains(ring: np.ndarray, x: float, y: float) -> bool:
+    """リング（[[lng, lat], ...] のndarray）に点が含まれるか（point_in_polygon のベクトル版）"""
+    xi, yi = ring[:, 0], ring[:, 1]
+    xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+    crosses = (yi > y) != (yj > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_intersect = (xj - xi) * (y - yi) / (yj - yi) + xi
+    return bool(np.count_nonzero(crosses & (x < x_intersect)) % 2)
+
+
+class _SpatialIndex:
+    """1つのGeoJSON（都道府県）のリングのグリッドインデックス"""
+
+    def __init__(self, geojson_data: dict):
+        self.source = geojson_data  # 同一オブジェクトの判定用（キャッシュキーはid）
+        self.names: List[str] = []  # ポリゴン番号 → 市区町村名
+        self.rings: List[np.ndarray] = []
+        owners: List[int] = []  # リング番号 → ポリゴン番号
+
+        for feature in geojson_data.get("features", []):
+            muni_name = feature.get("properties", {}).get("N03_004", "")
+            geometry = feature.get("geometry") or {}
+            if not muni_name:
+                continue
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+            for rings in polygons:
+                rings = [np.asarray(r, dtype=float)[:, :2] for r in rings if len(r) >= 3]
+                if not rings:
+                    continue
+                self.rings.extend(rings)
+                owners.extend([len(self.names)] * len(rings))
+                self.names.append(muni_name)
+
+        count = len(self.rings)
+        self.owners = np.asarray(owners, dtype=np.int32)
+        self.bboxes = np.array(
+            [[r[:, 0].min(), r[:, 1].min(), r[:, 0].max(), r[:, 1].max()] for r in self.rings]
+        ).reshape(count, 4)
+        self.grid = max(_GRID_MIN, min(_GRID_MAX, int(np.sqrt(count)) * 2))
+        if count:
+            self.min_x, self.min_y = self.bboxes[:, 0].min(), self.bboxes[:, 1].min()
+            span_x = max(self.bboxes[:, 2].max() - self.min_x, 1e-9)
+            span_y = max(self.bboxes[:, 3].max() - self.min_y, 1e-9)
+            self.cell_w, self.cell_h = span_x / self.grid, span_y / self.grid
+        else:
+            self.min_x = self.min_y = 0.0
+            self.cell_w = self.cell_h = 1.0
+
+        # セル → 候補リング番号（昇順 = featureの出現順）
+        cells: Dict[tuple, List[int]] = {}
+        x0, y0 = self._cell(self.bboxes[:, 0], self.bboxes[:, 1])
+        x1, y1 = self._cell(self.bboxes[:, 2], self.bboxes[:, 3])
+        for i in range(count):
+            for cx in range(x0[i], x1[i] + 1):
+                for cy in range(y0[i], y1[i] + 1):
+                    cells.setdefault((cx, cy), []).append(i)
+        self.cells = {k: np.asarray(v, dtype=np.int32) for k, v in cells.items()}
+
+        self.nbytes = int(self.bboxes.nbytes + self.owners.nbytes
+                          + sum(r.nbytes for r in self.rings)
+                          + sum(v.nbytes for v in self.cells.values()))
+
+    def _cell(self, x, y):
+        cx = np.clip(((np.asarray(x) - self.min_x) / self.cell_w).astype(int), 0, self.grid - 1)
+        cy = np.clip(((np.asarray(y) - self.min_y) / self.cell_h).astype(int), 0, self.grid - 1)
+        return cx, cy
+
+    def lookup(self, lat: float, lng: float) -> Optional[str]:
+        if not self.rings:
+            return None
+        cx, cy = self._cell(lng, lat)
+        candidates = self.cells.get((int(cx), int(cy)))
+        if candidates is None:
+            return None
+        boxes = self.bboxes[candidates]
+        hit = (boxes[:, 0] <= lng) & (lng <= boxes[:, 2]) & (boxes[:, 1] <= lat) & (lat <= boxes[:, 3])
+
+        # ポリゴンごとに点を含むリング数を数え、奇数なら内側（最初に見つかったポリゴンを返す）
+        parity: Dict[int, bool] = {}
+        for i in candidates[hit]:
+            if _ring_contains(self.rings[i], lng, lat):
+                owner = int(self.owners[i])
+                parity[owner] = not parity.get(owner, False)
+        inside = [owner for owner, odd in parity.items() if odd]
+        return self.names[min(inside)] if inside else None
+
+
+def get_spatial_index(geojson_data: dict) -> _SpatialIndex:
+    """GeoJSONの空間インデックスを取得（GeoJSONオブジェクトごとに1回だけ構築）"""
+    key = id(geojson_data)
+    index = cache_manager.get("geojson_index", key)
+    if index is None or index.source is not geojson_data:
+        index = _SpatialIndex(geojson_data)
+        cache_manager.set("geojson_index", key, index, size=index.nbytes)
+    return index
+
+
 def find_municipality_at_point(lat: float, lng: float, geojson_data: dict) -> Optional[str]:
     """指定座標にある市区町村を見つける
 
+    2026-01-20変更: 空間インデックス（get_spatial_index）で候補を絞り込んで判定。
+    ポリゴンの全リングをeven-odd規則で判定する（穴は除外、追加リングの離島は含む）。
+
     Args:
         lat: 緯度
         lng: 経度
@@ -395,30 +606,7 @@ def find_municipality_at_point(lat: float, lng: float, geojson_data: dict) -> Op
     """
     if not geojson_data:
         return None
-
-    for feature in geojson_data.get("features", []):
-        props = feature.get("properties", {})
-        muni_name = props.get("N03_004", "")
-        if not muni_name:
-            continue
-
-        geometry = feature.get("geometry", {})
-
-        if geometry.get("type") == "Polygon":
-            coords = geometry["coordinates"][0]
-            # GeoJSONは [lng, lat] 形式なので [lat, lng] に変換
-            latlngs = [[c[1], c[0]] for c in coords]
-            if point_in_polygon(lat, lng, latlngs):
-                return muni_name
-
-        elif geometry.get("type") == "MultiPolygon":
-            for polygon in geometry["coordinates"]:
-                coords = polygon[0]
-                latlngs = [[c[1], c[0]] for c in coords]
-                if point_in_polygon(lat, lng, latlngs):
-                    return muni_name
-
-    return None
+    return get_spatial_index(geojson_data).lookup(lat, lng)
 
 
 def create_geojson_style_function(
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+MapComplete 列指向データセット（Parquet、2026-01-20追加）
+
+CSVモードは MapComplete_Complete_All_FIXED.csv(.gz) を pd.read_csv で全量パースし、さらに
+_optimize_dtypes が全objectカラムで nunique() を計算していた（起動時間とピークメモリの大半）。
+generate_mapcomplete_complete_sheets.py / scripts/build_columnar_dataset.py が出力する
+Parquetデータセットがあれば、db_helper・main はこちらを列射影・パーティション絞り込み付きで読む。
+
+構成（hiveパーティション）:
+    MapComplete_Complete_All_FIXED.parquet/
+        job_type=看護師/row_type=SUMMARY/part-0.parquet
+        ...
+        _dataset.json   書き込み完了マーカー（行数・元CSV・作成日時）
+
+- パーティション: job_type（列がある場合）/ row_type
+- 各ファイルは prefecture, municipality 順にソート済み。row group の min/max 統計で
+  都道府県の絞り込みが効く（都道府県までディレクトリを分けると 12職種 × 約20 row_type × 47 =
+  約1.1万の小ファイルになり、全件読み込みが逆に遅くなるため）
+- ユニーク値が行数の50%未満の文字列カラムは辞書エンコード（読み込むと category になるため、
+  起動時の _optimize_dtypes が不要）
+- 読み込みはメモリマップ（use_mmap）で行う
+
+pyarrow はオプション依存。未インストール・データセットなしの場合は従来のCSV読み込みを使う。
+"""
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+DATASET_DIRNAME = "MapComplete_Complete_All_FIXED.parquet"
+MARKER_FILENAME = "_dataset.json"
+PARTITION_COLUMNS = ("job_type", "row_type")
+SORT_COLUMNS = ("prefecture", "municipality")
+ROW_GROUP_ROWS = 20_000
+DICTIONARY_MAX_RATIO = 0.5  # _optimize_dtypes と同じ基準
+
+
+def find_dataset(search_dirs: Iterable[Path], csv_names: Sequence[str] = ()) -> Optional[Path]:
+    """書き込みが完了したデータセットを探す
+
+    同じディレクトリにある元CSV（csv_names）の方が新しい場合は再生成漏れとみなして使わない。
+    pyarrow がなければ常にNone。
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+    for dir_path in search_dirs:
+        path = Path(dir_path) / DATASET_DIRNAME
+        if not (path / MARKER_FILENAME).exists():
+            continue
+        stale = [name for name in csv_names if is_stale(path, path.parent / name)]
+        if stale:
+            print(f"[PARQUET] {path} is older than {stale[0]} - skipped "
+                  f"(rebuild: python scripts/build_columnar_dataset.py)")
+            continue
+        return path
+    return None
+
+
+def is_stale(dataset_path: Path, csv_path: Optional[Path]) -> bool:
+    """元のCSVがデータセットより新しい（再生成されていない）か"""
+    if csv_path is None or not Path(csv_path).exists():
+        return False
+    return Path(csv_path).stat().st_mtime > (Path(dataset_path) / MARKER_FILENAME).stat().st_mtime
+
+
+def read_dataset_info(dataset_path: Path) -> Dict:
+    return json.loads((Path(dataset_path) / MARKER_FILENAME).read_text(encoding="utf-8"))
+
+
+# =====================================
+# 書き込み
+# =====================================
+def _to_dictionary_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """低カーディナリティの文字列カラムを category に変換（Parquetでは辞書エンコードになる）"""
+    converted = {}
+    for col in df.columns:
+        if col in PARTITION_COLUMNS or not (pd.api.types.is_object_dtype(df[col])
+                                            or pd.api.types.is_string_dtype(df[col])):
+            continue
+        if df[col].nunique() < len(df) * DICTIONARY_MAX_RATIO:
+            converted[col] = "category"
+    return df.astype(converted) if converted else df
+
+
+def write_dataset(df: pd.DataFrame, dataset_path: Path, source: Optional[str] = None,
+                  row_group_rows: int = ROW_GROUP_ROWS) -> Path:
+    """DataFrameをパーティション分割したParquetデータセットとして書き込み
+
+    一時ディレクトリに書き込んでから置き換えるため、読み込み側が書き込み途中のデータを見ることはない。
+
+    Args:
+        df: MapComplete統合データ（FIXED CSVと同じカラム）
+        dataset_path: 出力先（<dir>/MapComplete_Complete_All_FIXED.parquet）
+        source: 元データの説明（マーカーに記録）
+        row_group_rows: row group の最大行数
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow が必要です: pip install pyarrow")
+
+    dataset_path = Path(dataset_path)
+    partition_cols = [c for c in PARTITION_COLUMNS if c in df.columns]
+    sort_cols = partition_cols + [c for c in SORT_COLUMNS if c in df.columns]
+    df = df.sort_values(sort_cols, kind="stable", na_position="last") if sort_cols else df
+    df = _to_dictionary_columns(df.reset_index(drop=True))
+    # パーティション値は文字列（hiveのディレクトリ名）。欠損は __HIVE_DEFAULT_PARTITION__ になる
+    df = df.astype({c: "object" for c in partition_cols})
+
+    tmp_path = dataset_path.with_name(dataset_path.name + ".tmp")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table, tmp_path, format="parquet",
+        partitioning=ds.partitioning(pa.schema([table.schema.field(c) for c in partition_cols]), flavor="hive")
+        if partition_cols else None,
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=row_group_rows,
+        min_rows_per_group=min(row_group_rows, 1024),
+        preserve_order=True,
+    )
+    info = {
+        "rows": len(df),
+        "columns": list(df.columns),
+        "partitions": partition_cols,
+        "source": source,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    (tmp_path / MARKER_FILENAME).write_text(json.dumps(info, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if dataset_path.exists():
+        old_path = dataset_path.with_name(dataset_path.name + ".old")
+        if old_path.exists():
+            shutil.rmtree(old_path)
+        os.replace(dataset_path, old_path)
+        os.replace(tmp_path, dataset_path)
+        shutil.rmtree(old_path)
+    else:
+        os.replace(tmp_path, dataset_path)
+    return dataset_path
+
+
+def build_from_csv(csv_path: Path, dataset_path: Optional[Path] = None) -> Path:
+    """FIXED CSV(.gz) からデータセットを作成（出力先のデフォルトはCSVと同じディレクトリ）
+
+    CSVモードと同じ条件（utf-8-sig, low_memory=False）でパースするため、各カラムのdtypeはCSV読み込み時と同じになる。
+    """
+    csv_path = Path(csv_path)
+    dataset_path = Path(dataset_path) if dataset_path else csv_path.parent / DATASET_DIRNAME
+    started = time.perf_counter()
+    df = pd.read_csv(csv_path, encoding="utf-8-sig", low_memory=False)
+    write_dataset(df, dataset_path, source=csv_path.name)
+    print(f"[PARQUET] Built {dataset_path} from {csv_path.name}: {len(df):,} rows "
+          f"in {time.perf_counter() - started:.1f}s")
+    return dataset_path
+
+
+# =====================================
+# 読み込み
+# =====================================
+def _open_dataset(dataset_path: Path) -> "ds.Dataset":
+    return ds.dataset(
+        str(dataset_path), format="parquet",
+        partitioning=ds.HivePartitioning.discover(infer_dictionary=True),
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+        exclude_invalid_files=False,
+        ignore_prefixes=["_", "."],
+    )
+
+
+def _filter_expression(filters: Dict[str, object]):
+    expr = None
+    for col, value in filters.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set, frozenset)):
+            cond = ds.field(col).isin(list(value))
+        else:
+            cond = ds.field(col) == value
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def dataset_columns(dataset_path: Path) -> List[str]:
+    """データセットのカラム（パーティション列を含む）"""
+    return list(_open_dataset(dataset_path).schema.names)
+
+
+def read_dataset(dataset_path: Path, columns: Optional[Sequence[str]] = None,
+                 filters: Optional[Dict[str, object]] = None) -> pd.DataFrame:
+    """データセットを読み込み（列射影 + パーティション・row group の絞り込み）
+
+    Args:
+        dataset_path: データセットのディレクトリ
+        columns: 読み込むカラム（存在しないカラムは無視、Noneで全カラム）
+        filters: {カラム: 値 or 値のリスト}（job_type/row_type はディレクトリ単位、
+                 prefecture 等はrow group統計で読み飛ばす）
+
+    Returns:
+        pd.DataFrame: 辞書エンコードされたカラム・パーティション列は category
+    """
+    started = time.perf_counter()
+    dataset = _open_dataset(dataset_path)
+    names = dataset.schema.names
+    if columns is not None:
+        columns = [c for c in dict.fromkeys(columns) if c in names]
+    expr = _filter_expression({k: v for k, v in (filters or {}).items() if k in names})
+    table = dataset.to_table(columns=columns, filter=expr)
+    # 全行を読む場合はスキーマ順（CSVと同じカラム順）に並べる
+    ordered = [c for c in read_dataset_info(dataset_path).get("columns", []) if c in table.column_names]
+    ordered += [c for c in table.column_names if c not in ordered]
+    table = table.select(ordered)
+    # Arrow側のバッファを変換しながら解放（ピークメモリを抑える）
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"[PARQUET] Read {len(df):,} rows x {len(df.columns)} cols in {elapsed:.0f}ms "
+          f"(columns={'all' if columns is None else len(columns)}, filters={filters or {}})")
+    return df
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""db_helperの非同期ファサード（NiceGUIイベントハンドラ用）
+
+2026-01-20追加:
+db_helperのgetterは同期httpx + pandas集計のため、asyncハンドラから直接呼ぶと
+クエリ実行中はイベントループ全体が止まり、他ユーザーのWebSocketも応答しなくなる。
+このモジュール経由で呼び出すと、処理はスレッドプール（nicegui.run.io_bound）で実行され、
+イベントループは他クライアントの描画を継続できる。
+
+職種について:
+    セッションの職種（app.storage.user）はUIコンテキスト（イベントループ側）でしか参照できないため、
+    呼び出し時にイベントループ上で職種を解決し、ワーカースレッドでは job_type_scope() で固定する。
+
+使用例:
+    from db_async import run_in_thread, gather_in_threads
+
+    stats = await run_in_thread(get_prefecture_stats, "東京都")
+    flow, dist = await gather_in_threads(
+        (get_talent_flow, "東京都", None),
+        (get_distance_stats, "東京都", None),
+    )
+"""
+
+import asyncio
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+try:
+    from nicegui import run
+    _HAS_NICEGUI = True
+except ImportError:  # Reflex等、NiceGUI以外から利用する場合
+    _HAS_NICEGUI = False
+
+import db_helper
+from db_helper import get_current_job_type, job_type_scope
+
+
+def _call_in_scope(job_type: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+    """ワーカースレッド側: 呼び出し元の職種で関数を実行"""
+    with job_type_scope(job_type):
+        return func(*args, **kwargs)
+
+
+async def run_in_thread(func: Callable, *args, **kwargs) -> Any:
+    """同期関数をスレッドプールで実行（呼び出し元セッションの職種を引き継ぐ）
+
+    Args:
+        func: db_helperのgetter、またはブロッキング処理を含む任意の同期関数
+        *args, **kwargs: funcに渡す引数
+
+    Returns:
+        funcの戻り値（アプリ停止中でキャンセルされた場合はNone）
+    """
+    job_type = get_current_job_type()  # イベントループ上で解決（セッションストレージ参照）
+    if _HAS_NICEGUI:
+        return await run.io_bound(_call_in_scope, job_type, func, args, kwargs)
+    return await asyncio.to_thread(_call_in_scope, job_type, func, args, kwargs)
+
+
+async def gather_in_threads(*calls: tuple) -> list:
+    """複数のgetterを並行実行（タブ表示時の独立したクエリをまとめて取得）
+
+    Args:
+        *calls: (関数, 位置引数...) のタプル
+
+    Returns:
+        list: 各呼び出しの戻り値（calls と同じ順序）
+    """
+    return list(await asyncio.gather(*(run_in_thread(func, *args) for func, *args in calls)))
+
+
+async def query_turso_df(sql: str, params: Optional[tuple] = None) -> pd.DataFrame:
+    """Tursoに非同期でクエリを実行してDataFrameとして取得
+
+    db_helper._turso_async_query（共有AsyncClient）を使用するため、スレッドを消費しない。
+    エラー時は例外を送出する（呼び出し側でフォールバック）。
+    """
+    rows, columns = await db_helper._turso_async_query(sql, list(params) if params else None)
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(rows, columns=columns)
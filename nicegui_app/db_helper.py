@@ -6,21 +6,34 @@
 DashboardStateでのデータベースアクセスを簡潔にするヘルパー関数群。
 環境変数で自動切り替え：
 - USE_CSV_MODE=true → CSV直接読み込み（Reflex Cloud推奨）
+  （CSV_LAZY_LOAD=false で遅延読み込みを無効化し、起動時に全量読み込み）
 - TURSO_DATABASE_URL設定あり → Turso使用
 - DATABASE_URL設定あり → PostgreSQL使用
 - どちらも未設定 → SQLite使用
+- STATS_ROLLUP=false → 3層比較統計の事前集計（stats_rollup.py）を使わず行データから集計
 """
 
 import os
 import sys
 import sqlite3
 import asyncio
+import functools
+import threading
+import numpy as np
 import pandas as pd
 import httpx  # requests から置き換え（非同期対応）
+from turso_client import post_pipeline, async_post_pipeline, get_turso_client_stats  # 2026-01-20: 共有コネクションプール
+from cache_manager import cache_manager, estimate_size  # 2026-01-20: メモリ予算付きキャッシュ
+from columnar_data import find_dataset, read_dataset  # 2026-01-20: Parquetデータセット（pyarrowはオプション）
+import stats_rollup  # 2026-01-20: 3層比較統計の事前集計
+import flow_cube  # 2026-01-20: 居住地×希望勤務地フローの疎行列
+import warmup  # 2026-01-20: 事前ロードの一括取得（row_typeパーティション単位）
+import instrumentation  # 2026-01-20: getterの所要時間（/metrics）
 from pathlib import Path
-from typing import Optional, Union
-from datetime import datetime, timedelta
+from typing import Callable, Optional, Union
 from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 print("=" * 60)
 print("[STARTUP] db_helper.py loading...")
@@ -188,13 +201,9 @@ def filter_realistic_flows(flows: list, target_pref: str) -> list:
 # CSVデータのグローバルキャッシュ（起動時に1回だけ読み込み）
 _csv_dataframe: Optional[pd.DataFrame] = None
 
-def _find_csv_path() -> tuple[Optional[Path], bool]:
-    """
-    CSVファイルを複数の場所から探す（Reflex Cloud対応）
-    Returns: (path, is_gzip)
-    """
-    # 探す場所のリスト（優先順位順）
-    search_dirs = [
+def _data_search_dirs() -> list[Path]:
+    """データファイルを探す場所のリスト（優先順位順）"""
+    return [
         Path(__file__).parent,  # db_helper.pyと同じディレクトリ
         Path(__file__).parent.parent,  # 親ディレクトリ
         Path.cwd(),  # カレントディレクトリ
@@ -203,6 +212,22 @@ def _find_csv_path() -> tuple[Optional[Path], bool]:
         Path("/app/mapcomplete_dashboard"),  # サブディレクトリ
     ]
 
+
+def _find_columnar_path() -> Optional[Path]:
+    """Parquetデータセットを探す（2026-01-20追加）
+
+    pyarrow未インストール・データセットなし・元CSVの方が新しい（再生成漏れ）場合はNone（CSVを使う）。
+    """
+    return find_dataset(_data_search_dirs(), csv_names=(CSV_FILENAME_GZ, CSV_FILENAME))
+
+
+def _find_csv_path() -> tuple[Optional[Path], bool]:
+    """
+    CSVファイルを複数の場所から探す（Reflex Cloud対応）
+    Returns: (path, is_gzip)
+    """
+    search_dirs = _data_search_dirs()
+
     # gzip版を優先して探す
     for dir_path in search_dirs:
         gz_path = dir_path / CSV_FILENAME_GZ
@@ -262,30 +287,359 @@ def _load_csv_data() -> pd.DataFrame:
 
     更新履歴:
     - 2025-12-22: dtype最適化追加（メモリ68%削減）
+    - 2026-01-20: 地域インデックス用にソート + 範囲インデックス構築（_csv_slice参照）
+    - 2026-01-20: Parquetデータセット（columnar_data）があれば優先（パース・dtype最適化なし）
+    - 2026-01-20: 初回読み込みをsingle_flight化、インデックス → フレームの順に公開（並行getter対策）
     """
-    global _csv_dataframe
     if _csv_dataframe is None:
-        csv_path, is_gzip = _find_csv_path()
+        def load():
+            global _csv_dataframe, _csv_region_index
+            if _csv_dataframe is not None:
+                return _csv_dataframe
+            df = _read_csv_data()
+            # 地域インデックス（ソートは読み込み時の1回のみ）
+            df = _sort_for_region_index(df)
+            # インデックスを先に公開する（_csv_slice はフレームが公開済みならインデックスも揃っている前提）
+            _csv_region_index = _build_csv_region_index(df)
+            _csv_dataframe = df
+            return df
+        # 並行するgetter（gather_in_threads）が同時に初回読み込みしても、パースは1回のみ
+        single_flight("full", load, namespace="csv_partition")
+    return _csv_dataframe
 
-        if csv_path is None:
-            raise FileNotFoundError(
-                f"CSVファイルが見つかりません: {CSV_FILENAME_GZ} または {CSV_FILENAME}\n"
-                "USE_CSV_MODE=true の場合、CSVファイルをデプロイパッケージに含めてください。"
-            )
 
-        if is_gzip:
-            print(f"[CSV] Loading compressed data from {csv_path}...")
-            _csv_dataframe = pd.read_csv(csv_path, encoding='utf-8-sig', compression='gzip', low_memory=False)
+def _read_csv_data() -> pd.DataFrame:
+    """Parquetデータセット（あれば優先）またはCSVを読み込み、dtype最適化したフレームを返す（ソート前）"""
+    if (columnar_path := _find_columnar_path()) is not None:
+        # 低カーディナリティ列はデータセット作成時に辞書エンコード済み（読み込み時点でcategory）
+        print(f"[CSV] Loading columnar dataset from {columnar_path}...")
+        return read_dataset(columnar_path)
+
+    csv_path, is_gzip = _find_csv_path()
+
+    if csv_path is None:
+        raise FileNotFoundError(
+            f"CSVファイルが見つかりません: {CSV_FILENAME_GZ} または {CSV_FILENAME}\n"
+            "USE_CSV_MODE=true の場合、CSVファイルをデプロイパッケージに含めてください。"
+        )
+
+    if is_gzip:
+        print(f"[CSV] Loading compressed data from {csv_path}...")
+        df = pd.read_csv(csv_path, encoding='utf-8-sig', compression='gzip', low_memory=False)
+    else:
+        print(f"[CSV] Loading data from {csv_path}...")
+        df = pd.read_csv(csv_path, encoding='utf-8-sig', low_memory=False)
+
+    print(f"[CSV] Loaded {len(df):,} rows")
+
+    # dtype最適化（メモリ68%削減）
+    return _optimize_dtypes(df)
+
+
+# =====================================
+# CSVモード: 地域インデックス（2026-01-20追加）
+# =====================================
+# 読み込み時にフレームを (job_type, row_type, prefecture, municipality) でソートし、
+# 各キー接頭辞 → 行範囲 (start, stop) の辞書を構築する。
+# ソート済みなので任意の接頭辞は連続範囲となり、df.iloc[start:stop] はO(1)のビュー（コピーなし）。
+# 以前は呼び出し毎に全行のbooleanマスク走査 + .copy() を行っていた。
+# 注: 返されるフレームは共有キャッシュのビュー。変更する場合は呼び出し側で .copy() すること。
+_CSV_INDEX_COLUMNS = ("job_type", "row_type", "prefecture", "municipality")
+_csv_region_index: Optional[dict] = None
+
+
+def _sort_for_region_index(df: pd.DataFrame) -> pd.DataFrame:
+    """インデックス列でソート（安定ソート、NaNは各グループ末尾）"""
+    cols = [c for c in _CSV_INDEX_COLUMNS if c in df.columns]
+    if not cols:
+        return df
+    return df.sort_values(cols, kind="stable", na_position="last").reset_index(drop=True)
+
+
+def _build_csv_region_index(df: pd.DataFrame) -> dict:
+    """ソート済みフレームからキー接頭辞 → 行範囲の辞書を構築
+
+    Returns:
+        dict: {
+            "columns": インデックス対象の列（CSVに存在するもののみ）,
+            "ranges": {(job_type,): (start, stop), (job_type, row_type): ..., ...},
+            "children": {接頭辞: [次の階層の値, ...]}（階層の途中が未指定のクエリ用）
+        }
+        キー内のNoneは欠損値（NaN）を表す。
+    """
+    cols = [c for c in _CSV_INDEX_COLUMNS if c in df.columns]
+    ranges = {}
+    children = {}
+    n_rows = len(df)
+    if n_rows == 0 or not cols:
+        return {"columns": cols, "ranges": ranges, "children": children}
+
+    # 各列を整数コードに変換し、接頭辞の値が変わる位置（境界）をベクトル演算で求める
+    codes, uniques = [], []
+    for col in cols:
+        col_codes, col_uniques = pd.factorize(df[col], use_na_sentinel=True)
+        codes.append(col_codes)
+        uniques.append([None if pd.isna(u) else u for u in col_uniques] + [None])  # -1 → None
+
+    changed = np.zeros(n_rows, dtype=bool)
+    changed[0] = True
+    for depth in range(1, len(cols) + 1):
+        col_codes = codes[depth - 1]
+        changed[1:] |= col_codes[1:] != col_codes[:-1]
+        starts = np.flatnonzero(changed)
+        stops = np.append(starts[1:], n_rows)
+        key_columns = [[uniques[level][c] for c in codes[level][starts]] for level in range(depth)]
+        for key, start, stop in zip(zip(*key_columns), starts.tolist(), stops.tolist()):
+            ranges[key] = (start, stop)
+            children.setdefault(key[:-1], []).append(key[-1])
+    print(f"[CSV] Region index built: {len(ranges):,} ranges over {cols}")
+    return {"columns": cols, "ranges": ranges, "children": children}
+
+
+def _csv_slice(row_type: str = None, prefecture: str = None, municipality: str = None,
+               columns: Optional[list] = None) -> pd.DataFrame:
+    """CSVフレームから 現在の職種 × row_type × 地域 のスライスを取得
+
+    指定したキーがインデックス列の接頭辞になっている場合（例: row_type+都道府県）は
+    連続範囲のビューをO(1)で返す。階層の途中が未指定の場合（例: row_type未指定で市区町村指定）は
+    該当する範囲のみを結合して返す（全件走査はしない）。
+
+    2026-01-20: 遅延読み込み（CSV_LAZY_LOAD）では全量を読まず、必要な (職種, row_type) パーティションの
+    必要なカラムだけを読み込む（_csv_partitions 参照）。
+
+    Args:
+        row_type: 行タイプ（Noneで全行タイプ）
+        prefecture: 都道府県（Noneで全国）
+        municipality: 市区町村（Noneで都道府県全体）
+        columns: 呼び出し側が使うカラム（インデックス列は常に含む。Noneで全カラム）。
+                 遅延読み込み時はこれ以外のカラムは含まれないため、使うカラムはすべて指定すること
+    """
+    wanted = {
+        "job_type": _get_job_type(),
+        "row_type": row_type,
+        "prefecture": prefecture,
+        "municipality": municipality,
+    }
+    if _csv_dataframe is not None or not CSV_LAZY_LOAD:
+        df = _load_csv_data()
+        return _slice_indexed(df, _csv_region_index, wanted)
+
+    catalog = _csv_catalog()
+    index_cols = catalog["index"]["columns"]
+    if "row_type" not in index_cols:
+        # row_type列がないCSV（パーティション分割できない）は全量読み込み
+        return _slice_indexed(_load_csv_data(), _csv_region_index, wanted)
+    if columns is not None and set(columns) <= set(index_cols):
+        # 都道府県・市区町村リスト等はキー列だけのカタログで足りる
+        return _slice_indexed(catalog["df"], catalog["index"], wanted)
+
+    job_type = wanted["job_type"] if "job_type" in index_cols else None
+    if row_type is None and prefecture is not None and catalog["source"][0] == "parquet":
+        # 全row_typeの地域データ: パーティション全体ではなく該当地域のrow groupのみ読む（結果は呼び出し側でキャッシュ）
+        filters = {c: wanted[c] for c in index_cols if wanted[c] is not None and c != "job_type"}
+        if job_type is not None:
+            filters["job_type"] = job_type
+        df = _sort_for_region_index(_read_csv_source(_with_index_columns(columns, index_cols), filters))
+        return _slice_indexed(df, _build_csv_region_index(df), wanted)
+
+    row_types = [row_type] if row_type is not None else _csv_row_types(catalog, job_type)
+    parts = _csv_partitions(job_type, row_types, columns)
+    slices = [_slice_indexed(parts[rt]["df"], parts[rt]["index"], wanted) for rt in row_types if rt in parts]
+    if not slices:
+        return catalog["df"].iloc[0:0]
+    if len(slices) == 1:
+        return slices[0]
+    return pd.concat(slices, ignore_index=True)
+
+
+def _csv_slice_is_shared(row_type: str = None, prefecture: str = None) -> bool:
+    """_csv_slice の結果が常駐フレーム・読み込み済みパーティションの行（ビュー/文字列は共有）を参照するか
+
+    Parquetの地域row groupを個別に読んだ場合（独立したフレーム）のみFalse。
+    """
+    if _csv_dataframe is not None or not CSV_LAZY_LOAD:
+        return True
+    catalog = _csv_catalog()
+    if "row_type" not in catalog["index"]["columns"]:
+        return True
+    return not (row_type is None and prefecture is not None and catalog["source"][0] == "parquet")
+
+
+def _slice_indexed(df: pd.DataFrame, index: dict, wanted: dict) -> pd.DataFrame:
+    """地域インデックス付きフレームから wanted（列 → 値、Noneは未指定）に一致する行を取得"""
+    cols = index["columns"]
+    specified = [i for i, c in enumerate(cols) if wanted[c] is not None]
+    if not specified:
+        return df
+
+    depth = specified[-1] + 1
+    if specified == list(range(depth)):
+        span = index["ranges"].get(tuple(wanted[c] for c in cols[:depth]))
+        return df.iloc[span[0]:span[1]] if span else df.iloc[0:0]
+
+    # 階層の途中に未指定キーがある: 未指定の階層だけ子キーに展開して該当範囲を集める
+    keys = [()]
+    for col in cols[:depth]:
+        if wanted[col] is not None:
+            keys = [key + (wanted[col],) for key in keys]
         else:
-            print(f"[CSV] Loading data from {csv_path}...")
-            _csv_dataframe = pd.read_csv(csv_path, encoding='utf-8-sig', low_memory=False)
+            keys = [key + (child,) for key in keys for child in index["children"].get(key, ())]
+    spans = sorted(index["ranges"][key] for key in keys if key in index["ranges"])
+    if not spans:
+        return df.iloc[0:0]
+    positions = np.concatenate([np.arange(start, stop) for start, stop in spans])
+    return df.take(positions)
 
-        print(f"[CSV] Loaded {len(_csv_dataframe):,} rows")
 
-        # dtype最適化（メモリ68%削減）
-        _csv_dataframe = _optimize_dtypes(_csv_dataframe)
+# =====================================
+# CSVモード: 遅延読み込み（2026-01-20追加）
+# =====================================
+# 以前は最初のgetter呼び出しで全職種 × 全row_type × 全カラムを _csv_dataframe に読み込み、常駐させていた
+# （概要タブしか開かないセッションでも RESIDENCE_FLOW や WORKSTYLE_* の分までメモリを使う）。
+# 遅延読み込みでは:
+#   - カタログ: キー列（job_type, row_type, prefecture, municipality）のみ + 地域インデックス。常駐（小さい）
+#   - パーティション: (職種, row_type) 単位で、getterが宣言したカラムのみ読み込み、
+#     cache_manager の "csv_partition" 名前空間（共通のメモリ予算）に保持。
+#     キャッシュ済みのカラムで足りなければ、カラムを追加して読み直す
+# データソースはParquetデータセット（columnar_data）があれば列射影 + パーティション絞り込みで読み、
+# なければCSVをチャンク単位で1パス走査する（欠けているrow_typeをまとめて読む）。
+# CSV_LAZY_LOAD=false で従来の全量読み込み（_load_csv_data）に戻せる。
+CSV_LAZY_LOAD = os.getenv("CSV_LAZY_LOAD", "true").lower() not in ("false", "0", "no")
+_CSV_SCAN_CHUNK_ROWS = 200_000
+_csv_catalog_data: Optional[dict] = None
+
+
+def _with_index_columns(columns: Optional[list], index_cols: list) -> Optional[list]:
+    """読み込むカラム（インデックス列 + 呼び出し側のカラム、Noneは全カラム）"""
+    if columns is None:
+        return None
+    return list(dict.fromkeys([*index_cols, *columns]))
+
+
+def _csv_source() -> tuple[str, Path]:
+    """遅延読み込みのデータソース: ("parquet", データセット) または ("csv", CSVファイル)"""
+    columnar_path = _find_columnar_path()
+    if columnar_path is not None:
+        return "parquet", columnar_path
+    csv_path, _ = _find_csv_path()
+    if csv_path is None:
+        raise FileNotFoundError(
+            f"CSVファイルが見つかりません: {CSV_FILENAME_GZ} または {CSV_FILENAME}\n"
+            "USE_CSV_MODE=true の場合、CSVファイルをデプロイパッケージに含めてください。"
+        )
+    return "csv", csv_path
+
+
+def _read_csv_source(columns: Optional[list], filters: dict, source: Optional[tuple] = None) -> pd.DataFrame:
+    """データソースから指定カラム・条件の行を読み込み
+
+    Args:
+        columns: 読み込むカラム（存在しないカラムは無視、Noneで全カラム）
+        filters: {カラム: 値 or 値のリスト}
+        source: _csv_source() の結果（省略時はカタログのソース）
+    """
+    import time
+    kind, path = source or _csv_catalog()["source"]
+    if kind == "parquet":
+        return read_dataset(path, columns=columns, filters=filters)
+
+    # CSV: 必要なカラムだけパースし、チャンクごとに条件で絞り込む（全量を保持しない）
+    started = time.time()
+    wanted = None if columns is None else set(columns) | set(filters)
+    reader = pd.read_csv(path, encoding='utf-8-sig', low_memory=False, chunksize=_CSV_SCAN_CHUNK_ROWS,
+                         usecols=None if wanted is None else (lambda c: c in wanted))
+    chunks = []
+    for chunk in reader:
+        mask = pd.Series(True, index=chunk.index)
+        for col, value in filters.items():
+            if col in chunk.columns:
+                mask &= chunk[col].isin(value) if isinstance(value, (list, tuple, set)) else chunk[col] == value
+        chunks.append(chunk[mask])
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    if columns is not None:
+        df = df[[c for c in df.columns if c in columns]]
+    print(f"[CSV] Scanned {path.name}: {len(df):,} rows x {len(df.columns)} cols "
+          f"in {(time.time() - started) * 1000:.0f}ms (filters={filters})")
+    return _optimize_dtypes(df) if len(df) else df
+
+
+def _csv_catalog() -> dict:
+    """キー列のみのカタログ（初回のみ読み込み、以降は常駐）
+
+    Returns:
+        dict: {"df": キー列のフレーム（ソート済み）, "index": 地域インデックス, "source": (種別, パス)}
+    """
+    global _csv_catalog_data
+    if _csv_catalog_data is None:
+        def load():
+            if _csv_catalog_data is not None:
+                return _csv_catalog_data
+            source = _csv_source()
+            print(f"[CSV] Loading key columns from {source[1]} (lazy load)...")
+            df = _sort_for_region_index(_read_csv_source(list(_CSV_INDEX_COLUMNS), {}, source=source))
+            return {"df": df, "index": _build_csv_region_index(df), "source": source}
+        _csv_catalog_data = single_flight("catalog", load, namespace="csv_partition")
+    return _csv_catalog_data
+
+
+def _csv_row_types(catalog: dict, job_type: Optional[str]) -> list:
+    """職種のrow_type一覧（カタログの地域インデックスから取得、ソート順）"""
+    prefix = (job_type,) if catalog["index"]["columns"][0] == "job_type" else ()
+    return [rt for rt in catalog["index"]["children"].get(prefix, []) if rt is not None]
+
+
+def _csv_partitions(job_type: Optional[str], row_types: list, columns: Optional[list]) -> dict:
+    """(職種, row_type) パーティションを取得（未キャッシュ・カラム不足の分はまとめて1回で読み込み）
+
+    Returns:
+        dict: row_type → {"df": ソート済みフレーム, "index": 地域インデックス, "columns": 読み込んだカラム（Noneは全カラム）}
+    """
+    parts, missing = {}, []
+    for row_type in row_types:
+        entry = cache_manager.get("csv_partition", (job_type, row_type))
+        if entry is not None and (entry["columns"] is None or (columns is not None and set(columns) <= entry["columns"])):
+            parts[row_type] = entry
+        else:
+            missing.append((row_type, entry))
+    if not missing:
+        return parts
+
+    # 既に読み込み済みのカラムも含めて読み直す（同じパーティションを複数エントリで持たない）
+    load_columns = columns
+    for _, entry in missing:
+        if load_columns is not None:
+            load_columns = None if entry is not None and entry["columns"] is None else \
+                sorted(set(load_columns) | (entry["columns"] if entry is not None else set()))
+    missing_types = tuple(sorted(rt for rt, _ in missing))
+    key = (job_type, missing_types, None if load_columns is None else tuple(load_columns))
+    loaded = single_flight(key, lambda: _load_csv_partitions(job_type, missing_types, load_columns),
+                           namespace="csv_partition")
+    parts.update(loaded)
+    return parts
+
+
+def _load_csv_partitions(job_type: Optional[str], row_types: tuple, columns: Optional[list]) -> dict:
+    index_cols = _csv_catalog()["index"]["columns"]
+    filters = {"row_type": list(row_types)}
+    if job_type is not None:
+        filters["job_type"] = job_type
+    df = _read_csv_source(_with_index_columns(columns, index_cols), filters)
+
+    loaded = {}
+    for row_type, part in df.groupby("row_type", observed=True, sort=False):
+        part = _sort_for_region_index(part)
+        entry = {
+            "df": part,
+            "index": _build_csv_region_index(part),
+            "columns": None if columns is None else frozenset(part.columns),
+        }
+        size = int(part.memory_usage(deep=True).sum()) + estimate_size(entry["index"])
+        cache_manager.set("csv_partition", (job_type, row_type), entry, size=size)
+        loaded[row_type] = entry
+    print(f"[CSV] Loaded partitions {job_type}/{list(row_types)}: {len(df):,} rows, "
+          f"columns={'all' if columns is None else len(df.columns)}")
+    return loaded
 
-    return _csv_dataframe
 
 # Turso環境変数
 TURSO_DATABASE_URL = os.getenv("TURSO_DATABASE_URL", "")
@@ -383,75 +737,149 @@ print("=" * 60)
 # 5. 明示的更新: refresh_all_cache() で全キャッシュをクリア&再読み込み
 #
 # これにより、例えば100人が同時に「東京都」を選択しても、
-# DBクエリは最初の1人目の1回のみ
-
-_cache: dict = {}
-_cache_time: dict = {}
-_max_cache_items = 100  # メモリ最適化: 100件に削減（Render 512MB対応）
+# DBクエリは最初の1人目の1回のみ（同時のキャッシュミスは single_flight で1回に集約、2026-01-20）
+
+# 2026-01-20変更: 件数上限のLRU dict → cache_manager（全キャッシュ共通のバイト予算 + 重み付きLRU）
+# 名前空間（重みが大きいほど予算超過時に残りやすい）:
+#   legacy: get_all_data等の汎用キャッシュ（TTL 30分）
+#   filtered_data: (職種, 都道府県, 市区町村) → DataFrame
+#   batch_cache: batch_stats/flow/persona/マーカー等（市区町村単位）
+#   preload: (職種, 都道府県) → 全カラムDataFrame（バックグラウンド事前ロード）
 _ttl_minutes = 30  # メモリ最適化: 30分に短縮
-
-# 永続キャッシュ（TTLなし、明示的にクリアするまで保持）
-# filtered_data: LRU方式でメモリ管理（2026-01-15追加）
-# batch_cache: batch_stats/batch_flow/batch_persona等のLRU制御（2026-01-15追加）
-_FILTERED_DATA_MAX_SIZE = 100  # LRU上限（メモリ超過防止）
-_BATCH_CACHE_MAX_SIZE = 200  # batch_stats等のLRU上限（市区町村単位キャッシュ）
+cache_manager.register("legacy", weight=1.0, ttl_seconds=_ttl_minutes * 60)
+cache_manager.register("filtered_data", weight=2.0)
+cache_manager.register("batch_cache", weight=2.0)
+cache_manager.register("preload", weight=4.0)
+cache_manager.register("csv_partition", weight=4.0)  # CSVモード遅延読み込み: (職種, row_type) → パーティション
+cache_manager.register("stats_rollup", weight=4.0)  # Turso: (職種,) → 事前集計テーブル（stats_rollup）
+cache_manager.register("flow_cube", weight=4.0)  # (職種,) → RESIDENCE_FLOWの疎行列（flow_cube）
+_DB_CACHE_NAMESPACES = ("legacy", "filtered_data", "batch_cache", "preload", "csv_partition", "stats_rollup",
+                        "flow_cube")
+
+# 永続キャッシュ（TTLなし、明示的にクリアするまで保持。都道府県・市区町村リストは小さいため予算管理外）
 _static_cache: dict = {
-    "prefectures": None,  # 都道府県リスト
-    "municipalities": {},  # 都道府県→市区町村リストのマッピング
-    "filtered_data": OrderedDict(),  # prefecture_municipality → DataFrame（LRU制御）
-    "batch_cache": OrderedDict(),  # batch_stats/flow/persona等（LRU制御）
+    "prefectures": {},  # 職種 → 都道府県リスト
+    "municipalities": {},  # (職種, 都道府県) → 市区町村リスト
 }
 _cache_initialized: bool = False
+# getterはdb_async経由でスレッドプールから並行実行されるため、LRU操作を排他（2026-01-20追加）
+_cache_lock = threading.RLock()
 
-# 現在選択中の職種（グローバル設定）
-_current_job_type: str = "介護職"
+# =====================================
+# 職種スコープ（2026-01-20: グローバル切り替え → セッション単位）
+# =====================================
+# 以前は set_current_job_type() がモジュールグローバルを書き換えて全キャッシュを破棄していたため、
+# 1人が職種を切り替えるたびに全ユーザーがコールドクエリに戻っていた。
+# 現在は職種をContextVar（タスク/スレッド単位）で解決し、全キャッシュキーの先頭に職種を含める。
+#
+# 職種の解決順:
+#   1. 各getterの明示引数 job_type=（例: get_national_stats(job_type="看護師")）
+#   2. job_type_scope() / set_current_job_type() で設定した現在のコンテキストの値
+#   3. set_job_type_provider() で登録したプロバイダ（main.pyではセッションの選択値）
+#   4. DEFAULT_JOB_TYPE
+DEFAULT_JOB_TYPE = "介護職"
+_job_type_var: ContextVar[Optional[str]] = ContextVar("job_type", default=None)
+_job_type_provider: Optional[Callable[[], Optional[str]]] = None
 
+# メモリ予算: 同時にキャッシュを保持する職種数（LRU、超過時は最も古い職種のキャッシュを破棄）
+_MAX_WARM_JOB_TYPES = max(1, int(os.getenv("JOB_TYPE_CACHE_MAX", "3")))
+_warm_job_types: OrderedDict = OrderedDict()
+_warm_job_types_lock = threading.Lock()
 
-def set_current_job_type(job_type: str) -> None:
-    """現在の職種を設定し、キャッシュをクリアする
 
-    職種変更時に呼び出すこと。キャッシュは自動的にクリアされ、
-    次回クエリ時に新しい職種でデータが取得される。
+def set_job_type_provider(provider: Optional[Callable[[], Optional[str]]]) -> None:
+    """コンテキスト未設定時に職種を返すプロバイダを登録（main.pyのセッション値など）
+
+    プロバイダが例外を投げた場合やNoneを返した場合はDEFAULT_JOB_TYPEを使用する。
     """
-    global _current_job_type, _static_cache, _cache, _cache_time
-    global _preload_cache, _preload_status  # P0-3修正: プリロードキャッシュも追加
+    global _job_type_provider
+    _job_type_provider = provider
 
-    if _current_job_type == job_type:
-        print(f"[JOB_TYPE] Already set to: {job_type}")
-        return
 
-    print(f"[JOB_TYPE] Changing from '{_current_job_type}' to '{job_type}'")
-    _current_job_type = job_type
+def _get_job_type() -> str:
+    """現在のコンテキストの職種を解決し、キャッシュのLRU順を更新"""
+    job_type = _job_type_var.get()
+    if not job_type and _job_type_provider is not None:
+        try:
+            job_type = _job_type_provider()
+        except Exception:
+            job_type = None
+    job_type = job_type or DEFAULT_JOB_TYPE
+    _touch_job_type(job_type)
+    return job_type
+
+
+def _touch_job_type(job_type: str) -> None:
+    """職種を最近使用としてマークし、予算超過分の職種キャッシュを破棄"""
+    evicted = []
+    with _warm_job_types_lock:
+        if job_type in _warm_job_types:
+            _warm_job_types.move_to_end(job_type)
+            return
+        _warm_job_types[job_type] = True
+        while len(_warm_job_types) > _MAX_WARM_JOB_TYPES:
+            old_job_type, _ = _warm_job_types.popitem(last=False)
+            evicted.append(old_job_type)
+    for old_job_type in evicted:
+        _evict_job_type(old_job_type)
+
+
+def _evict_job_type(job_type: str) -> None:
+    """指定職種のキャッシュのみを破棄（他の職種のキャッシュは保持）"""
+    for namespace in _DB_CACHE_NAMESPACES:
+        cache_manager.evict_where(namespace, lambda k: isinstance(k, tuple) and k[0] == job_type)
+    with _cache_lock:
+        _static_cache["prefectures"].pop(job_type, None)
+        for key in [k for k in list(_static_cache["municipalities"]) if k[0] == job_type]:
+            _static_cache["municipalities"].pop(key, None)
+    print(f"[JOB_TYPE] Evicted caches for '{job_type}' (max warm job types={_MAX_WARM_JOB_TYPES})")
+
+
+@contextmanager
+def job_type_scope(job_type: Optional[str]):
+    """with文の範囲内だけ職種を切り替える（スレッド・バッチ処理用）
 
-    # キャッシュをクリア（新職種のデータを取得するため）
-    _static_cache = {
-        "prefectures": None,
-        "municipalities": {},
-        "filtered_data": OrderedDict(),  # LRU制御用にOrderedDict
-        "batch_cache": OrderedDict(),  # batch_stats等のLRU制御
-    }
-    _cache = {}
-    _cache_time = {}
-
-    # P0-3修正: プリロードキャッシュもクリア（メモリ管理とデータ整合性のため）
-    _preload_cache = {}
-    _preload_status = {
-        "loading": False,
-        "loaded": False,
-        "progress": 0,
-        "total": len(PREFECTURE_ORDER),
-        "errors": []
-    }
+    使用例:
+        with job_type_scope("看護師"):
+            stats = get_national_stats()
+    """
+    token = _job_type_var.set(job_type)
+    try:
+        yield
+    finally:
+        _job_type_var.reset(token)
 
-    # メモリ解放（LRUキャッシュクリア後のガベージコレクション）
-    import gc
-    gc.collect()
-    print(f"[JOB_TYPE] All caches cleared + gc.collect() for job_type change to '{job_type}'")
+
+def _job_type_scoped(func):
+    """getterに job_type= キーワード引数を追加するデコレータ
+
+    指定時は関数内（内部で呼ぶ他のgetterを含む）をその職種で実行する。
+    2026-01-20追加: 所要時間を "db.<関数名>" のスパンとして記録（instrumentation）
+    """
+    span_name = f"db.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, job_type: Optional[str] = None, **kwargs):
+        with instrumentation.span(span_name):
+            if job_type is None:
+                return func(*args, **kwargs)
+            with job_type_scope(job_type):
+                return func(*args, **kwargs)
+    return wrapper
+
+
+def set_current_job_type(job_type: str) -> None:
+    """現在のコンテキスト（タスク/スレッド）の職種を設定
+
+    2026-01-20変更: 他ユーザーに影響しないよう、グローバル変更とキャッシュ全破棄を廃止。
+    キャッシュは職種別に保持されるため、切り替え後も以前の職種はウォームなまま再利用される。
+    """
+    _job_type_var.set(job_type)
 
 
 def get_current_job_type() -> str:
-    """現在選択中の職種を取得"""
-    return _current_job_type
+    """現在のコンテキストの職種を取得"""
+    return _get_job_type()
 
 
 # 都道府県の標準順序（JISコード順：北から南）
@@ -550,17 +978,8 @@ def _turso_http_query(sql: str, params: list = None, max_retries: int = 2) -> tu
     - HTTPステータスコードチェック追加
     - リトライロジック追加（最大2回）
     - パラメータバインディング実装（SQLインジェクション対策）
+    - 2026-01-20: 共有コネクションプール（turso_client）経由に変更
     """
-    # HTTPSのURLを構築
-    http_url = TURSO_DATABASE_URL
-    if http_url.startswith('libsql://'):
-        http_url = http_url.replace('libsql://', 'https://')
-
-    headers = {
-        'Authorization': f'Bearer {TURSO_AUTH_TOKEN}',
-        'Content-Type': 'application/json'
-    }
-
     # パラメータバインディング（SQLインジェクション対策）
     # Turso HTTP API v2はargs配列でパラメータを渡す
     stmt = {'sql': sql}
@@ -576,22 +995,17 @@ def _turso_http_query(sql: str, params: list = None, max_retries: int = 2) -> tu
     last_error = None
     for attempt in range(max_retries + 1):
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f'{http_url}/v2/pipeline',
-                    headers=headers,
-                    json=payload
-                )
+            response = post_pipeline(TURSO_DATABASE_URL, TURSO_AUTH_TOKEN, payload)
 
-                # HTTPステータスコードチェック
-                if response.status_code != 200:
-                    raise httpx.HTTPStatusError(
-                        f"HTTP {response.status_code}",
-                        request=response.request,
-                        response=response
-                    )
+            # HTTPステータスコードチェック
+            if response.status_code != 200:
+                raise httpx.HTTPStatusError(
+                    f"HTTP {response.status_code}",
+                    request=response.request,
+                    response=response
+                )
 
-                data = response.json()
+            data = response.json()
 
             if not data.get('results'):
                 return [], []
@@ -645,15 +1059,6 @@ def _turso_batch_query(queries: list) -> list:
     if not queries:
         return []
 
-    http_url = TURSO_DATABASE_URL
-    if http_url.startswith('libsql://'):
-        http_url = http_url.replace('libsql://', 'https://')
-
-    headers = {
-        'Authorization': f'Bearer {TURSO_AUTH_TOKEN}',
-        'Content-Type': 'application/json'
-    }
-
     # 複数ステートメントを1リクエストにまとめる
     requests_list = []
     for sql, params in queries:
@@ -665,18 +1070,13 @@ def _turso_batch_query(queries: list) -> list:
     payload = {'requests': requests_list}
 
     try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(
-                f'{http_url}/v2/pipeline',
-                headers=headers,
-                json=payload
-            )
+        response = post_pipeline(TURSO_DATABASE_URL, TURSO_AUTH_TOKEN, payload)
 
-            if response.status_code != 200:
-                print(f"[Turso Batch] HTTP {response.status_code}")
-                return [pd.DataFrame() for _ in queries]
+        if response.status_code != 200:
+            print(f"[Turso Batch] HTTP {response.status_code}")
+            return [pd.DataFrame() for _ in queries]
 
-            data = response.json()
+        data = response.json()
 
         results = []
         for i, result in enumerate(data.get('results', [])):
@@ -705,6 +1105,39 @@ def _turso_batch_query(queries: list) -> list:
         return [pd.DataFrame() for _ in queries]
 
 
+def _turso_pipeline_query(queries: list) -> list:
+    """複数クエリを1リクエストで実行（2026-01-20追加、事前ロード用）
+
+    _turso_batch_query と異なり、失敗（HTTPエラー・いずれかのクエリのエラー）は例外にする
+    （一部のページだけ欠けたまま事前ロードが完了しないように）。
+
+    Returns:
+        list: 各クエリの結果DataFrame（行がなければ空のDataFrame）
+    """
+    requests_list = []
+    for sql, params in queries:
+        stmt = {'sql': sql}
+        if params:
+            stmt['args'] = _build_turso_args(list(params))
+        requests_list.append({'type': 'execute', 'stmt': stmt})
+
+    response = post_pipeline(TURSO_DATABASE_URL, TURSO_AUTH_TOKEN, {'requests': requests_list})
+    if response.status_code != 200:
+        raise httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
+
+    results = []
+    for i, result in enumerate(response.json().get('results', [])):
+        if result.get('type') == 'error':
+            raise Exception(f"Turso query {i} error: {result.get('error', {}).get('message', 'Unknown')}")
+        resp = result.get('response', {}).get('result', {})
+        columns = [c['name'] for c in resp.get('cols', [])]
+        rows = [[val.get('value') if isinstance(val, dict) else val for val in row] for row in resp.get('rows', [])]
+        results.append(pd.DataFrame(rows, columns=columns) if rows else pd.DataFrame())
+    if len(results) != len(queries):
+        raise Exception(f"Turso pipeline returned {len(results)} results for {len(queries)} queries")
+    return results
+
+
 async def _turso_async_query(sql: str, params: list = None, max_retries: int = 2) -> tuple:
     """Turso非同期クエリ実行（httpx.AsyncClient使用）
 
@@ -713,15 +1146,8 @@ async def _turso_async_query(sql: str, params: list = None, max_retries: int = 2
     - タイムアウト: 10秒
     - リトライロジック追加
     - パラメータバインディング実装（SQLインジェクション対策）
+    - 2026-01-20: 共有コネクションプール（turso_client）経由に変更
     """
-    http_url = TURSO_DATABASE_URL
-    if http_url.startswith('libsql://'):
-        http_url = http_url.replace('libsql://', 'https://')
-
-    headers = {
-        'Authorization': f'Bearer {TURSO_AUTH_TOKEN}',
-        'Content-Type': 'application/json'
-    }
 
     # パラメータバインディング（SQLインジェクション対策）
     stmt = {'sql': sql}
@@ -737,21 +1163,16 @@ async def _turso_async_query(sql: str, params: list = None, max_retries: int = 2
     last_error = None
     for attempt in range(max_retries + 1):
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f'{http_url}/v2/pipeline',
-                    headers=headers,
-                    json=payload
-                )
+            response = await async_post_pipeline(TURSO_DATABASE_URL, TURSO_AUTH_TOKEN, payload)
 
-                if response.status_code != 200:
-                    raise httpx.HTTPStatusError(
-                        f"HTTP {response.status_code}",
-                        request=response.request,
-                        response=response
-                    )
+            if response.status_code != 200:
+                raise httpx.HTTPStatusError(
+                    f"HTTP {response.status_code}",
+                    request=response.request,
+                    response=response
+                )
 
-                data = response.json()
+            data = response.json()
 
             if not data.get('results'):
                 return [], []
@@ -847,72 +1268,202 @@ def query_df(sql: str, params: Optional[tuple] = None) -> pd.DataFrame:
             conn.close()
 
 
-def _get_cached(key: str, ttl_minutes: int = None):
+# =====================================
+# 同時キャッシュミスの集約（single-flight、2026-01-20追加）
+# =====================================
+# キャッシュは check-then-fetch のため、同じ地域を複数ユーザーが同時に開くと
+# 全員がキャッシュミスしてそれぞれDBクエリを実行していた。
+# 同じキーの処理が実行中なら後続の呼び出しは完了を待ち、結果（または例外）を共有する。
+class _Flight:
+    """実行中の1回分の処理（後続の呼び出しはdoneを待つ）"""
+    __slots__ = ("done", "result", "error", "owner")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.owner = threading.get_ident()
+
+
+_flights: dict = {}  # (namespace, key) → _Flight
+_async_flights: dict = {}  # (namespace, key) → asyncio.Task（イベントループ用）
+_flights_lock = threading.Lock()
+_flight_stats: dict = {}  # namespace → {"executed": 実行回数, "coalesced": 待ち合わせで抑止した重複実行数}
+
+
+def _record_flight(namespace: str, coalesced: bool) -> None:
+    stats = _flight_stats.setdefault(namespace, {"executed": 0, "coalesced": 0})
+    stats["coalesced" if coalesced else "executed"] += 1
+
+
+def single_flight(key, fn: Callable, namespace: str = "default"):
+    """同じキーの処理が実行中ならその完了を待って結果を共有（スレッド用）
+
+    Args:
+        key: キャッシュキー（同じキー = 同じ結果になる処理）
+        fn: 引数なしの取得処理
+        namespace: 統計用の名前空間
+
+    同一スレッドからの再入（fn内から同じキーを呼ぶ場合）はデッドロックを避けて直接実行する。
+    """
+    flight_key = (namespace, key)
+    with _flights_lock:
+        flight = _flights.get(flight_key)
+        if flight is not None and flight.owner == threading.get_ident():
+            return fn()
+        leader = flight is None
+        if leader:
+            flight = _flights[flight_key] = _Flight()
+        _record_flight(namespace, coalesced=not leader)
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = fn()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(flight_key, None)
+        flight.done.set()
+
+
+async def single_flight_async(key, coro_fn: Callable, namespace: str = "default"):
+    """single_flight のasync版（イベントループ上のコルーチン用）
+
+    共有する取得処理は独立したタスクで実行し、各呼び出しは asyncio.shield で待つ。
+    先に呼んだ呼び出し（クライアント切断など）がキャンセルされても、取得処理と他の待ち合わせは継続する。
+
+    Args:
+        coro_fn: 引数なしでコルーチンを返す関数
+    """
+    flight_key = (namespace, key)
+    task = _async_flights.get(flight_key)
+    if task is not None:
+        _record_flight(namespace, coalesced=True)
+    else:
+        task = asyncio.ensure_future(coro_fn())
+        _async_flights[flight_key] = task
+        _record_flight(namespace, coalesced=False)
+
+        def _done(t):
+            if _async_flights.get(flight_key) is t:
+                del _async_flights[flight_key]
+            if not t.cancelled():
+                t.exception()  # 待ち合わせが全てキャンセル済みの場合の "exception was never retrieved" 警告を抑止
+
+        task.add_done_callback(_done)
+    return await asyncio.shield(task)
+
+
+def _coalesced(namespace: str, key_func: Callable, cache_namespace: str = None,
+               cache_key: Callable = None):
+    """関数呼び出しをキャッシュキー単位で集約するデコレータ
+
+    キーは (職種, *key_func(*args, **kwargs))。キャッシュ確認から取得・保存までを1回の実行として扱う。
+    cache_namespace を指定すると、cache_manager にキャッシュ済み（キーは cache_key(集約キー)、省略時は集約キーそのもの）
+    の場合は集約せずに返す（キャッシュヒットは実行回数・待ち合わせ回数に数えない）。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (_get_job_type(), *key_func(*args, **kwargs))
+            if cache_namespace is not None:
+                stored_key = cache_key(key) if cache_key is not None else key
+                if cache_manager.contains(cache_namespace, stored_key):  # 統計を変えない存在確認
+                    cached = cache_manager.get(cache_namespace, stored_key)
+                    if cached is not None:
+                        return cached
+            return single_flight(key, lambda: func(*args, **kwargs), namespace)
+        return wrapper
+    return decorator
+
+
+def _batch_cache_key(kind: str) -> Callable:
+    """集約キー (職種, *引数) → batch_cache のキー (職種, kind, *引数)"""
+    return lambda key: (key[0], kind, *key[1:])
+
+
+def get_single_flight_stats() -> dict:
+    """名前空間ごとの実行回数と、待ち合わせで抑止した重複実行数"""
+    with _flights_lock:
+        stats = {ns: dict(s) for ns, s in _flight_stats.items()}
+        in_flight = len(_flights) + len(_async_flights)
+    return {
+        "namespaces": stats,
+        "executed": sum(s["executed"] for s in stats.values()),
+        "coalesced": sum(s["coalesced"] for s in stats.values()),
+        "in_flight": in_flight,
+    }
+
+
+def _get_cached(key: tuple, ttl_minutes: int = None):
     """キャッシュからデータを取得
 
     Args:
-        key: キャッシュキー
-        ttl_minutes: TTL（分）。Noneの場合はデフォルト（2時間）
+        key: キャッシュキー（先頭要素は職種）
+        ttl_minutes: TTL（分）。Noneの場合はデフォルト（30分）
     """
-    if key not in _cache:
-        return None
-    elapsed = datetime.now() - _cache_time[key]
-    effective_ttl = ttl_minutes if ttl_minutes is not None else _ttl_minutes
-    if elapsed > timedelta(minutes=effective_ttl):
-        del _cache[key]
-        del _cache_time[key]
-        return None
-    return _cache[key]
+    max_age = ttl_minutes * 60 if ttl_minutes is not None else None
+    return cache_manager.get("legacy", key, max_age=max_age)
 
 
-def _set_cache(key: str, data):
-    """キャッシュにデータを保存"""
-    if len(_cache) >= _max_cache_items:
-        oldest = min(_cache_time, key=_cache_time.get)
-        del _cache[oldest]
-        del _cache_time[oldest]
-    _cache[key] = data
-    _cache_time[key] = datetime.now()
+def _set_cache(key: tuple, data):
+    """キャッシュにデータを保存（予算超過時は重み付きLRUで追い出し）"""
+    cache_manager.set("legacy", key, data)
 
 
 def clear_cache():
-    """全キャッシュをクリア（永続キャッシュ含む）+ ガベージコレクション"""
+    """全キャッシュをクリア（永続キャッシュ含む）+ ガベージコレクション
+
+    GAPデータ（main.py）とGeoJSON（choropleth_helper）はデータ更新と無関係のため対象外。
+    """
     import gc
-    global _cache, _cache_time, _static_cache, _cache_initialized, _preload_cache
-    _cache = {}
-    _cache_time = {}
-    _static_cache = {
-        "prefectures": None,
-        "municipalities": {},
-        "filtered_data": OrderedDict(),  # LRU制御用にOrderedDict
-        "batch_cache": OrderedDict(),  # batch_stats等のLRU制御
-    }
-    _preload_cache = {}  # プリロードキャッシュもクリア（防御的実装）
+    global _static_cache, _cache_initialized, _csv_catalog_data, _stats_rollup_file
+    for namespace in _DB_CACHE_NAMESPACES:
+        cache_manager.clear(namespace)  # プリロードキャッシュもクリア（防御的実装）
+    _csv_catalog_data = None  # CSVモード遅延読み込みのカタログ（データソース再検出）
+    _stats_rollup_file = None  # CSVモードの事前集計ファイル（再検出）
+    with _cache_lock:
+        _static_cache = {
+            "prefectures": {},
+            "municipalities": {},
+        }
+    with _warm_job_types_lock:
+        _warm_job_types.clear()
     _cache_initialized = False
     gc.collect()  # メモリ解放
-    print("[CACHE] All cache cleared (including _preload_cache, batch_cache) + gc.collect()")
+    print("[CACHE] All cache cleared (including preload, batch_cache) + gc.collect()")
 
 
-def _set_batch_cache(cache_key: str, value) -> None:
-    """batch_cacheにLRU制御付きで値を設定（メモリ超過防止）"""
-    global _static_cache
-    # 既存キーの場合は末尾に移動（LRU更新）
-    if cache_key in _static_cache["batch_cache"]:
-        _static_cache["batch_cache"].move_to_end(cache_key)
-    _static_cache["batch_cache"][cache_key] = value
-    # LRU eviction: 上限超過時に最も古いエントリを削除（空の場合は何もしない）
-    while len(_static_cache["batch_cache"]) > _BATCH_CACHE_MAX_SIZE and _static_cache["batch_cache"]:
-        removed_key, _ = _static_cache["batch_cache"].popitem(last=False)
-        print(f"[CACHE] LRU evicted from batch_cache: {removed_key}")
+def _set_batch_cache(cache_key: tuple, value) -> None:
+    """batch_cacheに値を設定（バイト予算で管理、メモリ超過防止）"""
+    cache_manager.set("batch_cache", cache_key, value)
 
 
-def _get_batch_cache(cache_key: str):
+def _get_batch_cache(cache_key: tuple):
     """batch_cacheから値を取得（LRU更新付き）"""
-    global _static_cache
-    if cache_key in _static_cache.get("batch_cache", {}):
-        _static_cache["batch_cache"].move_to_end(cache_key)  # LRU: 最近使用を末尾に
-        return _static_cache["batch_cache"][cache_key]
-    return None
+    return cache_manager.get("batch_cache", cache_key)
+
+
+def _set_filtered_cache(cache_key: tuple, df: pd.DataFrame, size: Optional[int] = None) -> None:
+    """filtered_dataに値を設定（バイト予算で管理、メモリ超過防止）
+
+    Args:
+        size: 予算に計上するバイト数（Noneは estimate_size で推定）
+    """
+    cache_manager.set("filtered_data", cache_key, df, size=size)
+
+
+def _get_filtered_cache(cache_key: tuple):
+    """filtered_dataから値を取得（LRU更新付き）"""
+    return cache_manager.get("filtered_data", cache_key)
 
 
 def refresh_all_cache():
@@ -925,6 +1476,9 @@ def refresh_all_cache():
     """
     print("[CACHE] Refreshing all cache...")
     clear_cache()
+    # 座標テーブルはデータ更新時のみ破棄（clear_cache()の対象外）
+    with _coord_tables_lock:
+        _coord_tables.clear()
 
     # 都道府県リストを事前読み込み（よく使うため）
     prefectures = get_prefectures()
@@ -934,12 +1488,22 @@ def refresh_all_cache():
 
 
 def get_cache_stats() -> dict:
-    """キャッシュ統計情報を取得"""
+    """キャッシュ統計情報を取得
+
+    "memory" には全キャッシュ共通の予算・使用量と、名前空間ごとの
+    entries / bytes / hits / misses / evictions / expired が含まれる（cache_manager.stats()）。
+    """
+    memory = cache_manager.stats()
     return {
-        "prefectures_cached": _static_cache["prefectures"] is not None,
+        "prefectures_cached": bool(_static_cache["prefectures"]),
         "municipalities_cached": len(_static_cache["municipalities"]),
-        "filtered_data_cached": len(_static_cache.get("filtered_data", {})),
-        "legacy_cache_items": len(_cache),
+        "warm_job_types": list(_warm_job_types),
+        "coord_tables": list(_coord_tables),
+        "single_flight": get_single_flight_stats(),
+        "preload": get_preload_status(),
+        "memory": memory,
+        "filtered_data_cached": memory["namespaces"]["filtered_data"]["entries"],
+        "legacy_cache_items": memory["namespaces"]["legacy"]["entries"],
     }
 
 
@@ -948,10 +1512,11 @@ def get_table(table_name: str) -> pd.DataFrame:
     return query_df(f"SELECT * FROM {table_name}")
 
 
+@_job_type_scoped
 def get_all_data() -> pd.DataFrame:
     """Turso job_seeker_data テーブルから現在のjob_typeの全データを取得（キャッシュ対応）"""
-    job_type = _current_job_type
-    cache_key = f"ALL_DATA_{job_type}"
+    job_type = _get_job_type()
+    cache_key = (job_type, "ALL_DATA")
     cached = _get_cached(cache_key)
     if cached is not None:
         return cached
@@ -968,6 +1533,7 @@ def get_all_data() -> pd.DataFrame:
     return df
 
 
+@_job_type_scoped
 def get_prefectures() -> list:
     """都道府県一覧を取得（北から南の標準順序）
 
@@ -981,9 +1547,11 @@ def get_prefectures() -> list:
     global _static_cache
     import time
 
+    job_type = _get_job_type()
+
     # 静的キャッシュにあれば即座に返す（DBアクセスなし）
-    if _static_cache["prefectures"] is not None:
-        return _static_cache["prefectures"]
+    if job_type in _static_cache["prefectures"]:
+        return _static_cache["prefectures"][job_type]
 
     print("[DB] Fetching prefectures (first time only)...")
     result = []
@@ -991,11 +1559,9 @@ def get_prefectures() -> list:
     if USE_CSV_MODE:
         # CSVモード: 直接CSV読み込み
         try:
-            df = _load_csv_data()
-            job_type = _current_job_type
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            if 'job_type' in df.columns:
-                df = df[df['job_type'] == job_type]
+            job_type = _get_job_type()
+            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加（2026-01-20: 地域インデックス経由）
+            df = _csv_slice(columns=['prefecture'])
             prefectures = df['prefecture'].dropna().unique().tolist()
             result = _sort_prefectures(prefectures)
             print(f"[CSV] Loaded {len(result)} prefectures for {job_type} from CSV")
@@ -1005,7 +1571,7 @@ def get_prefectures() -> list:
     elif _HAS_TURSO:
         # Tursoモード: リトライ付きでDBクエリ、失敗時CSVフォールバック
         max_retries = 3
-        job_type = _current_job_type
+        job_type = _get_job_type()
         for attempt in range(max_retries):
             try:
                 df = query_df(
@@ -1050,7 +1616,7 @@ def get_prefectures() -> list:
 
     # 静的キャッシュに保存（空でも保存して繰り返しクエリを防止）
     if result:
-        _static_cache["prefectures"] = result
+        _static_cache["prefectures"][job_type] = result
         print(f"[DB] Cached {len(result)} prefectures")
     else:
         print("[WARNING] No prefectures loaded - dropdown will be empty")
@@ -1058,6 +1624,7 @@ def get_prefectures() -> list:
     return result
 
 
+@_job_type_scoped
 def get_municipalities(prefecture: str) -> list:
     """指定都道府県の市区町村一覧を取得
 
@@ -1071,9 +1638,11 @@ def get_municipalities(prefecture: str) -> list:
     global _static_cache
     import time
 
+    job_type = _get_job_type()
+
     # 静的キャッシュにあれば即座に返す（DBアクセスなし）
-    if prefecture in _static_cache["municipalities"]:
-        return _static_cache["municipalities"][prefecture]
+    if (job_type, prefecture) in _static_cache["municipalities"]:
+        return _static_cache["municipalities"][(job_type, prefecture)]
 
     print(f"[DB] Fetching municipalities for {prefecture} (first time only)...")
     result = []
@@ -1081,13 +1650,9 @@ def get_municipalities(prefecture: str) -> list:
     if USE_CSV_MODE:
         # CSVモード: 直接CSV読み込み
         try:
-            df = _load_csv_data()
-            job_type = _current_job_type
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            if 'job_type' in df.columns:
-                filtered = df[(df['prefecture'] == prefecture) & (df['job_type'] == job_type)]
-            else:
-                filtered = df[df['prefecture'] == prefecture]
+            job_type = _get_job_type()
+            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加（2026-01-20: 地域インデックス経由）
+            filtered = _csv_slice(None, prefecture, columns=['municipality'])
             municipalities = filtered['municipality'].dropna().unique().tolist()
             result = sorted(municipalities)
             print(f"[CSV] Loaded {len(result)} municipalities for {prefecture}/{job_type}")
@@ -1097,7 +1662,7 @@ def get_municipalities(prefecture: str) -> list:
     elif _HAS_TURSO:
         # Tursoモード: リトライ付きクエリ、失敗時CSVフォールバック
         max_retries = 2
-        job_type = _current_job_type
+        job_type = _get_job_type()
         for attempt in range(max_retries):
             try:
                 df = query_df(
@@ -1149,7 +1714,7 @@ def get_municipalities(prefecture: str) -> list:
             result = []
 
     # 静的キャッシュに保存
-    _static_cache["municipalities"][prefecture] = result
+    _static_cache["municipalities"][(job_type, prefecture)] = result
     if result:
         print(f"[DB] Cached {len(result)} municipalities for {prefecture}")
     else:
@@ -1158,6 +1723,9 @@ def get_municipalities(prefecture: str) -> list:
     return result
 
 
+@_job_type_scoped
+@_coalesced("filtered_data", lambda prefecture, municipality=None: (prefecture, municipality or 'ALL'),
+            cache_namespace="filtered_data")
 def query_municipality(prefecture: str, municipality: str = None) -> pd.DataFrame:
     """市区町村単位でデータを取得（永続キャッシュ対応、Turso専用）
 
@@ -1167,13 +1735,12 @@ def query_municipality(prefecture: str, municipality: str = None) -> pd.DataFram
     """
     global _static_cache
 
-    job_type = _current_job_type
-    cache_key = f"{job_type}_{prefecture}_{municipality or 'ALL'}"
+    job_type = _get_job_type()
+    cache_key = (job_type, prefecture, municipality or 'ALL')
 
     # 永続キャッシュから取得（LRU制御）
-    if cache_key in _static_cache.get("filtered_data", {}):
-        _static_cache["filtered_data"].move_to_end(cache_key)  # LRU: 最近使用を末尾に
-        cached = _static_cache["filtered_data"][cache_key]
+    cached = _get_filtered_cache(cache_key)
+    if cached is not None:
         # キャッシュヒットログは抑制（ノイズ削減）
         return cached
 
@@ -1187,15 +1754,12 @@ def query_municipality(prefecture: str, municipality: str = None) -> pd.DataFram
         df = query_df(sql, (job_type, prefecture))
 
     # 永続キャッシュに保存（LRU制御）
-    _static_cache["filtered_data"][cache_key] = df
-    # LRU eviction: 上限超過時に最も古いエントリを削除
-    while len(_static_cache["filtered_data"]) > _FILTERED_DATA_MAX_SIZE:
-        removed_key, _ = _static_cache["filtered_data"].popitem(last=False)
-        print(f"[CACHE] LRU evicted from filtered_data: {removed_key}")
-    print(f"[DB] Cached {len(df)} rows for {cache_key} (LRU, max={_FILTERED_DATA_MAX_SIZE})")
+    _set_filtered_cache(cache_key, df)
+    print(f"[DB] Cached {len(df)} rows for {cache_key} (memory-budgeted LRU)")
     return df
 
 
+@_job_type_scoped
 def get_filtered_data(prefecture: str, municipality: str = None) -> pd.DataFrame:
     """サーバーサイドフィルタリング: 指定地域のデータのみ取得
 
@@ -1212,35 +1776,28 @@ def get_filtered_data(prefecture: str, municipality: str = None) -> pd.DataFrame
     """
     global _static_cache
 
-    job_type = _current_job_type
+    job_type = _get_job_type()
     # 永続キャッシュキーを生成（job_type含む）
-    cache_key = f"{job_type}_{prefecture}_{municipality or 'ALL'}"
+    cache_key = (job_type, prefecture, municipality or 'ALL')
 
     # 永続キャッシュから取得（LRU制御）
-    if cache_key in _static_cache.get("filtered_data", {}):
-        _static_cache["filtered_data"].move_to_end(cache_key)  # LRU: 最近使用を末尾に
-        cached = _static_cache["filtered_data"][cache_key]
+    cached = _get_filtered_cache(cache_key)
+    if cached is not None:
         # キャッシュヒットログは抑制（ノイズ削減）
         return cached
 
     if USE_CSV_MODE:
         print(f"[CSV] Filtering data for {job_type}/{prefecture}/{municipality or 'ALL'}...")
-        df = _load_csv_data()
-        # job_typeフィルタ（CSVにjob_type列がある場合）
-        if 'job_type' in df.columns:
-            df = df[df['job_type'] == job_type]
-        if prefecture:
-            df = df[df['prefecture'] == prefecture]
-        if municipality:
-            df = df[df['municipality'] == municipality]
-        result = df.copy()
-        # 永続キャッシュに保存（LRU制御）
-        _static_cache["filtered_data"][cache_key] = result
-        # LRU eviction: 上限超過時に最も古いエントリを削除
-        while len(_static_cache["filtered_data"]) > _FILTERED_DATA_MAX_SIZE:
-            removed_key, _ = _static_cache["filtered_data"].popitem(last=False)
-            print(f"[CACHE] LRU evicted from filtered_data: {removed_key}")
-        print(f"[CSV] Cached {len(result)} rows for {cache_key} (LRU, max={_FILTERED_DATA_MAX_SIZE})")
+        # 2026-01-20: 地域インデックスから取得（全件マスク走査 + .copy() を廃止）
+        # 結果は共有フレームのビュー/部分フレームなので呼び出し側で変更しないこと
+        result = _csv_slice(None, prefecture, municipality)
+        # 永続キャッシュに保存（LRU制御）。共有フレームのスライスは値・文字列を共有するため、
+        # deep=True のサイズではなく行ごとの参照分（shallow）だけを予算に計上する
+        size = None
+        if _csv_slice_is_shared(None, prefecture):
+            size = int(result.memory_usage(index=True, deep=False).sum())
+        _set_filtered_cache(cache_key, result, size=size)
+        print(f"[CSV] Cached {len(result)} rows for {cache_key} (memory-budgeted LRU)")
         return result
     elif _HAS_TURSO:
         return query_municipality(prefecture, municipality)
@@ -1260,9 +1817,10 @@ def get_filtered_data(prefecture: str, municipality: str = None) -> pd.DataFrame
         return query_df(sql, tuple(params)) if params else query_df(sql)
 
 
+@_job_type_scoped
 def get_row_count_by_location(prefecture: str, municipality: str = None) -> int:
     """指定地域のデータ行数を取得（軽量クエリ）"""
-    job_type = _current_job_type
+    job_type = _get_job_type()
     if _HAS_TURSO:
         if municipality:
             sql = "SELECT COUNT(*) as cnt FROM job_seeker_data WHERE job_type = ? AND prefecture = ? AND municipality = ?"
@@ -1394,11 +1952,13 @@ def execute_custom_query(sql: str, params: Optional[tuple] = None) -> pd.DataFra
 # 3層比較用統計取得関数（Turso最適化）
 # =============================================================================
 
+@_coalesced("batch_stats", lambda prefecture=None, municipality=None: (prefecture or 'ALL', municipality or 'ALL'),
+            cache_namespace="batch_cache", cache_key=_batch_cache_key("batch_stats"))
 def _batch_stats_query(prefecture: str = None, municipality: str = None) -> dict:
     """統計取得用バッチクエリ（事前ロードキャッシュ優先 + フォールバックでDB）
 
     優先順位:
-    1. 事前ロードキャッシュ（_preload_cache）から取得（DBアクセスなし）
+    1. 事前ロードキャッシュ（cache_managerの"preload"）から取得（DBアクセスなし）
     2. 静的キャッシュ（_static_cache）から取得
     3. フォールバック: DBクエリ実行
 
@@ -1419,8 +1979,8 @@ def _batch_stats_query(prefecture: str = None, municipality: str = None) -> dict
         return {}
 
     # キャッシュキー生成（job_type含む）
-    job_type = _current_job_type
-    cache_key = f"batch_stats_{job_type}_{prefecture or 'ALL'}_{municipality or 'ALL'}"
+    job_type = _get_job_type()
+    cache_key = (job_type, "batch_stats", prefecture or 'ALL', municipality or 'ALL')
 
     # 1. batch_cacheから取得（LRU制御付き）
     cached = _get_batch_cache(cache_key)
@@ -1428,35 +1988,34 @@ def _batch_stats_query(prefecture: str = None, municipality: str = None) -> dict
         return cached
 
     # 2. 事前ロードキャッシュから取得（全カラム、DBアクセス不要）
-    # 注: _preload_cacheは後方で定義されるが、実行時には存在する
     try:
-        if '_preload_cache' in globals() and _preload_cache:
-            if prefecture and prefecture in _preload_cache:
-                # 特定都道府県のデータを事前ロードキャッシュから取得
-                df_all = _preload_cache[prefecture].copy()
-
-                # job_typeでフィルタ（必須）
-                if 'job_type' in df_all.columns:
-                    df_all = df_all[df_all['job_type'] == job_type]
-
-                if municipality and 'municipality' in df_all.columns:
-                    df_all = df_all[df_all['municipality'] == municipality]
-
-                # row_typeでフィルタ
-                row_types = ['SUMMARY', 'RESIDENCE_FLOW', 'AGE_GENDER']
-                if 'row_type' in df_all.columns:
-                    df_all = df_all[df_all['row_type'].isin(row_types)]
-
-                if not df_all.empty:
-                    result = {
-                        "SUMMARY": df_all[df_all["row_type"] == "SUMMARY"].copy(),
-                        "RESIDENCE_FLOW": df_all[df_all["row_type"] == "RESIDENCE_FLOW"].copy(),
-                        "AGE_GENDER": df_all[df_all["row_type"] == "AGE_GENDER"].copy()
-                    }
-                    # batch_cacheに保存（LRU制御付き）
-                    _set_batch_cache(cache_key, result)
-                    print(f"[DB] Batch stats from preload cache: {cache_key}")
-                    return result
+        preloaded = cache_manager.get("preload", (job_type, prefecture)) if prefecture else None
+        if preloaded is not None:
+            # 特定都道府県のデータを事前ロードキャッシュから取得
+            df_all = preloaded.copy()
+
+            # job_typeでフィルタ（必須）
+            if 'job_type' in df_all.columns:
+                df_all = df_all[df_all['job_type'] == job_type]
+
+            if municipality and 'municipality' in df_all.columns:
+                df_all = df_all[df_all['municipality'] == municipality]
+
+            # row_typeでフィルタ
+            row_types = ['SUMMARY', 'RESIDENCE_FLOW', 'AGE_GENDER']
+            if 'row_type' in df_all.columns:
+                df_all = df_all[df_all['row_type'].isin(row_types)]
+
+            if not df_all.empty:
+                result = {
+                    "SUMMARY": df_all[df_all["row_type"] == "SUMMARY"].copy(),
+                    "RESIDENCE_FLOW": df_all[df_all["row_type"] == "RESIDENCE_FLOW"].copy(),
+                    "AGE_GENDER": df_all[df_all["row_type"] == "AGE_GENDER"].copy()
+                }
+                # batch_cacheに保存（LRU制御付き）
+                _set_batch_cache(cache_key, result)
+                print(f"[DB] Batch stats from preload cache: {cache_key}")
+                return result
     except Exception as e:
         print(f"[DEBUG] Preload cache check failed: {e}")
 
@@ -1513,6 +2072,8 @@ def _batch_stats_query(prefecture: str = None, municipality: str = None) -> dict
         return {"SUMMARY": pd.DataFrame(), "RESIDENCE_FLOW": pd.DataFrame(), "AGE_GENDER": pd.DataFrame()}
 
 
+@_coalesced("batch_flow", lambda municipality, target_prefecture=None: (municipality, target_prefecture or 'all'),
+            cache_namespace="batch_cache", cache_key=_batch_cache_key("batch_flow"))
 def _batch_flow_query(municipality: str, target_prefecture: str = None) -> dict:
     """人材フロー取得用バッチクエリ（1回のHTTP通信で流入元・流出先を同時取得）
 
@@ -1533,8 +2094,8 @@ def _batch_flow_query(municipality: str, target_prefecture: str = None) -> dict:
         return {"sources": [], "destinations": []}
 
     # キャッシュキー生成（job_type含む）
-    job_type = _current_job_type
-    cache_key = f"batch_flow_{job_type}_{municipality}_{target_prefecture or 'all'}"
+    job_type = _get_job_type()
+    cache_key = (job_type, "batch_flow", municipality, target_prefecture or 'all')
 
     # batch_cacheから取得（LRU制御付き）
     cached = _get_batch_cache(cache_key)
@@ -1624,6 +2185,8 @@ def _batch_flow_query(municipality: str, target_prefecture: str = None) -> dict:
         return {"sources": [], "destinations": []}
 
 
+@_coalesced("batch_persona", lambda prefecture=None, municipality=None: (prefecture or 'ALL', municipality or 'ALL'),
+            cache_namespace="batch_cache", cache_key=_batch_cache_key("batch_persona"))
 def _batch_persona_query(prefecture: str = None, municipality: str = None) -> dict:
     """人材属性取得用バッチクエリ（1回のHTTP通信で複数row_type取得）
 
@@ -1645,8 +2208,8 @@ def _batch_persona_query(prefecture: str = None, municipality: str = None) -> di
         return {}
 
     # キャッシュキー生成（job_type含む）
-    job_type = _current_job_type
-    cache_key = f"batch_persona_{job_type}_{prefecture or 'ALL'}_{municipality or 'ALL'}"
+    job_type = _get_job_type()
+    cache_key = (job_type, "batch_persona", prefecture or 'ALL', municipality or 'ALL')
 
     # batch_cacheから取得（LRU制御付き）
     cached = _get_batch_cache(cache_key)
@@ -1697,6 +2260,78 @@ def _batch_persona_query(prefecture: str = None, municipality: str = None) -> di
         return {"AGE_GENDER_RESIDENCE": pd.DataFrame(), "QUALIFICATION_DETAIL": pd.DataFrame(), "QUALIFICATION_PERSONA": pd.DataFrame()}
 
 
+# =====================================
+# 3層比較統計の事前集計（2026-01-20追加）
+# =====================================
+# 事前集計テーブル（stats_rollup.py）があれば、各statsのgetterは行データを取得・集計せずキーで1行引く。
+#   CSVモード: FIXED CSVと同じディレクトリの MapComplete_Stats_Rollup.(parquet|csv)（全職種分を常駐）
+#   Turso: stats_rollup テーブル（職種ごとに取得し、"stats_rollup" 名前空間にキャッシュ）。
+#          STATS_ROLLUP_RECHECK_SECONDS ごとに版（最終作成日時, 行数）を確認し、import / sync で
+#          作り直し・削除されていたら取得し直す
+# テーブルがない・該当キーがない場合は従来の集計にフォールバックする。
+STATS_ROLLUP_ENABLED = os.getenv("STATS_ROLLUP", "true").lower() != "false"
+STATS_ROLLUP_RECHECK_SECONDS = float(os.getenv("STATS_ROLLUP_RECHECK_SECONDS", "300"))
+_stats_rollup_file: Optional[dict] = None
+_stats_rollup_lock = threading.Lock()
+
+
+def _stats_rollup_table(job_type: str) -> dict:
+    """現在のデータソースの事前集計 {(職種, 階層, 都道府県, 市区町村): 行}（なければ空dict）"""
+    global _stats_rollup_file
+    if USE_CSV_MODE:
+        with _stats_rollup_lock:
+            if _stats_rollup_file is None:
+                path = stats_rollup.find_rollup(_data_search_dirs(), csv_names=(CSV_FILENAME_GZ, CSV_FILENAME))
+                _stats_rollup_file = stats_rollup.build_lookup(stats_rollup.read_rollup(path)) if path else {}
+                if path:
+                    print(f"[ROLLUP] Loaded {len(_stats_rollup_file):,} rows from {path}")
+                else:
+                    print("[ROLLUP] No rollup file - using row-level stats")
+            return _stats_rollup_file
+
+    if not _lazy_init_turso():
+        return {}
+    import time
+    cache_key = (job_type,)
+    entry = cache_manager.get("stats_rollup", cache_key)
+    if entry is not None and time.monotonic() - entry["checked"] >= STATS_ROLLUP_RECHECK_SECONDS:
+        # 版が同じなら確認時刻だけ更新、変わっていれば（作り直し・削除）取得し直す
+        version = stats_rollup.version_of(query_df(stats_rollup.TURSO_VERSION_SQL, (job_type,)))
+        if version == entry["version"]:
+            entry["checked"] = time.monotonic()
+        else:
+            print(f"[ROLLUP] {job_type}: version changed {entry['version']} -> {version}, reloading")
+            cache_manager.evict_where("stats_rollup", lambda k: k == cache_key)
+            entry = None
+    if entry is None:
+        def load():
+            # テーブル未作成の場合も空（エラーはquery_dfが出力）→ 従来の集計
+            df = query_df(f"SELECT * FROM {stats_rollup.TURSO_TABLE} WHERE job_type = ?", (job_type,))
+            return {
+                "version": stats_rollup.version_of(df),
+                "checked": time.monotonic(),
+                "table": stats_rollup.build_lookup(df) if not df.empty else {},
+            }
+        entry = single_flight(cache_key, load, namespace="stats_rollup")
+        cache_manager.set("stats_rollup", cache_key, entry)
+    return entry["table"]
+
+
+def _lookup_stats_rollup(level: str, prefecture: Optional[str] = None,
+                         municipality: Optional[str] = None) -> Optional[dict]:
+    """事前集計からgetter結果を取得（なければNone）"""
+    if not STATS_ROLLUP_ENABLED:
+        return None
+    job_type = _get_job_type()
+    try:
+        table = _stats_rollup_table(job_type)
+    except Exception as e:
+        print(f"[ROLLUP] Lookup failed (row-level stats): {type(e).__name__}: {e}")
+        return None
+    return stats_rollup.lookup_stats(table, job_type, level, prefecture, municipality) if table else None
+
+
+@_job_type_scoped
 def get_national_stats() -> dict:
     """全国統計をバッチクエリで効率的に計算（Turso用）
 
@@ -1714,6 +2349,11 @@ def get_national_stats() -> dict:
     """
     print("[DEBUG] get_national_stats() called", flush=True)
 
+    # 2026-01-20: 事前集計があればキーで引くだけ
+    rolled_up = _lookup_stats_rollup("national")
+    if rolled_up is not None:
+        return rolled_up
+
     # CSVモードの場合はCSVから計算
     if USE_CSV_MODE:
         print("[DEBUG] CSVモードで全国統計を計算", flush=True)
@@ -1728,10 +2368,9 @@ def get_national_stats() -> dict:
             "age_gender_pyramid": {}
         }
         try:
-            df = _load_csv_data()
-            job_type = _current_job_type
-            df = df[df['job_type'] == job_type]
-            df_summary = df[df['row_type'] == 'SUMMARY']
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            df_summary = _csv_slice('SUMMARY', columns=['avg_desired_areas', 'avg_qualifications',
+                                                        'male_count', 'female_count', 'avg_age'])
             print(f"[DEBUG] CSV SUMMARY rows: {len(df_summary)}", flush=True)
 
             if not df_summary.empty:
@@ -1754,7 +2393,7 @@ def get_national_stats() -> dict:
                             result["avg_age"] = round(weighted_sum / total_count, 1)
 
             # 年齢性別データ
-            df_age = df[df['row_type'] == 'AGE_GENDER']
+            df_age = _csv_slice('AGE_GENDER', columns=['category1', 'category2', 'count'])
             if not df_age.empty and 'category1' in df_age.columns and 'category2' in df_age.columns:
                 age_dist = {}
                 for _, row in df_age.groupby('category1')['count'].sum().items():
@@ -1798,7 +2437,7 @@ def get_national_stats() -> dict:
         if df_summary.empty:
             print("[DEBUG] Batch query returned empty SUMMARY, trying fallback query...", flush=True)
             try:
-                job_type = _current_job_type
+                job_type = _get_job_type()
                 df_summary = query_df(
                     "SELECT prefecture, municipality, avg_desired_areas, avg_qualifications, male_count, female_count FROM job_seeker_data WHERE job_type = ? AND row_type = 'SUMMARY'",
                     (job_type,)
@@ -1839,7 +2478,7 @@ def get_national_stats() -> dict:
         # フォールバック: RESIDENCE_FLOWも空の場合、個別クエリ（メモリ最適化）
         if df_flow.empty:
             try:
-                job_type = _current_job_type
+                job_type = _get_job_type()
                 df_flow = query_df(
                     "SELECT prefecture, municipality, avg_reference_distance_km FROM job_seeker_data WHERE job_type = ? AND row_type = 'RESIDENCE_FLOW' LIMIT 5000",
                     (job_type,)
@@ -1860,7 +2499,7 @@ def get_national_stats() -> dict:
             try:
                 # age_groupはデータベースに存在しないため削除（2025-12-29 修正）
                 # category2（性別）を追加（2025-12-31 修正：age_gender_pyramid用）
-                job_type = _current_job_type
+                job_type = _get_job_type()
                 df_age = query_df(
                     "SELECT prefecture, municipality, category1, category2, count, applicant_count FROM job_seeker_data WHERE job_type = ? AND row_type = 'AGE_GENDER'",
                     (job_type,)
@@ -1924,6 +2563,7 @@ def get_national_stats() -> dict:
     return result
 
 
+@_job_type_scoped
 def get_prefecture_stats(prefecture: str) -> dict:
     """都道府県統計をバッチクエリで効率的に計算（Turso用）
 
@@ -1935,6 +2575,11 @@ def get_prefecture_stats(prefecture: str) -> dict:
     Returns:
         dict: get_national_stats()と同じ形式
     """
+    # 2026-01-20: 事前集計があればキーで引くだけ（CSVモードでも利用可）
+    rolled_up = _lookup_stats_rollup("prefecture", prefecture) if prefecture else None
+    if rolled_up is not None:
+        return rolled_up
+
     # 遅延初期化を呼び出し（NiceGUI移行対応 2025-12-24）
     if not _lazy_init_turso() or not prefecture:
         return {}
@@ -2014,6 +2659,7 @@ def get_prefecture_stats(prefecture: str) -> dict:
     return result
 
 
+@_job_type_scoped
 def get_all_prefectures_stats() -> dict:
     """全都道府県の統計を一括取得（Turso用・キャッシュ効率化）
 
@@ -2021,8 +2667,8 @@ def get_all_prefectures_stats() -> dict:
         dict: {prefecture_name: stats_dict, ...}
     """
     # キャッシュキーにjob_typeを含める（職種切り替え対応）
-    job_type = _current_job_type
-    cache_key = f"all_prefecture_stats_{job_type}"
+    job_type = _get_job_type()
+    cache_key = (job_type, "all_prefecture_stats")
 
     # batch_cacheから取得（LRU制御付き）
     cached = _get_batch_cache(cache_key)
@@ -2044,6 +2690,7 @@ def get_all_prefectures_stats() -> dict:
     return result
 
 
+@_job_type_scoped
 def get_municipality_stats(prefecture: str, municipality: str) -> dict:
     """市区町村統計をバッチクエリで取得（Turso用3層比較）
 
@@ -2065,6 +2712,11 @@ def get_municipality_stats(prefecture: str, municipality: str) -> dict:
             "age_distribution": dict  # 年代別分布
         }
     """
+    # 2026-01-20: 事前集計があればキーで引くだけ（CSVモードでも利用可）
+    rolled_up = _lookup_stats_rollup("municipality", prefecture, municipality) if prefecture and municipality else None
+    if rolled_up is not None:
+        return rolled_up
+
     # 遅延初期化を呼び出し（NiceGUI移行対応 2025-12-24）
     if not _lazy_init_turso():
         return {}
@@ -2154,6 +2806,7 @@ def get_municipality_stats(prefecture: str, municipality: str) -> dict:
         return {}
 
 
+@_job_type_scoped
 def get_persona_market_share(prefecture: str = None, municipality: str = None) -> list:
     """ペルソナシェア（年齢×性別）をSQLで取得（Turso用）
 
@@ -2200,6 +2853,7 @@ def get_persona_market_share(prefecture: str = None, municipality: str = None) -
         return []
 
 
+@_job_type_scoped
 def get_qualification_retention_rates(prefecture: str = None, municipality: str = None) -> list:
     """資格別定着率をSQLで取得（Turso用）
 
@@ -2270,6 +2924,7 @@ def get_qualification_retention_rates(prefecture: str = None, municipality: str
         return []
 
 
+@_job_type_scoped
 def get_rarity_analysis(prefecture: str = None, municipality: str = None,
                         ages: list = None, genders: list = None,
                         qualifications: list = None) -> list:
@@ -2290,7 +2945,7 @@ def get_rarity_analysis(prefecture: str = None, municipality: str = None,
 
     try:
         # job_typeを取得（職種切り替え対応）
-        job_type = _current_job_type
+        job_type = _get_job_type()
         # QUALIFICATION_PERSONA または RARITYを使用
         conditions = ["job_type = ?", "row_type IN ('QUALIFICATION_PERSONA', 'RARITY')"]
         params = [job_type]
@@ -2349,6 +3004,7 @@ def get_rarity_analysis(prefecture: str = None, municipality: str = None,
         return []
 
 
+@_job_type_scoped
 def get_qualification_options(prefecture: str = None, municipality: str = None) -> list:
     """選択可能な資格リストを取得（Turso用）- 取得者数順
 
@@ -2389,6 +3045,7 @@ def get_qualification_options(prefecture: str = None, municipality: str = None)
         return []
 
 
+@_job_type_scoped
 def get_age_gender_stats(prefecture: str = None, municipality: str = None) -> list:
     """年齢×性別ごとの平均希望勤務地数・平均資格保有数を取得（Turso用）
 
@@ -2437,6 +3094,7 @@ def get_age_gender_stats(prefecture: str = None, municipality: str = None) -> li
         return []
 
 
+@_job_type_scoped
 def get_persona_employment_breakdown(prefecture: str = None, municipality: str = None) -> list:
     """就業状態別ペルソナ分析データを取得（Turso用）
 
@@ -2455,7 +3113,7 @@ def get_persona_employment_breakdown(prefecture: str = None, municipality: str =
 
     try:
         # job_typeを取得（職種切り替え対応）
-        job_type = _current_job_type
+        job_type = _get_job_type()
         conditions = ["job_type = ?", "row_type = 'PERSONA_MUNI'"]
         params = [job_type]
 
@@ -2510,6 +3168,7 @@ def get_persona_employment_breakdown(prefecture: str = None, municipality: str =
         return []
 
 
+@_job_type_scoped
 def get_qualification_by_gender(prefecture: str = None, municipality: str = None) -> list:
     """資格別男女保有者数を取得（Turso用）
 
@@ -2564,6 +3223,7 @@ def get_qualification_by_gender(prefecture: str = None, municipality: str = None
         return []
 
 
+@_job_type_scoped
 def get_distance_stats(prefecture: str = None, municipality: str = None) -> dict:
     """距離統計をSQLで取得（Turso用）
 
@@ -2577,7 +3237,7 @@ def get_distance_stats(prefecture: str = None, municipality: str = None) -> dict
 
     try:
         # job_typeを取得（職種切り替え対応）
-        job_type = _current_job_type
+        job_type = _get_job_type()
         conditions = ["job_type = ?", "row_type = 'RESIDENCE_FLOW'", "avg_reference_distance_km IS NOT NULL"]
         params = [job_type]
 
@@ -2654,6 +3314,7 @@ def get_distance_stats(prefecture: str = None, municipality: str = None) -> dict
         return {"mean": "-", "min": "-", "max": "-", "q25": "-", "median": "-", "q75": "-", "unit": "km"}
 
 
+@_job_type_scoped
 def get_mobility_type_distribution(prefecture: str = None, municipality: str = None,
                                      mode: str = "residence") -> list:
     """移動タイプ分布をSQLで取得（Turso用）
@@ -2671,7 +3332,7 @@ def get_mobility_type_distribution(prefecture: str = None, municipality: str = N
 
     try:
         # job_typeを取得（職種切り替え対応）
-        job_type = _current_job_type
+        job_type = _get_job_type()
         conditions = ["job_type = ?", "row_type = 'RESIDENCE_FLOW'", "mobility_type IS NOT NULL"]
         params = [job_type]
 
@@ -2726,6 +3387,7 @@ def get_mobility_type_distribution(prefecture: str = None, municipality: str = N
         return []
 
 
+@_job_type_scoped
 def get_competition_overview(prefecture: str = None, municipality: str = None) -> dict:
     """競争度概要をSQLで取得（Turso用）
 
@@ -2746,7 +3408,7 @@ def get_competition_overview(prefecture: str = None, municipality: str = None) -
 
     try:
         # job_typeを取得（職種切り替え対応）
-        job_type = _current_job_type
+        job_type = _get_job_type()
         conditions = ["job_type = ?", "row_type = 'COMPETITION'"]
         params = [job_type]
 
@@ -2813,6 +3475,7 @@ def get_competition_overview(prefecture: str = None, municipality: str = None) -
         return {}
 
 
+@_job_type_scoped
 def get_talent_flow(prefecture: str = None, municipality: str = None) -> dict:
     """人材フロー（流入/流出/純流）をSQLで取得（Turso用）
 
@@ -2834,7 +3497,7 @@ def get_talent_flow(prefecture: str = None, municipality: str = None) -> dict:
 
     try:
         # job_typeを取得（職種切り替え対応）
-        job_type = _current_job_type
+        job_type = _get_job_type()
         conditions = ["job_type = ?", "row_type = 'FLOW'"]
         params = [job_type]
 
@@ -2893,6 +3556,7 @@ def get_talent_flow(prefecture: str = None, municipality: str = None) -> dict:
         return {}
 
 
+@_job_type_scoped
 def get_flow_sources(prefecture: str = None, municipality: str = None, limit: int = 5) -> list:
     """流入元（どこから来るか）を取得（Turso用）
 
@@ -2915,6 +3579,7 @@ def get_flow_sources(prefecture: str = None, municipality: str = None, limit: in
     return batch_data.get("sources", [])[:limit]
 
 
+@_job_type_scoped
 def get_flow_destinations(prefecture: str = None, municipality: str = None, limit: int = 5) -> list:
     """流出先（どこへ流れるか）を取得（Turso用）
 
@@ -2979,6 +3644,7 @@ def _get_flow_sources_legacy(prefecture: str = None, municipality: str = None, l
         return []
 
 
+@_job_type_scoped
 def get_residence_flow_data(prefecture: str = None, municipality: str = None) -> pd.DataFrame:
     """RESIDENCE_FLOWデータを取得（都道府県/市区町村間フロー表示用）
 
@@ -3011,11 +3677,14 @@ def get_residence_flow_data(prefecture: str = None, municipality: str = None) ->
         return pd.DataFrame()
 
 
+@_job_type_scoped
 def get_pref_flow_top10(prefecture: str = None) -> list:
     """都道府県間フローTop10を取得（隣接県フィルタ適用）
 
+    2026-01-20変更: RESIDENCE_FLOWの行を取得・集計し直さず、フローキューブの都道府県行列から取得
+
     Args:
-        prefecture: 都道府県名（フィルタ用、Noneで全国）
+        prefecture: 都道府県名（居住地フィルタ用、Noneで全国）
 
     Returns:
         list: [{"origin": "大阪府", "destination": "東京都", "count": 1234}, ...]
@@ -3027,76 +3696,42 @@ def get_pref_flow_top10(prefecture: str = None) -> list:
         return []
 
     try:
-        df = get_residence_flow_data(prefecture, None)
-        print(f"[DB] get_pref_flow_top10: got {len(df)} rows from get_residence_flow_data")
-
-        if df.empty:
-            print("[DB] get_pref_flow_top10: df is empty, returning []")
-            return []
-
-        # RESIDENCE_FLOWのカラム構造:
-        # prefecture = 現住所都道府県, desired_prefecture = 希望勤務地都道府県
-        # count = 件数
-        origin_col = "prefecture"
-        dest_col = "desired_prefecture"
-        count_col = "count"
-
-        if origin_col not in df.columns or dest_col not in df.columns:
-            print(f"[DB] get_pref_flow_top10: Required columns not found. Available: {list(df.columns)}")
-            return []
+        cube = _get_flow_cube()
+        # 居住地が対象都道府県の行（異なる都道府県間のフローのみ）
+        origin, dest, counts = cube.prefecture_flows(prefecture or None)
+        keep = origin != dest
+        origin, dest, counts = origin[keep], dest[keep], counts[keep]
 
-        # 異なる都道府県間のフローのみ（同じ都道府県は除外）
-        df_flow = df[(df[origin_col].notna()) & (df[dest_col].notna())].copy()
-        df_flow = df_flow[df_flow[origin_col] != df_flow[dest_col]]
-
-        if df_flow.empty:
-            return []
-
-        # 集計
-        if count_col:
-            agg = df_flow.groupby([origin_col, dest_col])[count_col].sum().reset_index()
-            agg = agg.sort_values(count_col, ascending=False).head(30)  # フィルタ前に多めに取得
-
-            result = []
-            for _, row in agg.iterrows():
-                origin = str(row[origin_col])
-                destination = str(row[dest_col])
-                # 現実的なフローのみ（隣接県フィルタ）
-                if not is_realistic_flow(origin, destination):
-                    continue
-                result.append({
-                    "origin": origin,
-                    "destination": destination,
-                    "count": int(row[count_col])
-                })
-                if len(result) >= 10:  # 上位10件で終了
-                    break
-            return result
-        else:
-            # count列がない場合は件数カウント
-            agg = df_flow.groupby([origin_col, dest_col]).size().reset_index(name="count")
-            agg = agg.sort_values("count", ascending=False).head(10)
-
-            result = []
-            for _, row in agg.iterrows():
-                result.append({
-                    "origin": str(row[origin_col]),
-                    "destination": str(row[dest_col]),
-                    "count": int(row["count"])
-                })
-            return result
+        result = []
+        for i in flow_cube.rank_flows(origin, dest, counts)[:30]:  # フィルタ前に多めに取得
+            origin_pref = cube.prefectures[origin[i]]
+            dest_pref = cube.prefectures[dest[i]]
+            # 現実的なフローのみ（隣接県フィルタ）
+            if not is_realistic_flow(origin_pref, dest_pref):
+                continue
+            result.append({
+                "origin": origin_pref,
+                "destination": dest_pref,
+                "count": int(counts[i])
+            })
+            if len(result) >= 10:  # 上位10件で終了
+                break
+        return result
 
     except Exception as e:
         print(f"[DB] get_pref_flow_top10 error: {e}")
         return []
 
 
+@_job_type_scoped
 def get_muni_flow_top10(prefecture: str = None, municipality: str = None) -> list:
     """市区町村間フローTop10を取得（隣接県フィルタ適用）
 
+    2026-01-20変更: RESIDENCE_FLOWの行を取得・集計し直さず、フローキューブの行スライスから取得
+
     Args:
-        prefecture: 都道府県名（希望勤務地フィルタ用）
-        municipality: 市区町村名（フィルタ用）
+        prefecture: 都道府県名（居住地フィルタ用）
+        municipality: 市区町村名（居住地フィルタ用）
 
     Returns:
         list: [{"origin": "渋谷区", "origin_pref": "東京都", "destination": "新宿区", "destination_pref": "東京都", "count": 567}, ...]
@@ -3108,75 +3743,35 @@ def get_muni_flow_top10(prefecture: str = None, municipality: str = None) -> lis
         return []
 
     try:
-        df = get_residence_flow_data(prefecture, municipality)
-        print(f"[DB] get_muni_flow_top10: got {len(df)} rows from get_residence_flow_data")
-
-        if df.empty:
-            print("[DB] get_muni_flow_top10: df is empty, returning []")
-            return []
-
-        # RESIDENCE_FLOWのカラム構造:
-        # municipality = 現住所市区町村, desired_municipality = 希望勤務地市区町村
-        # prefecture = 現住所都道府県, desired_prefecture = 希望勤務地都道府県
-        # count = 件数
-        origin_col = "municipality"
-        dest_col = "desired_municipality"
-        origin_pref_col = "prefecture"
-        dest_pref_col = "desired_prefecture"
-        count_col = "count"
-
-        required_cols = [origin_col, dest_col, origin_pref_col, dest_pref_col]
-        missing_cols = [c for c in required_cols if c not in df.columns]
-        if missing_cols:
-            print(f"[DB] get_muni_flow_top10: Required columns not found: {missing_cols}. Available: {list(df.columns)}")
-            return []
-
-        # 異なる市区町村間のフローのみ（同じ市区町村は除外）
-        df_flow = df[(df[origin_col].notna()) & (df[dest_col].notna())].copy()
-        print(f"[DB] get_muni_flow_top10: after notna filter: {len(df_flow)} rows")
-        if len(df_flow) > 0:
-            print(f"[DB] get_muni_flow_top10: sample origin={df_flow[origin_col].iloc[0]}, dest={df_flow[dest_col].iloc[0]}")
-        df_flow = df_flow[df_flow[origin_col] != df_flow[dest_col]]
-        print(f"[DB] get_muni_flow_top10: after diff filter: {len(df_flow)} rows")
-
-        if df_flow.empty:
-            print("[DB] get_muni_flow_top10: df_flow is empty after filtering")
+        cube = _get_flow_cube()
+        origin, dest, counts = cube.flows_from(cube.areas(prefecture or None, municipality or None))
+
+        # 異なる市区町村間のフローのみ（同じ市区町村名は除外、地域が欠損の組み合わせも除外）
+        names = cube.area_municipality
+        keep = cube.area_is_municipality[origin] & cube.area_is_municipality[dest] & (names[origin] != names[dest])
+        origin, dest, counts = origin[keep], dest[keep], counts[keep]
+        if len(counts) == 0:
+            print("[DB] get_muni_flow_top10: no flows between different municipalities")
             return []
 
-        # 集計（都道府県も含める）
-        group_cols = [origin_pref_col, origin_col, dest_pref_col, dest_col]
-        if count_col and count_col in df_flow.columns:
-            agg = df_flow.groupby(group_cols)[count_col].sum().reset_index()
-        else:
-            agg = df_flow.groupby(group_cols).size().reset_index(name="count")
-            count_col = "count"
-
         # 隣接県フィルタを適用（多めに取得してフィルタ後にTop10）
-        agg = agg.sort_values(count_col, ascending=False).head(50)
-
-        filtered_rows = []
-        for _, row in agg.iterrows():
-            origin_pref = str(row[origin_pref_col]) if pd.notna(row[origin_pref_col]) else ""
-            dest_pref = str(row[dest_pref_col]) if pd.notna(row[dest_pref_col]) else ""
-            if is_realistic_flow(origin_pref, dest_pref):
-                filtered_rows.append(row)
-
-        print(f"[DB] get_muni_flow_top10: after realistic filter: {len(filtered_rows)} rows (from 50)")
-
-        if not filtered_rows:
-            print("[DB] get_muni_flow_top10: no realistic flows found")
-            return []
-
-        # Top10を返す
         result = []
-        for row in filtered_rows[:10]:
+        for i in flow_cube.rank_flows(origin, dest, counts)[:50]:
+            origin_pref = cube.area_prefecture[origin[i]]
+            dest_pref = cube.area_prefecture[dest[i]]
+            if not is_realistic_flow(origin_pref, dest_pref):
+                continue
             result.append({
-                "origin": str(row[origin_col]),
-                "origin_pref": str(row[origin_pref_col]) if pd.notna(row[origin_pref_col]) else "",
-                "destination": str(row[dest_col]),
-                "destination_pref": str(row[dest_pref_col]) if pd.notna(row[dest_pref_col]) else "",
-                "count": int(row[count_col])
+                "origin": names[origin[i]],
+                "origin_pref": origin_pref,
+                "destination": names[dest[i]],
+                "destination_pref": dest_pref,
+                "count": int(counts[i])
             })
+            if len(result) >= 10:
+                break
+
+        print(f"[DB] get_muni_flow_top10: {len(result)} realistic flows (from {len(counts)})")
         return result
 
     except Exception as e:
@@ -3187,7 +3782,11 @@ def get_muni_flow_top10(prefecture: str = None, municipality: str = None) -> lis
 # =====================================
 # WORKSTYLE クロス分析用関数（2025-12-26追加）
 # =====================================
+# CSVモード（遅延読み込み）で各getterが使うカラム（2026-01-20追加）
+_CROSS_COLUMNS = ['category1', 'category2', 'count']
+_URGENCY_COLUMNS = ['category2', 'count', 'avg_urgency_score']
 
+@_job_type_scoped
 def get_workstyle_distribution(prefecture: str = None, municipality: str = None) -> pd.DataFrame:
     """雇用形態基本分布を取得
 
@@ -3196,11 +3795,10 @@ def get_workstyle_distribution(prefecture: str = None, municipality: str = None)
     """
     print(f"[DB] get_workstyle_distribution called: pref={prefecture}, muni={municipality}")
     try:
-        job_type = _current_job_type
+        job_type = _get_job_type()
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'WORKSTYLE_DISTRIBUTION') & (df['job_type'] == job_type)]
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            filtered = _csv_slice('WORKSTYLE_DISTRIBUTION', columns=_CROSS_COLUMNS)
         else:
             # SQLレベルでフィルタリング（効率化）- job_type含む
             conditions = ["job_type = ?", "row_type = 'WORKSTYLE_DISTRIBUTION'"]
@@ -3245,6 +3843,7 @@ def get_workstyle_distribution(prefecture: str = None, municipality: str = None)
         return pd.DataFrame()
 
 
+@_job_type_scoped
 def get_workstyle_age_cross(prefecture: str = None, municipality: str = None) -> pd.DataFrame:
     """雇用形態×年代のクロス集計を取得
 
@@ -3253,15 +3852,10 @@ def get_workstyle_age_cross(prefecture: str = None, municipality: str = None) ->
     """
     print(f"[DB] get_workstyle_age_cross called: pref={prefecture}, muni={municipality}")
     try:
-        job_type = _current_job_type
+        job_type = _get_job_type()
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'WORKSTYLE_AGE_CROSS') & (df['job_type'] == job_type)]
-            if prefecture:
-                filtered = filtered[filtered['prefecture'] == prefecture]
-            if municipality:
-                filtered = filtered[filtered['municipality'] == municipality]
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            filtered = _csv_slice('WORKSTYLE_AGE_CROSS', prefecture, municipality, columns=_CROSS_COLUMNS)
         else:
             # SQLレベルでフィルタリング - job_type含む
             conditions = ["job_type = ?", "row_type = 'WORKSTYLE_AGE_CROSS'"]
@@ -3300,6 +3894,7 @@ def get_workstyle_age_cross(prefecture: str = None, municipality: str = None) ->
         return pd.DataFrame()
 
 
+@_job_type_scoped
 def get_workstyle_gender_cross(prefecture: str = None, municipality: str = None) -> pd.DataFrame:
     """雇用形態×性別のクロス集計を取得
 
@@ -3308,15 +3903,10 @@ def get_workstyle_gender_cross(prefecture: str = None, municipality: str = None)
     """
     print(f"[DB] get_workstyle_gender_cross called: pref={prefecture}, muni={municipality}")
     try:
-        job_type = _current_job_type
+        job_type = _get_job_type()
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'WORKSTYLE_GENDER_CROSS') & (df['job_type'] == job_type)]
-            if prefecture:
-                filtered = filtered[filtered['prefecture'] == prefecture]
-            if municipality:
-                filtered = filtered[filtered['municipality'] == municipality]
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            filtered = _csv_slice('WORKSTYLE_GENDER_CROSS', prefecture, municipality, columns=_CROSS_COLUMNS)
         else:
             # SQLレベルでフィルタリング - job_type含む
             conditions = ["job_type = ?", "row_type = 'WORKSTYLE_GENDER_CROSS'"]
@@ -3355,6 +3945,7 @@ def get_workstyle_gender_cross(prefecture: str = None, municipality: str = None)
         return pd.DataFrame()
 
 
+@_job_type_scoped
 def get_workstyle_urgency_cross(prefecture: str = None, municipality: str = None) -> pd.DataFrame:
     """雇用形態×緊急度のクロス集計を取得
 
@@ -3363,15 +3954,10 @@ def get_workstyle_urgency_cross(prefecture: str = None, municipality: str = None
     """
     print(f"[DB] get_workstyle_urgency_cross called: pref={prefecture}, muni={municipality}")
     try:
-        job_type = _current_job_type
+        job_type = _get_job_type()
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'WORKSTYLE_URGENCY') & (df['job_type'] == job_type)]
-            if prefecture:
-                filtered = filtered[filtered['prefecture'] == prefecture]
-            if municipality:
-                filtered = filtered[filtered['municipality'] == municipality]
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            filtered = _csv_slice('WORKSTYLE_URGENCY', prefecture, municipality, columns=_CROSS_COLUMNS)
         else:
             # SQLレベルでフィルタリング - job_type含む
             conditions = ["job_type = ?", "row_type = 'WORKSTYLE_URGENCY'"]
@@ -3410,6 +3996,7 @@ def get_workstyle_urgency_cross(prefecture: str = None, municipality: str = None
         return pd.DataFrame()
 
 
+@_job_type_scoped
 def get_workstyle_employment_cross(prefecture: str = None, municipality: str = None) -> pd.DataFrame:
     """雇用形態×就業状態のクロス集計を取得
 
@@ -3418,15 +4005,10 @@ def get_workstyle_employment_cross(prefecture: str = None, municipality: str = N
     """
     print(f"[DB] get_workstyle_employment_cross called: pref={prefecture}, muni={municipality}")
     try:
-        job_type = _current_job_type
+        job_type = _get_job_type()
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'WORKSTYLE_EMPLOYMENT_STATUS') & (df['job_type'] == job_type)]
-            if prefecture:
-                filtered = filtered[filtered['prefecture'] == prefecture]
-            if municipality:
-                filtered = filtered[filtered['municipality'] == municipality]
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            filtered = _csv_slice('WORKSTYLE_EMPLOYMENT_STATUS', prefecture, municipality, columns=_CROSS_COLUMNS)
         else:
             # SQLレベルでフィルタリング - job_type含む
             conditions = ["job_type = ?", "row_type = 'WORKSTYLE_EMPLOYMENT_STATUS'"]
@@ -3465,6 +4047,7 @@ def get_workstyle_employment_cross(prefecture: str = None, municipality: str = N
         return pd.DataFrame()
 
 
+@_job_type_scoped
 def get_workstyle_area_count_cross(prefecture: str = None, municipality: str = None) -> pd.DataFrame:
     """雇用形態×希望勤務地数のクロス集計を取得
 
@@ -3473,15 +4056,10 @@ def get_workstyle_area_count_cross(prefecture: str = None, municipality: str = N
     """
     print(f"[DB] get_workstyle_area_count_cross called: pref={prefecture}, muni={municipality}")
     try:
-        job_type = _current_job_type
+        job_type = _get_job_type()
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'WORKSTYLE_DESIRED_AREA_COUNT') & (df['job_type'] == job_type)]
-            if prefecture:
-                filtered = filtered[filtered['prefecture'] == prefecture]
-            if municipality:
-                filtered = filtered[filtered['municipality'] == municipality]
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            filtered = _csv_slice('WORKSTYLE_DESIRED_AREA_COUNT', prefecture, municipality, columns=_CROSS_COLUMNS)
         else:
             # SQLレベルでフィルタリング - job_type含む
             conditions = ["job_type = ?", "row_type = 'WORKSTYLE_DESIRED_AREA_COUNT'"]
@@ -3520,6 +4098,7 @@ def get_workstyle_area_count_cross(prefecture: str = None, municipality: str = N
         return pd.DataFrame()
 
 
+@_job_type_scoped
 def get_workstyle_summary_stats(prefecture: str = None, municipality: str = None) -> dict:
     """雇用形態分析のサマリー統計を取得
 
@@ -3552,6 +4131,7 @@ def get_workstyle_summary_stats(prefecture: str = None, municipality: str = None
         return {}
 
 
+@_job_type_scoped
 def get_urgency_gender_data(prefecture: str = None, municipality: str = None) -> list:
     """緊急度×性別のデータを取得
 
@@ -3560,12 +4140,10 @@ def get_urgency_gender_data(prefecture: str = None, municipality: str = None) ->
     """
     try:
         print(f"[DB] get_urgency_gender_data called: pref={prefecture}, muni={municipality}")
-        job_type = _current_job_type
+        job_type = _get_job_type()
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            print(f"[DB] CSV loaded: {len(df)} rows, row_types: {df['row_type'].unique()[:10].tolist() if 'row_type' in df.columns else 'no row_type column'}")
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'URGENCY_GENDER') & (df['job_type'] == job_type)]
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            filtered = _csv_slice('URGENCY_GENDER', columns=_URGENCY_COLUMNS)
             print(f"[DB] URGENCY_GENDER filtered: {len(filtered)} rows")
         else:
             sql = "SELECT * FROM job_seeker_data WHERE job_type = ? AND row_type = 'URGENCY_GENDER'"
@@ -3620,6 +4198,7 @@ def get_urgency_gender_data(prefecture: str = None, municipality: str = None) ->
         return []
 
 
+@_job_type_scoped
 def get_urgency_start_category_data(prefecture: str = None, municipality: str = None) -> list:
     """緊急度×転職希望時期のデータを取得
 
@@ -3627,11 +4206,10 @@ def get_urgency_start_category_data(prefecture: str = None, municipality: str =
         list: [{"category": "今すぐ", "count": 500, "avg_score": 5.0}, ...]
     """
     try:
-        job_type = _current_job_type
+        job_type = _get_job_type()
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'URGENCY_START_CATEGORY') & (df['job_type'] == job_type)]
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            filtered = _csv_slice('URGENCY_START_CATEGORY', columns=_URGENCY_COLUMNS)
         else:
             sql = "SELECT * FROM job_seeker_data WHERE job_type = ? AND row_type = 'URGENCY_START_CATEGORY'"
             filtered = query_df(sql, (job_type,))
@@ -3679,6 +4257,7 @@ def get_urgency_start_category_data(prefecture: str = None, municipality: str =
         return []
 
 
+@_job_type_scoped
 def get_workstyle_mobility_data(prefecture: str = None, municipality: str = None) -> list:
     """雇用形態×移動パターンのデータを取得
 
@@ -3687,11 +4266,11 @@ def get_workstyle_mobility_data(prefecture: str = None, municipality: str = None
     """
     try:
         print(f"[DB] get_workstyle_mobility_data called: pref={prefecture}, muni={municipality}")
-        job_type = _current_job_type
+        job_type = _get_job_type()
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'WORKSTYLE_MOBILITY') & (df['job_type'] == job_type)]
+            # 2026-01-20: 地域インデックスから取得（全件マスク走査を回避）
+            filtered = _csv_slice('WORKSTYLE_MOBILITY', columns=['category1', 'category2', 'count',
+                                                                 'avg_reference_distance_km'])
         else:
             # 2026-01-03 最適化: SELECT * → 必要カラムのみ取得（タイムアウト回避）
             sql = """
@@ -3758,6 +4337,142 @@ def get_workstyle_mobility_data(prefecture: str = None, municipality: str = None
         return []
 
 
+# =====================================
+# 市区町村座標テーブル（2026-01-20追加）
+# =====================================
+# 以前は get_map_markers / get_flow_lines / get_inflow_sources / get_competing_areas が
+# 呼び出しのたびに全国SUMMARYを取得し、iterrows()で座標マップを作り直していた。
+# 座標は職種ごとに1度だけ構築して共有する。データ更新時は refresh_all_cache() でのみ破棄する
+# （職種LRUの破棄・clear_cache()の対象外: 座標はデータ更新以外で変わらないため）。
+_coord_tables: dict = {}  # job_type → {"markers": DataFrame, "municipality": {(pref, muni): (lat, lng)}, "prefecture": {pref: (lat, lng)}}
+_coord_tables_lock = threading.Lock()
+
+_COORD_SOURCE_COLUMNS = ['prefecture', 'municipality', 'latitude', 'longitude',
+                         'applicant_count', 'count', 'male_count', 'female_count']
+
+
+def _numeric_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """数値列を取得（文字列・欠損は0、列がなければ0埋め）"""
+    if column not in df.columns:
+        return pd.Series(0.0, index=df.index)
+    return pd.to_numeric(df[column], errors='coerce').fillna(0)
+
+
+def _build_coord_table(job_type: str) -> dict:
+    """SUMMARY行から座標テーブルを構築（ベクトル化、iterrows不使用）"""
+    if USE_CSV_MODE:
+        summary = _csv_slice('SUMMARY', columns=_COORD_SOURCE_COLUMNS)
+        summary = summary[[c for c in _COORD_SOURCE_COLUMNS if c in summary.columns]]
+    else:
+        summary = query_df(
+            f"SELECT {', '.join(_COORD_SOURCE_COLUMNS)} FROM job_seeker_data WHERE job_type = ? AND row_type = 'SUMMARY'",
+            (job_type,)
+        )
+
+    if summary.empty or not {'prefecture', 'latitude', 'longitude'}.issubset(summary.columns):
+        return {"markers": pd.DataFrame(), "municipality": {}, "prefecture": {}}
+
+    municipality = summary['municipality'].astype(object) if 'municipality' in summary.columns \
+        else pd.Series(None, index=summary.index, dtype=object)
+    municipality = municipality.where(municipality.notna() & (municipality != ''), None)
+    lat = pd.to_numeric(summary['latitude'], errors='coerce')
+    lng = pd.to_numeric(summary['longitude'], errors='coerce')
+    valid = summary['prefecture'].notna() & lat.notna() & lng.notna() & (lat != 0) & (lng != 0)
+
+    # applicant_count を優先的に使用（countは0の場合がある）
+    applicant = _numeric_column(summary, 'applicant_count')
+    count = applicant.where(applicant != 0, _numeric_column(summary, 'count'))
+    is_muni = municipality.notna()
+
+    markers = pd.DataFrame({
+        "name": municipality.where(is_muni, summary['prefecture'].astype(object)),
+        "prefecture": summary['prefecture'].astype(object),
+        "municipality": municipality,
+        "lat": lat,
+        "lng": lng,
+        "count": count.astype('int64'),
+        "male_count": _numeric_column(summary, 'male_count').astype('int64'),
+        "female_count": _numeric_column(summary, 'female_count').astype('int64'),
+        "type": np.where(is_muni, "municipality", "prefecture"),
+    })[valid].reset_index(drop=True)
+
+    muni_rows = markers[markers['municipality'].notna()]
+    pref_rows = markers[markers['municipality'].isna()]
+    municipality_coords = dict(zip(
+        zip(muni_rows['prefecture'].tolist(), muni_rows['municipality'].tolist()),
+        zip(muni_rows['lat'].tolist(), muni_rows['lng'].tolist())
+    ))
+    # 都道府県座標: 都道府県行を優先し、ない場合は最初の市区町村の座標で代用
+    fallback = muni_rows.drop_duplicates('prefecture')
+    prefecture_coords = dict(zip(fallback['prefecture'].tolist(), zip(fallback['lat'].tolist(), fallback['lng'].tolist())))
+    prefecture_coords.update(zip(pref_rows['prefecture'].tolist(), zip(pref_rows['lat'].tolist(), pref_rows['lng'].tolist())))
+
+    return {"markers": markers, "municipality": municipality_coords, "prefecture": prefecture_coords}
+
+
+def _get_coord_table() -> dict:
+    """現在の職種の座標テーブルを取得（初回のみ構築）
+
+    Returns:
+        dict: {
+            "markers": DataFrame（座標のあるSUMMARY行、get_map_markersの出力列）,
+            "municipality": {(都道府県, 市区町村): (lat, lng)},
+            "prefecture": {都道府県: (lat, lng)},
+        }
+    """
+    job_type = _get_job_type()
+    table = _coord_tables.get(job_type)
+    if table is not None:
+        return table
+
+    with _coord_tables_lock:
+        table = _coord_tables.get(job_type)
+        if table is None:
+            table = _build_coord_table(job_type)
+            # 空の結果（DB未接続など）はキャッシュせず次回再試行
+            if not table["markers"].empty:
+                _coord_tables[job_type] = table
+            print(f"[CACHE] Coordinate table built: job_type={job_type} "
+                  f"municipalities={len(table['municipality'])} prefectures={len(table['prefecture'])}")
+    return table
+
+
+# =====================================
+# 居住地 → 希望勤務地 フローキューブ（2026-01-20追加）
+# =====================================
+# get_flow_balance / get_inflow_sources / get_flow_lines / get_pref_flow_top10 / get_muni_flow_top10 は
+# 職種ごとに1度だけ作る RESIDENCE_FLOW の疎行列（flow_cube.FlowCube）の行・列スライスで答える。
+# cache_manager の "flow_cube" 名前空間で保持する（職種LRUの破棄・clear_cache() で破棄）。
+def _load_flow_cube(job_type: str) -> flow_cube.FlowCube:
+    if USE_CSV_MODE:
+        df = _csv_slice('RESIDENCE_FLOW', columns=flow_cube.SOURCE_COLUMNS)
+    else:
+        df = query_df(
+            f"SELECT {', '.join(flow_cube.SOURCE_COLUMNS)} FROM job_seeker_data "
+            "WHERE job_type = ? AND row_type = 'RESIDENCE_FLOW'",
+            (job_type,)
+        )
+    cube = flow_cube.build_flow_cube(df)
+    print(f"[CACHE] Flow cube built: job_type={job_type} rows={len(df):,} areas={cube.n_areas:,}")
+    return cube
+
+
+def _get_flow_cube() -> flow_cube.FlowCube:
+    """現在の職種のフローキューブを取得（初回のみ構築、同時の初回アクセスは single_flight で1回に集約）"""
+    job_type = _get_job_type()
+    cache_key = (job_type,)
+    cube = cache_manager.get("flow_cube", cache_key)
+    if cube is None:
+        cube = single_flight(cache_key, lambda: _load_flow_cube(job_type), namespace="flow_cube")
+        # 空の結果（DB未接続など）はキャッシュせず次回再試行
+        if cube.n_areas:
+            cache_manager.set("flow_cube", cache_key, cube, size=cube.nbytes)
+    return cube
+
+
+@_job_type_scoped
+@_coalesced("map_markers", lambda prefecture=None: (prefecture or 'ALL',),
+            cache_namespace="batch_cache", cache_key=_batch_cache_key("map_markers"))
 def get_map_markers(prefecture: str = None) -> list:
     """地図表示用のマーカーデータを取得（キャッシュ対応 2025-12-29）
 
@@ -3770,8 +4485,8 @@ def get_map_markers(prefecture: str = None) -> list:
     """
     try:
         # キャッシュキー生成（job_type含む）
-        job_type = _current_job_type
-        cache_key = f"map_markers_{job_type}_{prefecture or 'ALL'}"
+        job_type = _get_job_type()
+        cache_key = (job_type, "map_markers", prefecture or 'ALL')
 
         # batch_cacheから取得（LRU制御付き）
         cached = _get_batch_cache(cache_key)
@@ -3780,26 +4495,13 @@ def get_map_markers(prefecture: str = None) -> list:
             return cached
 
         print(f"[DB] get_map_markers called: pref={prefecture} job_type={job_type}")
-        if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'SUMMARY') & (df['job_type'] == job_type)]
-        else:
-            sql = "SELECT * FROM job_seeker_data WHERE job_type = ? AND row_type = 'SUMMARY'"
-            filtered = query_df(sql, (job_type,))
+        # 2026-01-20: 共有座標テーブルから取得（SUMMARY再取得・iterrowsを回避）
+        filtered = _get_coord_table()["markers"]
 
         if filtered.empty:
             print(f"[DB] get_map_markers: No SUMMARY data")
             return []
 
-        # 座標があるデータのみ
-        filtered = filtered[
-            (filtered['latitude'].notna()) &
-            (filtered['longitude'].notna()) &
-            (filtered['latitude'] != '') &
-            (filtered['longitude'] != '')
-        ]
-
         if prefecture and prefecture != "全国":
             filtered = filtered[filtered['prefecture'] == prefecture]
 
@@ -3807,29 +4509,7 @@ def get_map_markers(prefecture: str = None) -> list:
             return []
 
         # マーカーデータ生成
-        markers = []
-        for _, row in filtered.iterrows():
-            try:
-                lat = float(row['latitude'])
-                lng = float(row['longitude'])
-                # applicant_count を優先的に使用（countは0の場合がある）
-                count = int(float(row.get('applicant_count', 0) or row.get('count', 0) or 0))
-                name = row.get('municipality', '') or row.get('prefecture', '')
-
-                if lat and lng:
-                    markers.append({
-                        "name": name,
-                        "prefecture": row.get('prefecture', ''),
-                        "municipality": row.get('municipality', ''),
-                        "lat": lat,
-                        "lng": lng,
-                        "count": count,
-                        "male_count": int(float(row.get('male_count', 0) or 0)),
-                        "female_count": int(float(row.get('female_count', 0) or 0)),
-                        "type": "municipality" if row.get('municipality') else "prefecture"
-                    })
-            except (ValueError, TypeError):
-                continue
+        markers = filtered.to_dict('records')
 
         # batch_cacheに保存（LRU制御付き）
         _set_batch_cache(cache_key, markers)
@@ -3843,6 +4523,9 @@ def get_map_markers(prefecture: str = None) -> list:
         return []
 
 
+@_job_type_scoped
+@_coalesced("flow_lines", lambda prefecture=None: (prefecture or 'ALL',),
+            cache_namespace="batch_cache", cache_key=_batch_cache_key("flow_lines"))
 def get_flow_lines(prefecture: str = None) -> list:
     """人材フロー用の線データを取得（キャッシュ対応 2025-12-29）
 
@@ -3854,8 +4537,8 @@ def get_flow_lines(prefecture: str = None) -> list:
     """
     try:
         # キャッシュキー生成（job_type含む）
-        job_type = _current_job_type
-        cache_key = f"flow_lines_{job_type}_{prefecture or 'ALL'}"
+        job_type = _get_job_type()
+        cache_key = (job_type, "flow_lines", prefecture or 'ALL')
 
         # batch_cacheから取得（LRU制御付き）
         cached = _get_batch_cache(cache_key)
@@ -3864,70 +4547,38 @@ def get_flow_lines(prefecture: str = None) -> list:
             return cached
 
         print(f"[DB] get_flow_lines called: pref={prefecture} job_type={job_type}")
-        if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'RESIDENCE_FLOW') & (df['job_type'] == job_type)]
-        else:
-            sql = "SELECT * FROM job_seeker_data WHERE job_type = ? AND row_type = 'RESIDENCE_FLOW'"
-            filtered = query_df(sql, (job_type,))
-
-        if filtered.empty:
-            return []
-
-        if prefecture and prefecture != "全国":
-            # 居住地または希望勤務地が対象都道府県のデータを抽出
-            # prefecture = 居住地都道府県, desired_prefecture = 希望勤務地都道府県
-            filtered = filtered[
-                (filtered['prefecture'] == prefecture) |
-                (filtered['desired_prefecture'] == prefecture)
-            ]
-
-        if filtered.empty:
+        # 2026-01-20: フローキューブの都道府県行列から取得（以前はRESIDENCE_FLOWの行ごとに線を作成しており、
+        # 同じ都道府県間の線が市区町村・属性の数だけ重なっていた → 都道府県間の合計で1本）
+        cube = _get_flow_cube()
+        scope = prefecture if prefecture and prefecture != "全国" else None
+        # 居住地または希望勤務地が対象都道府県
+        origin, dest, counts = cube.prefecture_flows(scope, touching=True)
+        if len(counts) == 0:
             return []
 
-        # 都道府県の座標マップ（SUMMARYから取得）- job_typeフィルタ含む
-        if USE_CSV_MODE:
-            summary_df = df[df['row_type'] == 'SUMMARY']
-        else:
-            summary_df = query_df(
-                "SELECT * FROM job_seeker_data WHERE job_type = ? AND row_type = 'SUMMARY'",
-                (job_type,)
-            )
-
-        pref_coords = {}
-        for _, row in summary_df.iterrows():
-            pref = row.get('prefecture', '')
-            if pref and row.get('latitude') and row.get('longitude'):
-                try:
-                    pref_coords[pref] = {'lat': float(row['latitude']), 'lng': float(row['longitude'])}
-                except (ValueError, TypeError):
-                    continue
+        # 都道府県の座標マップ（共有座標テーブル）- job_type別
+        pref_coords = _get_coord_table()["prefecture"]
 
-        # フローデータ生成
         # prefecture = 居住地（フロー元）, desired_prefecture = 希望勤務地（フロー先）
         flows = []
-        for _, row in filtered.iterrows():
-            try:
-                from_pref = row.get('prefecture', '')
-                to_pref = row.get('desired_prefecture', '')  # 修正: category1ではなくdesired_prefecture
-                count = int(float(row.get('count', 0) or 0))
-
-                if from_pref in pref_coords and to_pref in pref_coords and from_pref != to_pref:
-                    flows.append({
-                        "from_pref": from_pref,
-                        "to_pref": to_pref,
-                        "count": count,
-                        "from_lat": pref_coords[from_pref]['lat'],
-                        "from_lng": pref_coords[from_pref]['lng'],
-                        "to_lat": pref_coords[to_pref]['lat'],
-                        "to_lng": pref_coords[to_pref]['lng']
-                    })
-            except (ValueError, TypeError):
-                continue
+        for i in flow_cube.rank_flows(origin, dest, counts):
+            from_pref = cube.prefectures[origin[i]]
+            to_pref = cube.prefectures[dest[i]]
+            if from_pref in pref_coords and to_pref in pref_coords and from_pref != to_pref:
+                (from_lat, from_lng), (to_lat, to_lng) = pref_coords[from_pref], pref_coords[to_pref]
+                flows.append({
+                    "from_pref": from_pref,
+                    "to_pref": to_pref,
+                    "count": int(counts[i]),
+                    "from_lat": from_lat,
+                    "from_lng": from_lng,
+                    "to_lat": to_lat,
+                    "to_lng": to_lng
+                })
+                if len(flows) >= 100:
+                    break
 
-        flows.sort(key=lambda x: x['count'], reverse=True)
-        result = flows[:100]
+        result = flows
 
         # batch_cacheに保存（LRU制御付き）
         _set_batch_cache(cache_key, result)
@@ -3945,6 +4596,7 @@ def get_flow_lines(prefecture: str = None) -> list:
 # 地図機能拡張（流入元/バランス/競合地域）
 # ========================================
 
+@_job_type_scoped
 def get_inflow_sources(
     target_prefecture: str,
     target_municipality: str = None,
@@ -3966,97 +4618,48 @@ def get_inflow_sources(
     """
     try:
         print(f"[DB] get_inflow_sources: target={target_prefecture}/{target_municipality}, filters={workstyle}/{age_group}/{gender}")
-        job_type = _current_job_type
-
-        # 2026-01-03 最適化: SELECT * → 必要カラムのみ、都道府県フィルタをSQLに含める（タイムアウト回避）
-        INFLOW_COLUMNS = "prefecture, municipality, desired_prefecture, desired_municipality, count, category1, category2"
-
-        if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'RESIDENCE_FLOW') & (df['job_type'] == job_type)]
-            # 希望勤務地（target）でフィルタ
-            if 'desired_prefecture' in filtered.columns:
-                filtered = filtered[filtered['desired_prefecture'] == target_prefecture]
-            if target_municipality and target_municipality != "全て" and 'desired_municipality' in filtered.columns:
-                filtered = filtered[filtered['desired_municipality'] == target_municipality]
-        else:
-            # SQLで都道府県フィルタを直接適用（クエリ軽量化）
-            if target_municipality and target_municipality != "全て":
-                sql = f"SELECT {INFLOW_COLUMNS} FROM job_seeker_data WHERE job_type = ? AND row_type = 'RESIDENCE_FLOW' AND desired_prefecture = ? AND desired_municipality = ?"
-                params = (job_type, target_prefecture, target_municipality)
-            else:
-                sql = f"SELECT {INFLOW_COLUMNS} FROM job_seeker_data WHERE job_type = ? AND row_type = 'RESIDENCE_FLOW' AND desired_prefecture = ?"
-                params = (job_type, target_prefecture)
-            filtered = query_df(sql, params)
-
-        if filtered.empty:
-            print("[DB] get_inflow_sources: No RESIDENCE_FLOW data")
-            return []
-
+        # 2026-01-20: フローキューブの列スライス（希望勤務地 = target）から取得
+        # ※ RESIDENCE_FLOWにworkstyle列はないため、workstyleフィルタは従来通り適用しない
+        cube = _get_flow_cube()
+        municipality = target_municipality if target_municipality and target_municipality != "全て" else None
+        dests = cube.areas(target_prefecture, municipality) if target_prefecture else np.array([], dtype=np.int64)
         # 属性フィルタ（category1=年齢層, category2=性別）
-        if age_group and age_group != "全て" and 'category1' in filtered.columns:
-            filtered = filtered[filtered['category1'] == age_group]
-        if gender and gender != "全て" and 'category2' in filtered.columns:
-            filtered = filtered[filtered['category2'] == gender]
-
-        if filtered.empty:
-            print("[DB] get_inflow_sources: Filtered data is empty")
+        origin, _, counts = cube.flows_to(
+            dests,
+            age_group=age_group if age_group and age_group != "全て" else None,
+            gender=gender if gender and gender != "全て" else None,
+        )
+        if len(counts) == 0:
+            print("[DB] get_inflow_sources: No RESIDENCE_FLOW data")
             return []
 
-        # 居住地（source）別に集計
-        # prefecture列が居住地（都道府県）、municipality列が居住地（市区町村）
-        grouped = filtered.groupby(['prefecture', 'municipality']).agg({
-            'count': 'sum'
-        }).reset_index()
-
-        # SUMMARYデータから座標を取得（RESIDENCE_FLOWには座標がない場合がある）
-        if USE_CSV_MODE:
-            summary_df = _load_csv_data()
-            summary_df = summary_df[summary_df['row_type'] == 'SUMMARY']
-        else:
-            summary_df = query_df(
-                "SELECT prefecture, municipality, latitude, longitude FROM job_seeker_data WHERE job_type = ? AND row_type = 'SUMMARY'",
-                (job_type,)
-            )
+        # 居住地（source）別に集計（都道府県・市区町村が欠損の居住地は除外）
+        sources, totals = cube.totals(origin, counts)
+        keep = cube.area_is_municipality[sources]
+        sources, totals = sources[keep], totals[keep]
 
-        # 座標マップを作成
-        coord_map = {}
-        for _, row in summary_df.iterrows():
-            pref = row.get('prefecture', '')
-            muni = row.get('municipality', '')
-            lat = row.get('latitude')
-            lng = row.get('longitude')
-            if pref and muni and lat is not None and lng is not None:
-                try:
-                    coord_map[(pref, muni)] = (float(lat), float(lng))
-                except (ValueError, TypeError):
-                    continue
+        # 座標マップ（共有座標テーブル、RESIDENCE_FLOWには座標がない場合がある）
+        coord_map = _get_coord_table()["municipality"]
 
         results = []
-        for _, row in grouped.iterrows():
-            try:
-                source_pref = row.get('prefecture', '')
-                source_muni = row.get('municipality', '')
-                count = int(float(row.get('count', 0) or 0))
-
-                # SUMMARYから座標を取得
-                coords = coord_map.get((source_pref, source_muni))
-                if coords:
-                    lat, lng = coords
-                    results.append({
-                        "source_pref": source_pref,
-                        "source_muni": source_muni,
-                        "count": count,
-                        "lat": lat,
-                        "lng": lng
-                    })
-            except (ValueError, TypeError):
-                continue
+        for code, count in zip(sources.tolist(), totals.tolist()):
+            source_pref = cube.area_prefecture[code]
+            source_muni = cube.area_municipality[code]
+            # SUMMARYから座標を取得
+            coords = coord_map.get((source_pref, source_muni))
+            if coords:
+                lat, lng = coords
+                results.append({
+                    "source_pref": source_pref,
+                    "source_muni": source_muni,
+                    "count": int(count),
+                    "lat": lat,
+                    "lng": lng
+                })
 
         # countで降順ソート
         results.sort(key=lambda x: x['count'], reverse=True)
-        print(f"[DB] get_inflow_sources: {len(results)} sources returned (from {len(grouped)} grouped rows)")
+        print(f"[DB] get_inflow_sources: {len(results)} sources returned (from {len(sources)} grouped rows)")
         return results
 
     except Exception as e:
@@ -4066,6 +4669,7 @@ def get_inflow_sources(
         return []
 
 
+@_job_type_scoped
 def get_flow_balance(
     prefecture: str = None,
     workstyle: str = None,
@@ -4089,122 +4693,66 @@ def get_flow_balance(
     """
     try:
         print(f"[DB] get_flow_balance: pref={prefecture}, filters={workstyle}/{age_group}/{gender}")
-        job_type = _current_job_type
-
-        if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            flow_df = df[(df['row_type'] == 'RESIDENCE_FLOW') & (df['job_type'] == job_type)]
-        else:
-            flow_df = query_df(
-                "SELECT * FROM job_seeker_data WHERE job_type = ? AND row_type = 'RESIDENCE_FLOW'",
-                (job_type,)
-            )
-
-        if flow_df.empty:
-            return []
-
-        # 属性フィルタ（category1=年齢層, category2=性別）
-        if workstyle and workstyle != "全て" and 'workstyle' in flow_df.columns:
-            flow_df = flow_df[flow_df['workstyle'] == workstyle]
-        if age_group and age_group != "全て" and 'category1' in flow_df.columns:
-            flow_df = flow_df[flow_df['category1'] == age_group]  # 修正: age_group -> category1
-        if gender and gender != "全て" and 'category2' in flow_df.columns:
-            flow_df = flow_df[flow_df['category2'] == gender]  # 修正: gender -> category2
-
-        if prefecture and prefecture != "全国":
-            # 居住地または希望勤務地が対象都道府県
-            # prefecture = 居住地, desired_prefecture = 希望勤務地
-            flow_df = flow_df[
-                (flow_df['prefecture'] == prefecture) |
-                (flow_df['desired_prefecture'] == prefecture)  # 修正: category1 -> desired_prefecture
-            ]
-
-        if flow_df.empty:
+        # 2026-01-20: フローキューブの行・列スライスから取得（全国RESIDENCE_FLOW・SUMMARYの再取得と集計を廃止）
+        # ※ RESIDENCE_FLOWにworkstyle列はないため、workstyleフィルタは従来通り適用しない
+        cube = _get_flow_cube()
+        # 居住地または希望勤務地が対象都道府県（prefecture = 居住地, desired_prefecture = 希望勤務地）
+        scope = cube.areas(prefecture) if prefecture and prefecture != "全国" else None
+        origin, dest, counts = cube.flows_touching(
+            scope,
+            age_group=age_group if age_group and age_group != "全て" else None,  # category1
+            gender=gender if gender and gender != "全て" else None,  # category2
+        )
+        if len(counts) == 0:
             return []
 
-        # 流出: 居住地（prefecture）から出ていく
-        outflow_grouped = flow_df.groupby(['prefecture', 'municipality']).agg({
-            'count': 'sum',
-            'latitude': 'first',
-            'longitude': 'first'
-        }).reset_index()
-        outflow_grouped = outflow_grouped.rename(columns={'count': 'outflow'})
-
-        # 流入: 希望勤務地（desired_prefecture, desired_municipality）に来る
-        # 修正: category1/category2は年齢層/性別であり、地域ではない
-        inflow_df = flow_df.copy()
-        inflow_df = inflow_df.rename(columns={'desired_prefecture': 'target_pref', 'desired_municipality': 'target_muni'})
-        inflow_grouped = inflow_df.groupby(['target_pref', 'target_muni']).agg({
-            'count': 'sum'
-        }).reset_index()
-        inflow_grouped = inflow_grouped.rename(columns={'target_pref': 'prefecture', 'target_muni': 'municipality', 'count': 'inflow'})
-
-        # 座標を追加
-        if USE_CSV_MODE:
-            summary_df = df[df['row_type'].isin(['SUMMARY', 'MUNICIPALITY'])]
-        else:
-            summary_df = query_df(
-                "SELECT * FROM job_seeker_data WHERE job_type = ? AND row_type IN ('SUMMARY', 'MUNICIPALITY')",
-                (job_type,)
-            )
-
-        coords = {}
-        for _, row in summary_df.iterrows():
-            pref = row.get('prefecture', '')
-            muni = row.get('municipality', '')
-            key = f"{pref}_{muni}" if muni else pref
-            lat = row.get('latitude', 0)
-            lng = row.get('longitude', 0)
-            if lat and lng:
-                try:
-                    coords[key] = {'lat': float(lat), 'lng': float(lng)}
-                except (ValueError, TypeError):
-                    continue
-
-        # 流入と流出をマージ
-        merged = pd.merge(
-            outflow_grouped[['prefecture', 'municipality', 'outflow', 'latitude', 'longitude']],
-            inflow_grouped[['prefecture', 'municipality', 'inflow']],
-            on=['prefecture', 'municipality'],
-            how='outer'
-        ).fillna(0)
+        # 流出: 居住地から出ていく / 流入: 希望勤務地に来る（都道府県・市区町村が欠損の地域は除外）
+        out_keys, out_totals = cube.totals(origin, counts)
+        in_keys, in_totals = cube.totals(dest, counts)
+        outflow = pd.Series(out_totals, index=out_keys)[cube.area_is_municipality[out_keys]]
+        inflow = pd.Series(in_totals, index=in_keys)[cube.area_is_municipality[in_keys]]
+        areas = outflow.index.union(inflow.index)  # 地域名順（従来の outer merge と同じ）
+        outflow = outflow.reindex(areas, fill_value=0)
+        inflow = inflow.reindex(areas, fill_value=0)
+        # 居住地の行に座標があればそれを使う（流入のみの地域・座標なしは0）
+        has_outflow = areas.isin(out_keys)
+        lats = np.where(has_outflow, np.nan_to_num(cube.origin_lat[areas]), 0)
+        lngs = np.where(has_outflow, np.nan_to_num(cube.origin_lng[areas]), 0)
+
+        # 座標を追加（共有座標テーブル）
+        coord_table = _get_coord_table()
+        muni_coords = coord_table["municipality"]
+        pref_coords = coord_table["prefecture"]
 
         results = []
-        for _, row in merged.iterrows():
-            try:
-                pref = row.get('prefecture', '')
-                muni = row.get('municipality', '')
-                inflow = int(float(row.get('inflow', 0)))
-                outflow = int(float(row.get('outflow', 0)))
-                net_flow = inflow - outflow
-                total = inflow + outflow
-                # 2025-12-31 修正: 0.5推定を廃止、データがない場合は0とする
-                ratio = inflow / total if total > 0 else 0
-
-                lat = float(row.get('latitude', 0) or 0)
-                lng = float(row.get('longitude', 0) or 0)
-
-                # 座標がない場合はcoordsから取得
-                if lat == 0 or lng == 0:
-                    key = f"{pref}_{muni}" if muni else pref
-                    if key in coords:
-                        lat = coords[key]['lat']
-                        lng = coords[key]['lng']
-
-                if lat != 0 and lng != 0 and (inflow > 0 or outflow > 0):
-                    results.append({
-                        "prefecture": pref,
-                        "municipality": muni,
-                        "inflow": inflow,
-                        "outflow": outflow,
-                        "net_flow": net_flow,
-                        "ratio": round(ratio, 3),
-                        "lat": lat,
-                        "lng": lng
-                    })
-            except (ValueError, TypeError):
-                continue
+        for code, inflow_value, outflow_value, lat, lng in zip(
+                areas.tolist(), inflow.tolist(), outflow.tolist(), lats.tolist(), lngs.tolist()):
+            pref = cube.area_prefecture[code]
+            muni = cube.area_municipality[code]
+            inflow_count = int(inflow_value)
+            outflow_count = int(outflow_value)
+            net_flow = inflow_count - outflow_count
+            total = inflow_count + outflow_count
+            # 2025-12-31 修正: 0.5推定を廃止、データがない場合は0とする
+            ratio = inflow_count / total if total > 0 else 0
+
+            # 座標がない場合は座標テーブルから取得
+            if lat == 0 or lng == 0:
+                coords = muni_coords.get((pref, muni)) if muni else pref_coords.get(pref)
+                if coords:
+                    lat, lng = coords
+
+            if lat != 0 and lng != 0 and (inflow_count > 0 or outflow_count > 0):
+                results.append({
+                    "prefecture": pref,
+                    "municipality": muni,
+                    "inflow": inflow_count,
+                    "outflow": outflow_count,
+                    "net_flow": net_flow,
+                    "ratio": round(ratio, 3),
+                    "lat": lat,
+                    "lng": lng
+                })
 
         results.sort(key=lambda x: abs(x['net_flow']), reverse=True)
         print(f"[DB] get_flow_balance: {len(results)} municipalities returned")
@@ -4217,6 +4765,7 @@ def get_flow_balance(
         return []
 
 
+@_job_type_scoped
 def get_competing_areas(
     source_prefecture: str,
     source_municipality: str = None,
@@ -4242,77 +4791,67 @@ def get_competing_areas(
     """
     try:
         print(f"[DB] get_competing_areas: source={source_prefecture}/{source_municipality}, filters={workstyle}/{age_group}/{gender}")
-        job_type = _current_job_type
+        job_type = _get_job_type()
+
+        # 2026-01-20: 居住地・属性フィルタと希望勤務地別の集計をDB側で実行
+        # （全国RESIDENCE_FLOWのSELECT * + pandasフィルタを廃止し、応答サイズを結果件数に比例させる）
+        # ※ RESIDENCE_FLOWにworkstyle列はないため、workstyleフィルタは従来通り適用しない
+        municipality = source_municipality if source_municipality and source_municipality != "全て" else None
+        age_group = age_group if age_group and age_group != "全て" else None
+        gender = gender if gender and gender != "全て" else None
 
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            # 2025-12-31 修正: CSVモードでもjob_typeフィルタを追加
-            filtered = df[(df['row_type'] == 'RESIDENCE_FLOW') & (df['job_type'] == job_type)]
+            # 地域インデックスで居住地を絞り込み、同じ条件でpandas集計
+            filtered = _csv_slice('RESIDENCE_FLOW', source_prefecture, municipality,
+                                  columns=['desired_prefecture', 'desired_municipality', 'category1', 'category2', 'count'])
+            if 'desired_prefecture' not in filtered.columns or 'desired_municipality' not in filtered.columns:
+                print(f"[DB] get_competing_areas: Required columns (desired_prefecture/desired_municipality) not found")
+                return []
+            if age_group:
+                filtered = filtered[filtered['category1'] == age_group]
+            if gender:
+                filtered = filtered[filtered['category2'] == gender]
+            grouped = filtered.groupby(
+                ['desired_prefecture', 'desired_municipality'], observed=True, dropna=False
+            )['count'].sum().reset_index()
         else:
-            filtered = query_df(
-                "SELECT * FROM job_seeker_data WHERE job_type = ? AND row_type = 'RESIDENCE_FLOW'",
-                (job_type,)
-            )
-
-        if filtered.empty:
-            return []
-
-        # 居住地でフィルタ
-        filtered = filtered[filtered['prefecture'] == source_prefecture]
-        if source_municipality and source_municipality != "全て":
-            filtered = filtered[filtered['municipality'] == source_municipality]
-
-        # 属性フィルタ（category1=年齢層, category2=性別）
-        if age_group and age_group != "全て" and 'category1' in filtered.columns:
-            filtered = filtered[filtered['category1'] == age_group]
-        if gender and gender != "全て" and 'category2' in filtered.columns:
-            filtered = filtered[filtered['category2'] == gender]
-        if workstyle and workstyle != "全て" and 'workstyle' in filtered.columns:
-            filtered = filtered[filtered['workstyle'] == workstyle]
+            # Turso/SQLite/PostgreSQL共通（プレースホルダーはquery_dfで変換）
+            conditions = ["job_type = ?", "row_type = 'RESIDENCE_FLOW'", "prefecture = ?"]
+            params = [job_type, source_prefecture]
+            if municipality:
+                conditions.append("municipality = ?")
+                params.append(municipality)
+            if age_group:
+                conditions.append("category1 = ?")
+                params.append(age_group)
+            if gender:
+                conditions.append("category2 = ?")
+                params.append(gender)
+            sql = f"""SELECT desired_prefecture, desired_municipality, SUM(count) as count
+                FROM job_seeker_data
+                WHERE {' AND '.join(conditions)}
+                GROUP BY desired_prefecture, desired_municipality"""
+            grouped = query_df(sql, tuple(params))
 
-        if filtered.empty:
+        if grouped.empty:
             print("[DB] get_competing_areas: Filtered data is empty")
             return []
 
-        # 全体の人数を取得
-        total_count = filtered['count'].sum()
+        # 全体の人数（希望勤務地が欠損の行も含む）
+        grouped['count'] = pd.to_numeric(grouped['count'], errors='coerce').fillna(0)
+        total_count = int(grouped['count'].sum())
         if total_count == 0:
             return []
 
-        # 希望勤務地カラムを特定（RESIDENCE_FLOWは常にdesired_*カラムを持つ）
-        if 'desired_prefecture' not in filtered.columns or 'desired_municipality' not in filtered.columns:
-            print(f"[DB] get_competing_areas: Required columns (desired_prefecture/desired_municipality) not found")
-            return []
+        # 希望勤務地が欠損のグループは表示対象外
+        grouped = grouped[grouped['desired_prefecture'].notna() & grouped['desired_municipality'].notna()]
         desired_pref_col = 'desired_prefecture'
         desired_muni_col = 'desired_municipality'
 
-        # 希望勤務地別に集計
-        grouped = filtered.groupby([desired_pref_col, desired_muni_col]).agg({
-            'count': 'sum'
-        }).reset_index()
-
-        # SUMMARYデータから座標を取得
-        if USE_CSV_MODE:
-            summary_df = _load_csv_data()
-            summary_df = summary_df[summary_df['row_type'] == 'SUMMARY']
-        else:
-            summary_df = query_df(
-                "SELECT prefecture, municipality, latitude, longitude FROM job_seeker_data WHERE job_type = ? AND row_type = 'SUMMARY'",
-                (job_type,)
-            )
-
-        coords = {}
-        for _, row in summary_df.iterrows():
-            pref = row.get('prefecture', '')
-            muni = row.get('municipality', '')
-            key = f"{pref}_{muni}" if muni else pref
-            lat = row.get('latitude')
-            lng = row.get('longitude')
-            if lat is not None and lng is not None:
-                try:
-                    coords[key] = {'lat': float(lat), 'lng': float(lng)}
-                except (ValueError, TypeError):
-                    continue
+        # 座標マップ（共有座標テーブル）
+        coord_table = _get_coord_table()
+        muni_coords = coord_table["municipality"]
+        pref_coords = coord_table["prefecture"]
 
         results = []
         for _, row in grouped.iterrows():
@@ -4323,14 +4862,7 @@ def get_competing_areas(
                 percentage = round(count / total_count * 100, 1) if total_count > 0 else 0
 
                 # 座標取得
-                key = f"{target_pref}_{target_muni}" if target_muni else target_pref
-                lat, lng = 0, 0
-                if key in coords:
-                    lat = coords[key]['lat']
-                    lng = coords[key]['lng']
-                elif target_pref in coords:
-                    lat = coords[target_pref]['lat']
-                    lng = coords[target_pref]['lng']
+                lat, lng = muni_coords.get((target_pref, target_muni)) or pref_coords.get(target_pref) or (0, 0)
 
                 if lat != 0 and lng != 0:
                     results.append({
@@ -4355,6 +4887,7 @@ def get_competing_areas(
         return []
 
 
+@_job_type_scoped
 def get_workstyle_mobility_summary(prefecture: str = None, municipality: str = None) -> dict:
     """雇用形態別の移動パターンサマリーを取得
 
@@ -4430,96 +4963,145 @@ def get_workstyle_mobility_summary(prefecture: str = None, municipality: str = N
 # =====================================
 # バックグラウンド全データ事前ロード（タイムアウト回避 + 全カラムキャッシュ）
 # =====================================
+# 2026-01-20変更: 都道府県ごとの直列クエリ（47リクエスト）→ warmup.run_warmup で row_type パーティションを
+# 数回のpipelineリクエスト（ページをまとめて取得、同時実行数を制限）で取得し、都道府県別の分割は手元で行う。
+# 事前ロードの合計は cache_manager の予算の WARMUP_BUDGET_SHARE 以内（超える都道府県は取得しない）。
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# 事前ロードキャッシュ（都道府県別の全データ）
-_preload_cache: dict = {}
+# 事前ロードキャッシュ: cache_managerの"preload"名前空間（(職種, 都道府県) → 全データ）
+# 2026-01-20変更: 無制限のdict → バイト予算管理（予算超過時は一部の都道府県が破棄されうる）
 _preload_status = {
+    "job_type": None,
     "loading": False,
     "loaded": False,
+    "complete": False,  # 全都道府県がキャッシュ済み（予算外・エラーなし）
+    "phase": "idle",  # idle / planning / fetching / caching / done
     "progress": 0,
     "total": len(PREFECTURE_ORDER),
-    "errors": []
+    "pages_done": 0,
+    "pages_total": 0,
+    "errors": [],
+    "prefectures": [],  # ロードに成功した都道府県
+    "skipped": [],  # 予算外で取得・キャッシュしなかった都道府県
+    "rows": 0,
+    "bytes": 0,
+    "requests": 0,  # ウォームアップが発行したリクエスト数（再試行を含む）
+    "turso_requests": 0,  # 同期間のTursoリクエスト数（turso_client統計の差分、他の処理を含む）
+    "elapsed_sec": 0.0,  # ウォームアップ所要時間
 }
+_preload_lock = threading.Lock()
+_preload_ready = threading.Event()
+
+
+def _warmup_execute(queries: list) -> list:
+    """事前ロード用のクエリ実行（Tursoは1回のpipelineリクエスト、それ以外は順に実行）"""
+    if get_db_type() == "turso":
+        return _turso_pipeline_query(queries)
+    return [query_df(sql, params) for sql, params in queries]
+
+
+def _claim_preload(job_type: str) -> bool:
+    """事前ロードを開始できれば状態を初期化してTrue（ロード中、または同じ職種がロード済みならFalse）"""
+    with _preload_lock:
+        if _preload_status["loading"] or (_preload_status["loaded"] and _preload_status["job_type"] == job_type):
+            return False
+        _preload_ready.clear()
+        _preload_status.update({
+            "job_type": job_type, "loading": True, "loaded": False, "complete": False, "phase": "planning",
+            "progress": 0, "pages_done": 0, "pages_total": 0, "errors": [], "prefectures": [], "skipped": [],
+            "rows": 0, "bytes": 0, "requests": 0, "turso_requests": 0, "elapsed_sec": 0.0,
+        })
+        return True
 
-def _preload_prefecture_data(pref: str) -> pd.DataFrame:
-    """都道府県単位でデータを取得（タイムアウト回避用、全カラム、job_typeフィルタ含む）
 
-    Args:
-        pref: 都道府県名
+def _background_preload_all(job_type: str = DEFAULT_JOB_TYPE):
+    """バックグラウンドで職種1つ分の全データを取得し、都道府県ごとにキャッシュ
 
-    Returns:
-        DataFrame（その都道府県の全データ）
+    戦略（2026-01-20変更）:
+    - row_type ごとに rowid 順のページで取得し、複数ページを1リクエストにまとめる（warmup.py）
+    - リクエストは WARMUP_CONCURRENCY 本まで並行
+    - 取得したページを都道府県で分け、都道府県ごとにキャッシュ
+    - 全取得完了後、他の関数はキャッシュから参照可能（is_preload_ready / wait_for_preload）
     """
-    if not _HAS_TURSO:
-        return pd.DataFrame()
+    if _claim_preload(job_type):
+        _run_preload(job_type)
 
+
+def _run_preload(job_type: str):
+    """事前ロード本体（_claim_preload 済みの職種を取得し、完了時に _preload_ready を設定）"""
     try:
-        # 全カラムを取得（SELECT *）- 1都道府県ずつなのでタイムアウトしにくい
-        # job_typeフィルタを追加
-        job_type = _current_job_type
-        sql = f"SELECT * FROM job_seeker_data WHERE job_type = ? AND prefecture = ?"
-        return query_df(sql, (job_type, pref))
+        if USE_CSV_MODE:
+            # CSVモードは全データがメモリ上にあるため事前ロード不要
+            print("[SKIP] Background preload: CSV mode")
+            return
+
+        turso_before = get_turso_client_stats()["requests"]
+        budget = cache_manager.budget_bytes * warmup.BUDGET_SHARE
+        print(f"[PRELOAD] Starting warm-up for {job_type} (row_type partitions, "
+              f"{warmup.PAGE_ROWS:,} rows/page, {warmup.PAGES_PER_REQUEST} pages/request, "
+              f"concurrency {warmup.CONCURRENCY}, budget {budget / 1024 / 1024:.0f}MB)...")
+
+        def on_progress(phase, done, total):
+            _preload_status["phase"] = phase
+            if phase == "fetching":
+                _preload_status["pages_done"] = done
+                _preload_status["pages_total"] = total
+
+        result = warmup.run_warmup(job_type, _warmup_execute, PREFECTURE_ORDER, budget,
+                                   paged=get_db_type() != "postgresql", on_progress=on_progress)
+
+        _preload_status["phase"] = "caching"
+        skipped = list(result["skipped"])
+        for pref in PREFECTURE_ORDER:
+            df = result["slices"].get(pref)
+            if df is not None:
+                if cache_manager.set("preload", (job_type, pref), df):
+                    _preload_status["prefectures"].append(pref)
+                else:
+                    skipped.append(pref)  # 単体で予算超過
+            _preload_status["progress"] += 1
+
+        _preload_status.update({
+            "errors": result["errors"],
+            "skipped": skipped,
+            "complete": not result["errors"] and not skipped,
+            "rows": result["rows"],
+            "bytes": result["bytes"],
+            "requests": result["requests"],
+            "turso_requests": get_turso_client_stats()["requests"] - turso_before,
+            "elapsed_sec": result["elapsed_sec"],
+        })
+        for error in result["errors"]:
+            print(f"[PRELOAD] Error: {error}")
+        print(f"[PRELOAD] Warm-up complete: {len(_preload_status['prefectures'])} prefectures, "
+              f"{result['rows']:,} rows ({result['bytes'] / 1024 / 1024:.1f}MB) in {result['elapsed_sec']:.1f}s, "
+              f"{result['requests']} requests ({result['pages']} pages), "
+              f"{_preload_status['turso_requests']} Turso requests, {len(result['skipped'])} skipped (budget)")
     except Exception as e:
-        print(f"[PRELOAD] Failed to load {pref}: {e}")
-        return pd.DataFrame()
-
-
-def _background_preload_all():
-    """バックグラウンドで全データを都道府県ごとに取得（タイムアウト回避）
-
-    戦略:
-    - 47都道府県を1つずつ順番に取得
-    - 各クエリは1都道府県分のみなので軽量（タイムアウト回避）
-    - 取得したデータは都道府県ごとにキャッシュ
-    - 全取得完了後、他の関数はキャッシュから参照可能
-    """
-    global _preload_cache, _preload_status
-
-    if _preload_status["loading"] or _preload_status["loaded"]:
-        return
-
-    _preload_status["loading"] = True
-    _preload_status["progress"] = 0
-    _preload_status["errors"] = []
-
-    print("[PRELOAD] Starting background data load (all columns, prefecture by prefecture)...")
-
-    # 都道府県ごとに順次取得（並列だとサーバー負荷が高いので順次）
-    for i, pref in enumerate(PREFECTURE_ORDER):
-        try:
-            df = _preload_prefecture_data(pref)
-            if not df.empty:
-                _preload_cache[pref] = df
-                print(f"[PRELOAD] Loaded {pref}: {len(df):,} rows")
-            else:
-                print(f"[PRELOAD] No data for {pref}")
-        except Exception as e:
-            error_msg = f"{pref}: {e}"
-            _preload_status["errors"].append(error_msg)
-            print(f"[PRELOAD] Error: {error_msg}")
-
-        _preload_status["progress"] = i + 1
-
-    _preload_status["loading"] = False
-    _preload_status["loaded"] = True
+        _preload_status["errors"].append(str(e))
+        print(f"[PRELOAD] Error: {e}")
+    finally:
+        _preload_status["phase"] = "done"
+        _preload_status["loading"] = False
+        _preload_status["loaded"] = True
+        _preload_ready.set()
 
-    total_rows = sum(len(df) for df in _preload_cache.values())
-    print(f"[PRELOAD] Background load complete: {len(_preload_cache)} prefectures, {total_rows:,} total rows")
 
-
-def start_background_preload():
+def start_background_preload(job_type: str = DEFAULT_JOB_TYPE):
     """バックグラウンド事前ロードを開始（非ブロッキング）
 
     アプリ起動時に呼び出すと、バックグラウンドで全データをロード開始。
     ユーザーは待たずに操作開始可能。
+    2026-01-20変更: 別の職種がロード済みの場合はその職種でやり直す（ロード中は何もしない）
+
+    Args:
+        job_type: 事前ロードする職種（デフォルト: 介護職）
     """
-    if _preload_status["loading"] or _preload_status["loaded"]:
+    if not _claim_preload(job_type):
         print("[PRELOAD] Already loading or loaded, skipping")
         return
 
-    thread = threading.Thread(target=_background_preload_all, daemon=True)
+    thread = threading.Thread(target=_run_preload, args=(job_type,), daemon=True)
     thread.start()
     print("[PRELOAD] Background preload thread started")
 
@@ -4529,16 +5111,28 @@ def get_preload_status() -> dict:
 
     Returns:
         dict: {
+            "job_type": str,  # 事前ロード対象の職種
             "loading": bool,  # ロード中かどうか
             "loaded": bool,   # ロード完了かどうか
-            "progress": int,  # 完了した都道府県数
+            "complete": bool, # 全都道府県がキャッシュ済みか（予算外・エラーなし）
+            "phase": str,     # idle / planning / fetching / caching / done
+            "progress": int,  # キャッシュ処理が完了した都道府県数
             "total": int,     # 総都道府県数
-            "errors": list    # エラーリスト
+            "pages_done": int, "pages_total": int,  # 取得済み / 全ページ数
+            "errors": list,   # エラーリスト
+            "prefectures": list, "skipped": list,  # キャッシュ済み / 予算外の都道府県
+            "rows": int, "bytes": int,  # 取得した行数・推定バイト数
+            "requests": int, "turso_requests": int, "elapsed_sec": float  # リクエスト数・所要時間
         }
     """
-    return _preload_status.copy()
+    status = _preload_status.copy()
+    status["errors"] = list(status["errors"])
+    status["prefectures"] = list(status["prefectures"])
+    status["skipped"] = list(status["skipped"])
+    return status
 
 
+@_job_type_scoped
 def get_preloaded_data(prefecture: str = None, row_type: str = None) -> pd.DataFrame:
     """事前ロードされたデータを取得
 
@@ -4549,18 +5143,21 @@ def get_preloaded_data(prefecture: str = None, row_type: str = None) -> pd.DataF
     Returns:
         DataFrame（条件に合致するデータ、現在のjob_typeでフィルタ済み）
     """
-    if not _preload_cache:
-        return pd.DataFrame()
-
     # 現在のjob_typeを取得（職種切り替え対応）
-    job_type = _current_job_type
+    job_type = _get_job_type()
+    if _preload_status["job_type"] != job_type:
+        return pd.DataFrame()
 
     if prefecture:
-        df = _preload_cache.get(prefecture, pd.DataFrame())
+        df = cache_manager.get("preload", (job_type, prefecture))
+        if df is None:
+            return pd.DataFrame()
     else:
-        # 全都道府県を結合
-        dfs = list(_preload_cache.values())
-        if not dfs:
+        # 全都道府県を結合（予算外・破棄された都道府県があれば不完全なため空を返し、呼び出し側でDBにフォールバック）
+        if _preload_status["skipped"]:
+            return pd.DataFrame()
+        dfs = [cache_manager.get("preload", (job_type, pref)) for pref in _preload_status["prefectures"]]
+        if not dfs or any(d is None for d in dfs):
             return pd.DataFrame()
         df = pd.concat(dfs, ignore_index=True)
 
@@ -4575,10 +5172,17 @@ def get_preloaded_data(prefecture: str = None, row_type: str = None) -> pd.DataF
 
 
 def is_preload_ready() -> bool:
-    """事前ロードが完了しているかどうか"""
-    return _preload_status["loaded"]
+    """現在の職種の事前ロードが完了しているかどうか"""
+    return _preload_status["loaded"] and _preload_status["job_type"] == _get_job_type()
+
+
+def wait_for_preload(timeout: Optional[float] = None) -> bool:
+    """事前ロードの完了を待つ（2026-01-20追加）。timeout 秒以内に現在の職種の事前ロードが完了すればTrue"""
+    _preload_ready.wait(timeout)
+    return is_preload_ready()
 
 
+@_job_type_scoped
 def get_municipality_detail(prefecture: str, municipality: str) -> dict:
     """市区町村の詳細情報を取得（人材地図サイドバー用）
 
@@ -4609,14 +5213,12 @@ def get_municipality_detail(prefecture: str, municipality: str) -> dict:
         result = {}
 
         # job_typeを取得（職種切り替え対応）
-        job_type = _current_job_type
+        job_type = _get_job_type()
 
         # CSVモード対応（2026-01-06）
         if USE_CSV_MODE:
-            df = _load_csv_data()
-            if 'job_type' in df.columns:
-                df = df[df['job_type'] == job_type]
-            df = df[(df['prefecture'] == prefecture) & (df['municipality'] == municipality)]
+            # 2026-01-20: 地域インデックスから該当市区町村の行のみ取得
+            df = _csv_slice(None, prefecture, municipality)
 
             # 年齢×性別データ
             age_gender_data = df[df['row_type'] == 'AGE_GENDER']
@@ -4816,14 +5418,15 @@ if __name__ == "__main__":
 # 求人データ（job_openingsテーブル）取得関数
 # =====================================
 
+@_job_type_scoped
 def get_job_openings(prefecture=None, municipality=None) -> dict:
     """求人数を取得（現在のjob_typeでフィルタ）
 
     Returns: {"job_count": 合計求人数, "municipalities": {市区町村: 件数, ...}}
     テーブルが存在しない場合は空データを返す（エラーにしない）
     """
-    job_type = _current_job_type
-    cache_key = f"job_openings_{job_type}_{prefecture}_{municipality}"
+    job_type = _get_job_type()
+    cache_key = (job_type, "job_openings", prefecture, municipality)
     cached = _get_cached(cache_key)
     if cached is not None:
         return cached
@@ -4861,6 +5464,7 @@ def get_job_openings(prefecture=None, municipality=None) -> dict:
         return empty_result
 
 
+@_job_type_scoped
 def get_supply_demand_metrics(prefecture=None, municipality=None, gap_stats=None) -> dict:
     """需給指標を計算（求人データ + GAP供給データ）
 
@@ -4870,8 +5474,8 @@ def get_supply_demand_metrics(prefecture=None, municipality=None, gap_stats=None
     Args:
         gap_stats: TAB4で既に取得済みのget_gap_stats()結果。supply値を流用する。
     """
-    job_type = _current_job_type
-    cache_key = f"supply_demand_{job_type}_{prefecture}_{municipality}"
+    job_type = _get_job_type()
+    cache_key = (job_type, "supply_demand", prefecture, municipality)
     cached = _get_cached(cache_key)
     if cached is not None:
         return cached
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+居住地 → 希望勤務地 フローの疎行列（2026-01-20追加）
+
+get_flow_balance / get_inflow_sources / get_flow_lines / get_pref_flow_top10 / get_muni_flow_top10 は
+呼び出しのたびに RESIDENCE_FLOW の行（全国または都道府県分）を取得・フィルタし、pandasで集計し直していた。
+職種ごとに RESIDENCE_FLOW から1度だけ「居住地 × 希望勤務地」の疎行列（SciPy CSR）を作り、
+各getterは行・列のスライスと合計で答える（市区町村の選択は該当する行・列だけを読む）。
+
+構成:
+    - 地域辞書: RESIDENCE_FLOW に現れる (都道府県, 市区町村) を (都道府県, 市区町村) 順に並べた番号。
+      居住地・希望勤務地で共通（正方行列）。欠損は None として1つの地域になる
+      （都道府県単位の集計には含め、市区町村単位の集計では除く = 従来の groupby と同じ）
+    - 行列: counts[居住地, 希望勤務地] = count の合計（count 0 の組み合わせも明示的な0として残す）
+    - 属性スライス: category1（年齢層）・category2（性別）で絞り込んだ行列。初回に作成して保持する
+    - 都道府県行列: 地域 → 都道府県 の対応行列 A で A.T @ counts @ A（属性スライスごとに保持）
+
+※ RESIDENCE_FLOW に雇用形態・資格の列はないため、属性スライスは年齢層・性別のみ
+  （getterの workstyle 引数は従来通り適用しない）。
+
+使用例:
+    cube = build_flow_cube(residence_flow_df)
+    matrix = cube.matrix(age_group='30代')                       # 居住地 × 希望勤務地（CSR）
+    origin, dest, counts = cube.flows_to(cube.areas('東京都', '新宿区'))  # 新宿区への流入（居住地別）
+    sources, totals = cube.totals(origin, counts)
+"""
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+SOURCE_COLUMNS = ['prefecture', 'municipality', 'desired_prefecture', 'desired_municipality',
+                  'category1', 'category2', 'count', 'latitude', 'longitude']
+
+
+def _text(df: pd.DataFrame, column: str) -> np.ndarray:
+    """文字列列をobject配列で取得（欠損・列なしは None）"""
+    if column not in df.columns:
+        return np.full(len(df), None, dtype=object)
+    values = df[column].astype(object)
+    return values.where(values.notna(), None).to_numpy()
+
+
+def _number(df: pd.DataFrame, column: str, default: float) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), default)
+    return pd.to_numeric(df[column], errors='coerce').fillna(default).to_numpy(dtype=float)
+
+
+def _entries(matrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """疎行列の (行, 列, 値)"""
+    coo = matrix.tocoo()
+    return coo.row, coo.col, coo.data
+
+
+class FlowCube:
+    """職種1つ分の RESIDENCE_FLOW（居住地 × 希望勤務地 の疎行列と属性スライス）
+
+    Attributes:
+        area_prefecture / area_municipality: 地域番号 → 都道府県・市区町村（object配列、欠損は None）
+        area_is_municipality: 都道府県・市区町村がどちらも欠損でない地域（市区町村単位の集計対象）
+        prefectures: 都道府県（ソート済み）。area_pref_code は地域番号 → その番号（欠損は -1）
+        origin_lat / origin_lng: 居住地として最初に現れた行の latitude / longitude（なければ NaN）
+    """
+
+    def __init__(self, area_prefecture, area_municipality, origin, dest, age, gender, count,
+                 origin_lat, origin_lng):
+        self.area_prefecture = area_prefecture
+        self.area_municipality = area_municipality
+        self.prefectures = sorted({p for p in area_prefecture if p is not None})
+        self._pref_index = {p: i for i, p in enumerate(self.prefectures)}
+        self.area_pref_code = np.array([self._pref_index.get(p, -1) for p in area_prefecture], dtype=np.int64)
+        # 市区町村単位の集計に含める地域（都道府県・市区町村がどちらも欠損でない）
+        self.area_is_municipality = (self.area_pref_code >= 0) & np.array([m is not None for m in area_municipality],
+                                                                          dtype=bool)
+        self.origin_lat = origin_lat
+        self.origin_lng = origin_lng
+        self._origin, self._dest, self._count = origin, dest, count
+        self._age, self._gender = age, gender
+        self._area_index = {key: i for i, key in enumerate(zip(area_prefecture.tolist(), area_municipality.tolist()))}
+        self._pref_areas = {p: np.flatnonzero(self.area_pref_code == i) for i, p in enumerate(self.prefectures)}
+        self._slices = {}
+        self._pref_slices = {}
+        self._lock = threading.Lock()
+
+    @property
+    def n_areas(self) -> int:
+        return len(self.area_prefecture)
+
+    @property
+    def nbytes(self) -> int:
+        """キャッシュ予算用のおおよそのバイト数（作成済みの属性スライスを含む）"""
+        arrays = (self._origin, self._dest, self._count, self.origin_lat, self.origin_lng, self.area_pref_code,
+                  self.area_is_municipality)
+        size = sum(a.nbytes for a in arrays) + 16 * (len(self._age) + len(self._gender) + 2 * self.n_areas)
+        matrices = [m for pair in self._slices.values() for m in pair] + list(self._pref_slices.values())
+        for m in matrices:
+            size += m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+        return int(size)
+
+    # ----- 地域の選択 -----
+
+    def areas(self, prefecture: Optional[str] = None, municipality: Optional[str] = None) -> np.ndarray:
+        """都道府県・市区町村（None は未指定）に一致する地域番号"""
+        if prefecture is not None and municipality is not None:
+            code = self._area_index.get((prefecture, municipality))
+            return np.array([] if code is None else [code], dtype=np.int64)
+        if prefecture is not None:
+            return self._pref_areas.get(prefecture, np.array([], dtype=np.int64))
+        if municipality is not None:
+            return np.flatnonzero(self.area_municipality == municipality)
+        return np.arange(self.n_areas, dtype=np.int64)
+
+    # ----- 行列 -----
+
+    def _slice(self, age_group: Optional[str], gender: Optional[str]):
+        key = (age_group, gender)
+        with self._lock:
+            cached = self._slices.get(key)
+            if cached is not None:
+                return cached
+            mask = np.ones(len(self._count), dtype=bool)
+            if age_group is not None:
+                mask &= self._age == age_group
+            if gender is not None:
+                mask &= self._gender == gender
+            # 重複（年齢層・性別違いの同じ組み合わせ）は合計。count 0 の組み合わせも明示的な0として残る
+            coo = sp.coo_matrix((self._count[mask], (self._origin[mask], self._dest[mask])),
+                                shape=(self.n_areas, self.n_areas))
+            cached = (coo.tocsr(), coo.tocsc())
+            self._slices[key] = cached
+            return cached
+
+    def matrix(self, age_group: Optional[str] = None, gender: Optional[str] = None) -> sp.csr_matrix:
+        """居住地 × 希望勤務地（CSR、属性は None で絞り込まない）"""
+        return self._slice(age_group, gender)[0]
+
+    def column_matrix(self, age_group: Optional[str] = None, gender: Optional[str] = None) -> sp.csc_matrix:
+        """matrix と同じ内容のCSC（希望勤務地＝列のスライス用）"""
+        return self._slice(age_group, gender)[1]
+
+    def prefecture_matrix(self, age_group: Optional[str] = None, gender: Optional[str] = None) -> sp.csr_matrix:
+        """居住都道府県 × 希望都道府県（都道府県が欠損の地域は含まない）"""
+        matrix = self.matrix(age_group, gender)
+        key = (age_group, gender)
+        with self._lock:
+            cached = self._pref_slices.get(key)
+            if cached is None:
+                valid = np.flatnonzero(self.area_pref_code >= 0)
+                to_pref = sp.csr_matrix((np.ones(len(valid)), (valid, self.area_pref_code[valid])),
+                                        shape=(self.n_areas, len(self.prefectures)))
+                cached = (to_pref.T @ matrix @ to_pref).tocsr()
+                self._pref_slices[key] = cached
+            return cached
+
+    # ----- 組み合わせの取得 -----
+
+    def flows_from(self, origins: np.ndarray, age_group: Optional[str] = None,
+                   gender: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """居住地が origins の組み合わせ (居住地, 希望勤務地, 合計)（CSRの行スライス）"""
+        rows, cols, data = _entries(self.matrix(age_group, gender)[origins])
+        return origins[rows], cols, data
+
+    def flows_to(self, dests: np.ndarray, age_group: Optional[str] = None,
+                 gender: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """希望勤務地が dests の組み合わせ (居住地, 希望勤務地, 合計)（CSCの列スライス）"""
+        rows, cols, data = _entries(self.column_matrix(age_group, gender)[:, dests])
+        return rows, dests[cols], data
+
+    def flows_touching(self, codes: Optional[np.ndarray], age_group: Optional[str] = None,
+                       gender: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """居住地または希望勤務地が codes に含まれる組み合わせ（None で全件）"""
+        if codes is None:
+            return _entries(self.matrix(age_group, gender))
+        inside = np.zeros(self.n_areas, dtype=bool)
+        inside[codes] = True
+        # 居住地が codes の行すべて + 希望勤務地が codes の列のうち居住地が codes 外のもの
+        origin, dest, data = self.flows_from(codes, age_group, gender)
+        in_origin, in_dest, in_data = self.flows_to(codes, age_group, gender)
+        outside = ~inside[in_origin]
+        return (np.concatenate([origin, in_origin[outside]]),
+                np.concatenate([dest, in_dest[outside]]),
+                np.concatenate([data, in_data[outside]]))
+
+    def prefecture_flows(self, prefecture: Optional[str] = None, touching: bool = False,
+                         age_group: Optional[str] = None,
+                         gender: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """都道府県間の組み合わせ (居住都道府県番号, 希望都道府県番号, 合計)
+
+        prefecture を指定した場合は居住都道府県が一致するもの（touching=True なら希望都道府県の一致も含む）。
+        """
+        origin, dest, data = _entries(self.prefecture_matrix(age_group, gender))
+        if prefecture is None:
+            return origin, dest, data
+        code = self._pref_index.get(prefecture, -1)
+        keep = (origin == code) | ((dest == code) if touching else False)
+        return origin[keep], dest[keep], data[keep]
+
+    def totals(self, codes: np.ndarray, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """地域番号ごとの合計 (地域番号, 合計)。組み合わせが存在する地域のみ、番号順（= 地域名順）"""
+        present = np.bincount(codes, minlength=self.n_areas) > 0
+        sums = np.bincount(codes, weights=data, minlength=self.n_areas)
+        keys = np.flatnonzero(present)
+        return keys, sums[keys]
+
+
+def rank_flows(origin: np.ndarray, dest: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """合計の降順（同数は居住地・希望勤務地の番号順 = 従来の groupby 後の安定ソートと同じ）の並び"""
+    return np.lexsort((dest, origin, -counts))
+
+
+def build_flow_cube(df: pd.DataFrame) -> FlowCube:
+    """RESIDENCE_FLOW の行（SOURCE_COLUMNS、不足する列は欠損扱い）から FlowCube を作成"""
+    n = len(df)
+    keys = pd.DataFrame({
+        'prefecture': np.concatenate([_text(df, 'prefecture'), _text(df, 'desired_prefecture')]),
+        'municipality': np.concatenate([_text(df, 'municipality'), _text(df, 'desired_municipality')]),
+    })
+    # (都道府県, 市区町村) 順の番号（欠損は各階層の末尾）。getterの並び順は groupby と同じになる
+    grouped = keys.groupby(['prefecture', 'municipality'], dropna=False, sort=True)
+    codes = grouped.ngroup().to_numpy(dtype=np.int64)
+    areas = grouped.size().index
+    area_prefecture = np.array([None if pd.isna(p) else p for p in areas.get_level_values(0)], dtype=object)
+    area_municipality = np.array([None if pd.isna(m) else m for m in areas.get_level_values(1)], dtype=object)
+    origin, dest = codes[:n], codes[n:]
+
+    # 居住地の座標: 居住地ごとに最初の非欠損値（従来の groupby(...).agg('first') と同じ）
+    origin_lat = np.full(len(areas), np.nan)
+    origin_lng = np.full(len(areas), np.nan)
+    for column, target in (('latitude', origin_lat), ('longitude', origin_lng)):
+        values = pd.Series(_number(df, column, np.nan))
+        first = values.groupby(origin).first()
+        target[first.index.to_numpy()] = first.to_numpy()
+
+    return FlowCube(area_prefecture, area_municipality, origin, dest,
+                    _text(df, 'category1'), _text(df, 'category2'), _number(df, 'count', 0.0),
+                    origin_lat, origin_lng)
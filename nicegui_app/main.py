@@ -16,12 +16,16 @@ import gc
 import time
 from pathlib import Path
 from typing import List, Dict, Any
-from collections import defaultdict, OrderedDict
+from collections import defaultdict
 
-import httpx
 import pandas as pd
 from nicegui import app, ui
 
+from turso_client import post_pipeline, get_turso_client_stats, close_turso_clients
+from cache_manager import cache_manager
+from columnar_data import find_dataset, read_dataset  # 2026-01-20: Parquetデータセット（pyarrowはオプション）
+import instrumentation  # 2026-01-20: スパン計測と /metrics
+
 # セキュリティ: パスワードハッシュ化 (2025-12-29追加)
 try:
     import bcrypt
@@ -65,8 +69,11 @@ try:
         get_preloaded_data,
         is_preload_ready,
         # 職種切り替え関数
-        set_current_job_type,
         get_current_job_type,
+        set_job_type_provider,
+        # 同時キャッシュミスの集約
+        single_flight,
+        single_flight_async,
         # CSVモードフラグ
         USE_CSV_MODE,
         # 求人データ取得関数
@@ -102,10 +109,28 @@ except ImportError as e:
     get_urgency_gender_data = lambda pref=None, muni=None: []
     get_urgency_start_category_data = lambda pref=None, muni=None: []
     DB_PREFECTURE_ORDER = []
-    set_current_job_type = lambda job_type: None
     get_current_job_type = lambda: "介護職"
+    set_job_type_provider = lambda provider: None
+    single_flight = lambda key, fn, namespace="default": fn()
+    single_flight_async = lambda key, coro_fn, namespace="default": coro_fn()
     USE_CSV_MODE = True  # フォールバック時はCSVモード
 
+# 非同期ファサード（2026-01-20追加）: db_helperの同期処理をスレッドプールで実行
+try:
+    from db_async import run_in_thread, gather_in_threads, query_turso_df
+except ImportError as e:
+    print(f"[STARTUP] db_async.py import failed: {e}")
+    import asyncio
+    from nicegui import run
+
+    async def run_in_thread(func, *args, **kwargs):
+        return await run.io_bound(func, *args, **kwargs)
+
+    async def gather_in_threads(*calls):
+        return list(await asyncio.gather(*(run_in_thread(func, *args) for func, *args in calls)))
+
+    query_turso_df = None
+
 # コロプレスマップヘルパー（47都道府県GeoJSON対応）
 try:
     from choropleth_helper import (
@@ -113,6 +138,7 @@ try:
         load_multiple_geojson,
         get_pref_center,
         get_color_by_value,
+        colors_for_values,
         find_municipality_at_point,
         PREF_NAME_TO_CODE,
     )
@@ -125,6 +151,7 @@ except ImportError as e:
     load_multiple_geojson = lambda prefs: None
     get_pref_center = lambda pref: (36.5, 138.0)
     get_color_by_value = lambda v, m, mode: "#9ca3af"
+    colors_for_values = lambda values, m, mode: ["#9ca3af"] * len(values)
     find_municipality_at_point = lambda lat, lng, data: None
     PREF_NAME_TO_CODE = {}
 
@@ -327,18 +354,10 @@ def generate_name_variants(name: str) -> list:
 def query_turso(sql: str) -> pd.DataFrame:
     """Run a Turso HTTP query."""
     log(f"[TURSO] query_turso called with SQL: {sql[:100]}...")
-    http_url = TURSO_DATABASE_URL
-    if http_url.startswith("libsql://"):
-        http_url = http_url.replace("libsql://", "https://")
-    log(f"[TURSO] HTTP URL: {http_url[:50]}...")
-
-    headers = {
-        "Authorization": f"Bearer {TURSO_AUTH_TOKEN}",
-        "Content-Type": "application/json",
-    }
     payload = {"requests": [{"type": "execute", "stmt": {"sql": sql}}]}
 
-    response = httpx.post(f"{http_url}/v2/pipeline", headers=headers, json=payload, timeout=30.0)
+    # 2026-01-20: 共有コネクションプール経由（毎回のTLSハンドシェイクを回避）
+    response = post_pipeline(TURSO_DATABASE_URL, TURSO_AUTH_TOKEN, payload)
     if response.status_code != 200:
         raise RuntimeError(f"Turso HTTP {response.status_code}: {response.text}")
 
@@ -413,6 +432,18 @@ def load_data() -> pd.DataFrame:
 
     # CSVフォールバック: 最小カラム読み込み
     essential_cols_list = ["prefecture", "municipality", "row_type"]
+
+    # Parquetデータセットがあれば 3カラム × SUMMARYパーティションのみ読み込む（2026-01-20追加）
+    dataset_path = find_dataset([CSV_PATH.parent, CSV_PATH_ALT.parent], csv_names=(CSV_PATH_GZ.name, CSV_PATH.name))
+    if dataset_path is not None:
+        try:
+            _dataframe = read_dataset(dataset_path, columns=essential_cols_list, filters={"row_type": "SUMMARY"})
+            _data_source = f"Parquet ({dataset_path.name})"
+            log(f"[DATA] Loaded {len(_dataframe):,} rows from Parquet dataset")
+            return _dataframe
+        except Exception as exc:
+            log(f"[DATA] Parquet load failed: {type(exc).__name__}: {exc} - falling back to CSV")
+
     for path in [CSV_PATH_GZ, CSV_PATH, CSV_PATH_ALT]:
         if path.exists():
             log(f"[DATA] Loading from CSV: {path} (essential columns)")
@@ -434,9 +465,19 @@ def load_data() -> pd.DataFrame:
     return pd.DataFrame()
 
 
-# GAP data cache (都道府県別キャッシュ) - LRU方式でメモリ管理
-_gap_cache: OrderedDict[str, pd.DataFrame] = OrderedDict()
-_GAP_CACHE_MAX_SIZE = 50  # LRU上限（メモリ超過防止）
+# 職種はセッション単位（2026-01-20）: db_helperの各getterはログイン中ユーザーの選択値を使う
+def _session_job_type() -> str | None:
+    """現在のセッションで選択中の職種（UIコンテキスト外では例外 → db_helper側でデフォルト）"""
+    return app.storage.user.get("job_type")
+
+
+set_job_type_provider(_session_job_type)
+
+
+# GAP data cache (職種×都道府県別キャッシュ) - cache_managerのバイト予算で管理（2026-01-20: 件数上限50 → 共通予算）
+cache_manager.register("gap_data", weight=1.0)
+# 必要カラムのみ取得
+GAP_COLUMNS = "prefecture, municipality, row_type, demand_count, supply_count, gap, demand_supply_ratio"
 
 
 def load_gap_data(pref: str | None = None) -> pd.DataFrame:
@@ -446,50 +487,108 @@ def load_gap_data(pref: str | None = None) -> pd.DataFrame:
     - 全国データを一度に取得すると502タイムアウトが発生
     - 都道府県を指定することで軽量なクエリに分割
     """
-    global _gap_cache
-
     # キャッシュキーを生成
     job_type = get_current_job_type()
     cache_key = f"{job_type}_{pref or 'ALL'}"
 
-    if cache_key in _gap_cache and not _gap_cache[cache_key].empty:
-        _gap_cache.move_to_end(cache_key)  # LRU: 最近使用したものを末尾に移動
-        return _gap_cache[cache_key]
-
-    # 必要カラムのみ取得
-    GAP_COLUMNS = "prefecture, municipality, row_type, demand_count, supply_count, gap, demand_supply_ratio"
+    cached = _cached_gap_data(cache_key)
+    if cached is not None:
+        return cached
 
     if TURSO_DATABASE_URL and TURSO_AUTH_TOKEN:
-        try:
-            # 都道府県フィルタ付きクエリ（タイムアウト回避）
-            if pref and pref != "全国":
-                sql = f"SELECT {GAP_COLUMNS} FROM job_seeker_data WHERE row_type = 'GAP' AND job_type = '{job_type}' AND prefecture = '{pref}'"
-                log(f"[DATA] Loading GAP data from Turso for job_type={job_type}, pref={pref}...")
-            else:
-                # 全国の場合も実行するが、タイムアウトリスクあり
-                sql = f"SELECT {GAP_COLUMNS} FROM job_seeker_data WHERE row_type = 'GAP' AND job_type = '{job_type}'"
-                log(f"[DATA] Loading GAP data from Turso for job_type={job_type} (全国)...")
-
-            result_df = query_turso(sql)
-            log(f"[DATA] Loaded {len(result_df):,} GAP rows from Turso")
-
-            # Ensure numeric columns
-            for col in ["demand_count", "supply_count", "gap", "demand_supply_ratio"]:
-                if col in result_df.columns:
-                    result_df[col] = pd.to_numeric(result_df[col], errors="coerce")
-
-            # LRU方式でキャッシュに追加（メモリ超過防止）
-            _gap_cache[cache_key] = result_df
-            while len(_gap_cache) > _GAP_CACHE_MAX_SIZE:
-                removed_key, _ = _gap_cache.popitem(last=False)  # 最も古いものを削除
-                log(f"[CACHE] LRU evicted from _gap_cache: {removed_key}")
-            return result_df
-        except Exception as exc:
-            log(f"[DATA] GAP data load failed: {exc}")
-            return pd.DataFrame()
+        # 同時のキャッシュミスは1回のクエリに集約（2026-01-20）
+        return single_flight(cache_key, lambda: _fetch_gap_data(cache_key, job_type, pref), namespace="gap_data")
     return pd.DataFrame()
 
 
+def _cached_gap_data(cache_key: str) -> pd.DataFrame | None:
+    """GAPキャッシュから取得（LRU更新付き、空データはミス扱い）"""
+    cached = cache_manager.get("gap_data", cache_key)
+    if cached is not None and not cached.empty:
+        return cached
+    return None
+
+
+def _fetch_gap_data(cache_key: str, job_type: str, pref: str | None) -> pd.DataFrame:
+    """TursoからGAPデータを取得してキャッシュ（load_gap_dataのキャッシュミス時）"""
+    cached = _cached_gap_data(cache_key)
+    if cached is not None:  # 待ち合わせ中に他の呼び出しが取得済み
+        return cached
+
+    try:
+        # 都道府県フィルタ付きクエリ（タイムアウト回避）
+        if pref and pref != "全国":
+            sql = f"SELECT {GAP_COLUMNS} FROM job_seeker_data WHERE row_type = 'GAP' AND job_type = '{job_type}' AND prefecture = '{pref}'"
+            log(f"[DATA] Loading GAP data from Turso for job_type={job_type}, pref={pref}...")
+        else:
+            # 全国の場合も実行するが、タイムアウトリスクあり
+            sql = f"SELECT {GAP_COLUMNS} FROM job_seeker_data WHERE row_type = 'GAP' AND job_type = '{job_type}'"
+            log(f"[DATA] Loading GAP data from Turso for job_type={job_type} (全国)...")
+
+        result_df = query_turso(sql)
+        log(f"[DATA] Loaded {len(result_df):,} GAP rows from Turso")
+        return _store_gap_data(cache_key, result_df)
+    except Exception as exc:
+        log(f"[DATA] GAP data load failed: {exc}")
+        return pd.DataFrame()
+
+
+def _store_gap_data(cache_key: str, result_df: pd.DataFrame) -> pd.DataFrame:
+    """GAPデータを数値化してキャッシュに追加"""
+    # Ensure numeric columns
+    for col in ["demand_count", "supply_count", "gap", "demand_supply_ratio"]:
+        if col in result_df.columns:
+            result_df[col] = pd.to_numeric(result_df[col], errors="coerce")
+
+    # 共通予算のキャッシュに追加（超過時は重み付きLRUで追い出し）
+    cache_manager.set("gap_data", cache_key, result_df)
+    return result_df
+
+
+async def load_gap_data_async(pref: str | None = None) -> pd.DataFrame:
+    """load_gap_data の非同期版（2026-01-20追加）
+
+    共有AsyncClient（db_helper._turso_async_query）で問い合わせるため、
+    読み込み中もイベントループ（他ユーザーの描画）をブロックしない。キャッシュは同期版と共有。
+    """
+    job_type = get_current_job_type()
+    cache_key = f"{job_type}_{pref or 'ALL'}"
+
+    cached = _cached_gap_data(cache_key)
+    if cached is not None:
+        return cached
+
+    if not (TURSO_DATABASE_URL and TURSO_AUTH_TOKEN and query_turso_df):
+        return pd.DataFrame()
+
+    # 同時のキャッシュミスは1回のクエリに集約（2026-01-20）
+    return await single_flight_async(
+        cache_key, lambda: _fetch_gap_data_async(cache_key, job_type, pref), namespace="gap_data"
+    )
+
+
+async def _fetch_gap_data_async(cache_key: str, job_type: str, pref: str | None) -> pd.DataFrame:
+    """_fetch_gap_data の非同期版（共有AsyncClient使用）"""
+    cached = _cached_gap_data(cache_key)
+    if cached is not None:  # 待ち合わせ中に他の呼び出しが取得済み
+        return cached
+
+    sql = f"SELECT {GAP_COLUMNS} FROM job_seeker_data WHERE row_type = 'GAP' AND job_type = ?"
+    params = [job_type]
+    if pref and pref != "全国":
+        sql += " AND prefecture = ?"
+        params.append(pref)
+
+    try:
+        log(f"[DATA] Loading GAP data from Turso (async) for job_type={job_type}, pref={pref or '全国'}...")
+        result_df = await query_turso_df(sql, tuple(params))
+        log(f"[DATA] Loaded {len(result_df):,} GAP rows from Turso")
+        return _store_gap_data(cache_key, result_df)
+    except Exception as exc:
+        log(f"[DATA] GAP data load failed: {exc}")
+        return pd.DataFrame()
+
+
 def get_gap_stats(pref: str | None = None, muni: str | None = None) -> dict:
     """Get supply/demand gap statistics for the balance tab (Reflex完全再現)."""
     # 2026-01-03: 都道府県パラメータを渡してタイムアウト回避
@@ -750,6 +849,21 @@ async def health_check():
     return Response(content="OK", media_type="text/plain")
 
 
+@app.get("/health/turso")
+async def turso_client_stats():
+    """Turso接続プールのメトリクス（レイテンシ・送受信バイト・新規接続数）"""
+    return get_turso_client_stats()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus形式のメトリクス（getter・Turso・コロプレス描画のスパン、キャッシュのヒット率）"""
+    return Response(content=instrumentation.render_prometheus(), media_type=instrumentation.PROMETHEUS_CONTENT_TYPE)
+
+
+app.on_shutdown(close_turso_clients)
+
+
 # ---------------------------------------------------------------------
 # Login page
 # ---------------------------------------------------------------------
@@ -796,14 +910,14 @@ def login_page() -> None:
 # Dashboard
 # ---------------------------------------------------------------------
 @ui.page("/")
-def dashboard_page() -> None:
+async def dashboard_page() -> None:
     if not is_authenticated():
         ui.navigate.to("/login")
         return
 
     ui.query("body").style(f"background-color: {BG_COLOR}")
 
-    df = _clean_dataframe(load_data())
+    df = _clean_dataframe(await run_in_thread(load_data))  # 初回ロード中も他ユーザーをブロックしない
 
     # Build prefecture options with JIS north→south ordering
     prefecture_options: List[str] = ["全国"]
@@ -1026,17 +1140,15 @@ def dashboard_page() -> None:
                 ui.label("職種").classes("text-lg font-bold").style("color: #E69F00;")
 
             async def on_job_type_change(e):
-                """職種変更時のハンドラ - db_helperの職種を切り替えてデータ再読み込み"""
-                global _gap_cache  # 2026-01-03: 辞書型キャッシュに変更
+                """職種変更時のハンドラ - セッションの職種を切り替えてデータ再読み込み
+
+                2026-01-20: db_helperはセッションの職種（_session_job_type）で解決し、
+                キャッシュも職種別に保持するため、他ユーザーのキャッシュはクリアしない。
+                """
                 new_job_type = _get_event_value(e, job_type_select)
                 if new_job_type is not None and new_job_type != state.get("job_type"):
                     state["job_type"] = new_job_type
                     log(f"[UI] job_type change -> {new_job_type}")
-                    # 2026-01-03: GAPキャッシュをクリア（都道府県別キャッシュ対応）
-                    _gap_cache.clear()
-                    log(f"[UI] Cleared _gap_cache for job_type change")
-                    # db_helperの職種を切り替え（キャッシュクリア含む）
-                    set_current_job_type(new_job_type)
                     ui.notify(f"職種を「{new_job_type}」に切り替えました", type="positive")
                     # データ再読み込み
                     show_content.refresh()
@@ -1049,12 +1161,6 @@ def dashboard_page() -> None:
                     state["job_type"] = valid_job_type  # 無効な値を修正
                     log(f"[UI] Invalid job_type '{stored_job_type}' -> reset to '{valid_job_type}'")
 
-                # ページロード時にdb_helperの職種をセッションと同期（重要！）
-                current_db_job_type = get_current_job_type()
-                if current_db_job_type != valid_job_type:
-                    set_current_job_type(valid_job_type)
-                    log(f"[UI] Sync db_helper job_type: '{current_db_job_type}' -> '{valid_job_type}'")
-
                 job_type_select = ui.select(
                     options=JOB_TYPE_OPTIONS,
                     value=valid_job_type,
@@ -1104,8 +1210,10 @@ def dashboard_page() -> None:
                     create_municipality_dropdown()
 
     # Content
+    # 2026-01-20: async化。db_helper呼び出しはdb_async経由でスレッドプール実行し、
+    # クエリ中も他クライアントのWebSocket（描画・操作）をブロックしない
     @ui.refreshable
-    def show_content() -> None:
+    async def show_content() -> None:
         filtered_df = get_filtered_data()
         tab = state.get("tab", "overview")  # デフォルトをoverviewに変更（軽量・echart無し）
         print(f"[DEBUG] show_content called, tab = {tab}")
@@ -1124,9 +1232,9 @@ def dashboard_page() -> None:
                 muni_val = state["municipality"] if state["municipality"] != "すべて" else None
 
                 # db_helperから統計取得
-                nat_stats = get_national_stats()
-                pref_stats = get_prefecture_stats(pref_val) if pref_val else {}
-                muni_stats = get_municipality_stats(pref_val, muni_val) if pref_val and muni_val else {}
+                nat_stats = await run_in_thread(get_national_stats)
+                pref_stats = await run_in_thread(get_prefecture_stats, pref_val) if pref_val else {}
+                muni_stats = await run_in_thread(get_municipality_stats, pref_val, muni_val) if pref_val and muni_val else {}
 
                 # 選択レベルに応じたKPIデータ取得（市区町村 > 都道府県 > 全国）
                 if muni_val and muni_stats:
@@ -1457,10 +1565,10 @@ def dashboard_page() -> None:
                 muni_val = state["municipality"] if state["municipality"] != "すべて" else None
 
                 # ペルソナシェアデータを取得
-                persona_data = get_persona_market_share(pref_val, muni_val)
+                persona_data = await run_in_thread(get_persona_market_share, pref_val, muni_val)
 
                 # 資格データを取得
-                qualification_data = get_qualification_retention_rates(pref_val, muni_val)
+                qualification_data = await run_in_thread(get_qualification_retention_rates, pref_val, muni_val)
 
                 # ----- 1行目: 全ペルソナ内訳 + ペルソナ構成比横棒グラフ -----
                 with ui.row().classes("w-full gap-4"):
@@ -1539,11 +1647,11 @@ def dashboard_page() -> None:
                     # 左側: 男女比ドーナツチャート
                     # get_municipality_statsまたはget_prefecture_statsからデータ取得
                     if pref_val and muni_val:
-                        demo_stats = get_municipality_stats(pref_val, muni_val)
+                        demo_stats = await run_in_thread(get_municipality_stats, pref_val, muni_val)
                     elif pref_val:
-                        demo_stats = get_prefecture_stats(pref_val)
+                        demo_stats = await run_in_thread(get_prefecture_stats, pref_val)
                     else:
-                        demo_stats = get_national_stats()
+                        demo_stats = await run_in_thread(get_national_stats)
 
                     male_total = demo_stats.get("male_count", 0)
                     female_total = demo_stats.get("female_count", 0)
@@ -1657,7 +1765,7 @@ def dashboard_page() -> None:
                 with ui.card().classes("w-full").style(
                     f"background-color: {CARD_BG}; border: 1px solid {BORDER_COLOR}; padding: 16px"
                 ):
-                    employment_data = get_persona_employment_breakdown(pref_val, muni_val)
+                    employment_data = await run_in_thread(get_persona_employment_breakdown, pref_val, muni_val)
                     if employment_data:
                         labels = [item["age_gender"] for item in employment_data]
                         employed = [item["就業中"] for item in employment_data]
@@ -1686,7 +1794,7 @@ def dashboard_page() -> None:
                 with ui.card().classes("w-full").style(
                     f"background-color: {CARD_BG}; border: 1px solid {BORDER_COLOR}; padding: 16px"
                 ):
-                    qual_gender_data = get_qualification_by_gender(pref_val, muni_val)
+                    qual_gender_data = await run_in_thread(get_qualification_by_gender, pref_val, muni_val)
                     if qual_gender_data:
                         labels = [item["qualification"] for item in qual_gender_data]
                         male_counts = [item["male"] for item in qual_gender_data]
@@ -1753,7 +1861,7 @@ def dashboard_page() -> None:
                 ):
                     ui.label("年齢×性別ごとの平均値").classes("text-xs mb-3").style(f"color: {MUTED_COLOR}")
 
-                    age_gender_stats = get_age_gender_stats(pref_val, muni_val)
+                    age_gender_stats = await run_in_thread(get_age_gender_stats, pref_val, muni_val)
                     if age_gender_stats:
                         for item in age_gender_stats:
                             with ui.row().classes("w-full justify-between items-center py-2 border-b").style(f"border-color: {BORDER_COLOR}"):
@@ -1798,7 +1906,7 @@ def dashboard_page() -> None:
                                 )).classes("text-sm").style(f"color: {TEXT_COLOR}")
 
                     # 資格チェックボックス - フル幅で完全表示
-                    qual_options = get_qualification_options(pref_val, muni_val)
+                    qual_options = await run_in_thread(get_qualification_options, pref_val, muni_val)
                     with ui.element("div").classes("w-full p-4 rounded mb-3").style("background-color: rgba(168, 85, 247, 0.05)"):
                         ui.label(f"資格（複数選択可）- 全{len(qual_options)}種類・取得者数順").classes("text-sm font-semibold mb-3").style(f"color: {MUTED_COLOR}")
                         # フル幅で縦スクロール可能なリスト
@@ -1823,9 +1931,10 @@ def dashboard_page() -> None:
                     # 検索結果表示エリア
                     result_container = ui.column().classes("w-full")
 
-                    def do_rarity_search():
+                    async def do_rarity_search():
                         result_container.clear()
-                        results = get_rarity_analysis(
+                        results = await run_in_thread(
+                            get_rarity_analysis,
                             pref_val, muni_val,
                             ages=rarity_state["ages"] or None,
                             genders=rarity_state["genders"] or None,
@@ -1873,7 +1982,7 @@ def dashboard_page() -> None:
                 ):
                     ui.label("性別ごとの転職緊急度を分析（棒グラフ: 人数、折れ線: 平均スコア）").classes("text-xs mb-3").style(f"color: {MUTED_COLOR}")
 
-                    urgency_gender_data = get_urgency_gender_data(pref_val, muni_val)
+                    urgency_gender_data = await run_in_thread(get_urgency_gender_data, pref_val, muni_val)
                     if urgency_gender_data:
                         labels = [item["gender"] for item in urgency_gender_data]
                         counts = [item["count"] for item in urgency_gender_data]
@@ -1941,7 +2050,7 @@ def dashboard_page() -> None:
                 ):
                     ui.label("転職希望時期ごとの緊急度を分析（棒グラフ: 人数、折れ線: 平均スコア）").classes("text-xs mb-3").style(f"color: {MUTED_COLOR}")
 
-                    urgency_start_data = get_urgency_start_category_data(pref_val, muni_val)
+                    urgency_start_data = await run_in_thread(get_urgency_start_category_data, pref_val, muni_val)
                     if urgency_start_data:
                         labels_start = [item["category"] for item in urgency_start_data]
                         counts_start = [item["count"] for item in urgency_start_data]
@@ -2008,18 +2117,21 @@ def dashboard_page() -> None:
                 pref_val = state["prefecture"] if state["prefecture"] != "全国" else None
                 muni_val = state["municipality"] if state["municipality"] != "すべて" else None
 
-                flow_data = get_talent_flow(pref_val, muni_val)
-                dist_data = get_distance_stats(pref_val, muni_val)
-                flow_sources = get_flow_sources(pref_val, muni_val, limit=10)
-                flow_destinations = get_flow_destinations(pref_val, muni_val, limit=10)
-                competition_data = get_competition_overview(pref_val, muni_val)
-                mobility_dist = get_mobility_type_distribution(pref_val, muni_val)
-                retention_data = get_qualification_retention_rates(pref_val, muni_val)
-                # 都道府県/市区町村フローTop10
-                print(f"[DEBUG] Calling get_pref_flow_top10({pref_val})")
-                pref_flow_list = get_pref_flow_top10(pref_val)
+                # 2026-01-20: 独立したクエリをスレッドプールで並行取得
+                (flow_data, dist_data, flow_sources, flow_destinations, competition_data,
+                 mobility_dist, retention_data, pref_flow_list, muni_flow_list) = await gather_in_threads(
+                    (get_talent_flow, pref_val, muni_val),
+                    (get_distance_stats, pref_val, muni_val),
+                    (get_flow_sources, pref_val, muni_val, 10),
+                    (get_flow_destinations, pref_val, muni_val, 10),
+                    (get_competition_overview, pref_val, muni_val),
+                    (get_mobility_type_distribution, pref_val, muni_val),
+                    (get_qualification_retention_rates, pref_val, muni_val),
+                    # 都道府県/市区町村フローTop10
+                    (get_pref_flow_top10, pref_val),
+                    (get_muni_flow_top10, pref_val, muni_val),
+                )
                 print(f"[DEBUG] pref_flow_list = {pref_flow_list[:2] if pref_flow_list else 'empty'}")
-                muni_flow_list = get_muni_flow_top10(pref_val, muni_val)
                 print(f"[DEBUG] muni_flow_list = {muni_flow_list[:2] if muni_flow_list else 'empty'}")
 
                 inflow = flow_data.get("inflow", 0)
@@ -2128,7 +2240,7 @@ def dashboard_page() -> None:
                         with ui.column().classes("flex-1 p-4 rounded-lg").style(f"border: 1px solid {BORDER_COLOR}; background-color: rgba(255, 255, 255, 0.03)"):
                             ui.label("市区町村間の移動フロー Top10").classes("text-sm font-semibold mb-2").style(f"color: {TEXT_COLOR}")
                             # 市区町村フローデータを取得して表示
-                            muni_flow_list = get_muni_flow_top10(pref_val, muni_val)
+                            muni_flow_list = await run_in_thread(get_muni_flow_top10, pref_val, muni_val)
                             if muni_flow_list:
                                 for item in muni_flow_list:
                                     with ui.row().classes("w-full items-center"):
@@ -2284,8 +2396,12 @@ def dashboard_page() -> None:
 
                 pref_val = state["prefecture"] if state["prefecture"] != "全国" else None
                 muni_val = state["municipality"] if state["municipality"] != "すべて" else None
-                gap_stats = get_gap_stats(pref_val, muni_val)
-                gap_rankings = get_gap_rankings(pref_val, limit=10)
+                # GAPデータを非同期で取得（以降はキャッシュから集計）
+                await load_gap_data_async(pref_val)
+                gap_stats, gap_rankings = await gather_in_threads(
+                    (get_gap_stats, pref_val, muni_val),
+                    (get_gap_rankings, pref_val, 10),
+                )
 
                 # 選択地域表示
                 with ui.row().classes("items-center gap-1 mb-4"):
@@ -2318,7 +2434,7 @@ def dashboard_page() -> None:
                 # 求人データカード（シェア％・競争倍率）
                 # ==========================================
                 try:
-                    sd_metrics = get_supply_demand_metrics(pref_val, muni_val, gap_stats=gap_stats)
+                    sd_metrics = await run_in_thread(get_supply_demand_metrics, pref_val, muni_val, gap_stats=gap_stats)
                     if sd_metrics["has_data"]:
                         with ui.card().style(
                             f"background-color: {CARD_BG}; border: 1px solid {BORDER_COLOR}; "
@@ -2388,7 +2504,7 @@ def dashboard_page() -> None:
 
                         # 流入元を取得（db_helperの既存関数）
                         from db_helper import get_inflow_sources, filter_realistic_flows
-                        inflow_sources_raw = get_inflow_sources(pref_val, muni_val)
+                        inflow_sources_raw = await run_in_thread(get_inflow_sources, pref_val, muni_val)
                         # 現実的な転職パターンのみにフィルタ（遠方ノイズ除去）
                         inflow_sources = filter_realistic_flows(inflow_sources_raw, pref_val)
 
@@ -2407,7 +2523,7 @@ def dashboard_page() -> None:
 
                                 # 都道府県のGAPデータを取得（キャッシュ活用）
                                 if source_pref not in pref_gap_cache:
-                                    pref_gap_cache[source_pref] = load_gap_data(source_pref)
+                                    pref_gap_cache[source_pref] = await load_gap_data_async(source_pref)
 
                                 gap_df = pref_gap_cache[source_pref]
                                 source_gap = 0
@@ -2658,7 +2774,7 @@ def dashboard_page() -> None:
                 muni = state["municipality"] if state["municipality"] != "すべて" else None
 
                 # 雇用形態基本分布
-                dist_df = get_workstyle_distribution(pref, muni)
+                dist_df = await run_in_thread(get_workstyle_distribution, pref, muni)
 
                 with ui.row().classes("w-full gap-4 mb-6"):
                     # 基本分布の円グラフ
@@ -2708,7 +2824,7 @@ def dashboard_page() -> None:
                                     ui.label(f"{cnt:,}人 ({pct}%)").style(f"color: {MUTED_COLOR}; font-size: 0.9rem")
 
                 # 雇用形態×年代クロス分析
-                age_cross_df = get_workstyle_age_cross(pref, muni)
+                age_cross_df = await run_in_thread(get_workstyle_age_cross, pref, muni)
 
                 with ui.card().classes("w-full p-4 mb-4").style(
                     f"background-color: {CARD_BG}; border: 1px solid {BORDER_COLOR}; border-radius: 12px"
@@ -2752,7 +2868,7 @@ def dashboard_page() -> None:
                         ui.label("データなし").style(f"color: {MUTED_COLOR}")
 
                 # 雇用形態×性別
-                gender_cross_df = get_workstyle_gender_cross(pref, muni)
+                gender_cross_df = await run_in_thread(get_workstyle_gender_cross, pref, muni)
 
                 with ui.row().classes("w-full gap-4 mb-4"):
                     with ui.card().classes("p-4").style(
@@ -2788,7 +2904,7 @@ def dashboard_page() -> None:
                             ui.label("データなし").style(f"color: {MUTED_COLOR}")
 
                     # 雇用形態×就業状態
-                    emp_cross_df = get_workstyle_employment_cross(pref, muni)
+                    emp_cross_df = await run_in_thread(get_workstyle_employment_cross, pref, muni)
 
                     with ui.card().classes("p-4").style(
                         f"background-color: {CARD_BG}; border: 1px solid {BORDER_COLOR}; "
@@ -2830,7 +2946,7 @@ def dashboard_page() -> None:
                             ui.label("データなし").style(f"color: {MUTED_COLOR}")
 
                 # === 雇用形態×移動パターン分析（WORKSTYLE_MOBILITY） ===
-                mobility_data = get_workstyle_mobility_summary(pref, muni)
+                mobility_data = await run_in_thread(get_workstyle_mobility_summary, pref, muni)
 
                 with ui.card().classes("w-full p-4 mt-4").style(
                     f"background-color: {CARD_BG}; border: 1px solid {BORDER_COLOR}; border-radius: 12px"
@@ -3092,7 +3208,7 @@ def dashboard_page() -> None:
                             map_widget.classes("w-full h-full")
 
                     # マーカーデータ取得
-                    markers_data = get_map_markers(pref)
+                    markers_data = await run_in_thread(get_map_markers, pref)
 
                     # === GeoJSONポリゴン表示（choropleth）===
                     polygon_stats = {"total": 0, "with_data": 0, "max_count": 0}  # 凡例用統計
@@ -3105,7 +3221,7 @@ def dashboard_page() -> None:
                         ws_val = state.get("talentmap_workstyle")
                         age_val = state.get("talentmap_age")
                         gender_val = state.get("talentmap_gender")
-                        inflow_data_raw = get_inflow_sources(pref, muni_for_inflow, ws_val, age_val, gender_val)
+                        inflow_data_raw = await run_in_thread(get_inflow_sources, pref, muni_for_inflow, ws_val, age_val, gender_val)
                         # 現実的な転職パターンのみにフィルタ（遠方ノイズ除去）
                         inflow_data_cache = filter_realistic_flows(inflow_data_raw, pref)
 
@@ -3116,12 +3232,13 @@ def dashboard_page() -> None:
                             source_prefs = list(dict.fromkeys([d['source_pref'] for d in inflow_data_cache[:30] if d.get('source_pref')]))
                             # 選択した都道府県 + 流入元都道府県をマージ
                             all_prefs = [pref] + [p for p in source_prefs if p != pref]
-                            geojson_data = load_multiple_geojson(all_prefs)
+                            geojson_data = await run_in_thread(load_multiple_geojson, all_prefs)
                             print(f"[CHOROPLETH] 流入元モード: {len(all_prefs)} prefectures loaded")
                         else:
-                            geojson_data = load_geojson(pref)
+                            geojson_data = await run_in_thread(load_geojson, pref)
                         if geojson_data:
                             geojson_data_for_click = geojson_data  # クリックハンドラ用に保持
+                            render_span = instrumentation.start_span("choropleth.render", prefecture=pref, mode=mode_val)
 
                             # マーカーデータから市区町村別データを作成
                             # （generate_name_variants関数はモジュールレベルで定義済み）
@@ -3176,30 +3293,29 @@ def dashboard_page() -> None:
                             polygon_stats["total"] = len(geojson_data.get("features", []))
                             polygon_stats["with_data"] = len(municipality_data)
 
+                            # 色を全feature分まとめて計算（スケールはモードごとに1回、2026-01-20）
+                            features = geojson_data.get("features", [])
+                            feature_names = [f.get("properties", {}).get("N03_004", "") for f in features]
+                            if style_mode == "count":
+                                values = [municipality_data.get(n, {}).get("count", 0) for n in feature_names]
+                                max_val = max_count
+                            elif style_mode == "inflow":
+                                values = [municipality_data.get(n, {}).get("inflow", 0) for n in feature_names]
+                                max_val = max_inflow
+                            elif style_mode == "balance":
+                                values = [municipality_data.get(n, {}).get("inflow", 0)
+                                          - municipality_data.get(n, {}).get("outflow", 0) + 50 for n in feature_names]
+                                max_val = 100
+                            else:  # competition
+                                values = [municipality_data.get(n, {}).get("competition", 0) for n in feature_names]
+                                max_val = max_competition
+                            fill_colors = colors_for_values(values, max_val, style_mode)
+
                             # GeoJSONの各featureをポリゴンとして追加
                             polygon_count = 0
-                            for feature in geojson_data.get("features", []):
-                                props = feature.get("properties", {})
-                                muni_name = props.get("N03_004", "")
+                            for feature, muni_name, value_color in zip(features, feature_names, fill_colors):
                                 geometry = feature.get("geometry", {})
 
-                                # 色とスタイルを計算
-                                data = municipality_data.get(muni_name, {})
-                                if style_mode == "count":
-                                    value = data.get("count", 0)
-                                    max_val = max_count
-                                elif style_mode == "inflow":
-                                    value = data.get("inflow", 0)
-                                    max_val = max_inflow
-                                elif style_mode == "balance":
-                                    inflow = data.get("inflow", 0)
-                                    outflow = data.get("outflow", 0)
-                                    value = inflow - outflow + 50
-                                    max_val = 100
-                                else:  # competition
-                                    value = data.get("competition", 0)
-                                    max_val = max_competition
-
                                 # 選択中の市区町村を強調（変換候補もチェック）
                                 if selected_muni_variants and muni_name in selected_muni_variants:
                                     fill_color = "#00d4ff"  # シアン
@@ -3207,7 +3323,7 @@ def dashboard_page() -> None:
                                     fill_opacity = 0.8
                                     border_weight = 3
                                 else:
-                                    fill_color = get_color_by_value(value, max_val, style_mode)
+                                    fill_color = value_color
                                     border_color = "#ffffff"
                                     fill_opacity = 0.6
                                     border_weight = 1
@@ -3254,6 +3370,7 @@ def dashboard_page() -> None:
                             name_rate = (name_matched / total_features * 100) if total_features > 0 else 0
                             data_rate = (with_data / total_features * 100) if total_features > 0 else 0
                             print(f"[CHOROPLETH] Rendered {polygon_count} polygons for {pref} (name_match={name_matched}/{total_features}={name_rate:.1f}%, with_data={with_data}/{total_features}={data_rate:.1f}%, max={max_count})")
+                            render_span.set(polygons=polygon_count, features=total_features).end()
 
                             # 都道府県の中心にズーム
                             pref_center = get_pref_center(pref)
@@ -3261,12 +3378,12 @@ def dashboard_page() -> None:
                             map_widget.set_zoom(9)
 
                     # マップクリックハンドラ（ポリゴンクリックで市区町村選択）
-                    def on_map_click(e):
+                    async def on_map_click(e):
                         if geojson_data_for_click:
                             lat = e.args.get("latlng", {}).get("lat")
                             lng = e.args.get("latlng", {}).get("lng")
                             if lat and lng:
-                                clicked_muni = find_municipality_at_point(lat, lng, geojson_data_for_click)
+                                clicked_muni = await run_in_thread(find_municipality_at_point, lat, lng, geojson_data_for_click)
                                 if clicked_muni and clicked_muni != state.get("municipality"):
                                     # データベースに存在する市区町村か確認
                                     current_pref = state.get("prefecture", "全国")
@@ -3312,7 +3429,7 @@ def dashboard_page() -> None:
                                 )
 
                         if state["talentmap_show_flows"]:
-                            flows_data = get_flow_lines(pref)
+                            flows_data = await run_in_thread(get_flow_lines, pref)
                             for flow in flows_data[:50]:
                                 weight = min(max(flow['count'] / 100, 1), 8)
                                 # Leaflet polyline形式: [[lat1, lng1], [lat2, lng2]]
@@ -3337,7 +3454,7 @@ def dashboard_page() -> None:
                             if inflow_data_cache:
                                 inflow_data = inflow_data_cache
                             else:
-                                inflow_data_raw = get_inflow_sources(pref, muni, ws_val, age_val, gender_val)
+                                inflow_data_raw = await run_in_thread(get_inflow_sources, pref, muni, ws_val, age_val, gender_val)
                                 inflow_data = filter_realistic_flows(inflow_data_raw, pref)
 
                             # ターゲット（選択市区町村）の座標を取得
@@ -3477,7 +3594,7 @@ def dashboard_page() -> None:
 
                     elif mode_val == "流出/流入バランス":
                         # 流出/流入バランス: サークルマーカーで色分け
-                        balance_data = get_flow_balance(pref, ws_val, age_val, gender_val)
+                        balance_data = await run_in_thread(get_flow_balance, pref, ws_val, age_val, gender_val)
 
                         if balance_data:
                             for d in balance_data[:150]:
@@ -3520,7 +3637,7 @@ def dashboard_page() -> None:
                         # 競合地域可視化: 選択地域の求職者が他に希望する地域
                         if pref:
                             muni = state.get("municipality") if state.get("municipality") != "全て" else None
-                            competing_data = get_competing_areas(pref, muni, ws_val, age_val, gender_val)
+                            competing_data = await run_in_thread(get_competing_areas, pref, muni, ws_val, age_val, gender_val)
 
                             if competing_data:
                                 for d in competing_data[:100]:
@@ -3600,7 +3717,7 @@ def dashboard_page() -> None:
                                 if mode_val in ["流入元", "流出/流入バランス"]:
                                     # inflow_dataから実際の流入数を計算（現実的なフローのみ）
                                     try:
-                                        inflow_sources_raw = get_inflow_sources(pref, selected_muni, ws_val, age_val, gender_val)
+                                        inflow_sources_raw = await run_in_thread(get_inflow_sources, pref, selected_muni, ws_val, age_val, gender_val)
                                         inflow_sources = filter_realistic_flows(inflow_sources_raw, pref)
                                         inflow = sum(d.get('count', 0) for d in inflow_sources) if inflow_sources else 0
                                     except Exception:
@@ -3619,7 +3736,7 @@ def dashboard_page() -> None:
                                 # 詳細データを取得（db_helperから）
                                 try:
                                     from db_helper import get_municipality_detail
-                                    detail = get_municipality_detail(pref, selected_muni)
+                                    detail = await run_in_thread(get_municipality_detail, pref, selected_muni)
                                     if detail:
                                         # 年齢構成（人口ピラミッド形式）
                                         if detail.get('age_gender_pyramid'):
@@ -3765,7 +3882,7 @@ def dashboard_page() -> None:
             tab_buttons.append((btn, tab_id))
 
     with ui.card().classes("w-full").style(f"background-color: {CARD_BG}; border: 1px solid {BORDER_COLOR}"):
-        show_content()
+        await show_content()
 
 
 # ---------------------------------------------------------------------
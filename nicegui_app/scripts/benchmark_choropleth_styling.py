@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""コロプレスのスタイル付け（choropleth_helper.prepare_styled_geojson）の従来実装との比較ベンチマーク
+
+従来実装: featureごとに municipality_data 全体の max() を再計算 + feature.copy()（properties を共有して変更）
+現在の実装: スケールをモードごとに1回計算 + 色を一括判定 + geometry を共有
+
+使い方:
+    # 北海道・東京都のGeoJSONで計測
+    python scripts/benchmark_choropleth_styling.py
+
+    # 都道府県・繰り返し回数を指定
+    python scripts/benchmark_choropleth_styling.py --prefectures 北海道 大阪府 --repeat 50
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import choropleth_helper as ch  # noqa: E402
+
+MODES = ["count", "inflow", "balance", "competition"]
+
+
+def legacy_style_feature(feature, municipality_data, mode, selected_muni, inflow_sources, competing_areas):
+    """従来の style_geojson_feature（featureごとにスケールを再計算、リストの線形探索）"""
+    muni_name = feature.get("properties", {}).get("N03_004", "")
+    style = {"color": "#ffffff", "weight": 1, "fillColor": ch.SPECIAL_COLORS["default"], "fillOpacity": 0.6}
+    if not muni_name:
+        return style
+    if selected_muni and muni_name == selected_muni:
+        style.update(fillColor=ch.SPECIAL_COLORS["selected"], weight=3, fillOpacity=0.8)
+        return style
+    if inflow_sources and muni_name in inflow_sources:
+        style.update(fillColor=ch.SPECIAL_COLORS["inflow_highlight"], weight=2, fillOpacity=0.7)
+        return style
+    if competing_areas and muni_name in competing_areas:
+        style.update(fillColor=ch.SPECIAL_COLORS["competition_highlight"], weight=2, fillOpacity=0.7)
+        return style
+    data = municipality_data.get(muni_name, {})
+    value = (data.get("inflow", 0) - data.get("outflow", 0) + 50 if mode == "balance"
+             else data.get(mode if mode in ("inflow", "competition") else "count", 0))
+    max_val = max(
+        (d.get("count", 0) if mode == "count" else
+         d.get("inflow", 0) if mode == "inflow" else
+         d.get("competition", 0) if mode == "competition" else
+         abs(d.get("inflow", 0) - d.get("outflow", 0)) + 50)
+        for d in municipality_data.values()
+    ) if municipality_data else 1
+    style["fillColor"] = ch.get_color_by_value(value, max_val, mode)
+    return style
+
+
+def legacy_prepare(geojson, municipality_data, mode, selected_muni, inflow_sources, competing_areas):
+    styled_features = []
+    for feature in geojson.get("features", []):
+        styled_feature = feature.copy()
+        styled_feature["properties"] = dict(styled_feature.get("properties", {}))  # 計測対象外の副作用を回避
+        styled_feature["properties"]["_style"] = legacy_style_feature(
+            feature, municipality_data, mode, selected_muni, inflow_sources, competing_areas)
+        styled_features.append(styled_feature)
+    return {"type": "FeatureCollection", "features": styled_features}
+
+
+def build_inputs(geojson):
+    """GeoJSONの市区町村名から擬似データを作成（マーカーと同様に名前の変換候補も登録）"""
+    names = sorted({f.get("properties", {}).get("N03_004", "") for f in geojson["features"]} - {""})
+    municipality_data = {}
+    for i, name in enumerate(names):
+        entry = {"count": (i * 37) % 500, "inflow": (i * 13) % 80, "outflow": (i * 7) % 60, "competition": i % 40}
+        for variant in (name, name.rstrip("市町村区"), f"{name}_"):
+            municipality_data[variant] = entry
+    inflow_sources = names[::7]
+    competing_areas = names[3::9]
+    return municipality_data, inflow_sources, competing_areas
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="コロプレススタイル付けのベンチマーク")
+    parser.add_argument("--prefectures", nargs="+", default=["北海道", "東京都"], help="都道府県名")
+    parser.add_argument("--repeat", type=int, default=20, help="繰り返し回数")
+    args = parser.parse_args()
+
+    for pref in args.prefectures:
+        geojson = ch.load_geojson(pref)
+        if not geojson:
+            print(f"[BENCH] GeoJSON not found: {pref}")
+            continue
+        municipality_data, inflow_sources, competing_areas = build_inputs(geojson)
+        selected = inflow_sources[1] if len(inflow_sources) > 1 else None
+        print(f"[BENCH] {pref}: {len(geojson['features']):,} features, {len(municipality_data):,} municipality keys")
+
+        for mode in MODES:
+            call_args = (municipality_data, mode, selected, inflow_sources, competing_areas)
+            new = ch.prepare_styled_geojson(pref, *call_args)
+            old = legacy_prepare(geojson, *call_args)
+            assert [f["properties"]["_style"] for f in new["features"]] == \
+                   [f["properties"]["_style"] for f in old["features"]], mode
+
+            legacy_ms = timed(lambda: legacy_prepare(geojson, *call_args), args.repeat)
+            new_ms = timed(lambda: ch.prepare_styled_geojson(pref, *call_args), args.repeat)
+            print(f"[BENCH]   {mode:<12} legacy {legacy_ms:9.2f} ms | batched {new_ms:7.2f} ms "
+                  f"({legacy_ms / new_ms:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
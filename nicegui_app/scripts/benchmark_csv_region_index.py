@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""CSVモードの地域インデックス（db_helper._csv_slice）と従来のマスク走査を比較するベンチマーク
+
+使い方:
+    # デフォルトCSV（reflex_app/MapComplete_Complete_All_FIXED.csv）で計測
+    python scripts/benchmark_csv_region_index.py
+
+    # CSVパス・職種数（job_type列がないCSVは職種を複製して擬似的に増やす）・繰り返し回数を指定
+    python scripts/benchmark_csv_region_index.py --csv path/to/file.csv --job-types 13 --repeat 200
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("USE_CSV_MODE", "true")
+
+import db_helper  # noqa: E402
+
+DEFAULT_CSV_PATH = Path(__file__).parent.parent.parent / "reflex_app" / db_helper.CSV_FILENAME
+JOB_TYPES = ["介護職", "看護師", "保育士", "栄養士", "生活相談員", "理学療法士", "作業療法士",
+             "ケアマネジャー", "サービス管理責任者", "サービス提供責任者", "学童支援",
+             "調理師、調理スタッフ", "児童発達支援管理責任者"]
+
+
+def load_frame(csv_path: Path, job_types: int) -> pd.DataFrame:
+    df = pd.read_csv(csv_path, encoding="utf-8-sig", low_memory=False)
+    if "job_type" not in df.columns:
+        # 職種別データを擬似的に作成（実データの行数規模に近づける）
+        df = pd.concat([df.assign(job_type=jt) for jt in JOB_TYPES[:job_types]], ignore_index=True)
+    return db_helper._optimize_dtypes(df)
+
+
+def mask_scan(df: pd.DataFrame, job_type, row_type, prefecture, municipality) -> pd.DataFrame:
+    """従来の実装: 全行booleanマスク + .copy()"""
+    filtered = df[df["job_type"] == job_type]
+    if row_type:
+        filtered = filtered[filtered["row_type"] == row_type]
+    if prefecture:
+        filtered = filtered[filtered["prefecture"] == prefecture]
+    if municipality:
+        filtered = filtered[filtered["municipality"] == municipality]
+    return filtered.copy()
+
+
+def timed(func, queries, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(*query)
+    return (time.perf_counter() - start) / (repeat * len(queries)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV地域インデックスのベンチマーク")
+    parser.add_argument("--csv", type=Path, default=DEFAULT_CSV_PATH, help="MapComplete CSVのパス")
+    parser.add_argument("--job-types", type=int, default=len(JOB_TYPES), help="擬似職種数（job_type列がない場合）")
+    parser.add_argument("--repeat", type=int, default=10, help="繰り返し回数")
+    args = parser.parse_args()
+
+    df = load_frame(args.csv, args.job_types)
+    print(f"[BENCH] {len(df):,} rows, {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f}MB")
+
+    start = time.perf_counter()
+    indexed = db_helper._sort_for_region_index(df)
+    db_helper._csv_region_index = db_helper._build_csv_region_index(indexed)
+    db_helper._csv_dataframe = indexed
+    print(f"[BENCH] sort + index build: {(time.perf_counter() - start) * 1000:.1f}ms (once at load)")
+
+    job_type = df["job_type"].iloc[0]
+    summary = df[(df["row_type"] == "SUMMARY") & df["municipality"].notna()]
+    regions = summary[["prefecture", "municipality"]].drop_duplicates().head(20).itertuples(index=False)
+    queries = [("SUMMARY", None, None), ("RESIDENCE_FLOW", None, None)]
+    for pref, muni in regions:
+        queries += [("SUMMARY", pref, None), ("RESIDENCE_FLOW", pref, muni), (None, pref, muni)]
+
+    # 結果の一致を確認
+    with db_helper.job_type_scope(job_type):
+        for query in queries:
+            expected = mask_scan(df, job_type, *query)
+            actual = db_helper._csv_slice(*query)
+            assert len(expected) == len(actual), (query, len(expected), len(actual))
+
+        scan_ms = timed(lambda *q: mask_scan(df, job_type, *q), queries, args.repeat)
+        index_ms = timed(db_helper._csv_slice, queries, args.repeat)
+
+    print(f"[BENCH] {len(queries)} queries x {args.repeat} repeats")
+    print(f"[BENCH] mask scan + copy : {scan_ms:8.3f} ms/query")
+    print(f"[BENCH] region index     : {index_ms:8.3f} ms/query ({scan_ms / index_ms:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""import の挿入フェーズ（turso_sync.import_csv）の従来実装との比較ベンチマーク
+
+従来実装: CSV全体を読み込み → df.to_dict('records') → 1セルずつ convert_value → 1,000行ずつ urllib で同期送信
+現在の実装: turso_stream_import（チャンク読み込み + カラム単位のエンコード + 並列送信）
+
+Turso には送信せず、応答時間（固定 + 行数比例）を模擬した擬似サーバーに送信する。
+ピークRSSを分けて計測するため、各方式は別プロセスで実行する。
+
+使い方:
+    # 20万行の擬似CSVを生成して比較
+    python scripts/benchmark_turso_import.py
+
+    # 実データのCSVで比較（応答時間・同時送信数を指定）
+    python scripts/benchmark_turso_import.py --csv data/MapComplete_看護師_READY.csv --latency-ms 300 --concurrency 4
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import turso_sync  # noqa: E402
+import turso_stream_import  # noqa: E402
+
+
+def make_csv(path: Path, rows: int) -> None:
+    """MapComplete形式の擬似CSV（数値・テキスト・NULLが混在）"""
+    rng = np.random.default_rng(0)
+    row_types = np.array(["SUMMARY", "AGE_GENDER", "FLOW", "RARITY", "COMPETITION"])
+    df = pd.DataFrame({
+        "job_type": "看護師",
+        "row_type": row_types[rng.integers(0, len(row_types), rows)],
+        "prefecture": "東京都",
+        "municipality": [f"市区町村{i % 1900}" for i in range(rows)],
+        "category1": np.where(rng.random(rows) < 0.5, "30代", None),
+        "category2": np.where(rng.random(rows) < 0.5, "女性", None),
+        "category3": np.where(rng.random(rows) < 0.2, "正看護師", None),
+        "count": rng.integers(0, 500, rows),
+        "applicant_count": rng.integers(0, 500, rows),
+        "male_count": rng.integers(0, 300, rows),
+        "female_count": rng.integers(0, 300, rows),
+        "percentage": rng.random(rows) * 100,
+        "female_ratio": rng.random(rows),
+        "avg_age": np.where(rng.random(rows) < 0.7, rng.random(rows) * 30 + 30, np.nan),
+        "latitude": rng.random(rows) + 35,
+        "longitude": rng.random(rows) + 139,
+        "gap": rng.random(rows) * 50 - 25,
+        "rarity_score": rng.random(rows),
+    })
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def server_delay(body: bytes, latency_ms: float, per_row_us: float) -> float:
+    """擬似サーバーの応答時間（秒）"""
+    rows = body.count(b'"args"') * turso_sync.ROWS_PER_INSERT
+    return (latency_ms / 1000) + rows * per_row_us / 1e6
+
+
+def fake_results(body: bytes) -> bytes:
+    stmts = body.count(b'"type":"execute"') or body.count(b'"type": "execute"')
+    return json.dumps({"results": [{"type": "ok", "response": {"result": {}}}] * stmts}).encode()
+
+
+def run_legacy(csv_path: str, latency_ms: float, per_row_us: float) -> dict:
+    """2026-01-20以前の import_csv 挿入フェーズ"""
+    def urlopen(req, timeout=None):
+        time.sleep(server_delay(req.data, latency_ms, per_row_us))
+        body = fake_results(req.data)
+        return type("Response", (), {"read": lambda self: body})()
+
+    turso_sync.urllib.request.urlopen = urlopen
+    start = time.perf_counter()
+    df = pd.read_csv(csv_path, dtype=str, low_memory=False, encoding="utf-8-sig")
+    columns = [c for c in df.columns if c != "id"]
+    all_records = df.to_dict("records")
+    rows_per_request = turso_sync.ROWS_PER_INSERT * turso_sync.INSERTS_PER_REQUEST
+    for i in range(0, len(all_records), rows_per_request):
+        mega_batch = all_records[i:i + rows_per_request]
+        requests = [turso_sync.create_bulk_insert_stmt(mega_batch[j:j + turso_sync.ROWS_PER_INSERT], columns)
+                    for j in range(0, len(mega_batch), turso_sync.ROWS_PER_INSERT)]
+        turso_sync.send_pipeline("https://fake.turso.io", "token", requests)
+    elapsed = time.perf_counter() - start
+    return {"rows": len(df), "elapsed": elapsed, "peak_rss_mb": turso_stream_import.peak_rss_mb()}
+
+
+def run_stream(csv_path: str, latency_ms: float, per_row_us: float, concurrency: int) -> dict:
+    async def post(database_url, auth_token, payload, content=None, timeout=None):
+        await asyncio.sleep(server_delay(content, latency_ms, per_row_us))
+        return httpx.Response(200, content=fake_results(content), request=httpx.Request("POST", database_url))
+
+    turso_stream_import.async_post_pipeline = post
+    stats = turso_stream_import.stream_import(csv_path, "https://fake.turso.io", "token", concurrency=concurrency)
+    return {"rows": stats["rows_sent"], "elapsed": stats["elapsed"], "peak_rss_mb": stats["peak_rss_mb"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import 挿入フェーズのベンチマーク")
+    parser.add_argument("--csv", help="計測するCSV（省略時は擬似CSVを生成）")
+    parser.add_argument("--rows", type=int, default=200_000, help="擬似CSVの行数")
+    parser.add_argument("--latency-ms", type=float, default=200, help="擬似サーバーの1リクエストあたり応答時間")
+    parser.add_argument("--per-row-us", type=float, default=20, help="擬似サーバーの1行あたり処理時間（マイクロ秒）")
+    parser.add_argument("--concurrency", type=int, default=turso_stream_import.DEFAULT_CONCURRENCY, help="同時送信数")
+    parser.add_argument("--mode", choices=["legacy", "stream"], help=argparse.SUPPRESS)  # 子プロセス用
+    args = parser.parse_args()
+
+    if args.mode:
+        if args.mode == "legacy":
+            result = run_legacy(args.csv, args.latency_ms, args.per_row_us)
+        else:
+            result = run_stream(args.csv, args.latency_ms, args.per_row_us, args.concurrency)
+        print("RESULT " + json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv
+        if not csv_path:
+            csv_path = str(Path(tmp) / "benchmark.csv")
+            make_csv(Path(csv_path), args.rows)
+        size_mb = Path(csv_path).stat().st_size / 1024 / 1024
+        print(f"[BENCH] {Path(csv_path).name}: {size_mb:,.1f} MB, latency {args.latency_ms:.0f} ms "
+              f"+ {args.per_row_us:.0f} us/row, concurrency {args.concurrency}")
+
+        results = {}
+        for mode in ("legacy", "stream"):
+            proc = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--csv", csv_path,
+                 "--latency-ms", str(args.latency_ms), "--per-row-us", str(args.per_row_us),
+                 "--concurrency", str(args.concurrency)],
+                capture_output=True, text=True, encoding="utf-8",
+            )
+            lines = [line for line in proc.stdout.splitlines() if line.startswith("RESULT ")]
+            if proc.returncode != 0 or not lines:
+                print(f"[BENCH] {mode} failed:\n{proc.stderr[-2000:]}")
+                return
+            results[mode] = result = json.loads(lines[-1][len("RESULT "):])
+            rss = f"{result['peak_rss_mb']:,.0f} MB" if result["peak_rss_mb"] is not None else "N/A"
+            print(f"[BENCH]   {mode:<7} {result['rows']:>9,} rows | {result['elapsed']:7.1f} s | "
+                  f"{result['rows'] / result['elapsed']:>9,.0f} rows/s | peak RSS {rss}")
+
+        legacy, stream = results["legacy"], results["stream"]
+        print(f"[BENCH]   speedup {legacy['elapsed'] / stream['elapsed']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
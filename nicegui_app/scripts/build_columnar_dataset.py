@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""MapComplete_Complete_All_FIXED.csv(.gz) から Parquetデータセットを作成（2026-01-20追加）
+
+通常は generate_mapcomplete_complete_sheets.py がCSVと同時に出力する。既存のCSVだけがある環境
+（reflex_app/ の gzip版など）ではこのスクリプトで変換する。データセットの構成は columnar_data.py を参照。
+
+--benchmark では起動時の読み込み（従来: read_csv + _optimize_dtypes / 現在: read_dataset）の
+所要時間とピークRSSを計測する。ピークRSSを分けて計測するため、各方式は別プロセスで実行する。
+
+使い方:
+    # CSVと同じディレクトリに MapComplete_Complete_All_FIXED.parquet/ を作成
+    python scripts/build_columnar_dataset.py ../reflex_app/MapComplete_Complete_All_FIXED.csv.gz
+
+    # 出力先を指定
+    python scripts/build_columnar_dataset.py data/MapComplete_Complete_All_FIXED.csv --output /tmp/dataset.parquet
+
+    # 作成後に起動時の読み込みを比較
+    python scripts/build_columnar_dataset.py ../reflex_app/MapComplete_Complete_All_FIXED.csv.gz --benchmark
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import columnar_data  # noqa: E402
+from turso_stream_import import peak_rss_mb  # noqa: E402
+
+# main.load_data のCSVフォールバックで読むカラム
+SUMMARY_COLUMNS = ["prefecture", "municipality", "row_type"]
+
+
+def _peak_rss_mb():
+    """子プロセス自身のピークRSS（Linuxの ru_maxrss は fork 元の値を引き継ぐため VmHWM を優先）"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def run_csv(csv_path: str, summary: bool) -> dict:
+    """従来の起動時読み込み（db_helper._load_csv_data / main.load_data）"""
+    from db_helper import _optimize_dtypes
+
+    start = time.perf_counter()
+    if summary:
+        df = pd.read_csv(csv_path, encoding="utf-8-sig", usecols=lambda c: c in SUMMARY_COLUMNS, low_memory=True)
+        df = df[df["row_type"] == "SUMMARY"]
+    else:
+        df = _optimize_dtypes(pd.read_csv(csv_path, encoding="utf-8-sig", low_memory=False))
+    elapsed = time.perf_counter() - start
+    return {"rows": len(df), "elapsed": elapsed, "memory_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
+            "peak_rss_mb": _peak_rss_mb()}
+
+
+def run_parquet(dataset_path: str, summary: bool) -> dict:
+    start = time.perf_counter()
+    if summary:
+        df = columnar_data.read_dataset(dataset_path, columns=SUMMARY_COLUMNS, filters={"row_type": "SUMMARY"})
+    else:
+        df = columnar_data.read_dataset(dataset_path)
+    elapsed = time.perf_counter() - start
+    return {"rows": len(df), "elapsed": elapsed, "memory_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
+            "peak_rss_mb": _peak_rss_mb()}
+
+
+def benchmark(csv_path: Path, dataset_path: Path) -> None:
+    for summary in (False, True):
+        label = "SUMMARY列のみ" if summary else "全量"
+        results = {}
+        for mode, path in (("csv", csv_path), ("parquet", dataset_path)):
+            cmd = [sys.executable, __file__, str(path), "--mode", mode] + (["--summary"] if summary else [])
+            proc = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8")
+            lines = [line for line in proc.stdout.splitlines() if line.startswith("RESULT ")]
+            if proc.returncode != 0 or not lines:
+                print(f"[BENCH] {mode} failed:\n{proc.stderr[-2000:]}")
+                return
+            results[mode] = result = json.loads(lines[-1][len("RESULT "):])
+            rss = f"{result['peak_rss_mb']:,.0f} MB" if result["peak_rss_mb"] is not None else "N/A"
+            print(f"[BENCH] {label:<10} {mode:<7} {result['rows']:>9,} rows | {result['elapsed']:6.2f} s | "
+                  f"frame {result['memory_mb']:,.0f} MB | peak RSS {rss}")
+        print(f"[BENCH] {label:<10} speedup {results['csv']['elapsed'] / results['parquet']['elapsed']:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FIXED CSV から Parquetデータセットを作成")
+    parser.add_argument("csv", help="MapComplete_Complete_All_FIXED.csv(.gz)")
+    parser.add_argument("--output", help=f"出力先（省略時はCSVと同じディレクトリの {columnar_data.DATASET_DIRNAME}）")
+    parser.add_argument("--benchmark", action="store_true", help="作成後に起動時の読み込みを比較")
+    parser.add_argument("--mode", choices=["csv", "parquet"], help=argparse.SUPPRESS)  # 子プロセス用
+    parser.add_argument("--summary", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run = run_csv if args.mode == "csv" else run_parquet
+        print("RESULT " + json.dumps(run(args.csv, args.summary)))
+        return
+
+    if not columnar_data.PYARROW_AVAILABLE:
+        print("[ERROR] pyarrow が必要です: pip install pyarrow")
+        sys.exit(1)
+
+    csv_path = Path(args.csv)
+    dataset_path = columnar_data.build_from_csv(csv_path, Path(args.output) if args.output else None)
+    files = list(dataset_path.rglob("*.parquet"))
+    size_mb = sum(f.stat().st_size for f in files) / 1024 / 1024
+    print(f"[PARQUET] {len(files)} files, {size_mb:,.1f} MB "
+          f"(CSV {csv_path.stat().st_size / 1024 / 1024:,.1f} MB)")
+
+    if args.benchmark:
+        benchmark(csv_path, dataset_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""3層比較統計（全国・都道府県・市区町村）の事前集計を作成（2026-01-20追加）
+
+通常は generate_mapcomplete_complete_sheets.py（CSVモード）と turso_sync.py import / sync（Turso）が
+自動で作成する。既存のCSVだけがある環境や、集計ロジックを変更した後の再作成に使う。
+テーブルの構成は stats_rollup.py を参照。
+
+--benchmark ではリクエスト時の集計（地域で行データを絞り込んで集計、従来のgetterと同じ処理）と
+事前集計のキー参照の所要時間を比較する。
+
+使い方:
+    # CSVと同じディレクトリに MapComplete_Stats_Rollup.csv / .parquet を作成
+    python scripts/build_stats_rollup.py ../reflex_app/MapComplete_Complete_All_FIXED.csv.gz
+
+    # 出力先を指定（job_type列のないCSVは --job-type で職種を付与）
+    python scripts/build_stats_rollup.py data/MapComplete_看護師_READY.csv --output /tmp/rollup --job-type 看護師
+
+    # Tursoの stats_rollup テーブルを再作成（フォルダ指定で全職種）
+    python scripts/build_stats_rollup.py data/ --turso
+
+    # 作成後にリクエスト時の集計と比較
+    python scripts/build_stats_rollup.py ../reflex_app/MapComplete_Complete_All_FIXED.csv.gz --benchmark
+"""
+
+import io
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import stats_rollup  # noqa: E402
+
+
+def _csv_paths(targets):
+    paths = []
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            paths.extend(sorted(path.glob("*.csv")))
+        elif path.exists():
+            paths.append(path)
+        else:
+            raise FileNotFoundError(f"ファイルが見つかりません: {target}")
+    return paths
+
+
+def benchmark(source: pd.DataFrame, rollup: pd.DataFrame, samples: int = 200) -> None:
+    """地域ごとの統計取得: リクエスト時の集計 vs 事前集計のキー参照"""
+    regions = rollup.loc[rollup["level"] == "municipality", ["job_type", "prefecture", "municipality"]]
+    regions = regions.sample(min(samples, len(regions)), random_state=0).values.tolist()
+    source = source.assign(job_type=source["job_type"].fillna("") if "job_type" in source else "")
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # build_rollup のログを抑制
+        for job_type, pref, muni in regions:
+            part = source[(source["job_type"] == job_type) & (source["prefecture"] == pref)]
+            stats_rollup.build_rollup(part)  # 都道府県 + 市区町村（getterの2回分に相当）
+    row_level = (time.perf_counter() - started) / len(regions) * 1000
+
+    lookup = stats_rollup.build_lookup(rollup)
+    started = time.perf_counter()
+    for job_type, pref, muni in regions:
+        stats_rollup.lookup_stats(lookup, job_type, "prefecture", pref)
+        stats_rollup.lookup_stats(lookup, job_type, "municipality", pref, muni)
+    rolled_up = (time.perf_counter() - started) / len(regions) * 1000
+
+    print(f"\n[BENCH] {len(regions)} regions (prefecture + municipality stats per region)")
+    print(f"  row-level aggregation: {row_level:8.2f} ms/region")
+    print(f"  rollup lookup:         {rolled_up:8.4f} ms/region ({row_level / max(rolled_up, 1e-9):,.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="3層比較統計の事前集計を作成")
+    parser.add_argument("csv", nargs="+", help="FIXED CSV(.gz) / 職種別CSV またはそのフォルダ")
+    parser.add_argument("--output", help="出力ディレクトリ（デフォルト: CSVと同じディレクトリ）")
+    parser.add_argument("--job-type", help="job_type列のないCSVに付与する職種")
+    parser.add_argument("--turso", action="store_true", help="Tursoの stats_rollup テーブルを再作成")
+    parser.add_argument("--benchmark", action="store_true", help="リクエスト時の集計と所要時間を比較")
+    args = parser.parse_args()
+
+    try:
+        csv_paths = _csv_paths(args.csv)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    if args.turso:
+        import turso_sync
+        results = [turso_sync.refresh_stats_rollup(str(p)) for p in csv_paths]
+        return 1 if any(results) else 0
+
+    # 同じ出力先のCSV（職種別CSVのフォルダなど）は1つのファイルにまとめる
+    rollups = {}
+    for csv_path in csv_paths:
+        source = stats_rollup.read_source_csv(csv_path, args.job_type)
+        rollup = stats_rollup.build_rollup(source)
+        rollups.setdefault(Path(args.output) if args.output else csv_path.parent, []).append((csv_path.name, rollup))
+        if args.benchmark:
+            benchmark(source, rollup)
+    for out_dir, parts in rollups.items():
+        stats_rollup.write_rollup(pd.concat([r for _, r in parts], ignore_index=True), out_dir,
+                                  source=", ".join(name for name, _ in parts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+"""
+3層比較統計（全国・都道府県・市区町村）の事前集計テーブル（2026-01-20追加）
+
+get_national_stats / get_prefecture_stats / get_municipality_stats はリクエストのたびに
+SUMMARY・RESIDENCE_FLOW・AGE_GENDER の行データを取得して集計しており、概要タブは
+show_content.refresh() のたびに3つとも呼び出していた。
+データ作成時（generate_mapcomplete_complete_sheets.py / turso_sync.py import・sync）に
+職種 × 階層 × 地域 ごとの集計結果を1行にまとめたテーブルを作成し、getterはキーで引くだけにする。
+
+テーブル（1行 = 1つの getter 結果）:
+    job_type, level ("national" / "prefecture" / "municipality"), prefecture, municipality,
+    desired_areas, distance_km, qualifications, male_count, female_count, avg_age, female_ratio,
+    age_distribution (JSON), age_gender_pyramid (JSON)
+
+出力先:
+    - CSVモード: MapComplete_Stats_Rollup.csv（pyarrowがあれば .parquet も）を FIXED CSV と同じディレクトリに
+    - Turso: stats_rollup テーブル（職種単位で置き換え）
+
+集計は db_helper の各getter（_batch_stats_query 経由の行データ集計）と同じ定義:
+    - 全国・都道府県: SUMMARY の avg_desired_areas / avg_qualifications は平均、人数は合計、
+      avg_age は男女合計人数による加重平均。RESIDENCE_FLOW の avg_reference_distance_km は平均
+    - 市区町村: SUMMARY の最初の1行の値
+    - age_distribution: AGE_GENDER の category1 別 count 合計（6区分）
+    - age_gender_pyramid: AGE_GENDER の count > 0 の行を category1 × 性別（category2 に「男」/「女」を含む）で合計
+"""
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ROLLUP_BASENAME = "MapComplete_Stats_Rollup"
+TURSO_TABLE = "stats_rollup"
+LEVELS = ("national", "prefecture", "municipality")
+AGE_GROUPS = ["20代", "30代", "40代", "50代", "60代", "70歳以上"]
+SOURCE_ROW_TYPES = ("SUMMARY", "RESIDENCE_FLOW", "AGE_GENDER")
+SOURCE_COLUMNS = ["job_type", "row_type", "prefecture", "municipality",
+                  "avg_desired_areas", "avg_qualifications", "male_count", "female_count", "avg_age",
+                  "avg_reference_distance_km", "category1", "category2", "count"]
+KEY_COLUMNS = ["job_type", "level", "prefecture", "municipality"]
+ROLLUP_COLUMNS = KEY_COLUMNS + ["desired_areas", "distance_km", "qualifications", "male_count", "female_count",
+                                "avg_age", "female_ratio", "age_distribution", "age_gender_pyramid"]
+
+_LEVEL_KEYS = {
+    "national": ["job_type"],
+    "prefecture": ["job_type", "prefecture"],
+    "municipality": ["job_type", "prefecture", "municipality"],
+}
+
+
+# =====================================
+# 集計
+# =====================================
+def read_source_csv(csv_path: Path, job_type: Optional[str] = None) -> pd.DataFrame:
+    """集計に必要なカラム・row_typeのみ読み込み（job_type列がないCSVは job_type を補う）"""
+    df = pd.read_csv(csv_path, encoding="utf-8-sig", low_memory=False,
+                     usecols=lambda c: c in SOURCE_COLUMNS)
+    df = df[df["row_type"].isin(SOURCE_ROW_TYPES)]
+    if "job_type" not in df.columns:
+        df = df.assign(job_type=job_type or "")
+    return df
+
+
+def _round(value, digits: int):
+    return None if value is None or pd.isna(value) else round(float(value), digits)
+
+
+def build_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    """行データ（SOURCE_COLUMNS）から事前集計テーブルを作成
+
+    Args:
+        df: job_seeker_data / FIXED CSV 形式の行データ（job_type列がなければ "" として扱う）
+
+    Returns:
+        pd.DataFrame: ROLLUP_COLUMNS（1行 = 職種 × 階層 × 地域）
+    """
+    started = time.perf_counter()
+    df = df.reindex(columns=SOURCE_COLUMNS)
+    df["job_type"] = df["job_type"].astype(object).where(df["job_type"].notna(), "")
+    for col in ("job_type", "row_type", "prefecture", "municipality", "category1", "category2"):
+        df[col] = df[col].astype(object)
+    for col in ("avg_desired_areas", "avg_qualifications", "male_count", "female_count", "avg_age",
+                "avg_reference_distance_km", "count"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    summary = df[df["row_type"] == "SUMMARY"]
+    flow = df[df["row_type"] == "RESIDENCE_FLOW"]
+    age = df[df["row_type"] == "AGE_GENDER"]
+
+    tables = []
+    for level in LEVELS:
+        keys = _LEVEL_KEYS[level]
+        # 地域が欠損のキーは getter から引かれないため対象外
+        level_summary, level_flow, level_age = (part.dropna(subset=keys) for part in (summary, flow, age))
+        region_keys = pd.concat([p[keys] for p in (level_summary, level_flow, level_age)]).drop_duplicates()
+        table = region_keys.set_index(keys)
+        table = table.join(_summary_stats(level_summary, keys, first_row=(level == "municipality")))
+        table = table.join(_flow_stats(level_flow, keys))
+        table = table.join(_age_stats(level_age, keys, level))
+        table = table.reset_index()
+        table["level"] = level
+        tables.append(table)
+
+    rollup = pd.concat(tables, ignore_index=True).reindex(columns=ROLLUP_COLUMNS)
+    rollup = _finalize(rollup)
+    print(f"[ROLLUP] Built {len(rollup):,} rows from {len(df):,} source rows "
+          f"in {time.perf_counter() - started:.2f}s")
+    return rollup
+
+
+def _summary_stats(summary: pd.DataFrame, keys: List[str], first_row: bool) -> pd.DataFrame:
+    if first_row:
+        # 市区町村: 最初のSUMMARY行の値（getterは df_summary.iloc[0]）
+        first = summary.drop_duplicates(keys, keep="first").set_index(keys)
+        return pd.DataFrame({
+            "desired_areas": first["avg_desired_areas"],
+            "qualifications": first["avg_qualifications"],
+            "male_count": first["male_count"].fillna(0),
+            "female_count": first["female_count"].fillna(0),
+            "avg_age": first["avg_age"],
+        })
+
+    valid_age = summary["avg_age"].notna()
+    total = (summary["male_count"].fillna(0) + summary["female_count"].fillna(0)).where(valid_age, 0.0)
+    work = summary[keys].assign(
+        avg_desired_areas=summary["avg_desired_areas"],
+        avg_qualifications=summary["avg_qualifications"],
+        male_count=summary["male_count"],
+        female_count=summary["female_count"],
+        age_weight=total,
+        age_weighted=(summary["avg_age"] * total).where(valid_age, 0.0),
+    )
+    grouped = work.groupby(keys, sort=False)
+    sums = grouped[["male_count", "female_count", "age_weight", "age_weighted"]].sum()
+    means = grouped[["avg_desired_areas", "avg_qualifications"]].mean()
+    return pd.DataFrame({
+        "desired_areas": means["avg_desired_areas"],
+        "qualifications": means["avg_qualifications"],
+        "male_count": sums["male_count"],
+        "female_count": sums["female_count"],
+        "avg_age": (sums["age_weighted"] / sums["age_weight"]).where(sums["age_weight"] > 0),
+    })
+
+
+def _flow_stats(flow: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    distance = flow.groupby(keys, sort=False)["avg_reference_distance_km"].mean()
+    return distance.rename("distance_km").to_frame()
+
+
+def _age_stats(age: pd.DataFrame, keys: List[str], level: str) -> pd.DataFrame:
+    """年代別分布（6区分）と年齢×性別ピラミッドをJSON文字列で返す"""
+    counts = age["count"].fillna(0)
+    by_age = age[keys].assign(category1=age["category1"], count=counts) \
+        .dropna(subset=["category1"]).groupby(keys + ["category1"], sort=False)["count"].sum()
+
+    # ピラミッド: count > 0 かつ category1/category2 が空でない行
+    cnt = np.trunc(counts)
+    cat1, cat2 = age["category1"], age["category2"].astype(str)
+    usable = (cnt > 0) & cat1.notna() & (cat1 != "") & age["category2"].notna() & (age["category2"] != "")
+    gender = np.where(cat2.str.contains("男"), "male", np.where(cat2.str.contains("女"), "female", ""))
+    pyramid = age[keys].assign(category1=cat1, gender=gender, count=cnt)[usable] \
+        .groupby(keys + ["category1", "gender"], sort=False)["count"].sum()
+
+    distributions: Dict[tuple, Dict[str, int]] = {}
+    for key, value in by_age.items():
+        region, group = key[:-1], key[-1]
+        dist = distributions.setdefault(region, dict.fromkeys(AGE_GROUPS, 0))
+        if group in dist:
+            dist[group] = int(value)
+    pyramids: Dict[tuple, Dict[str, Dict[str, int]]] = {}
+    for key, value in pyramid.items():
+        region, group, sex = key[:-2], key[-2], key[-1]
+        entry = pyramids.setdefault(region, {}).setdefault(group, {"male": 0, "female": 0})
+        if sex:
+            entry[sex] += int(value)
+
+    regions = list(distributions)
+    table = pd.DataFrame(regions, columns=keys, dtype=object)
+    table["age_distribution"] = [json.dumps(distributions[r], ensure_ascii=False) for r in regions]
+    table["age_gender_pyramid"] = [json.dumps(pyramids.get(r, {}), ensure_ascii=False) for r in regions]
+    return table.set_index(keys)
+
+
+def _finalize(rollup: pd.DataFrame) -> pd.DataFrame:
+    """getterと同じ丸め・既定値に揃える"""
+    municipality = rollup["level"] == "municipality"
+    rollup["desired_areas"] = [_round(v, 2) if pd.notna(v) else (np.nan if has else 0.0)
+                               for v, has in zip(rollup["desired_areas"], rollup["male_count"].notna())]
+    rollup["qualifications"] = [_round(v, 2) if pd.notna(v) else (np.nan if has else 0.0)
+                                for v, has in zip(rollup["qualifications"], rollup["male_count"].notna())]
+    rollup["distance_km"] = [_round(v, 2) if pd.notna(v) else 0.0 for v in rollup["distance_km"]]
+    rollup["male_count"] = rollup["male_count"].fillna(0).astype("int64")
+    rollup["female_count"] = rollup["female_count"].fillna(0).astype("int64")
+    rollup["avg_age"] = [_round(v, 1) for v in rollup["avg_age"]]
+    total = rollup["male_count"] + rollup["female_count"]
+    rollup["female_ratio"] = [round(f / t * 100, 1) if t > 0 else 0.0
+                              for f, t in zip(rollup["female_count"], total)]
+    rollup.loc[~municipality, "female_ratio"] = np.nan
+    # AGE_GENDER がない地域: 全国・都道府県は {}、市区町村は6区分0
+    empty_dist = json.dumps(dict.fromkeys(AGE_GROUPS, 0), ensure_ascii=False)
+    no_age = rollup["age_distribution"].isna()
+    rollup.loc[no_age & municipality, "age_distribution"] = empty_dist
+    rollup.loc[no_age & ~municipality, "age_distribution"] = "{}"
+    rollup["age_gender_pyramid"] = rollup["age_gender_pyramid"].fillna("{}")
+    return rollup
+
+
+# =====================================
+# getter結果への変換
+# =====================================
+def to_stats(row: Dict) -> Dict:
+    """テーブルの1行を getter と同じ形式の dict に変換（呼び出しごとに新しいdictを返す）"""
+    def number(value, default=0.0):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return default
+        return float(value)
+
+    stats = {
+        "desired_areas": number(row.get("desired_areas"), np.nan),
+        "distance_km": number(row.get("distance_km")),
+        "qualifications": number(row.get("qualifications"), np.nan),
+        "male_count": int(number(row.get("male_count"))),
+        "female_count": int(number(row.get("female_count"))),
+        "avg_age": None if pd.isna(row.get("avg_age")) else float(row["avg_age"]),
+        "age_distribution": json.loads(row.get("age_distribution") or "{}"),
+        "age_gender_pyramid": json.loads(row.get("age_gender_pyramid") or "{}"),
+    }
+    if row.get("level") == "municipality":
+        stats["female_ratio"] = number(row.get("female_ratio"))
+    return stats
+
+
+def build_lookup(rollup: pd.DataFrame) -> Dict[tuple, Dict]:
+    """(job_type, level, prefecture, municipality) → 行（dict）の辞書"""
+    rollup = rollup.astype(object).where(rollup.notna(), None)
+    lookup = {}
+    for row in rollup.to_dict("records"):
+        key = (row["job_type"] or "", row["level"], row["prefecture"] or None, row["municipality"] or None)
+        lookup[key] = row
+    return lookup
+
+
+def lookup_stats(lookup: Dict[tuple, Dict], job_type: Optional[str], level: str,
+                 prefecture: Optional[str] = None, municipality: Optional[str] = None) -> Optional[Dict]:
+    """getter結果を引く（job_type列のないCSVから作成したテーブルは job_type="" で引く）。なければNone"""
+    for key_job_type in dict.fromkeys((job_type or "", "")):
+        row = lookup.get((key_job_type, level, prefecture or None, municipality or None))
+        if row is not None:
+            return to_stats(row)
+    return None
+
+
+# =====================================
+# ファイル入出力（CSVモード）
+# =====================================
+def write_rollup(rollup: pd.DataFrame, out_dir: Path, source: Optional[str] = None) -> List[Path]:
+    """CSV（と pyarrow があれば Parquet）に書き込み。書き込み完了後に置き換える"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    targets = [("csv", out_dir / f"{ROLLUP_BASENAME}.csv")]
+    try:
+        import pyarrow  # noqa: F401
+        targets.append(("parquet", out_dir / f"{ROLLUP_BASENAME}.parquet"))
+    except ImportError:
+        pass
+    for kind, path in targets:
+        tmp_path = path.with_name(path.name + ".tmp")
+        if kind == "csv":
+            rollup.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+        else:
+            rollup.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        written.append(path)
+    print(f"[ROLLUP] Wrote {len(rollup):,} rows to {', '.join(p.name for p in written)}"
+          + (f" (source: {source})" if source else ""))
+    return written
+
+
+def find_rollup(search_dirs: Iterable[Path], csv_names: Sequence[str] = ()) -> Optional[Path]:
+    """事前集計ファイルを探す（同じディレクトリの元CSVの方が新しい場合は再生成漏れとみなして使わない）"""
+    for dir_path in search_dirs:
+        dir_path = Path(dir_path)
+        candidates = [dir_path / f"{ROLLUP_BASENAME}.parquet", dir_path / f"{ROLLUP_BASENAME}.csv"]
+        for path in candidates:
+            if not path.exists() or (path.suffix == ".parquet" and not _parquet_available()):
+                continue
+            stale = [name for name in csv_names
+                     if (dir_path / name).exists() and (dir_path / name).stat().st_mtime > path.stat().st_mtime]
+            if stale:
+                print(f"[ROLLUP] {path} is older than {stale[0]} - skipped "
+                      f"(rebuild: python scripts/build_stats_rollup.py)")
+                break
+            return path
+    return None
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def read_rollup(path: Path) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path, encoding="utf-8-sig", keep_default_na=False, na_values=[""],
+                       dtype={"job_type": str, "prefecture": str, "municipality": str})
+
+
+def build_from_csv(csv_path: Path, out_dir: Optional[Path] = None, job_type: Optional[str] = None) -> List[Path]:
+    """FIXED CSV(.gz) から事前集計ファイルを作成（出力先のデフォルトはCSVと同じディレクトリ）"""
+    csv_path = Path(csv_path)
+    rollup = build_rollup(read_source_csv(csv_path, job_type))
+    return write_rollup(rollup, Path(out_dir) if out_dir else csv_path.parent, source=csv_path.name)
+
+
+# =====================================
+# Turso
+# =====================================
+TURSO_CREATE_SQL = f"""CREATE TABLE IF NOT EXISTS {TURSO_TABLE} (
+    job_type TEXT NOT NULL,
+    level TEXT NOT NULL,
+    prefecture TEXT,
+    municipality TEXT,
+    desired_areas REAL,
+    distance_km REAL,
+    qualifications REAL,
+    male_count INTEGER,
+    female_count INTEGER,
+    avg_age REAL,
+    female_ratio REAL,
+    age_distribution TEXT,
+    age_gender_pyramid TEXT,
+    built_at TEXT
+)"""
+TURSO_INDEX_SQL = f"CREATE INDEX IF NOT EXISTS idx_{TURSO_TABLE}_job_type ON {TURSO_TABLE} (job_type)"
+_TURSO_ROWS_PER_INSERT = 100
+
+
+def turso_requests(rollup: pd.DataFrame) -> List[tuple]:
+    """stats_rollup を職種単位で置き換える Pipeline API のリクエスト
+
+    Returns:
+        list: [(job_type, requests), ...]。1職種 = 1回の送信（DELETE + INSERT を1トランザクションで実行）
+    """
+    built_at = datetime.now().isoformat(timespec="seconds")
+    columns = ROLLUP_COLUMNS + ["built_at"]
+    placeholders = "(" + ", ".join("?" for _ in columns) + ")"
+    result = []
+    for job_type, part in rollup.groupby("job_type", sort=False):
+        stmts = [
+            {"type": "execute", "stmt": {"sql": TURSO_CREATE_SQL}},
+            {"type": "execute", "stmt": {"sql": TURSO_INDEX_SQL}},
+            {"type": "execute", "stmt": {"sql": "BEGIN"}},
+            {"type": "execute", "stmt": {
+                "sql": f"DELETE FROM {TURSO_TABLE} WHERE job_type = ?",
+                "args": [{"type": "text", "value": str(job_type)}],
+            }},
+        ]
+        records = part.assign(built_at=built_at).reindex(columns=columns)
+        records = records.astype(object).where(records.notna(), None).values.tolist()
+        for start in range(0, len(records), _TURSO_ROWS_PER_INSERT):
+            batch = records[start:start + _TURSO_ROWS_PER_INSERT]
+            stmts.append({"type": "execute", "stmt": {
+                "sql": f"INSERT INTO {TURSO_TABLE} ({', '.join(columns)}) VALUES {', '.join([placeholders] * len(batch))}",
+                "args": [_turso_arg(value) for row in batch for value in row],
+            }})
+        stmts.append({"type": "execute", "stmt": {"sql": "COMMIT"}})
+        result.append((job_type, stmts))
+    return result
+
+
+def turso_clear_requests(job_type: str) -> List[Dict]:
+    """stats_rollup から職種の行を削除する Pipeline API のリクエスト（インポート開始時・失敗時）
+
+    削除後のダッシュボードは行データからの集計にフォールバックする。
+    """
+    return [
+        {"type": "execute", "stmt": {"sql": TURSO_CREATE_SQL}},
+        {"type": "execute", "stmt": {"sql": TURSO_INDEX_SQL}},
+        {"type": "execute", "stmt": {
+            "sql": f"DELETE FROM {TURSO_TABLE} WHERE job_type = ?",
+            "args": [{"type": "text", "value": str(job_type)}],
+        }},
+    ]
+
+
+TURSO_VERSION_SQL = f"SELECT MAX(built_at) AS built_at, COUNT(*) AS n FROM {TURSO_TABLE} WHERE job_type = ?"
+
+
+def version_of(rows: pd.DataFrame) -> tuple:
+    """職種の stats_rollup の版 (最終作成日時, 行数)。行がない・テーブル未作成は (None, 0)
+
+    rows は職種の全行（SELECT *）または TURSO_VERSION_SQL の結果。
+    """
+    if rows is None or rows.empty:
+        return (None, 0)
+    if "n" in rows.columns:
+        built_at, n = rows["built_at"].iloc[0], int(rows["n"].iloc[0])
+    else:
+        built_at, n = rows["built_at"].max() if "built_at" in rows.columns else None, len(rows)
+    return (None if pd.isna(built_at) else str(built_at), n)
+
+
+def _turso_arg(value) -> Dict:
+    if value is None:
+        return {"type": "null"}
+    if isinstance(value, (bool, np.bool_)):
+        return {"type": "integer", "value": str(int(value))}
+    if isinstance(value, (int, np.integer)):
+        return {"type": "integer", "value": str(int(value))}
+    if isinstance(value, (float, np.floating)):
+        return {"type": "float", "value": float(value)}
+    return {"type": "text", "value": str(value)}
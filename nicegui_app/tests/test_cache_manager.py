@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+メモリ予算付きキャッシュマネージャ（cache_manager）のテスト
+
+バイト予算の遵守、重み付きLRUの追い出し順、名前空間ごとの統計、
+db_helperのキャッシュ関数が共通予算を使うことを確認する。
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+from cache_manager import CacheManager, cache_manager, estimate_size
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"municipality": [f"市{i}" for i in range(rows)], "count": np.arange(rows)})
+
+
+class TestEstimateSize:
+    def test_dataframe_uses_deep_memory_usage(self):
+        df = _frame(1000).astype({"municipality": object})  # 文字列の実体はdeep=Trueでのみ計上される
+        assert estimate_size(df) == df.memory_usage(index=True, deep=True).sum()
+        assert estimate_size(df) > df.memory_usage(index=True, deep=False).sum()
+
+    def test_containers_include_values(self):
+        df = _frame(500)
+        batch = {"SUMMARY": df, "RESIDENCE_FLOW": df.head(10)}
+        assert estimate_size(batch) >= estimate_size(df)
+        markers = [{"name": f"市{i}", "lat": 35.0, "lng": 139.0} for i in range(5000)]
+        assert estimate_size(markers) > estimate_size(markers[:100]) * 10
+
+
+class TestCacheManager:
+    def test_budget_enforced_across_namespaces(self):
+        manager = CacheManager(budget_bytes=1000)
+        manager.register("a")
+        manager.register("b")
+        for i in range(5):
+            manager.set("a", i, "x", size=300)
+            manager.set("b", i, "y", size=300)
+        stats = manager.stats()
+        assert stats["used_bytes"] <= 1000
+        assert stats["namespaces"]["a"]["evictions"] + stats["namespaces"]["b"]["evictions"] == 7
+
+    def test_weighted_lru_keeps_heavier_namespace(self):
+        manager = CacheManager(budget_bytes=400)
+        manager.register("light", weight=1.0)
+        manager.register("heavy", weight=4.0)
+        manager.set("heavy", "h", "H", size=100)
+        manager.set("light", "l1", "L", size=100)
+        manager.set("light", "l2", "L", size=100)
+        manager.set("light", "l3", "L", size=100)
+        # 予算超過: heavyの方が古いが、重みが大きいため軽い名前空間の最古エントリが追い出される
+        manager.set("light", "l4", "L", size=100)
+        assert manager.contains("heavy", "h")
+        assert not manager.contains("light", "l1")
+        assert manager.contains("light", "l4")
+
+    def test_get_refreshes_recency(self):
+        manager = CacheManager(budget_bytes=300)
+        for key in ("k1", "k2", "k3"):
+            manager.set("ns", key, key, size=100)
+        assert manager.get("ns", "k1") == "k1"
+        manager.set("ns", "k4", "k4", size=100)
+        assert manager.keys("ns") == ["k3", "k1", "k4"]
+
+    def test_oversized_entry_is_rejected(self):
+        manager = CacheManager(budget_bytes=100)
+        manager.set("ns", "small", 1, size=50)
+        assert manager.set("ns", "huge", 2, size=500) is False
+        assert manager.get("ns", "small") == 1
+        assert manager.stats()["rejected"] == 1
+
+    def test_ttl_and_stats(self, monkeypatch):
+        manager = CacheManager(budget_bytes=1000)
+        manager.register("ttl", ttl_seconds=60)
+        manager.set("ttl", "k", "v", size=10)
+        assert manager.get("ttl", "k") == "v"
+        assert manager.get("ttl", "missing") is None
+
+        entry = manager._namespaces["ttl"].entries["k"]
+        entry.created -= 120
+        assert manager.get("ttl", "k") is None
+        stats = manager.stats()["namespaces"]["ttl"]
+        assert stats == {"entries": 0, "bytes": 0, "hits": 1, "misses": 2,
+                         "evictions": 0, "expired": 1, "weight": 1.0}
+
+    def test_evict_where_and_replace_keep_bytes_consistent(self):
+        manager = CacheManager(budget_bytes=1000)
+        manager.set("ns", ("介護職", "東京都"), 1, size=100)
+        manager.set("ns", ("看護師", "東京都"), 2, size=200)
+        manager.set("ns", ("看護師", "東京都"), 3, size=50)
+        assert manager.evict_where("ns", lambda k: k[0] == "介護職") == 1
+        assert manager.stats()["used_bytes"] == 50
+
+
+class TestDbHelperIntegration:
+    @pytest.fixture(autouse=True)
+    def clean(self):
+        db_helper.clear_cache()
+        yield
+        db_helper.clear_cache()
+
+    def test_helpers_share_budget_and_report_stats(self, monkeypatch):
+        monkeypatch.setattr(cache_manager, "budget_bytes", cache_manager.budget_bytes)
+        db_helper._set_filtered_cache(("介護職", "東京都", "ALL"), _frame(100))
+        db_helper._set_batch_cache(("介護職", "batch_stats", "東京都", "ALL"), {"SUMMARY": _frame(10)})
+        assert db_helper._get_filtered_cache(("介護職", "東京都", "ALL")) is not None
+        assert db_helper._get_batch_cache(("看護師", "batch_stats", "東京都", "ALL")) is None
+
+        memory = db_helper.get_cache_stats()["memory"]
+        filtered = memory["namespaces"]["filtered_data"]
+        assert filtered["entries"] == 1 and filtered["hits"] >= 1 and filtered["bytes"] > 0
+        assert memory["namespaces"]["batch_cache"]["misses"] >= 1
+
+        # 予算を縮小すると共通予算内に収まるまで追い出される
+        cache_manager.set_budget(filtered["bytes"])
+        assert cache_manager.stats()["used_bytes"] <= filtered["bytes"]
+
+    def test_preloaded_national_data_requires_all_prefectures(self, monkeypatch):
+        monkeypatch.setitem(db_helper._preload_status, "job_type", "介護職")
+        monkeypatch.setitem(db_helper._preload_status, "prefectures", ["東京都", "北海道"])
+        cache_manager.set("preload", ("介護職", "東京都"), _frame(3).assign(row_type="SUMMARY"))
+        cache_manager.set("preload", ("介護職", "北海道"), _frame(2).assign(row_type="SUMMARY"))
+        with db_helper.job_type_scope("介護職"):
+            assert len(db_helper.get_preloaded_data(row_type="SUMMARY")) == 5
+            cache_manager.pop("preload", ("介護職", "北海道"))
+            assert db_helper.get_preloaded_data().empty
+            assert len(db_helper.get_preloaded_data("東京都")) == 3
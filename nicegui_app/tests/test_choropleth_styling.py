@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+コロプレススタイル一括計算（style_features / prepare_styled_geojson）のテスト
+
+従来の feature 単位の計算（スケールを毎回再計算）と同じスタイルになること、
+スタイル付けでキャッシュ済みGeoJSONのgeometryを共有し、featureを変更しないことを確認する。
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import choropleth_helper as ch
+
+
+def _legacy_style(feature, municipality_data, mode, selected_muni, inflow_sources, competing_areas):
+    """2026-01-20以前の style_geojson_feature（比較用）"""
+    muni_name = feature.get("properties", {}).get("N03_004", "")
+    style = {"color": "#ffffff", "weight": 1, "fillColor": ch.SPECIAL_COLORS["default"], "fillOpacity": 0.6}
+    if not muni_name:
+        return style
+    if selected_muni and muni_name == selected_muni:
+        style.update(fillColor=ch.SPECIAL_COLORS["selected"], weight=3, fillOpacity=0.8)
+        return style
+    if inflow_sources and muni_name in inflow_sources:
+        style.update(fillColor=ch.SPECIAL_COLORS["inflow_highlight"], weight=2, fillOpacity=0.7)
+        return style
+    if competing_areas and muni_name in competing_areas:
+        style.update(fillColor=ch.SPECIAL_COLORS["competition_highlight"], weight=2, fillOpacity=0.7)
+        return style
+    data = municipality_data.get(muni_name, {})
+    if mode == "count":
+        value = data.get("count", 0)
+    elif mode == "inflow":
+        value = data.get("inflow", 0)
+    elif mode == "balance":
+        value = data.get("inflow", 0) - data.get("outflow", 0) + 50
+    elif mode == "competition":
+        value = data.get("competition", 0)
+    else:
+        value = data.get("count", 0)
+    max_val = max(
+        (d.get("count", 0) if mode == "count" else
+         d.get("inflow", 0) if mode == "inflow" else
+         d.get("competition", 0) if mode == "competition" else
+         abs(d.get("inflow", 0) - d.get("outflow", 0)) + 50)
+        for d in municipality_data.values()
+    ) if municipality_data else 1
+    style["fillColor"] = ch.get_color_by_value(value, max_val, mode)
+    return style
+
+
+@pytest.fixture
+def geojson():
+    names = [f"市{i}" for i in range(30)] + [""]
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": {"N03_004": name},
+             "geometry": {"type": "Polygon", "coordinates": [[[139.0, 35.0], [139.1, 35.0], [139.1, 35.1]]]}}
+            for name in names
+        ],
+    }
+
+
+@pytest.fixture
+def municipality_data():
+    return {
+        f"市{i}": {"count": i * 7 % 23, "inflow": i % 5, "outflow": (i * 3) % 11, "competition": i % 4}
+        for i in range(25)  # 市25〜市29はデータなし
+    }
+
+
+@pytest.mark.parametrize("mode", ["count", "inflow", "balance", "competition", "unknown"])
+@pytest.mark.parametrize("highlights", [
+    (None, None, None),
+    ("市3", ["市4", "市5"], ["市5", "市6"]),
+])
+def test_style_features_matches_legacy(geojson, municipality_data, mode, highlights):
+    selected, inflow, competing = highlights
+    features = geojson["features"]
+    expected = [_legacy_style(f, municipality_data, mode, selected, inflow, competing) for f in features]
+    assert ch.style_features(features, municipality_data, mode, selected, inflow, competing) == expected
+    assert [ch.style_geojson_feature(f, municipality_data, mode, selected, inflow, competing)
+            for f in features] == expected
+
+
+def test_empty_and_zero_scale(geojson):
+    features = geojson["features"]
+    for data in ({}, {"市1": {"count": 0}}):
+        expected = [_legacy_style(f, data, "count", None, None, None) for f in features]
+        assert ch.style_features(features, data, "count") == expected
+
+
+def test_colors_for_values_matches_scalar():
+    values = [-5, 0, 1, 19.9, 20, 39, 40, 60, 80, 100, 150, float("nan")]
+    for mode in ch.COLOR_CONFIG:
+        assert ch.colors_for_values(values, 100, mode) == [ch.get_color_by_value(v, 100, mode) for v in values]
+    assert ch.colors_for_values([1, 2], 0) == [ch.SPECIAL_COLORS["default"]] * 2
+
+
+def test_prepare_styled_geojson_shares_geometry(monkeypatch, geojson, municipality_data):
+    monkeypatch.setattr(ch, "load_geojson", lambda pref: geojson)
+    styled = ch.prepare_styled_geojson("東京都", municipality_data, "count", selected_muni="市1")
+
+    assert len(styled["features"]) == len(geojson["features"])
+    for original, feature in zip(geojson["features"], styled["features"]):
+        assert feature["geometry"] is original["geometry"]
+        assert "_style" in feature["properties"]
+        assert "_style" not in original["properties"]  # キャッシュ側は変更しない
+    assert styled["features"][1]["properties"]["_style"]["fillColor"] == ch.SPECIAL_COLORS["selected"]
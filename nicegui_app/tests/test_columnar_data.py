@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+columnar_data（Parquetデータセット）のテスト
+
+- 書き込み → 読み込みでCSVと同じ内容になること（カラム順・値・欠損）
+- 列射影・パーティション/row group の絞り込み
+- 元CSVの方が新しい場合は使わないこと
+- db_helper のCSVモード（全量読み込み）がデータセットを読み、地域インデックスが同じ行を返すこと
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import columnar_data
+import db_helper
+
+
+def _frame(rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    prefs = np.array(["東京都", "北海道", "大阪府"])
+    row_types = np.array(["SUMMARY", "AGE_GENDER", "RESIDENCE_FLOW"])
+    return pd.DataFrame({
+        "job_type": np.array(["看護師", "介護職"])[rng.integers(0, 2, rows)],
+        "row_type": row_types[rng.integers(0, 3, rows)],
+        "prefecture": prefs[rng.integers(0, 3, rows)],
+        "municipality": [f"市{i % 25}" if i % 13 else None for i in range(rows)],
+        "category1": np.array(["20代", "30代", None], dtype=object)[rng.integers(0, 3, rows)],
+        "applicant_count": rng.integers(0, 500, rows),
+        "avg_age": np.where(rng.random(rows) < 0.8, rng.random(rows) * 30 + 30, np.nan),
+        "id_text": [f"row-{i}" for i in range(rows)],  # 高カーディナリティ（辞書エンコードしない）
+    })
+
+
+@pytest.fixture
+def csv_and_dataset(tmp_path):
+    csv_path = tmp_path / "MapComplete_Complete_All_FIXED.csv"
+    _frame().to_csv(csv_path, index=False, encoding="utf-8-sig")
+    dataset_path = columnar_data.build_from_csv(csv_path)
+    return csv_path, dataset_path
+
+
+def _canonical(df):
+    """比較用: 文字列化してキーでソート"""
+    out = df.astype(object).where(df.notna(), None)
+    return out.sort_values(list(out.columns), key=lambda s: s.astype(str)).reset_index(drop=True)
+
+
+def test_round_trip_matches_csv(csv_and_dataset):
+    csv_path, dataset_path = csv_and_dataset
+    expected = pd.read_csv(csv_path, encoding="utf-8-sig", low_memory=False)
+    actual = columnar_data.read_dataset(dataset_path)
+
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(_canonical(actual), _canonical(expected))
+    assert isinstance(actual["prefecture"].dtype, pd.CategoricalDtype)
+    assert not isinstance(actual["id_text"].dtype, pd.CategoricalDtype)
+    assert actual["applicant_count"].dtype == expected["applicant_count"].dtype
+    assert columnar_data.read_dataset_info(dataset_path)["rows"] == len(expected)
+
+
+def test_projection_and_filters(csv_and_dataset):
+    csv_path, dataset_path = csv_and_dataset
+    expected = pd.read_csv(csv_path, encoding="utf-8-sig")
+    expected = expected[(expected["row_type"] == "SUMMARY") & expected["prefecture"].isin(["東京都", "北海道"])]
+
+    actual = columnar_data.read_dataset(dataset_path, columns=["municipality", "row_type", "no_such_column"],
+                                        filters={"row_type": "SUMMARY", "prefecture": ["東京都", "北海道"]})
+    assert list(actual.columns) == ["row_type", "municipality"]  # CSVと同じカラム順
+    assert len(actual) == len(expected)
+    assert set(actual["row_type"]) == {"SUMMARY"}
+
+
+def test_stale_dataset_is_skipped(csv_and_dataset):
+    csv_path, dataset_path = csv_and_dataset
+    assert columnar_data.find_dataset([csv_path.parent], csv_names=(csv_path.name,)) == dataset_path
+
+    csv_mtime = csv_path.stat().st_mtime
+    os.utime(dataset_path / columnar_data.MARKER_FILENAME, (csv_mtime - 10, csv_mtime - 10))  # CSVだけ更新された状態
+    assert columnar_data.find_dataset([csv_path.parent], csv_names=(csv_path.name,)) is None
+
+    columnar_data.build_from_csv(csv_path)  # 再生成すれば使われる
+    assert columnar_data.find_dataset([csv_path.parent], csv_names=(csv_path.name,)) == dataset_path
+
+
+def test_incomplete_dataset_is_ignored(tmp_path):
+    (tmp_path / columnar_data.DATASET_DIRNAME / "job_type=看護師").mkdir(parents=True)  # マーカーなし
+    assert columnar_data.find_dataset([tmp_path]) is None
+
+
+@pytest.mark.parametrize("query", [
+    ("SUMMARY", None, None),
+    ("AGE_GENDER", "東京都", None),
+    ("RESIDENCE_FLOW", "大阪府", "市3"),
+    (None, "北海道", "市7"),
+])
+def test_db_helper_loads_dataset(csv_and_dataset, monkeypatch, query):
+    csv_path, _ = csv_and_dataset
+    monkeypatch.setattr(db_helper, "_data_search_dirs", lambda: [csv_path.parent])
+    monkeypatch.setattr(db_helper, "CSV_LAZY_LOAD", False)  # 全量読み込み（遅延読み込みは test_csv_lazy_load.py）
+    monkeypatch.setattr(db_helper, "_csv_dataframe", None)
+    monkeypatch.setattr(db_helper, "_csv_region_index", None)
+    monkeypatch.setattr(db_helper, "read_dataset", read_spy := _Spy(columnar_data.read_dataset))
+
+    with db_helper.job_type_scope("看護師"):
+        actual = db_helper._csv_slice(*query)
+    assert read_spy.calls == 1
+
+    expected = pd.read_csv(csv_path, encoding="utf-8-sig")
+    mask = expected["job_type"] == "看護師"
+    for col, value in zip(("row_type", "prefecture", "municipality"), query):
+        if value:
+            mask &= expected[col] == value
+    assert sorted(actual["id_text"]) == sorted(expected.loc[mask, "id_text"])
+
+
+class _Spy:
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.func(*args, **kwargs)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+get_competing_areas のDB側集計テスト
+
+SQLite（Turso/PostgreSQLと同じSQL）とCSVモードで同じ結果になることを確認する。
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+
+
+def _flow(pref, muni, desired_pref, desired_muni, count, age="30代", gender="女性"):
+    return {"job_type": "介護職", "row_type": "RESIDENCE_FLOW", "prefecture": pref, "municipality": muni,
+            "category1": age, "category2": gender, "count": count, "latitude": None, "longitude": None,
+            "desired_prefecture": desired_pref, "desired_municipality": desired_muni,
+            "applicant_count": None, "male_count": None, "female_count": None}
+
+
+def _summary(pref, muni, lat, lng):
+    return {"job_type": "介護職", "row_type": "SUMMARY", "prefecture": pref, "municipality": muni,
+            "category1": None, "category2": None, "count": 1, "latitude": lat, "longitude": lng,
+            "desired_prefecture": None, "desired_municipality": None,
+            "applicant_count": 1, "male_count": 0, "female_count": 1}
+
+
+ROWS = [
+    _summary("東京都", None, 35.68, 139.69),
+    _summary("東京都", "新宿区", 35.69, 139.70),
+    _summary("東京都", "渋谷区", 35.66, 139.70),
+    _summary("神奈川県", "横浜市", 35.44, 139.64),
+    _flow("東京都", "渋谷区", "東京都", "新宿区", 40),
+    _flow("東京都", "渋谷区", "東京都", "新宿区", 10, age="20代", gender="男性"),
+    _flow("東京都", "渋谷区", "神奈川県", "横浜市", 30),
+    _flow("東京都", "渋谷区", "東京都", "港区", 15),  # SUMMARYになし → 都道府県座標
+    _flow("東京都", "渋谷区", None, None, 5),  # 希望勤務地欠損（合計のみに含む）
+    _flow("東京都", "新宿区", "神奈川県", "横浜市", 100),
+    _flow("神奈川県", "横浜市", "東京都", "渋谷区", 70),
+]
+
+QUERIES = [
+    ("東京都", "渋谷区", None, None),
+    ("東京都", None, None, None),
+    ("東京都", "渋谷区", "30代", "女性"),
+    ("東京都", "全て", "20代", "全て"),
+    ("北海道", None, None, None),
+]
+
+
+@pytest.fixture
+def csv_mode(monkeypatch):
+    df = db_helper._optimize_dtypes(pd.DataFrame(ROWS))
+    sorted_df = db_helper._sort_for_region_index(df)
+    monkeypatch.setattr(db_helper, "USE_CSV_MODE", True)
+    monkeypatch.setattr(db_helper, "_csv_dataframe", sorted_df)
+    monkeypatch.setattr(db_helper, "_csv_region_index", db_helper._build_csv_region_index(sorted_df))
+    db_helper._coord_tables.clear()
+    yield
+    db_helper._coord_tables.clear()
+
+
+@pytest.fixture
+def sqlite_mode(monkeypatch, tmp_path):
+    db_path = tmp_path / "job_seeker.db"
+    with sqlite3.connect(db_path) as conn:
+        pd.DataFrame(ROWS).to_sql("job_seeker_data", conn, index=False)
+    monkeypatch.setattr(db_helper, "USE_CSV_MODE", False)
+    monkeypatch.setattr(db_helper, "_HAS_TURSO", False)
+    monkeypatch.setattr(db_helper, "_lazy_init_turso", lambda: False)
+    monkeypatch.setattr(db_helper, "DATABASE_URL", None)
+    monkeypatch.setattr(db_helper, "DB_PATH", db_path)
+    db_helper._coord_tables.clear()
+    yield
+    db_helper._coord_tables.clear()
+
+
+def _competing(query):
+    return [(r["target_pref"], r["target_muni"], r["count"], r["percentage"], r["lat"])
+            for r in db_helper.get_competing_areas(*query)]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_sqlite_matches_csv_mode(request, query):
+    request.getfixturevalue("csv_mode")
+    expected = _competing(query)
+    request.getfixturevalue("sqlite_mode")
+    assert _competing(query) == expected
+
+
+def test_grouped_result(sqlite_mode):
+    assert _competing(("東京都", "渋谷区", None, None)) == [
+        ("東京都", "新宿区", 50, 50.0, 35.69),
+        ("神奈川県", "横浜市", 30, 30.0, 35.44),
+        ("東京都", "港区", 15, 15.0, 35.68),
+    ]
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+共有座標テーブル（_get_coord_table）のテスト
+
+地図系getterが同じ座標テーブルを使い、refresh_all_cache()まで再構築しないことを確認する。
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+
+
+def _row(job_type, row_type, pref, muni, lat=None, lng=None, count=0, **extra):
+    return {"job_type": job_type, "row_type": row_type, "prefecture": pref, "municipality": muni,
+            "latitude": lat, "longitude": lng, "applicant_count": count, "count": count,
+            "male_count": 0, "female_count": 0, **extra}
+
+
+@pytest.fixture
+def csv_frame(monkeypatch):
+    rows = [
+        _row("介護職", "SUMMARY", "東京都", None, 35.68, 139.69, 300),
+        _row("介護職", "SUMMARY", "東京都", "新宿区", 35.69, 139.70, 200),
+        _row("介護職", "SUMMARY", "東京都", "渋谷区", 35.66, 139.70, 100),
+        _row("介護職", "SUMMARY", "神奈川県", "横浜市", 35.44, 139.64, 50),
+        _row("介護職", "SUMMARY", "北海道", "札幌市"),  # 座標なし
+        _row("看護師", "SUMMARY", "東京都", "新宿区", 1.0, 2.0, 10),
+        _row("介護職", "RESIDENCE_FLOW", "神奈川県", "横浜市", count=30,
+             desired_prefecture="東京都", desired_municipality="新宿区"),
+        _row("介護職", "RESIDENCE_FLOW", "東京都", "渋谷区", count=20,
+             desired_prefecture="東京都", desired_municipality="新宿区"),
+        _row("介護職", "RESIDENCE_FLOW", "東京都", "渋谷区", count=5,
+             desired_prefecture="神奈川県", desired_municipality="川崎市"),
+    ]
+    df = db_helper._optimize_dtypes(pd.DataFrame(rows))
+    sorted_df = db_helper._sort_for_region_index(df)
+    monkeypatch.setattr(db_helper, "USE_CSV_MODE", True)
+    monkeypatch.setattr(db_helper, "_csv_dataframe", sorted_df)
+    monkeypatch.setattr(db_helper, "_csv_region_index", db_helper._build_csv_region_index(sorted_df))
+    monkeypatch.setattr(db_helper, "_job_type_provider", None)
+    db_helper.clear_cache()
+    db_helper._coord_tables.clear()
+    yield
+    db_helper.clear_cache()
+    db_helper._coord_tables.clear()
+
+
+def test_coord_table_lookups(csv_frame):
+    table = db_helper._get_coord_table()
+    assert table["municipality"][("東京都", "新宿区")] == (35.69, 139.70)
+    assert ("北海道", "札幌市") not in table["municipality"]
+    # 都道府県行を優先、ない場合は市区町村の座標で代用
+    assert table["prefecture"]["東京都"] == pytest.approx((35.68, 139.69))
+    assert table["prefecture"]["神奈川県"] == (35.44, 139.64)
+
+    with db_helper.job_type_scope("看護師"):
+        assert db_helper._get_coord_table()["municipality"][("東京都", "新宿区")] == (1.0, 2.0)
+
+
+def test_map_getters_share_table(csv_frame, monkeypatch):
+    markers = db_helper.get_map_markers()
+    assert {m["name"] for m in markers} == {"東京都", "新宿区", "渋谷区", "横浜市"}
+    tokyo = next(m for m in markers if m["name"] == "東京都")
+    assert tokyo["type"] == "prefecture" and tokyo["count"] == 300
+
+    # 以降のgetterはSUMMARYを再取得しない
+    def fail(*args, **kwargs):
+        raise AssertionError("coordinate table rebuilt")
+    monkeypatch.setattr(db_helper, "_build_coord_table", fail)
+
+    inflow = db_helper.get_inflow_sources("東京都", "新宿区")
+    assert [(r["source_muni"], r["lat"]) for r in inflow] == [("横浜市", 35.44), ("渋谷区", 35.66)]
+
+    competing = db_helper.get_competing_areas("東京都", "渋谷区")
+    # 川崎市はSUMMARYにないため都道府県座標で代用
+    assert {(r["target_muni"], r["lat"]) for r in competing} == {("新宿区", 35.69), ("川崎市", 35.44)}
+
+    flows = db_helper.get_flow_lines()
+    assert [(f["from_pref"], f["to_pref"]) for f in flows] == [("神奈川県", "東京都"), ("東京都", "神奈川県")]
+
+
+def test_refresh_all_cache_rebuilds_table(csv_frame):
+    db_helper._get_coord_table()
+    db_helper.clear_cache()
+    assert db_helper.DEFAULT_JOB_TYPE in db_helper._coord_tables
+
+    db_helper.refresh_all_cache()
+    assert db_helper.get_cache_stats()["coord_tables"] == []
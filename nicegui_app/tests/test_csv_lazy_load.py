@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+CSVモードの遅延読み込み（db_helper._csv_slice / _csv_partitions）のテスト
+
+- 全量読み込みと同じ行が返ること（CSV・Parquetデータセットの両方）
+- 宣言したカラム・必要な row_type だけが読み込まれ、cache_manager の予算内に保持されること
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import columnar_data
+import db_helper
+from cache_manager import cache_manager
+
+ROW_TYPES = ["SUMMARY", "AGE_GENDER", "RESIDENCE_FLOW", "WORKSTYLE_DISTRIBUTION"]
+
+
+def _frame(rows=900, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "job_type": np.array(["看護師", "介護職"])[rng.integers(0, 2, rows)],
+        "row_type": np.array(ROW_TYPES)[rng.integers(0, len(ROW_TYPES), rows)],
+        "prefecture": np.array(["東京都", "北海道", "大阪府"])[rng.integers(0, 3, rows)],
+        "municipality": [f"市{i % 30}" if i % 11 else None for i in range(rows)],
+        "category1": np.array(["20代", "30代", "40代"])[rng.integers(0, 3, rows)],
+        "category2": np.array(["男性", "女性"])[rng.integers(0, 2, rows)],
+        "count": np.arange(rows),
+        "desired_prefecture": np.array(["東京都", "神奈川県"])[rng.integers(0, 2, rows)],
+        "latitude": rng.random(rows) + 35,
+    })
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def data_dir(request, tmp_path, monkeypatch):
+    csv_path = tmp_path / db_helper.CSV_FILENAME
+    _frame().to_csv(csv_path, index=False, encoding="utf-8-sig")
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+        columnar_data.build_from_csv(csv_path)
+    monkeypatch.setattr(db_helper, "_data_search_dirs", lambda: [tmp_path])
+    monkeypatch.setattr(db_helper, "CSV_LAZY_LOAD", True)
+    monkeypatch.setattr(db_helper, "_csv_dataframe", None)
+    monkeypatch.setattr(db_helper, "_csv_region_index", None)
+    monkeypatch.setattr(db_helper, "_csv_catalog_data", None)
+    monkeypatch.setattr(db_helper, "_CSV_SCAN_CHUNK_ROWS", 128)
+    cache_manager.clear("csv_partition")
+    yield csv_path
+    cache_manager.clear("csv_partition")
+
+
+def _expected(csv_path, job_type, row_type=None, prefecture=None, municipality=None):
+    df = pd.read_csv(csv_path, encoding="utf-8-sig")
+    mask = df["job_type"] == job_type
+    for col, value in (("row_type", row_type), ("prefecture", prefecture), ("municipality", municipality)):
+        if value:
+            mask &= df[col] == value
+    return df[mask]
+
+
+@pytest.mark.parametrize("query", [
+    ("SUMMARY", None, None),
+    ("AGE_GENDER", "東京都", None),
+    ("RESIDENCE_FLOW", "大阪府", "市3"),
+    ("WORKSTYLE_DISTRIBUTION", None, "市7"),
+    (None, "北海道", None),
+    (None, "東京都", "市2"),
+    (None, None, None),
+])
+def test_lazy_slice_matches_full_frame(data_dir, query):
+    with db_helper.job_type_scope("看護師"):
+        actual = db_helper._csv_slice(*query, columns=["count", "category1"])
+    expected = _expected(data_dir, "看護師", *query)
+    assert sorted(actual["count"]) == sorted(expected["count"])
+    assert {"prefecture", "municipality", "category1"} <= set(actual.columns)
+    assert "desired_prefecture" not in actual.columns
+
+
+def test_only_declared_partitions_and_columns_are_loaded(data_dir):
+    with db_helper.job_type_scope("看護師"):
+        prefectures = db_helper._csv_slice(columns=["prefecture"])
+        assert set(prefectures["prefecture"]) == {"東京都", "北海道", "大阪府"}
+        assert cache_manager.keys("csv_partition") == []  # キー列だけならカタログで足りる
+
+        summary = db_helper._csv_slice("SUMMARY", columns=["latitude"])
+        assert cache_manager.keys("csv_partition") == [("看護師", "SUMMARY")]
+        assert "count" not in summary.columns
+
+        # 宣言が増えたらカラムを追加して読み直す（エントリは1つのまま）
+        summary = db_helper._csv_slice("SUMMARY", columns=["latitude", "count"])
+        assert cache_manager.keys("csv_partition") == [("看護師", "SUMMARY")]
+        expected = _expected(data_dir, "看護師", "SUMMARY")
+        assert sorted(summary["count"]) == sorted(expected["count"])
+        assert np.allclose(sorted(summary["latitude"]), sorted(expected["latitude"]))
+
+        # 既存カラムの範囲内ならキャッシュから返す
+        hits = cache_manager.stats()["namespaces"]["csv_partition"]["hits"]
+        db_helper._csv_slice("SUMMARY", "東京都", columns=["count"])
+        assert cache_manager.stats()["namespaces"]["csv_partition"]["hits"] == hits + 1
+
+
+def test_partitions_are_budgeted_and_evicted_per_job_type(data_dir):
+    for job_type in ("看護師", "介護職"):
+        with db_helper.job_type_scope(job_type):
+            db_helper._csv_slice(None, None, None, columns=["count"])
+    assert len(cache_manager.keys("csv_partition")) == 2 * len(ROW_TYPES)
+    assert cache_manager.stats()["namespaces"]["csv_partition"]["bytes"] > 0
+
+    db_helper._evict_job_type("介護職")
+    assert {key[0] for key in cache_manager.keys("csv_partition")} == {"看護師"}
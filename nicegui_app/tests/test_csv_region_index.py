@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+CSVモード地域インデックス（_csv_slice）のテスト
+
+従来のbooleanマスク走査と同じ行が返ることを確認する。
+初回読み込み中に並行するgetterが、インデックス未構築のフレームを参照しないことも確認する。
+"""
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+
+
+@pytest.fixture
+def indexed_frame(monkeypatch):
+    rows = []
+    for job_type in ("介護職", "看護師"):
+        for row_type in ("SUMMARY", "RESIDENCE_FLOW", "AGE_GENDER"):
+            for pref, munis in (("東京都", ["新宿区", "渋谷区", None]), ("北海道", ["札幌市", None])):
+                for muni in munis:
+                    rows.append({"job_type": job_type, "row_type": row_type,
+                                 "prefecture": pref, "municipality": muni, "count": len(rows)})
+    # 読み込み順をシャッフル（ソートが必要な状態）
+    df = pd.DataFrame(rows).sample(frac=1, random_state=0).reset_index(drop=True)
+    df = db_helper._optimize_dtypes(df)
+
+    sorted_df = db_helper._sort_for_region_index(df)
+    monkeypatch.setattr(db_helper, "_csv_dataframe", sorted_df)
+    monkeypatch.setattr(db_helper, "_csv_region_index", db_helper._build_csv_region_index(sorted_df))
+    return df
+
+
+def _mask_scan(df, job_type, row_type=None, prefecture=None, municipality=None):
+    mask = df["job_type"] == job_type
+    if row_type:
+        mask &= df["row_type"] == row_type
+    if prefecture:
+        mask &= df["prefecture"] == prefecture
+    if municipality:
+        mask &= df["municipality"] == municipality
+    return df[mask]
+
+
+@pytest.mark.parametrize("query", [
+    (None, None, None),
+    ("SUMMARY", None, None),
+    ("SUMMARY", "東京都", None),
+    ("RESIDENCE_FLOW", "東京都", "渋谷区"),
+    (None, "東京都", "新宿区"),
+    (None, "北海道", None),
+    ("AGE_GENDER", None, "札幌市"),
+    ("SUMMARY", "沖縄県", None),
+])
+def test_slice_matches_mask_scan(indexed_frame, query):
+    with db_helper.job_type_scope("看護師"):
+        actual = db_helper._csv_slice(*query)
+    expected = _mask_scan(indexed_frame, "看護師", *query)
+    assert sorted(actual["count"].tolist()) == sorted(expected["count"].tolist())
+
+
+def test_prefix_slice_is_view(indexed_frame):
+    with db_helper.job_type_scope("介護職"):
+        sliced = db_helper._csv_slice("SUMMARY", "東京都")
+    assert len(sliced) == 3
+    assert np.shares_memory(sliced["count"].to_numpy(), db_helper._csv_dataframe["count"].to_numpy())
+
+
+def test_filtered_data_charges_shared_slice_shallow(indexed_frame, monkeypatch):
+    from cache_manager import cache_manager
+    monkeypatch.setattr(db_helper, "USE_CSV_MODE", True)
+    frame = db_helper._csv_dataframe.astype({"prefecture": object, "municipality": object})  # 文字列は行間で共有
+    monkeypatch.setattr(db_helper, "_csv_dataframe", frame)
+    monkeypatch.setattr(db_helper, "_csv_region_index", db_helper._build_csv_region_index(frame))
+    cache_manager.clear("filtered_data")
+    with db_helper.job_type_scope("介護職"):
+        result = db_helper.get_filtered_data("東京都")
+    entry_bytes = cache_manager.stats()["namespaces"]["filtered_data"]["bytes"]
+    assert entry_bytes == result.memory_usage(index=True, deep=False).sum()
+    assert entry_bytes < result.memory_usage(index=True, deep=True).sum()
+    cache_manager.clear("filtered_data")
+
+
+def test_concurrent_first_load(indexed_frame, tmp_path, monkeypatch):
+    csv_path = tmp_path / db_helper.CSV_FILENAME
+    indexed_frame.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    monkeypatch.setattr(db_helper, "CSV_LAZY_LOAD", False)
+    monkeypatch.setattr(db_helper, "_csv_dataframe", None)
+    monkeypatch.setattr(db_helper, "_csv_region_index", None)
+    monkeypatch.setattr(db_helper, "_find_columnar_path", lambda: None)
+    finds = []
+    monkeypatch.setattr(db_helper, "_find_csv_path", lambda: finds.append(1) or (csv_path, False))
+    build = db_helper._build_csv_region_index
+
+    def slow_build(df):
+        time.sleep(0.2)  # インデックス構築中に他のgetterが到着する
+        return build(df)
+    monkeypatch.setattr(db_helper, "_build_csv_region_index", slow_build)
+
+    barrier = threading.Barrier(4)
+
+    def getter(query):
+        barrier.wait()
+        with db_helper.job_type_scope("看護師"):
+            return db_helper._csv_slice(*query)
+
+    queries = [("SUMMARY", "東京都", None), (None, "北海道", None), ("AGE_GENDER", None, "札幌市"), (None, None, None)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(getter, queries))
+
+    assert len(finds) == 1  # パースは1回のみ
+    for query, actual in zip(queries, results):
+        expected = _mask_scan(indexed_frame, "看護師", *query)
+        assert sorted(actual["count"].tolist()) == sorted(expected["count"].tolist())
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+db_async（非同期ファサード）のテスト
+
+同時接続ユーザーを模擬し、ブロッキングするgetterの実行中もイベントループが応答し続けること、
+各ユーザーの職種がワーカースレッドに引き継がれることを確認する。
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+import db_async
+
+QUERY_SECONDS = 0.2  # 1クエリのブロッキング時間（同期httpx + pandas集計を模擬）
+USERS = 8
+
+
+@pytest.fixture(autouse=True)
+def no_provider(monkeypatch):
+    monkeypatch.setattr(db_helper, "_job_type_provider", None)
+
+
+@db_helper._job_type_scoped
+def _blocking_getter(prefecture):
+    time.sleep(QUERY_SECONDS)
+    return prefecture, db_helper.get_current_job_type(), threading.current_thread().name
+
+
+async def _heartbeat(stop: asyncio.Event, gaps: list):
+    """イベントループの応答間隔を計測（他ユーザーのWebSocket処理を模擬）"""
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.01)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+
+async def _user(job_type: str, prefecture: str):
+    with db_helper.job_type_scope(job_type):
+        return await db_async.run_in_thread(_blocking_getter, prefecture)
+
+
+async def _load_test():
+    stop, gaps = asyncio.Event(), []
+    heartbeat = asyncio.create_task(_heartbeat(stop, gaps))
+    job_types = ["介護職", "看護師"]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_user(job_types[i % 2], f"pref{i}") for i in range(USERS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+    return results, elapsed, max(gaps)
+
+
+def test_concurrent_users_do_not_block_event_loop():
+    results, elapsed, max_gap = asyncio.run(_load_test())
+
+    # 各ユーザーは自分の地域・職種の結果を受け取る
+    assert [(pref, jt) for pref, jt, _ in results] == [
+        (f"pref{i}", "介護職" if i % 2 == 0 else "看護師") for i in range(USERS)
+    ]
+    # 処理はイベントループ外（ワーカースレッド）で実行される
+    assert all(thread != threading.main_thread().name for _, _, thread in results)
+    # 直列実行（USERS * QUERY_SECONDS）より十分速い
+    assert elapsed < USERS * QUERY_SECONDS / 2
+    # クエリ実行中もイベントループは応答し続ける（1クエリ分ブロックされない）
+    assert max_gap < QUERY_SECONDS / 2
+
+
+def test_session_job_type_resolved_on_event_loop(monkeypatch):
+    """セッションストレージ（プロバイダ）はイベントループ側でのみ参照できる"""
+    loop_thread = threading.current_thread()
+
+    def provider():
+        if threading.current_thread() is not loop_thread:
+            raise RuntimeError("outside of UI context")
+        return "保育士"
+
+    db_helper.set_job_type_provider(provider)
+    _, job_type, _ = asyncio.run(db_async.run_in_thread(_blocking_getter, "東京都"))
+    assert job_type == "保育士"
+
+
+def test_gather_in_threads_keeps_order():
+    results = asyncio.run(db_async.gather_in_threads(
+        (_blocking_getter, "北海道"),
+        (_blocking_getter, "沖縄県"),
+    ))
+    assert [pref for pref, _, _ in results] == ["北海道", "沖縄県"]
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+フローキューブ（flow_cube.FlowCube）と RESIDENCE_FLOW 系getterのテスト
+
+疎行列の行・列スライスが行単位の集計と一致すること、getterが職種ごとに1度だけ作ったキューブから答えることを確認する。
+ランダムな合成データで、キューブ化前のgetter（行データをpandasで集計）と同じ結果になることも確認する。
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+import flow_cube
+
+
+def _flow(pref, muni, desired_pref, desired_muni, count, age="30代", gender="女性", lat=None, lng=None):
+    return {"job_type": "介護職", "row_type": "RESIDENCE_FLOW", "prefecture": pref, "municipality": muni,
+            "category1": age, "category2": gender, "count": count, "latitude": lat, "longitude": lng,
+            "desired_prefecture": desired_pref, "desired_municipality": desired_muni,
+            "applicant_count": None, "male_count": None, "female_count": None}
+
+
+def _summary(pref, muni, lat, lng):
+    return {"job_type": "介護職", "row_type": "SUMMARY", "prefecture": pref, "municipality": muni,
+            "category1": None, "category2": None, "count": 1, "latitude": lat, "longitude": lng,
+            "desired_prefecture": None, "desired_municipality": None,
+            "applicant_count": 1, "male_count": 0, "female_count": 1}
+
+
+ROWS = [
+    _summary("東京都", None, 35.68, 139.69),
+    _summary("東京都", "新宿区", 35.69, 139.70),
+    _summary("東京都", "渋谷区", 35.66, 139.70),
+    _summary("神奈川県", None, 35.45, 139.64),
+    _summary("神奈川県", "横浜市", 35.44, 139.64),
+    _summary("神奈川県", "川崎市", 35.53, 139.70),
+    _summary("北海道", None, 43.06, 141.35),
+    _flow("東京都", "渋谷区", "東京都", "新宿区", 40),
+    _flow("東京都", "渋谷区", "東京都", "新宿区", 10, age="20代", gender="男性"),
+    _flow("東京都", "渋谷区", "神奈川県", "横浜市", 30, lat=35.60, lng=139.60),
+    _flow("東京都", "渋谷区", "東京都", "港区", 15),
+    _flow("東京都", "渋谷区", None, None, 5),  # 希望勤務地欠損（合計のみに含む）
+    _flow("東京都", "新宿区", "神奈川県", "横浜市", 100, age="40代"),
+    _flow("神奈川県", "横浜市", "東京都", "渋谷区", 70),
+    _flow("神奈川県", "川崎市", "東京都", "新宿区", 25, gender="男性"),
+    _flow("神奈川県", "横浜市", "北海道", "札幌市", 60),  # 隣接県フィルタで除外
+]
+
+
+@pytest.fixture
+def csv_mode(monkeypatch):
+    df = db_helper._optimize_dtypes(pd.DataFrame(ROWS))
+    sorted_df = db_helper._sort_for_region_index(df)
+    monkeypatch.setattr(db_helper, "USE_CSV_MODE", True)
+    monkeypatch.setattr(db_helper, "_csv_dataframe", sorted_df)
+    monkeypatch.setattr(db_helper, "_csv_region_index", db_helper._build_csv_region_index(sorted_df))
+    monkeypatch.setattr(db_helper, "_job_type_provider", None)
+    monkeypatch.setattr(db_helper, "_lazy_init_turso", lambda: True)
+    db_helper.clear_cache()
+    db_helper._coord_tables.clear()
+    yield
+    db_helper.clear_cache()
+    db_helper._coord_tables.clear()
+
+
+@pytest.fixture
+def cube():
+    flows = pd.DataFrame([row for row in ROWS if row["row_type"] == "RESIDENCE_FLOW"])
+    return flow_cube.build_flow_cube(flows)
+
+
+def _pairs(cube, origin, dest, counts):
+    return {(cube.area_municipality[o], cube.area_municipality[d]): int(c) for o, d, c in zip(origin, dest, counts)}
+
+
+def test_area_dictionary_is_sorted(cube):
+    keys = list(zip(cube.area_prefecture, cube.area_municipality))
+    assert keys[-1] == (None, None)  # 欠損は末尾
+    assert keys[:-1] == sorted(keys[:-1], key=lambda k: (k[0], k[1] is None, k[1] or ""))
+    assert cube.prefectures == ["北海道", "東京都", "神奈川県"]
+    assert cube.areas("東京都", "渋谷区").tolist() == [keys.index(("東京都", "渋谷区"))]
+    assert cube.areas("沖縄県").tolist() == []
+    assert len(cube.areas()) == cube.n_areas
+
+
+def test_row_and_column_slices(cube):
+    shibuya = cube.areas("東京都", "渋谷区")
+    assert _pairs(cube, *cube.flows_from(shibuya)) == {
+        ("渋谷区", "新宿区"): 50, ("渋谷区", "横浜市"): 30, ("渋谷区", "港区"): 15, ("渋谷区", None): 5}
+    assert _pairs(cube, *cube.flows_from(shibuya, age_group="30代", gender="女性")) == {
+        ("渋谷区", "新宿区"): 40, ("渋谷区", "横浜市"): 30, ("渋谷区", "港区"): 15, ("渋谷区", None): 5}
+    assert _pairs(cube, *cube.flows_to(cube.areas("東京都", "新宿区"))) == {
+        ("渋谷区", "新宿区"): 50, ("川崎市", "新宿区"): 25}
+    assert _pairs(cube, *cube.flows_to(cube.areas("東京都", "新宿区"), gender="男性")) == {
+        ("渋谷区", "新宿区"): 10, ("川崎市", "新宿区"): 25}
+
+    # 居住地・希望勤務地のどちらかが神奈川県（同じ組み合わせは1度だけ）
+    origin, dest, counts = cube.flows_touching(cube.areas("神奈川県"))
+    assert sum(counts) == 30 + 100 + 70 + 25 + 60
+    assert len(set(zip(origin.tolist(), dest.tolist()))) == len(counts)
+
+    # 行単位の合計と一致
+    flows = [row for row in ROWS if row["row_type"] == "RESIDENCE_FLOW"]
+    assert cube.matrix().sum() == sum(row["count"] for row in flows)
+
+
+def test_prefecture_flows(cube):
+    origin, dest, counts = cube.prefecture_flows("東京都")
+    pairs = {(cube.prefectures[o], cube.prefectures[d]): int(c) for o, d, c in zip(origin, dest, counts)}
+    assert pairs == {("東京都", "東京都"): 65, ("東京都", "神奈川県"): 130}
+    origin, dest, counts = cube.prefecture_flows("東京都", touching=True)
+    assert len(counts) == 3 and sum(counts) == 65 + 130 + 95
+
+
+def test_slices_are_built_once(cube):
+    assert cube.matrix("30代") is cube.matrix("30代")
+    assert cube.column_matrix() is cube.column_matrix()
+    assert cube.prefecture_matrix() is cube.prefecture_matrix()
+    before = cube.nbytes
+    cube.matrix("40代", "女性")
+    assert cube.nbytes > before
+
+
+def test_rank_flows_breaks_ties_by_area():
+    order = flow_cube.rank_flows(np.array([2, 1, 0, 1]), np.array([0, 3, 1, 0]), np.array([5, 7, 5, 5]))
+    assert order.tolist() == [1, 2, 3, 0]
+
+
+def test_flow_getters(csv_mode):
+    assert [(r["origin"], r["destination"], r["count"]) for r in db_helper.get_muni_flow_top10("東京都")] == [
+        ("新宿区", "横浜市", 100), ("渋谷区", "新宿区", 50), ("渋谷区", "横浜市", 30), ("渋谷区", "港区", 15)]
+    assert [(r["origin"], r["destination"]) for r in db_helper.get_muni_flow_top10("神奈川県", "横浜市")] == [
+        ("横浜市", "渋谷区")]
+    assert [(r["origin"], r["destination"], r["count"]) for r in db_helper.get_pref_flow_top10("東京都")] == [
+        ("東京都", "神奈川県", 130)]
+
+    inflow = db_helper.get_inflow_sources("東京都", "新宿区")
+    assert [(r["source_pref"], r["source_muni"], r["count"]) for r in inflow] == [
+        ("東京都", "渋谷区", 50), ("神奈川県", "川崎市", 25)]
+
+    balance = {(r["prefecture"], r["municipality"]): r for r in db_helper.get_flow_balance("神奈川県")}
+    assert (balance[("神奈川県", "横浜市")]["inflow"], balance[("神奈川県", "横浜市")]["outflow"]) == (130, 130)
+    assert balance[("東京都", "渋谷区")]["lat"] == 35.60  # 居住地の行の座標
+    assert ("北海道", "札幌市") not in balance  # 座標なし（市区町村がある地域は都道府県座標で補わない）
+    assert balance[("神奈川県", "川崎市")]["net_flow"] == -25
+
+    lines = db_helper.get_flow_lines("東京都")
+    assert [(r["from_pref"], r["to_pref"], r["count"]) for r in lines] == [
+        ("東京都", "神奈川県", 130), ("神奈川県", "東京都", 95)]
+
+
+def test_cube_built_once_per_job_type(csv_mode, monkeypatch):
+    calls = []
+    load = db_helper._load_flow_cube
+    monkeypatch.setattr(db_helper, "_load_flow_cube", lambda job_type: calls.append(job_type) or load(job_type))
+    db_helper.get_flow_balance("東京都", age_group="30代")
+    db_helper.get_inflow_sources("東京都", "新宿区", gender="男性")
+    db_helper.get_muni_flow_top10("東京都")
+    db_helper.get_flow_lines()
+    assert calls == ["介護職"]
+    db_helper.clear_cache()
+    db_helper.get_flow_lines()
+    assert calls == ["介護職", "介護職"]
+
+
+# ========================================
+# キューブ化前のgetterとの一致（ランダムな合成データ）
+# ========================================
+RANDOM_AREAS = {
+    "東京都": ["新宿区", "渋谷区", "中央区"],
+    "神奈川県": ["横浜市", "川崎市"],
+    "埼玉県": ["さいたま市", "川口市"],
+    "大阪府": ["大阪市", "中央区"],  # 市区町村名が他県と重複
+    "北海道": ["札幌市"],
+}
+AGES = ["20代", "30代", "40代", "50代以上"]
+GENDERS = ["男性", "女性"]
+
+
+def _random_rows(seed):
+    rng = np.random.default_rng(seed)
+    areas = [(pref, muni) for pref, munis in RANDOM_AREAS.items() for muni in munis]
+    rows = []
+    for pref, munis in RANDOM_AREAS.items():
+        rows.append(_summary(pref, None, *rng.uniform(30, 45, 2)))
+        rows += [_summary(pref, muni, *rng.uniform(30, 45, 2)) for muni in munis[:-1]]  # 最後の市区町村は座標なし
+    flow_coords = {area: tuple(rng.uniform(30, 45, 2)) for area in areas[::3]}  # 居住地の行に座標がある地域
+    for _ in range(400):
+        origin = areas[rng.integers(len(areas))]
+        dest = areas[rng.integers(len(areas))] if rng.random() > 0.05 else (None, None)
+        lat, lng = flow_coords.get(origin, (None, None))
+        # 件数は大きな乱数（集計値の同順位を避け、並び順まで比較できるようにする）
+        rows.append(_flow(*origin, *dest, int(rng.integers(1, 10**6)),
+                          age=AGES[rng.integers(len(AGES))], gender=GENDERS[rng.integers(2)], lat=lat, lng=lng))
+    return rows
+
+
+@pytest.fixture(params=[0, 1, 2])
+def random_csv_mode(request, monkeypatch):
+    rows = _random_rows(request.param)
+    df = db_helper._optimize_dtypes(pd.DataFrame(rows))
+    sorted_df = db_helper._sort_for_region_index(df)
+    monkeypatch.setattr(db_helper, "USE_CSV_MODE", True)
+    monkeypatch.setattr(db_helper, "_csv_dataframe", sorted_df)
+    monkeypatch.setattr(db_helper, "_csv_region_index", db_helper._build_csv_region_index(sorted_df))
+    monkeypatch.setattr(db_helper, "_job_type_provider", None)
+    monkeypatch.setattr(db_helper, "_lazy_init_turso", lambda: True)
+    db_helper.clear_cache()
+    db_helper._coord_tables.clear()
+    frame = pd.DataFrame(rows)  # object列（キューブ化前のCSVモードはcategory列の比較で失敗していたため）
+    yield frame[frame["row_type"] == "RESIDENCE_FLOW"], frame[frame["row_type"] == "SUMMARY"]
+    db_helper.clear_cache()
+    db_helper._coord_tables.clear()
+
+
+def _legacy_pref_flow_top10(flows, prefecture=None):
+    """キューブ化前の get_pref_flow_top10（居住地で絞り込み → 都道府県の組み合わせで集計）"""
+    df = flows if prefecture is None else flows[flows["prefecture"] == prefecture]
+    df = df[df["prefecture"].notna() & df["desired_prefecture"].notna()]
+    df = df[df["prefecture"] != df["desired_prefecture"]]
+    agg = df.groupby(["prefecture", "desired_prefecture"])["count"].sum().reset_index()
+    result = []
+    for _, row in agg.sort_values("count", ascending=False).head(30).iterrows():
+        if db_helper.is_realistic_flow(row["prefecture"], row["desired_prefecture"]):
+            result.append({"origin": row["prefecture"], "destination": row["desired_prefecture"],
+                           "count": int(row["count"])})
+            if len(result) >= 10:
+                break
+    return result
+
+
+def _legacy_muni_flow_top10(flows, prefecture=None, municipality=None):
+    """キューブ化前の get_muni_flow_top10"""
+    df = flows
+    if prefecture:
+        df = df[df["prefecture"] == prefecture]
+    if municipality:
+        df = df[df["municipality"] == municipality]
+    df = df[df["municipality"].notna() & df["desired_municipality"].notna()]
+    df = df[df["municipality"] != df["desired_municipality"]]
+    group_cols = ["prefecture", "municipality", "desired_prefecture", "desired_municipality"]
+    agg = df.groupby(group_cols)["count"].sum().reset_index().sort_values("count", ascending=False).head(50)
+    result = []
+    for _, row in agg.iterrows():
+        if db_helper.is_realistic_flow(row["prefecture"], row["desired_prefecture"]):
+            result.append({"origin": row["municipality"], "origin_pref": row["prefecture"],
+                           "destination": row["desired_municipality"], "destination_pref": row["desired_prefecture"],
+                           "count": int(row["count"])})
+    return result[:10]
+
+
+def _filter_attributes(df, age_group, gender):
+    if age_group:
+        df = df[df["category1"] == age_group]
+    if gender:
+        df = df[df["category2"] == gender]
+    return df
+
+
+def _legacy_inflow_sources(flows, coord_map, target_prefecture, target_municipality=None,
+                           age_group=None, gender=None):
+    """キューブ化前の get_inflow_sources"""
+    df = flows[flows["desired_prefecture"] == target_prefecture]
+    if target_municipality:
+        df = df[df["desired_municipality"] == target_municipality]
+    df = _filter_attributes(df, age_group, gender)
+    grouped = df.groupby(["prefecture", "municipality"])["count"].sum().reset_index()
+    results = []
+    for _, row in grouped.iterrows():
+        coords = coord_map.get((row["prefecture"], row["municipality"]))
+        if coords:
+            results.append({"source_pref": row["prefecture"], "source_muni": row["municipality"],
+                            "count": int(row["count"]), "lat": coords[0], "lng": coords[1]})
+    results.sort(key=lambda x: x["count"], reverse=True)
+    return results
+
+
+def _legacy_flow_balance(flows, summary, prefecture=None, age_group=None, gender=None):
+    """キューブ化前の get_flow_balance（座標はSUMMARY行から）"""
+    df = _filter_attributes(flows, age_group, gender)
+    if prefecture:
+        df = df[(df["prefecture"] == prefecture) | (df["desired_prefecture"] == prefecture)]
+    outflow = df.groupby(["prefecture", "municipality"]).agg(
+        {"count": "sum", "latitude": "first", "longitude": "first"}).reset_index()
+    outflow = outflow.rename(columns={"count": "outflow"})
+    inflow = df.groupby(["desired_prefecture", "desired_municipality"])["count"].sum().reset_index()
+    inflow = inflow.rename(columns={"desired_prefecture": "prefecture", "desired_municipality": "municipality",
+                                    "count": "inflow"})
+    coords = {}
+    for _, row in summary.iterrows():
+        key = f"{row['prefecture']}_{row['municipality']}" if row["municipality"] else row["prefecture"]
+        coords[key] = (float(row["latitude"]), float(row["longitude"]))
+    merged = pd.merge(outflow, inflow, on=["prefecture", "municipality"], how="outer").fillna(0)
+    results = []
+    for _, row in merged.iterrows():
+        pref, muni = row["prefecture"], row["municipality"]
+        inflow_count, outflow_count = int(row["inflow"]), int(row["outflow"])
+        total = inflow_count + outflow_count
+        lat, lng = float(row["latitude"] or 0), float(row["longitude"] or 0)
+        if lat == 0 or lng == 0:
+            lat, lng = coords.get(f"{pref}_{muni}" if muni else pref, (lat, lng))
+        if lat != 0 and lng != 0 and total > 0:
+            results.append({"prefecture": pref, "municipality": muni, "inflow": inflow_count,
+                            "outflow": outflow_count, "net_flow": inflow_count - outflow_count,
+                            "ratio": round(inflow_count / total, 3), "lat": lat, "lng": lng})
+    results.sort(key=lambda x: abs(x["net_flow"]), reverse=True)
+    return results[:200]
+
+
+def _legacy_flow_lines(flows, pref_coords, prefecture=None):
+    """キューブ化前の get_flow_lines（RESIDENCE_FLOWの1行ごとに1本、上位100本への切り詰めなし）"""
+    df = flows
+    if prefecture:
+        df = df[(df["prefecture"] == prefecture) | (df["desired_prefecture"] == prefecture)]
+    return [(row["prefecture"], row["desired_prefecture"], int(row["count"])) for _, row in df.iterrows()
+            if row["prefecture"] in pref_coords and row["desired_prefecture"] in pref_coords
+            and row["prefecture"] != row["desired_prefecture"]]
+
+
+def test_getters_match_legacy(random_csv_mode):
+    flows, summary = random_csv_mode
+    for prefecture in [None] + list(RANDOM_AREAS):
+        assert db_helper.get_pref_flow_top10(prefecture) == _legacy_pref_flow_top10(flows, prefecture)
+        assert db_helper.get_muni_flow_top10(prefecture) == _legacy_muni_flow_top10(flows, prefecture)
+        for municipality in RANDOM_AREAS.get(prefecture, []):
+            assert (db_helper.get_muni_flow_top10(prefecture, municipality)
+                    == _legacy_muni_flow_top10(flows, prefecture, municipality))
+
+    coord_map = db_helper._get_coord_table()["municipality"]
+    for prefecture, munis in RANDOM_AREAS.items():
+        for municipality in [None] + munis:
+            for age_group, gender in [(None, None), ("30代", None), (None, "男性"), ("50代以上", "女性")]:
+                assert (db_helper.get_inflow_sources(prefecture, municipality, age_group=age_group, gender=gender)
+                        == _legacy_inflow_sources(flows, coord_map, prefecture, municipality, age_group, gender))
+
+    for prefecture in [None] + list(RANDOM_AREAS):
+        for age_group, gender in [(None, None), ("20代", None), (None, "女性"), ("40代", "男性")]:
+            actual = db_helper.get_flow_balance(prefecture, age_group=age_group, gender=gender)
+            expected = _legacy_flow_balance(flows, summary, prefecture, age_group, gender)
+            assert actual == pytest.approx(expected)
+
+
+def test_flow_lines_sum_legacy_lines_per_pair(random_csv_mode):
+    """get_flow_lines は従来の1行1本の線を都道府県の組み合わせごとに合計した1本（意図した変更）"""
+    flows, _ = random_csv_mode
+    pref_coords = db_helper._get_coord_table()["prefecture"]
+    for prefecture in [None] + list(RANDOM_AREAS):
+        expected = {}
+        for from_pref, to_pref, count in _legacy_flow_lines(flows, pref_coords, prefecture):
+            expected[(from_pref, to_pref)] = expected.get((from_pref, to_pref), 0) + count
+        lines = db_helper.get_flow_lines(prefecture)
+        assert {(r["from_pref"], r["to_pref"]): r["count"] for r in lines} == expected
+        assert [r["count"] for r in lines] == sorted(expected.values(), reverse=True)
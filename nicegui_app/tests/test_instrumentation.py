@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+パフォーマンス計測（instrumentation.py）のテスト
+
+スパンの集計（件数・パーセンタイル・エラー）、親子関係、JSONLトレース、Prometheus形式の出力と、
+db_helper のgetter・キャッシュ・Tursoの統計が /metrics に含まれることを確認する。
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import instrumentation
+import db_helper
+from cache_manager import cache_manager
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics(monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    instrumentation.reset()
+    yield
+    instrumentation.configure_trace(None)
+    instrumentation.reset()
+
+
+def test_observe_percentiles():
+    for ms in range(1, 101):
+        instrumentation.observe("db.sample", ms / 1000)
+    stats = instrumentation.snapshot()["spans"]["db.sample"]
+    assert stats["count"] == 100 and stats["errors"] == 0
+    assert (stats["p50_ms"], stats["p95_ms"], stats["p99_ms"], stats["max_ms"]) == (51.0, 95.0, 99.0, 100.0)
+    assert stats["avg_ms"] == 50.5
+
+
+def test_span_and_timed(tmp_path):
+    trace = tmp_path / "trace" / "spans.jsonl"
+    instrumentation.configure_trace(str(trace))
+
+    @instrumentation.timed("db.inner")
+    def inner():
+        return 1
+
+    @instrumentation.timed()
+    async def fetch():
+        return inner() + 1
+
+    with instrumentation.span("event.select", prefecture="東京都") as outer:
+        assert asyncio.run(fetch()) == 2
+        outer.set(rows=3)
+    with pytest.raises(ValueError):
+        with instrumentation.span("event.select"):
+            raise ValueError("boom")
+
+    spans = instrumentation.snapshot()["spans"]
+    assert spans["event.select"]["count"] == 2 and spans["event.select"]["errors"] == 1
+    assert spans["fetch"]["count"] == spans["db.inner"]["count"] == 1
+
+    records = [json.loads(line) for line in trace.read_text(encoding="utf-8").splitlines()]
+    by_name = {r["span"]: r for r in records if r["span"] != "event.select"}
+    outer_record = next(r for r in records if r["span"] == "event.select" and not r["error"])
+    assert outer_record["prefecture"] == "東京都" and outer_record["rows"] == 3
+    assert by_name["db.inner"]["parent"] == by_name["fetch"]["id"]
+    assert records[-1]["error_type"] == "ValueError"
+
+
+def test_start_span_records_once():
+    s = instrumentation.start_span("choropleth.render", prefecture="北海道")
+    s.set(polygons=10).end()
+    s.end()
+    assert instrumentation.snapshot()["spans"]["choropleth.render"]["count"] == 1
+
+
+def test_disabled_records_nothing(monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", False)
+    instrumentation.timed("db.off")(lambda: None)()
+    instrumentation.incr("cache_hits_total", namespace="db")
+    assert instrumentation.snapshot() == {"spans": {}, "counters": {}}
+
+
+def test_prometheus_text():
+    instrumentation.observe("db.get_filtered_data", 0.02)
+    instrumentation.incr("cache_hits_total", namespace='q"uote')
+    text = instrumentation.render_prometheus()
+    assert "# TYPE app_span_seconds summary" in text
+    assert 'app_span_seconds{span="db.get_filtered_data",quantile="0.95"} 0.02' in text
+    assert 'app_span_seconds_count{span="db.get_filtered_data"} 1' in text
+    assert 'cache_hits_total{namespace="q\\"uote"} 1.0' in text
+    assert text.endswith("\n")
+
+
+def test_collectors_include_cache_and_turso():
+    cache_manager.register("metrics_test")
+    cache_manager.set("metrics_test", "k", 1)
+    cache_manager.get("metrics_test", "k")
+    cache_manager.get("metrics_test", "missing")
+    text = instrumentation.render_prometheus()
+    assert 'cache_hit_ratio{namespace="metrics_test"} 0.5' in text
+    assert "# TYPE turso_requests_total counter" in text
+    cache_manager.clear("metrics_test")
+
+    def broken():
+        raise RuntimeError("collector down")
+
+    instrumentation.register_collector(broken)
+    try:
+        assert "cache_bytes" in instrumentation.render_prometheus()  # 失敗したコレクタは読み飛ばす
+    finally:
+        instrumentation._collectors.remove(broken)
+
+
+def test_db_getters_are_spans(monkeypatch):
+    @db_helper._job_type_scoped
+    def get_example(prefecture=None):
+        return db_helper.get_current_job_type()
+
+    assert get_example("東京都", job_type="看護師") == "看護師"
+    assert instrumentation.snapshot()["spans"]["db.get_example"]["count"] == 1
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+職種スコープ（セッション単位の職種切り替え）のテスト
+
+職種切り替えが他セッションのキャッシュを破棄しないこと、
+キャッシュが職種別に保持され、予算超過時のみ古い職種が破棄されることを確認する。
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    monkeypatch.setattr(db_helper, "_job_type_provider", None)
+    db_helper.clear_cache()
+    yield
+    db_helper.clear_cache()
+
+
+@db_helper._job_type_scoped
+def _resolved_job_type():
+    return db_helper.get_current_job_type()
+
+
+class TestJobTypeResolution:
+    def test_default_job_type(self):
+        assert db_helper.get_current_job_type() == db_helper.DEFAULT_JOB_TYPE
+
+    def test_explicit_parameter_overrides_context(self):
+        with db_helper.job_type_scope("看護師"):
+            assert _resolved_job_type() == "看護師"
+            assert _resolved_job_type(job_type="保育士") == "保育士"
+            assert db_helper.get_current_job_type() == "看護師"
+
+    def test_provider_used_when_context_unset(self, monkeypatch):
+        db_helper.set_job_type_provider(lambda: "栄養士")
+        assert db_helper.get_current_job_type() == "栄養士"
+        with db_helper.job_type_scope("看護師"):
+            assert db_helper.get_current_job_type() == "看護師"
+
+    def test_provider_error_falls_back_to_default(self):
+        def provider():
+            raise RuntimeError("outside of UI context")
+        db_helper.set_job_type_provider(provider)
+        assert db_helper.get_current_job_type() == db_helper.DEFAULT_JOB_TYPE
+
+    def test_scope_is_isolated_per_thread(self):
+        seen = {}
+
+        def worker(job_type):
+            db_helper.set_current_job_type(job_type)
+            seen[job_type] = db_helper.get_current_job_type()
+
+        threads = [threading.Thread(target=worker, args=(jt,)) for jt in ("看護師", "保育士")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert seen == {"看護師": "看護師", "保育士": "保育士"}
+        assert db_helper.get_current_job_type() == db_helper.DEFAULT_JOB_TYPE
+
+
+class TestJobTypeCaches:
+    def test_switch_keeps_other_job_type_cache(self):
+        db_helper._set_cache(("介護職", "ALL_DATA"), "kaigo")
+        db_helper._set_batch_cache(("介護職", "batch_stats", "ALL", "ALL"), {"SUMMARY": None})
+
+        db_helper.set_current_job_type("看護師")
+        db_helper._set_cache(("看護師", "ALL_DATA"), "kango")
+
+        assert db_helper._get_cached(("介護職", "ALL_DATA")) == "kaigo"
+        assert db_helper._get_batch_cache(("介護職", "batch_stats", "ALL", "ALL")) is not None
+        assert db_helper._get_cached(("看護師", "ALL_DATA")) == "kango"
+
+    def test_least_recent_job_type_evicted_over_budget(self, monkeypatch):
+        monkeypatch.setattr(db_helper, "_MAX_WARM_JOB_TYPES", 2)
+        for job_type in ("介護職", "看護師"):
+            with db_helper.job_type_scope(job_type):
+                db_helper.get_current_job_type()
+            db_helper._set_cache((job_type, "ALL_DATA"), job_type)
+            db_helper._static_cache["prefectures"][job_type] = ["東京都"]
+
+        with db_helper.job_type_scope("保育士"):
+            db_helper.get_current_job_type()
+
+        assert db_helper._get_cached(("介護職", "ALL_DATA")) is None
+        assert "介護職" not in db_helper._static_cache["prefectures"]
+        assert db_helper._get_cached(("看護師", "ALL_DATA")) == "看護師"
+        assert db_helper.get_cache_stats()["warm_job_types"] == ["看護師", "保育士"]
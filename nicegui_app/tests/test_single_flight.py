@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+single-flight（同時キャッシュミスの集約）のテスト
+
+同じキーへの同時呼び出しが1回の取得に集約され、抑止数が統計に記録されることを確認する。
+"""
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+
+CALLERS = 6
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    monkeypatch.setattr(db_helper, "_job_type_provider", None)
+    monkeypatch.setattr(db_helper, "_flight_stats", {})
+    db_helper.clear_cache()
+    yield
+    db_helper.clear_cache()
+
+
+def _run_concurrently(func, *args):
+    barrier = threading.Barrier(CALLERS)
+
+    def call():
+        barrier.wait()
+        return func(*args)
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        return [f.result() for f in [pool.submit(call) for _ in range(CALLERS)]]
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"rows": 3}
+
+    results = _run_concurrently(lambda: db_helper.single_flight(("介護職", "東京都"), fetch, "test"))
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    stats = db_helper.get_single_flight_stats()
+    assert stats["namespaces"]["test"] == {"executed": 1, "coalesced": CALLERS - 1}
+    assert stats["in_flight"] == 0
+
+
+def test_error_is_shared_and_next_call_retries():
+    calls = []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.05)
+        raise RuntimeError("Turso timeout")
+
+    def call():
+        try:
+            return db_helper.single_flight("key", failing, "test")
+        except RuntimeError as e:
+            return str(e)
+
+    assert _run_concurrently(call) == ["Turso timeout"] * CALLERS
+    assert len(calls) == 1
+    assert db_helper.single_flight("key", lambda: "ok", "test") == "ok"
+
+
+def test_reentrant_call_does_not_deadlock():
+    def outer():
+        return db_helper.single_flight("same", lambda: "inner", "test")
+
+    assert db_helper.single_flight("same", outer, "test") == "inner"
+
+
+def test_async_callers_share_one_execution():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "gap"
+
+    async def main():
+        return await asyncio.gather(*(db_helper.single_flight_async("介護職_東京都", fetch, "gap_data")
+                                      for _ in range(CALLERS)))
+
+    assert asyncio.run(main()) == ["gap"] * CALLERS
+    assert len(calls) == 1
+    assert db_helper.get_cache_stats()["single_flight"]["namespaces"]["gap_data"]["coalesced"] == CALLERS - 1
+
+
+def test_async_leader_cancel_does_not_cancel_followers():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "gap"
+
+    async def main():
+        leader = asyncio.ensure_future(db_helper.single_flight_async("介護職_大阪府", fetch, "gap_data"))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(db_helper.single_flight_async("介護職_大阪府", fetch, "gap_data"))
+                     for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()  # 先に呼んだセッションのクライアント切断
+        results = await asyncio.gather(*followers)
+        assert leader.cancelled()
+        return results
+
+    assert asyncio.run(main()) == ["gap"] * 3
+    assert len(calls) == 1
+
+
+def test_cache_hits_bypass_coalescing(monkeypatch):
+    queries = []
+
+    def fake_query_df(sql, params=None):
+        queries.append(params)
+        return pd.DataFrame({"row_type": ["SUMMARY"], "prefecture": ["東京都"]})
+
+    monkeypatch.setattr(db_helper, "_HAS_TURSO", True)
+    monkeypatch.setattr(db_helper, "query_df", fake_query_df)
+    with db_helper.job_type_scope("看護師"):
+        for _ in range(5):
+            db_helper._batch_stats_query(prefecture="東京都")
+    assert len(queries) == 1
+    assert db_helper.get_single_flight_stats()["namespaces"]["batch_stats"] == {"executed": 1, "coalesced": 0}
+
+
+def test_batch_stats_query_hits_db_once(monkeypatch):
+    queries = []
+
+    def fake_query_df(sql, params=None):
+        queries.append(params)
+        time.sleep(0.1)
+        return pd.DataFrame({"row_type": ["SUMMARY", "AGE_GENDER"], "prefecture": ["東京都"] * 2})
+
+    monkeypatch.setattr(db_helper, "_HAS_TURSO", True)
+    monkeypatch.setattr(db_helper, "query_df", fake_query_df)
+
+    def call():
+        with db_helper.job_type_scope("看護師"):
+            return db_helper._batch_stats_query(prefecture="東京都")
+
+    results = _run_concurrently(call)
+
+    assert queries == [("看護師", "東京都")]
+    assert all(len(r["SUMMARY"]) == 1 for r in results)
+    assert db_helper.get_single_flight_stats()["namespaces"]["batch_stats"]["coalesced"] == CALLERS - 1
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+マップクリック用空間インデックス（find_municipality_at_point）のテスト
+
+穴・飛び地・追加リングの離島・MultiPolygonを含むGeoJSONで、
+全リングを総当たりする判定（even-odd規則）と同じ結果になることを確認する。
+"""
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import choropleth_helper as ch
+
+
+def _square(x0, y0, size):
+    """[lng, lat] の正方形リング（閉じたリング）"""
+    return [[x0, y0], [x0 + size, y0], [x0 + size, y0 + size], [x0, y0 + size], [x0, y0]]
+
+
+def _feature(name, geometry_type, coordinates):
+    return {"type": "Feature", "properties": {"N03_004": name},
+            "geometry": {"type": geometry_type, "coordinates": coordinates}}
+
+
+@pytest.fixture
+def geojson():
+    return {"type": "FeatureCollection", "features": [
+        # 外周 + 穴（中央に飛び地の「内町」）+ 離島リング（国土数値情報の形式）
+        _feature("外市", "Polygon", [_square(0, 0, 10), _square(4, 4, 2), _square(20, 20, 1)]),
+        _feature("内町", "Polygon", [_square(4, 4, 2)]),
+        _feature("群島村", "MultiPolygon", [[_square(12, 0, 2)], [_square(12, 5, 2)]]),
+        _feature("", "Polygon", [_square(30, 30, 1)]),  # 名前なしは対象外
+    ]}
+
+
+def _brute_force(lat, lng, geojson_data):
+    for feature in geojson_data["features"]:
+        name = feature["properties"].get("N03_004", "")
+        if not name:
+            continue
+        geometry = feature["geometry"]
+        polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+        for rings in polygons:
+            inside = sum(ch.point_in_polygon(lat, lng, [[c[1], c[0]] for c in ring]) for ring in rings)
+            if inside % 2:
+                return name
+    return None
+
+
+@pytest.mark.parametrize("lat, lng, expected", [
+    (1, 1, "外市"),
+    (5, 5, "内町"),       # 外市の穴の中 → 飛び地
+    (20.5, 20.5, "外市"),  # 追加リングの離島
+    (1, 13, "群島村"),
+    (6, 13, "群島村"),
+    (3.5, 13, None),      # MultiPolygonの間
+    (30.5, 30.5, None),   # 名前なし
+    (-5, -5, None),       # 範囲外
+])
+def test_lookup(geojson, lat, lng, expected):
+    assert ch.find_municipality_at_point(lat, lng, geojson) == expected
+
+
+def test_matches_brute_force_on_random_points(geojson):
+    rng = random.Random(0)
+    for _ in range(500):
+        lat, lng = rng.uniform(-2, 32), rng.uniform(-2, 32)
+        assert ch.find_municipality_at_point(lat, lng, geojson) == _brute_force(lat, lng, geojson)
+
+
+def test_index_built_once_per_geojson(geojson):
+    index = ch.get_spatial_index(geojson)
+    assert ch.get_spatial_index(geojson) is index
+    assert ch.get_spatial_index({"type": "FeatureCollection", "features": []}) is not index
+    assert ch.find_municipality_at_point(1, 1, {"features": []}) is None
+    assert ch.find_municipality_at_point(1, 1, None) is None
+
+
+def test_real_geojson_matches_brute_force():
+    geojson = ch.load_geojson("東京都")
+    if not geojson:
+        pytest.skip("東京都のGeoJSONがありません")
+    rng = random.Random(1)
+    points = []
+    for feature in rng.sample(geojson["features"], 20):
+        ring = feature["geometry"]["coordinates"][0]
+        lng, lat = ring[rng.randrange(len(ring))][:2]
+        points.append((lat + rng.uniform(-0.01, 0.01), lng + rng.uniform(-0.01, 0.01)))
+    for lat, lng in points:
+        assert ch.find_municipality_at_point(lat, lng, geojson) == _brute_force(lat, lng, geojson)
+
+
+def test_merged_geojson_reused_across_renders(geojson, monkeypatch):
+    from cache_manager import cache_manager
+    parts = {"A県": {"type": "FeatureCollection", "features": geojson["features"][:2]},
+             "B県": {"type": "FeatureCollection", "features": geojson["features"][2:]}}
+    monkeypatch.setattr(ch, "load_geojson", lambda pref: parts.get(pref))
+    monkeypatch.setattr(cache_manager, "contains",
+                        lambda ns, key, _orig=cache_manager.contains: key in parts if ns == "geojson" else _orig(ns, key))
+    try:
+        merged = ch.load_multiple_geojson(["A県", "B県"])
+        assert ch.load_multiple_geojson(["A県", "B県"]) is merged  # 描画のたびに作り直さない
+        assert ch.get_spatial_index(merged) is ch.get_spatial_index(ch.load_multiple_geojson(["A県", "B県"]))
+        assert len(merged["features"]) == len(geojson["features"])
+
+        del parts["B県"]  # 構成県が追い出されたら作り直す
+        rebuilt = ch.load_multiple_geojson(["A県", "B県"])
+        assert rebuilt is not merged and len(rebuilt["features"]) == 2
+    finally:
+        ch.clear_geojson_cache()
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+3層比較統計の事前集計（stats_rollup）のテスト
+
+- 事前集計から引いた結果が、行データを集計する従来のgetter（Turso経路）と同じになること
+- Turso用のリクエスト（stats_rollup テーブルの職種単位の置き換え・削除）がSQLとして実行できること
+- import / sync で事前集計が削除・作り直しされたら、キャッシュ済みの事前集計を使わないこと
+- CSVモードで事前集計ファイルが使われ、元CSVより古いファイルは使われないこと
+"""
+import math
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+import stats_rollup
+from cache_manager import cache_manager
+
+JOB_TYPES = ["看護師", "介護職"]
+PREFECTURES = ["東京都", "北海道", "大阪府"]
+AGE_CATEGORIES = stats_rollup.AGE_GROUPS + ["不明"]
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for job_type in JOB_TYPES:
+        for pref in PREFECTURES:
+            for m in range(4):
+                muni = f"{pref[:2]}市{m}"
+                for n in range(1 + (m == 1)):  # 市1はSUMMARYが2行（最初の行を使う）
+                    rows.append({
+                        "job_type": job_type, "row_type": "SUMMARY", "prefecture": pref, "municipality": muni,
+                        "avg_desired_areas": rng.uniform(1, 5) if m != 2 else np.nan,
+                        "avg_qualifications": rng.uniform(0, 3),
+                        "male_count": float(rng.integers(0, 50)),
+                        "female_count": float(rng.integers(0, 50)) if n == 0 else np.nan,
+                        "avg_age": rng.uniform(25, 60) if m != 3 else np.nan,
+                    })
+                if pref == "北海道" and m == 0:
+                    continue  # RESIDENCE_FLOW / AGE_GENDER のない市区町村
+                for _ in range(3):
+                    rows.append({
+                        "job_type": job_type, "row_type": "RESIDENCE_FLOW", "prefecture": pref, "municipality": muni,
+                        "avg_reference_distance_km": rng.uniform(0, 80) if m != 3 else np.nan,
+                    })
+                for category1 in AGE_CATEGORIES:
+                    for category2 in ("男性", "女性"):
+                        rows.append({
+                            "job_type": job_type, "row_type": "AGE_GENDER", "prefecture": pref,
+                            "municipality": muni, "category1": category1, "category2": category2,
+                            "count": float(rng.integers(0, 20)),
+                        })
+    return pd.DataFrame(rows).reindex(columns=stats_rollup.SOURCE_COLUMNS)
+
+
+def _execute(conn, stmts):
+    """Pipeline APIのリクエストをsqlite3で実行"""
+    def value(arg):
+        if arg["type"] == "null":
+            return None
+        if arg["type"] == "integer":
+            return int(arg["value"])
+        return arg["value"]
+    for request in stmts:
+        stmt = request["stmt"]
+        conn.execute(stmt["sql"], [value(a) for a in stmt.get("args", [])])
+
+
+@pytest.fixture
+def turso(monkeypatch):
+    """Turso経路: 行データは _batch_stats_query、stats_rollup テーブルは sqlite3 で代替"""
+    df = _frame()
+
+    def batch_stats_query(prefecture=None, municipality=None):
+        part = df[df["job_type"] == db_helper._get_job_type()]
+        if prefecture:
+            part = part[part["prefecture"] == prefecture]
+        if municipality:
+            part = part[part["municipality"] == municipality]
+        return {rt: part[part["row_type"] == rt].copy() for rt in stats_rollup.SOURCE_ROW_TYPES}
+
+    conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+    queries = []
+
+    def query_df(sql, params=None):
+        queries.append(sql)
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        except Exception:
+            return pd.DataFrame()  # テーブル未作成（query_df と同じく空を返す）
+
+    monkeypatch.setattr(db_helper, "USE_CSV_MODE", False)
+    monkeypatch.setattr(db_helper, "_lazy_init_turso", lambda: True)
+    monkeypatch.setattr(db_helper, "_batch_stats_query", batch_stats_query)
+    monkeypatch.setattr(db_helper, "query_df", query_df)
+    cache_manager.clear("stats_rollup")
+    yield df, conn, queries
+    cache_manager.clear("stats_rollup")
+    conn.close()
+
+
+def _assert_same(actual, expected):
+    assert set(expected) <= set(actual)
+    for key, value in expected.items():
+        if isinstance(value, float) and math.isnan(value):
+            assert math.isnan(actual[key]), key
+        elif isinstance(value, float):
+            assert actual[key] == pytest.approx(value), key
+        else:
+            assert actual[key] == value, key
+
+
+def _all_stats():
+    calls = [("national", db_helper.get_national_stats, ())]
+    for pref in PREFECTURES:
+        calls.append(("prefecture", db_helper.get_prefecture_stats, (pref,)))
+        calls += [("municipality", db_helper.get_municipality_stats, (pref, f"{pref[:2]}市{m}")) for m in range(4)]
+    return {(job_type, level) + args: getter(*args, job_type=job_type)
+            for job_type in JOB_TYPES for level, getter, args in calls}
+
+
+def test_rollup_matches_row_level_getters(turso, monkeypatch):
+    df, conn, queries = turso
+    monkeypatch.setattr(db_helper, "STATS_ROLLUP_ENABLED", False)
+    expected = _all_stats()
+
+    for job_type, stmts in stats_rollup.turso_requests(stats_rollup.build_rollup(df)):
+        _execute(conn, stmts)
+    monkeypatch.setattr(db_helper, "STATS_ROLLUP_ENABLED", True)
+    monkeypatch.setattr(db_helper, "_batch_stats_query", lambda *a, **k: pytest.fail("row-level query"))
+    actual = _all_stats()
+
+    for key in expected:
+        assert expected[key], key
+        _assert_same(actual[key], expected[key])
+    # 職種ごとに1回だけ取得
+    assert len([q for q in queries if stats_rollup.TURSO_TABLE in q]) == len(JOB_TYPES)
+
+
+def test_falls_back_without_table(turso):
+    df, conn, queries = turso
+    stats = db_helper.get_prefecture_stats("東京都", job_type="看護師")
+    summary = df[(df["job_type"] == "看護師") & (df["prefecture"] == "東京都") & (df["row_type"] == "SUMMARY")]
+    assert stats["male_count"] == int(summary["male_count"].sum())
+    # 未作成の結果もキャッシュし、毎回問い合わせない
+    db_helper.get_municipality_stats("東京都", "東京市0", job_type="看護師")
+    assert len([q for q in queries if stats_rollup.TURSO_TABLE in q]) == 1
+
+
+def test_turso_requests_replace_job_type(turso):
+    df, conn, _ = turso
+    rollup = stats_rollup.build_rollup(df)
+    for _, stmts in stats_rollup.turso_requests(rollup):
+        _execute(conn, stmts)
+    nurse = rollup[rollup["job_type"] == "看護師"].assign(male_count=0)
+    for _, stmts in stats_rollup.turso_requests(nurse):
+        _execute(conn, stmts)
+
+    counts = dict(conn.execute(
+        f"SELECT job_type, SUM(male_count) FROM {stats_rollup.TURSO_TABLE} GROUP BY job_type").fetchall())
+    assert counts["看護師"] == 0
+    assert counts["介護職"] == int(rollup.loc[rollup["job_type"] == "介護職", "male_count"].sum())
+    assert conn.execute(f"SELECT COUNT(*) FROM {stats_rollup.TURSO_TABLE}").fetchone()[0] == len(rollup)
+
+
+def test_turso_clear_requests_delete_job_type(turso):
+    df, conn, _ = turso
+    _execute(conn, stats_rollup.turso_clear_requests("看護師"))  # テーブル未作成でも実行できる
+    rollup = stats_rollup.build_rollup(df)
+    for _, stmts in stats_rollup.turso_requests(rollup):
+        _execute(conn, stmts)
+    _execute(conn, stats_rollup.turso_clear_requests("看護師"))
+
+    counts = dict(conn.execute(
+        f"SELECT job_type, COUNT(*) FROM {stats_rollup.TURSO_TABLE} GROUP BY job_type").fetchall())
+    assert counts == {"介護職": int((rollup["job_type"] == "介護職").sum())}
+
+
+def test_cached_rollup_follows_version(turso, monkeypatch):
+    df, conn, queries = turso
+    rollup = stats_rollup.build_rollup(df)
+    nurse = rollup[rollup["job_type"] == "看護師"]
+    for _, stmts in stats_rollup.turso_requests(nurse.assign(male_count=0)):
+        _execute(conn, stmts)
+    assert db_helper.get_national_stats(job_type="看護師")["male_count"] == 0
+
+    # import 開始・sync 失敗で削除 → 再確認で行データからの集計に戻る
+    _execute(conn, stats_rollup.turso_clear_requests("看護師"))
+    assert db_helper.get_national_stats(job_type="看護師")["male_count"] == 0  # 再確認の間隔内はキャッシュ
+    monkeypatch.setattr(db_helper, "STATS_ROLLUP_ENABLED", False)
+    expected = db_helper.get_national_stats(job_type="看護師")["male_count"]
+    assert expected > 0
+    monkeypatch.setattr(db_helper, "STATS_ROLLUP_ENABLED", True)
+    monkeypatch.setattr(db_helper, "STATS_ROLLUP_RECHECK_SECONDS", 0)
+    assert db_helper.get_national_stats(job_type="看護師")["male_count"] == expected
+
+    # 作り直し → 新しい事前集計を取得
+    for _, stmts in stats_rollup.turso_requests(nurse):
+        _execute(conn, stmts)
+    monkeypatch.setattr(db_helper, "_batch_stats_query", lambda *a, **k: pytest.fail("row-level query"))
+    assert db_helper.get_national_stats(job_type="看護師")["male_count"] == expected
+
+    # 版が同じなら確認だけで取得し直さない
+    n_loads = len([q for q in queries if q.startswith("SELECT *")])
+    db_helper.get_national_stats(job_type="看護師")
+    assert len([q for q in queries if q.startswith("SELECT *")]) == n_loads
+
+
+@pytest.fixture
+def csv_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_helper, "USE_CSV_MODE", True)
+    monkeypatch.setattr(db_helper, "_data_search_dirs", lambda: [tmp_path])
+    monkeypatch.setattr(db_helper, "_stats_rollup_file", None)
+    yield tmp_path
+    db_helper._stats_rollup_file = None
+
+
+def test_csv_mode_uses_rollup_file(csv_mode):
+    df = _frame().drop(columns=["job_type"])  # FIXED CSV には job_type列がない
+    csv_path = csv_mode / db_helper.CSV_FILENAME
+    df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    stats_rollup.build_from_csv(csv_path)
+
+    stats = db_helper.get_municipality_stats("大阪府", "大阪市1", job_type="看護師")
+    first = df[(df["municipality"] == "大阪市1") & (df["row_type"] == "SUMMARY")].iloc[0]
+    assert stats["male_count"] == int(first["male_count"])
+    assert stats["desired_areas"] == round(first["avg_desired_areas"], 2)
+    assert set(stats["age_distribution"]) == set(stats_rollup.AGE_GROUPS)
+    assert db_helper.get_prefecture_stats("北海道")["male_count"] == \
+        int(df.loc[(df["prefecture"] == "北海道") & (df["row_type"] == "SUMMARY"), "male_count"].sum())
+
+
+def test_stale_rollup_file_is_ignored(csv_mode):
+    csv_path = csv_mode / db_helper.CSV_FILENAME
+    _frame().to_csv(csv_path, index=False, encoding="utf-8-sig")
+    written = stats_rollup.build_from_csv(csv_path)
+    assert stats_rollup.find_rollup([csv_mode], [db_helper.CSV_FILENAME]) is not None
+
+    for path in written:  # CSVより古くする（再生成漏れ）
+        os.utime(path, (csv_path.stat().st_mtime - 60,) * 2)
+    assert stats_rollup.find_rollup([csv_mode], [db_helper.CSV_FILENAME]) is None
+    assert db_helper._stats_rollup_table("看護師") == {}
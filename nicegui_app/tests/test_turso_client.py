@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+turso_client（共有コネクションプール）のテスト
+
+実際のTursoには接続せず、httpx.MockTransportで応答を返す。
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import turso_client
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    sql = body["requests"][0]["stmt"]["sql"]
+    return httpx.Response(200, json={"results": [{"type": "ok", "response": {"result": {
+        "cols": [{"name": "sql"}], "rows": [[{"type": "text", "value": sql}]]}}}]})
+
+
+@pytest.fixture
+def mock_clients(monkeypatch):
+    transport = httpx.MockTransport(_handler)
+    monkeypatch.setattr(turso_client, "_sync_client", httpx.Client(transport=transport))
+    monkeypatch.setattr(turso_client, "get_async_client",
+                        lambda: httpx.AsyncClient(transport=transport))
+    turso_client.reset_turso_client_stats()
+    yield
+    turso_client.reset_turso_client_stats()
+
+
+def test_pipeline_url_converts_libsql():
+    assert turso_client.pipeline_url("libsql://db.turso.io") == "https://db.turso.io/v2/pipeline"
+    assert turso_client.pipeline_url("https://db.turso.io/") == "https://db.turso.io/v2/pipeline"
+
+
+def test_sync_client_is_shared(mock_clients):
+    assert turso_client.get_client() is turso_client.get_client()
+
+
+def test_post_pipeline_records_metrics(mock_clients):
+    payload = {"requests": [{"type": "execute", "stmt": {"sql": "SELECT 1"}}]}
+    for _ in range(3):
+        response = turso_client.post_pipeline("libsql://db.turso.io", "token", payload)
+        assert response.status_code == 200
+
+    stats = turso_client.get_turso_client_stats()
+    assert stats["requests"] == 3
+    assert stats["errors"] == 0
+    assert stats["bytes_sent"] == 3 * len(json.dumps(payload, separators=(",", ":")).encode())
+    assert stats["bytes_received"] > 0
+    assert stats["p95_latency_ms"] >= stats["p50_latency_ms"] >= 0
+
+
+def test_async_post_pipeline_records_metrics(mock_clients):
+    payload = {"requests": [{"type": "execute", "stmt": {"sql": "SELECT 2"}}]}
+    response = asyncio.run(turso_client.async_post_pipeline("libsql://db.turso.io", "token", payload))
+    assert response.json()["results"][0]["response"]["result"]["rows"][0][0]["value"] == "SELECT 2"
+    assert turso_client.get_turso_client_stats()["requests"] == 1
+
+
+def test_turso_http_query_uses_pooled_client(mock_clients, monkeypatch):
+    import db_helper
+
+    monkeypatch.setattr(db_helper, "TURSO_DATABASE_URL", "libsql://db.turso.io")
+    monkeypatch.setattr(db_helper, "TURSO_AUTH_TOKEN", "token")
+    rows, columns = db_helper._turso_http_query("SELECT 3")
+    assert columns == ["sql"]
+    assert rows == [{"sql": "SELECT 3"}]
+    assert turso_client.get_turso_client_stats()["requests"] == 1
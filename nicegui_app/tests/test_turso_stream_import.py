@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+turso_stream_import（import の挿入フェーズ）のテスト
+
+- カラム単位のエンコードが convert_value と同じ args になること
+- 並列送信で全行が1回ずつ挿入され、中断後の再実行では未完了の行のみ送信されること
+- 429 では待機・縮小してリトライすること
+- 送信の例外でバッチが失敗しても残りを送り切り、送信側が全て止まったら中断すること（ハングしない）
+"""
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import turso_stream_import as tsi
+import turso_sync
+
+VALUES = [" 12", "1_000", "inf", "-inf", "1e3", "abc", "5.0", "0.1", "1e16", "1e-7", None, "nan", "NaN",
+          "", " ", "9e20", "-3.7", '東京"都\\', "a\nb", "新宿区", "123456789012.5", "-0.0"]
+
+
+@pytest.mark.parametrize("col", ["count", "avg_age", "latitude", "prefecture", "category1"])
+def test_encode_column_matches_convert_value(col):
+    values = pd.Series(VALUES, dtype=str)
+    encoded = [json.loads(f) for f in tsi.encode_column(values, col)]
+    expected = [json.loads(json.dumps(turso_sync.convert_value(v, col))) for v in values]
+    assert encoded == expected
+
+
+def test_statements_match_legacy_bulk_insert():
+    chunk = pd.DataFrame({"prefecture": ["東京都", None, "大阪府"], "count": ["1", "2.7", ""],
+                          "avg_age": ["40.5", "x", None]}, dtype=str)
+    columns = list(chunk.columns)
+    stmts = tsi.StatementEncoder(columns).encode(chunk, row_offset=100)
+    legacy = turso_sync.create_bulk_insert_stmt(chunk.to_dict("records"), columns)
+    assert [(s, e) for s, e, _ in stmts] == [(100, 103)]
+    assert json.loads(stmts[0][2]) == json.loads(json.dumps(legacy))
+
+
+class FakePipeline:
+    """async_post_pipeline の置き換え（SQLiteで実行、任意のリクエストで失敗させられる）"""
+
+    def __init__(self, columns):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(f"CREATE TABLE job_seeker_data ({', '.join(columns)})")
+        self.requests = 0
+        self.rows_received = 0
+        self.fail = lambda n: None  # n番目のリクエストで返すステータス（Noneなら成功）
+
+    async def __call__(self, database_url, auth_token, payload, content=None, timeout=None):
+        self.requests += 1
+        request = httpx.Request("POST", database_url)
+        status = self.fail(self.requests)
+        if status is not None:
+            return httpx.Response(status, headers={"Retry-After": "0"}, request=request)
+        results = []
+        for item in json.loads(content)["requests"]:
+            args = [None if a["type"] == "null" else a["value"] for a in item["stmt"]["args"]]
+            cur = self.conn.execute(item["stmt"]["sql"], args)
+            self.rows_received += cur.rowcount
+            results.append({"type": "ok", "response": {"result": {"affected_row_count": cur.rowcount}}})
+        return httpx.Response(200, json={"results": results}, request=request)
+
+    def ids(self):
+        return sorted(int(r[0]) for r in self.conn.execute("SELECT municipality FROM job_seeker_data"))
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    n = 1003  # ROWS_PER_INSERT で割り切れない行数
+    df = pd.DataFrame({"id": range(n), "job_type": "看護師", "row_type": "SUMMARY", "prefecture": "東京都",
+                       "municipality": [str(i) for i in range(n)], "count": [str(i % 7) for i in range(n)]})
+    path = tmp_path / "nurse.csv"
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+    return str(path)
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakePipeline(["job_type", "row_type", "prefecture", "municipality", "count"])
+    monkeypatch.setattr(tsi, "async_post_pipeline", fake)
+    return fake
+
+
+def test_stream_import_inserts_every_row_once(csv_path, fake):
+    chunks = []
+    stats = tsi.stream_import(csv_path, "https://fake.turso.io", "token", concurrency=3, chunk_rows=100,
+                              on_chunk=chunks.append)
+    assert fake.ids() == list(range(1003))
+    assert stats["inserted"] == stats["rows_sent"] == stats["rows_read"] == 1003
+    assert stats["failed_rows"] == 0
+    assert sum(len(c) for c in chunks) == 1003 and "id" not in chunks[0].columns
+    assert stats["rows_per_sec"] > 0
+
+
+def test_resume_sends_only_unfinished_rows(csv_path, fake, tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    fake.fail = lambda n: 400 if n in (2, 5) else None  # 再送しないエラーで2リクエスト分を未完了にする
+    checkpoint = tsi.ImportCheckpoint.create(checkpoint_path, csv_path)
+    stats = tsi.stream_import(csv_path, "https://fake.turso.io", "token", checkpoint=checkpoint,
+                              concurrency=2, chunk_rows=200)
+    assert stats["failed_rows"] > 0
+    done = fake.ids()
+    assert len(done) == 1003 - stats["failed_rows"]
+
+    fake.fail = lambda n: None
+    fake.rows_received = 0
+    resumed = tsi.ImportCheckpoint.load(checkpoint_path, csv_path)
+    assert resumed is not None and resumed.rows_done == len(done)
+    stats = tsi.stream_import(csv_path, "https://fake.turso.io", "token", checkpoint=resumed,
+                              concurrency=2, chunk_rows=200)
+    assert stats["rows_skipped"] == len(done)
+    assert fake.rows_received == 1003 - len(done)
+    assert fake.ids() == list(range(1003))  # 重複なし
+    assert tsi.ImportCheckpoint.load(checkpoint_path, csv_path).rows_done == 1003
+
+
+def test_throttle_retries_and_shrinks_batch(csv_path, fake, monkeypatch):
+    fake.fail = lambda n: 429 if n == 1 else (503 if n == 3 else None)
+    stats = tsi.stream_import(csv_path, "https://fake.turso.io", "token", concurrency=1, chunk_rows=1000)
+    assert fake.ids() == list(range(1003))
+    assert stats["retries"] == 2 and stats["throttled"] == 2
+
+
+@pytest.fixture
+def large_csv_path(tmp_path):
+    n = 6000  # 文の数がキュー上限（concurrency × MAX_STATEMENTS_PER_REQUEST）を超える行数
+    df = pd.DataFrame({"job_type": "看護師", "row_type": "SUMMARY", "prefecture": "東京都",
+                       "municipality": [str(i) for i in range(n)], "count": "1"})
+    path = tmp_path / "large.csv"
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+    return str(path)
+
+
+def test_batch_exception_counts_rows_as_failed(large_csv_path, fake, monkeypatch):
+    real = fake.__call__
+
+    async def flaky(database_url, auth_token, payload, content=None, timeout=None):
+        if fake.requests % 2 == 0:
+            fake.requests += 1
+            return httpx.Response(200, text="<html>gateway</html>", request=httpx.Request("POST", database_url))
+        return await real(database_url, auth_token, payload, content=content, timeout=timeout)
+
+    monkeypatch.setattr(tsi, "async_post_pipeline", flaky)
+    stats = tsi.stream_import(large_csv_path, "https://fake.turso.io", "token", concurrency=1, chunk_rows=1000)
+    assert stats["rows_sent"] == stats["rows_read"] == 6000
+    assert stats["failed_rows"] > 0 and stats["inserted"] + stats["failed_rows"] == 6000
+    assert len(fake.ids()) == stats["inserted"]
+    assert any("JSONDecodeError" in e for e in stats["errors"])
+
+
+def test_all_senders_dead_cancels_producer(large_csv_path, fake, monkeypatch):
+    def broken(self, batch, results):
+        raise RuntimeError("record failed")
+
+    monkeypatch.setattr(tsi._Uploader, "_record", broken)
+    with pytest.raises(RuntimeError, match="record failed"):
+        tsi.stream_import(large_csv_path, "https://fake.turso.io", "token", concurrency=2, chunk_rows=1000)
+
+
+def test_adaptive_batch_size():
+    batch = tsi.AdaptiveBatchSize(initial=40, minimum=5, maximum=60, target_latency=1.0)
+    batch.on_success(40, 0.1)
+    assert batch.size == 50
+    batch.on_success(10, 0.1)  # 小さいリクエストでは変えない
+    assert batch.size == 50
+    batch.on_success(50, 5.0)
+    assert batch.size == 25
+    for _ in range(5):
+        batch.on_throttle(0)
+    assert batch.size == 5
+
+
+def test_checkpoint_discarded_when_csv_changes(csv_path, tmp_path):
+    checkpoint = tsi.ImportCheckpoint.create(tmp_path / "checkpoint.json", csv_path)
+    checkpoint.add(0, 20)
+    checkpoint.add(40, 60)
+    checkpoint.add(20, 40)
+    assert checkpoint.ranges == [[0, 60]]
+    checkpoint.save()
+    assert tsi.ImportCheckpoint.load(tmp_path / "checkpoint.json", csv_path).covers(20, 40)
+
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("9999,看護師,SUMMARY,東京都,9999,1\n")
+    os.utime(csv_path, ns=(0, 0))
+    assert tsi.ImportCheckpoint.load(tmp_path / "checkpoint.json", csv_path) is None
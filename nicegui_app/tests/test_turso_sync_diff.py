@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+turso_sync の差分同期（sync）のテスト
+
+Turso Pipeline APIをSQLite（インメモリ）で応答する擬似サーバーに置き換え、
+初回は全件インポート、以降は変更行のみが送信され、同じCSVの再実行では何も送信しないことを確認する。
+"""
+import io
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import turso_stream_import
+import turso_sync
+
+COLUMNS = ["job_type", "row_type", "prefecture", "municipality", "category1", "category2",
+           "category3", "count", "applicant_count", "latitude", "longitude", "avg_age"]
+
+
+def _row(row_type, pref, muni, count, cat1=None, cat2=None, cat3=None, lat=None, lng=None, age=None):
+    return {"job_type": "看護師", "row_type": row_type, "prefecture": pref, "municipality": muni,
+            "category1": cat1, "category2": cat2, "category3": cat3, "count": count,
+            "applicant_count": count, "latitude": lat, "longitude": lng, "avg_age": age}
+
+
+BASE_ROWS = [
+    _row("SUMMARY", "東京都", None, 100, age=41.5),
+    _row("SUMMARY", "東京都", "新宿区", 30, age=40.2),
+    _row("SUMMARY", "北海道", "札幌市", 20, age=45.0),
+    _row("AGE_GENDER", "東京都", "新宿区", 5, cat1="30代", cat2="女性"),
+    _row("AGE_GENDER", "東京都", "新宿区", 3, cat1="30代", cat2="男性"),
+    _row("URGENCY_AGE", "東京都", "新宿区", 2, cat2="20代"),
+    _row("RARITY", "東京都", "新宿区", 1, cat1="30代", cat2="女性", cat3="正看護師", lat=35.69, lng=139.70),
+]
+
+
+class FakeTurso:
+    """urllib.request.urlopen を置き換える擬似Pipeline API（SQLite）"""
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:")
+        # female_ratio はDB検証のサンプル表示で参照されるカラム（CSVにはない）
+        self.conn.execute(f"CREATE TABLE job_seeker_data ({', '.join(COLUMNS)}, female_ratio)")
+        self.requests = 0
+        self.bytes = 0
+
+    @staticmethod
+    def _arg(arg):
+        if arg["type"] == "null":
+            return None
+        if arg["type"] == "integer":
+            return int(arg["value"])
+        if arg["type"] == "float":
+            return float(arg["value"])
+        return arg["value"]
+
+    def execute(self, data: bytes) -> bytes:
+        self.requests += 1
+        self.bytes += len(data)
+        results = []
+        for item in json.loads(data)["requests"]:
+            stmt = item["stmt"]
+            try:
+                cur = self.conn.execute(stmt["sql"], [self._arg(a) for a in stmt.get("args", [])])
+                rows = cur.fetchall() if cur.description else []
+                results.append({"type": "ok", "response": {"type": "execute", "result": {
+                    "cols": [{"name": d[0]} for d in cur.description or []],
+                    "rows": [[{"type": "null"} if v is None else {"type": "text", "value": str(v)} for v in r]
+                             for r in rows],
+                    "affected_row_count": cur.rowcount,
+                }}})
+            except sqlite3.Error as e:
+                results.append({"type": "error", "error": {"message": str(e)}})
+        return json.dumps({"results": results}).encode()
+
+    def urlopen(self, req, timeout=None):
+        body = self.execute(req.data)
+        return type("Response", (), {"read": lambda self: body})()
+
+    async def async_post_pipeline(self, database_url, auth_token, payload, content=None, timeout=None):
+        """turso_client.async_post_pipeline の置き換え（import の挿入フェーズ）"""
+        body = self.execute(content if content is not None else json.dumps(payload).encode())
+        return httpx.Response(200, content=body, request=httpx.Request("POST", database_url))
+
+    def rows(self):
+        return sorted(self.conn.execute(
+            "SELECT row_type, prefecture, municipality, category1, category2, count, avg_age FROM job_seeker_data"
+        ).fetchall(), key=repr)
+
+
+@pytest.fixture
+def turso(monkeypatch, tmp_path):
+    fake = FakeTurso()
+    monkeypatch.setattr(turso_sync.urllib.request, "urlopen", fake.urlopen)
+    monkeypatch.setattr(turso_stream_import, "async_post_pipeline", fake.async_post_pipeline)
+    monkeypatch.setattr(turso_sync, "get_turso_config", lambda: ("https://fake.turso.io", "token"))
+    monkeypatch.setattr(turso_sync, "MANIFEST_DIR", tmp_path / "manifest")
+    return fake
+
+
+def _write_csv(path, rows):
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False, encoding="utf-8-sig")
+    return str(path)
+
+
+def _expected(rows):
+    """CSV経由（dtype=str）→ convert_value の型変換後にDBに入るはずの値"""
+    buf = io.StringIO()
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(buf, index=False)
+    buf.seek(0)
+    df = pd.read_csv(buf, dtype=str)
+    result = []
+    for r in df.to_dict("records"):
+        conv = {c: turso_sync.convert_value(r[c], c) for c in COLUMNS}
+        result.append(tuple(FakeTurso._arg(conv[c]) for c in
+                            ("row_type", "prefecture", "municipality", "category1", "category2", "count", "avg_age")))
+    return sorted(result, key=repr)
+
+
+def test_first_sync_imports_and_rerun_sends_nothing(turso, tmp_path):
+    csv_path = _write_csv(tmp_path / "nurse.csv", BASE_ROWS)
+    assert turso_sync.sync_csv(csv_path) == 0
+    assert turso.rows() == _expected(BASE_ROWS)
+    assert turso_sync.get_manifest_path("看護師").exists()
+
+    turso.requests = turso.bytes = 0
+    assert turso_sync.sync_csv(csv_path) == 0
+    assert turso.requests == 0 and turso.bytes == 0
+
+
+def test_sync_sends_only_changes(turso, tmp_path, capsys):
+    csv_path = _write_csv(tmp_path / "nurse.csv", BASE_ROWS)
+    assert turso_sync.sync_csv(csv_path) == 0
+
+    changed = [dict(r) for r in BASE_ROWS]
+    changed[1]["count"] = 35          # 更新（SUMMARY 新宿区）
+    changed[1]["applicant_count"] = 35
+    del changed[4]                    # 削除（AGE_GENDER 男性）
+    changed.append(_row("SUMMARY", "北海道", "函館市", 7, age=50.1))  # 挿入
+    _write_csv(tmp_path / "nurse.csv", changed)
+
+    turso.requests = turso.bytes = 0
+    capsys.readouterr()
+    assert turso_sync.sync_csv(csv_path, skip_validation=True) == 0
+    out = capsys.readouterr().out
+    assert "挿入: 1行  更新: 1行  削除: 1行" in out
+    assert turso.rows() == _expected(changed)
+
+    # 同じCSVで再実行しても何も送信しない
+    turso.requests = turso.bytes = 0
+    assert turso_sync.sync_csv(csv_path) == 0
+    assert turso.requests == 0
+
+
+def test_failed_statements_are_retried_on_next_sync(turso, tmp_path, monkeypatch):
+    csv_path = _write_csv(tmp_path / "nurse.csv", BASE_ROWS)
+    assert turso_sync.sync_csv(csv_path) == 0
+
+    changed = BASE_ROWS + [_row("SUMMARY", "北海道", "函館市", 7)]
+    _write_csv(tmp_path / "nurse.csv", changed)
+
+    real_urlopen = turso.urlopen
+
+    def failing(req, timeout=None):
+        if b"INSERT" in req.data:
+            raise OSError("connection reset")
+        return real_urlopen(req, timeout)
+
+    monkeypatch.setattr(turso_sync.urllib.request, "urlopen", failing)
+    monkeypatch.setattr(turso_sync.time, "sleep", lambda s: None)
+    assert turso_sync.sync_csv(csv_path, skip_validation=True) == 1
+    assert len(turso.rows()) == len(BASE_ROWS)
+
+    monkeypatch.setattr(turso_sync.urllib.request, "urlopen", real_urlopen)
+    assert turso_sync.sync_csv(csv_path, skip_validation=True) == 0
+    assert turso.rows() == _expected(changed)
+
+
+def test_key_hash_ignores_value_columns():
+    df = pd.DataFrame([_row("SUMMARY", "東京都", "新宿区", 30), _row("SUMMARY", "東京都", "新宿区", 31),
+                       _row("AGE_GENDER", "東京都", "新宿区", 30, cat1="30代", cat2="女性")], dtype=str)
+    hashes = turso_sync.compute_row_hashes(df)
+    assert hashes["key_hash"].iloc[0] == hashes["key_hash"].iloc[1]
+    assert hashes["row_hash"].iloc[0] != hashes["row_hash"].iloc[1]
+    assert hashes["key_hash"].iloc[0] != hashes["key_hash"].iloc[2]
+
+
+def test_diff_against_empty_manifest_inserts_all():
+    df = pd.DataFrame([_row("SUMMARY", "東京都", "新宿区", 30), _row("SUMMARY", "東京都", "渋谷区", 12)], dtype=str)
+    hashes = turso_sync.compute_row_hashes(df)
+    empty = turso_sync.build_manifest(df, hashes).iloc[0:0]
+    inserts, updates, deletes = turso_sync.diff_manifest(hashes, empty)
+    assert inserts.tolist() == [0, 1]
+    assert len(updates) == 0 and len(deletes) == 0
+
+    # 既存マニフェストとの差分は従来どおり
+    manifest = turso_sync.build_manifest(df, hashes)
+    changed = pd.DataFrame([_row("SUMMARY", "東京都", "新宿区", 31), _row("SUMMARY", "東京都", "中野区", 5)], dtype=str)
+    inserts, updates, deletes = turso_sync.diff_manifest(turso_sync.compute_row_hashes(changed), manifest)
+    assert (inserts.tolist(), updates.tolist(), deletes.tolist()) == ([1], [0], [1])
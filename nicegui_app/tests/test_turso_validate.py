@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+turso_sync.validate_csv（チャンク単位の1パス検証）のテスト
+
+従来の全量読み込み + row_typeごとの groupby と同じ件数・重複数・エラーになること、
+複数CSVの並列検証でJSONレポートが出力されることを確認する。
+"""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import turso_sync
+
+
+def _frame(job_type="看護師", rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    row_types = np.array(["SUMMARY", "AGE_GENDER", "FLOW", "MYSTERY"])
+    df = pd.DataFrame({
+        "id": range(rows),
+        "job_type": job_type,
+        "row_type": row_types[rng.integers(0, len(row_types), rows)],
+        "prefecture": np.array(["東京都", "大阪府", "北海道"])[rng.integers(0, 3, rows)],
+        "municipality": [f"市{i % 40}" if i % 17 else None for i in range(rows)],
+        "category1": np.array(["20代", "30代", None], dtype=object)[rng.integers(0, 3, rows)],
+        "category2": np.array(["男性", "女性"])[rng.integers(0, 2, rows)],
+        "count": rng.integers(0, 100, rows),
+    })
+    return df
+
+
+def _legacy_duplicates(df):
+    """2026-01-20以前の一意キー重複チェック"""
+    result = {}
+    for rt in df["row_type"].unique():
+        if pd.isna(rt):
+            continue
+        key_cols = turso_sync.get_unique_key_cols(rt)
+        missing = [c for c in key_cols if c not in df.columns]
+        if missing:
+            continue
+        subset = df[df["row_type"] == rt]
+        dup = subset[key_cols].fillna("__NULL__").groupby(key_cols).size()
+        result[rt] = int((dup > 1).sum())
+    return result
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # 重複キーがチャンクをまたぐようにする
+    monkeypatch.setattr(turso_sync, "VALIDATE_CHUNK_ROWS", 97)
+
+
+def test_matches_full_frame_checks(tmp_path):
+    df = _frame()
+    path = tmp_path / "nurse.csv"
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+    legacy = pd.read_csv(path, dtype=str, encoding="utf-8-sig").drop(columns=["id"])
+
+    result = turso_sync.validate_csv(str(path), verbose=False)
+    assert result["row_count"] == len(df)
+    assert result["job_type"] == "看護師"
+    assert result["row_types"] == legacy["row_type"].value_counts().to_dict()
+    assert result["duplicate_keys"] == _legacy_duplicates(legacy)
+    assert result["null_counts"]["municipality"] == legacy["municipality"].isna().sum()
+    assert result["prefecture_count"] == 3
+    assert any("重複キー" in e for e in result["errors"])
+    assert any("未定義のrow_type" in w for w in result["warnings"])
+    assert any("idカラム" in w for w in result["warnings"])
+
+
+def test_valid_csv_and_job_type_errors(tmp_path):
+    df = _frame(rows=40).drop(columns=["category1", "category2"])
+    df["row_type"] = "SUMMARY"
+    df["municipality"] = [f"市{i}" for i in range(40)]
+    path = tmp_path / "ok.csv"
+    df.to_csv(path, index=False)
+    result = turso_sync.validate_csv(str(path), verbose=False)
+    assert result["valid"], result["errors"]
+    assert result["duplicate_keys"] == {"SUMMARY": 0}
+
+    df.loc[5, "job_type"] = "介護職"
+    df.loc[6, "prefecture"] = None
+    df.to_csv(path, index=False)
+    errors = turso_sync.validate_csv(str(path), verbose=False)["errors"]
+    assert any("複数のjob_type" in e for e in errors)
+    assert any("'prefecture'に1件のNULL" in e for e in errors)
+
+
+def test_parallel_report(tmp_path):
+    paths = []
+    for i, job_type in enumerate(["看護師", "介護職", "保育士"]):
+        path = tmp_path / f"MapComplete_{job_type}.csv"
+        _frame(job_type, rows=300, seed=i).to_csv(path, index=False, encoding="utf-8-sig")
+        paths.append(str(path))
+    report_path = tmp_path / "report" / "validation.json"
+
+    results = turso_sync.validate_csvs(paths, workers=2, report_path=str(report_path))
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert [r["job_type"] for r in results] == ["看護師", "介護職", "保育士"]
+    assert [f["csv"] for f in report["files"]] == [str(Path(p).resolve()) for p in paths]
+    assert report["valid"] is False
+    assert report["files"][0]["row_types"] == turso_sync.validate_csv(paths[0], verbose=False)["row_types"]
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+一括ウォームアップ（warmup.py / db_helper の事前ロード）のテスト
+
+row_type パーティションのページ取得から作った都道府県別データが都道府県ごとのクエリ結果と一致すること、
+リクエストがまとめられること、予算・失敗時の扱いと進捗・完了待ちを確認する。
+"""
+import math
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import db_helper
+import warmup
+from cache_manager import cache_manager
+
+PREFECTURES = ["北海道", "東京都", "神奈川県", "大阪府"]
+ROW_TYPES = ["SUMMARY", "AGE_GENDER", "RESIDENCE_FLOW"]
+
+
+def _rows():
+    rows = []
+    for i in range(150):
+        rows.append({"job_type": "介護職" if i % 5 else "看護師", "row_type": ROW_TYPES[i % 3],
+                     "prefecture": PREFECTURES[(i * 7) % 4], "municipality": f"市{i % 11}",
+                     "category1": f"{20 + (i % 5) * 10}代", "count": i})
+    rows.append({"job_type": "介護職", "row_type": "SUMMARY", "prefecture": None, "municipality": None,
+                 "category1": None, "count": 1})  # 都道府県欠損（事前ロード対象外）
+    return rows
+
+
+@pytest.fixture
+def sqlite_mode(monkeypatch, tmp_path):
+    db_path = tmp_path / "job_seeker.db"
+    with sqlite3.connect(db_path) as conn:
+        pd.DataFrame(_rows()).to_sql("job_seeker_data", conn, index=False)
+    monkeypatch.setattr(db_helper, "USE_CSV_MODE", False)
+    monkeypatch.setattr(db_helper, "_HAS_TURSO", False)
+    monkeypatch.setattr(db_helper, "_lazy_init_turso", lambda: False)
+    monkeypatch.setattr(db_helper, "DATABASE_URL", None)
+    monkeypatch.setattr(db_helper, "DB_PATH", db_path)
+    monkeypatch.setattr(db_helper, "_job_type_provider", None)
+    monkeypatch.setattr(warmup, "PAGE_ROWS", 7)
+    monkeypatch.setattr(warmup, "PAGES_PER_REQUEST", 3)
+    db_helper._preload_status.update(loading=False, loaded=False, job_type=None)
+    db_helper.clear_cache()
+    with db_helper.job_type_scope(None):  # 他のテストで設定された職種を引き継がない
+        yield db_path
+    db_helper._preload_status.update(loading=False, loaded=False, job_type=None, skipped=[])
+    db_helper.clear_cache()
+
+
+def _expected(db_path, job_type, pref):
+    with sqlite3.connect(db_path) as conn:
+        return pd.read_sql_query("SELECT * FROM job_seeker_data WHERE job_type = ? AND prefecture = ?",
+                                 conn, params=(job_type, pref))
+
+
+def _sorted(df):
+    return df.sort_values(["row_type", "count"]).reset_index(drop=True)
+
+
+def test_preload_matches_per_prefecture_queries(sqlite_mode):
+    db_helper._background_preload_all("介護職")
+    status = db_helper.get_preload_status()
+
+    assert status["loaded"] and status["complete"] and not status["errors"]
+    assert status["prefectures"] == ["北海道", "東京都", "神奈川県", "大阪府"]
+    assert status["progress"] == status["total"] == len(db_helper.PREFECTURE_ORDER)
+    for pref in PREFECTURES:
+        pd.testing.assert_frame_equal(_sorted(db_helper.get_preloaded_data(pref)),
+                                      _sorted(_expected(sqlite_mode, "介護職", pref)))
+
+    # ページ数 = row_type ごとの ceil(行数 / 7)、リクエスト = 計画1回 + ceil(ページ数 / 3)
+    pages = sum(math.ceil(40 / 7) for _ in ROW_TYPES)
+    assert (status["pages_done"], status["pages_total"]) == (pages, pages)
+    assert status["requests"] == 1 + math.ceil(pages / 3)
+    assert status["rows"] == 120
+
+    national = db_helper.get_preloaded_data(row_type="SUMMARY")
+    assert len(national) == 40 and set(national["job_type"]) == {"介護職"}
+    assert db_helper.get_preloaded_data(job_type="看護師").empty
+    assert db_helper.is_preload_ready()
+
+
+def test_budget_skips_prefectures(sqlite_mode, monkeypatch):
+    monkeypatch.setattr(warmup, "BUDGET_SHARE", 1.0)
+    full = warmup.run_warmup("介護職", db_helper._warmup_execute, PREFECTURES, budget_bytes=1e9)
+    budget = full["bytes"] * 0.6
+    monkeypatch.setattr(cache_manager, "budget_bytes", budget)
+
+    db_helper._background_preload_all("介護職")
+    status = db_helper.get_preload_status()
+    assert status["skipped"] and not status["complete"]
+    assert status["prefectures"] + status["skipped"] == PREFECTURES
+    assert status["bytes"] <= budget
+    for pref in status["prefectures"]:  # prefecture IN (...) で絞り込んで取得
+        pd.testing.assert_frame_equal(_sorted(db_helper.get_preloaded_data(pref)),
+                                      _sorted(_expected(sqlite_mode, "介護職", pref)))
+    assert db_helper.get_preloaded_data(status["skipped"][0]).empty
+    assert db_helper.get_preloaded_data().empty  # 全国は不完全なためDBにフォールバック
+
+
+def test_retry_and_failure(sqlite_mode):
+    calls = []
+
+    def flaky(queries):
+        calls.append(len(queries))
+        if len(calls) == 2:
+            raise ConnectionError("reset")
+        return db_helper._warmup_execute(queries)
+
+    result = warmup.run_warmup("介護職", flaky, PREFECTURES, budget_bytes=1e9, concurrency=1)
+    assert not result["errors"] and result["requests"] == len(calls)
+    assert set(result["slices"]) == set(PREFECTURES)
+
+    def broken(queries):
+        if "LIMIT 7 OFFSET 14" in " ".join(sql for sql, _ in queries):
+            raise ConnectionError("down")
+        return db_helper._warmup_execute(queries)
+
+    result = warmup.run_warmup("介護職", broken, PREFECTURES, budget_bytes=1e9)
+    assert result["errors"] and result["slices"] == {}
+
+
+def test_start_and_wait(sqlite_mode):
+    db_helper.start_background_preload("看護師")
+    assert db_helper.wait_for_preload(timeout=30) is False  # 現在の職種（介護職）ではない
+    assert db_helper.get_preload_status()["job_type"] == "看護師"
+    assert len(db_helper.get_preloaded_data("東京都", job_type="看護師")) == len(_expected(sqlite_mode, "看護師", "東京都"))
+
+    # 別の職種ならやり直し
+    db_helper.start_background_preload("介護職")
+    assert db_helper.wait_for_preload(timeout=30) is True
+    assert db_helper.get_preload_status()["complete"]
+
+
+def test_turso_pipeline_query(monkeypatch):
+    class Response:
+        status_code = 200
+
+        def __init__(self, results):
+            self._results = results
+
+        def json(self):
+            return {"results": self._results}
+
+    ok = {"type": "ok", "response": {"result": {
+        "cols": [{"name": "prefecture"}, {"name": "count"}],
+        "rows": [[{"type": "text", "value": "東京都"}, {"type": "integer", "value": "3"}],
+                 [{"type": "text", "value": "北海道"}, {"type": "null"}]]}}}
+    empty = {"type": "ok", "response": {"result": {"cols": [{"name": "prefecture"}], "rows": []}}}
+    payloads = []
+    monkeypatch.setattr(db_helper, "post_pipeline",
+                        lambda url, token, payload: payloads.append(payload) or Response([ok, empty]))
+
+    frames = db_helper._turso_pipeline_query([("SELECT 1", ("介護職",)), ("SELECT 2", None)])
+    assert frames[0]["prefecture"].tolist() == ["東京都", "北海道"]
+    assert frames[0]["count"].iloc[0] == "3" and pd.isna(frames[0]["count"].iloc[1])
+    assert frames[1].empty
+    assert [r["stmt"].get("args") for r in payloads[0]["requests"]] == [[{"type": "text", "value": "介護職"}], None]
+
+    monkeypatch.setattr(db_helper, "post_pipeline", lambda url, token, payload: Response(
+        [ok, {"type": "error", "error": {"message": "no such table"}}]))
+    with pytest.raises(Exception, match="no such table"):
+        db_helper._turso_pipeline_query([("SELECT 1", None), ("SELECT 2", None)])
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Turso HTTP APIクライアント（プロセス共有のコネクションプール）
+
+2026-01-20追加:
+db_helper.py / main.py の各クエリ関数がリクエスト毎に httpx.Client を生成していたため、
+毎回 TCP + TLS ハンドシェイクが発生していた。ここで keep-alive 付きのクライアントを
+プロセス全体で共有し、全クエリ経路（同期・非同期）がこのモジュールを経由する。
+
+- 同期版: スレッド間で1つの httpx.Client を共有（httpxはスレッドセーフ）
+- 非同期版: イベントループ毎に1つの httpx.AsyncClient を保持
+- HTTP/2: h2 パッケージがインストールされていれば自動で有効化
+- リクエスト毎のレイテンシ・送受信バイト数・新規接続数を計測（get_turso_client_stats）
+
+環境変数:
+    TURSO_HTTP2                 auto / true / false（デフォルト: auto）
+    TURSO_POOL_MAX_CONNECTIONS  最大同時接続数（デフォルト: 10）
+    TURSO_POOL_MAX_KEEPALIVE    keep-alive保持する接続数（デフォルト: 5）
+    TURSO_KEEPALIVE_EXPIRY      アイドル接続の保持秒数（デフォルト: 60）
+    TURSO_CONNECT_TIMEOUT       接続タイムアウト秒（デフォルト: 10）
+    TURSO_READ_TIMEOUT          読み取りタイムアウト秒（デフォルト: 30）
+    TURSO_POOL_TIMEOUT          プール空き待ちタイムアウト秒（デフォルト: 10）
+"""
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Dict, Optional
+
+import httpx
+
+import instrumentation
+
+# HTTP/2はオプション依存（h2がない環境ではHTTP/1.1 keep-aliveで動作）
+try:
+    import h2  # noqa: F401
+    _H2_AVAILABLE = True
+except ImportError:
+    _H2_AVAILABLE = False
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        print(f"[TURSO] Invalid {name}={os.getenv(name)!r}, using {default}")
+        return float(default)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        print(f"[TURSO] Invalid {name}={os.getenv(name)!r}, using {default}")
+        return int(default)
+
+
+def _resolve_http2() -> bool:
+    setting = os.getenv("TURSO_HTTP2", "auto").strip().lower()
+    if setting in ("0", "false", "no", "off"):
+        return False
+    if setting in ("1", "true", "yes", "on") and not _H2_AVAILABLE:
+        print("[TURSO] TURSO_HTTP2=true but h2 is not installed - falling back to HTTP/1.1")
+    return _H2_AVAILABLE
+
+
+# =====================================
+# クライアント設定
+# =====================================
+HTTP2_ENABLED = _resolve_http2()
+POOL_LIMITS = httpx.Limits(
+    max_connections=_env_int("TURSO_POOL_MAX_CONNECTIONS", 10),
+    max_keepalive_connections=_env_int("TURSO_POOL_MAX_KEEPALIVE", 5),
+    keepalive_expiry=_env_float("TURSO_KEEPALIVE_EXPIRY", 60.0),
+)
+TIMEOUT = httpx.Timeout(
+    _env_float("TURSO_READ_TIMEOUT", 30.0),
+    connect=_env_float("TURSO_CONNECT_TIMEOUT", 10.0),
+    pool=_env_float("TURSO_POOL_TIMEOUT", 10.0),
+)
+
+_sync_client: Optional[httpx.Client] = None
+_sync_client_lock = threading.Lock()
+# イベントループ毎のAsyncClient（ループ終了時に自動で解放される）
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def pipeline_url(database_url: str) -> str:
+    """libsql:// URLを /v2/pipeline のHTTPS URLに変換"""
+    http_url = database_url
+    if http_url.startswith("libsql://"):
+        http_url = http_url.replace("libsql://", "https://")
+    return f"{http_url.rstrip('/')}/v2/pipeline"
+
+
+def _auth_headers(auth_token: str) -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {auth_token}",
+        "Content-Type": "application/json",
+    }
+
+
+def get_client() -> httpx.Client:
+    """プロセス共有の同期クライアントを取得（初回のみ生成）"""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        with _sync_client_lock:
+            if _sync_client is None or _sync_client.is_closed:
+                _sync_client = httpx.Client(http2=HTTP2_ENABLED, limits=POOL_LIMITS, timeout=TIMEOUT)
+                print(f"[TURSO] Pooled client created (http2={HTTP2_ENABLED}, "
+                      f"max_connections={POOL_LIMITS.max_connections})")
+    return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """実行中イベントループ用の非同期クライアントを取得（ループ毎に1つ）"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(http2=HTTP2_ENABLED, limits=POOL_LIMITS, timeout=TIMEOUT)
+        _async_clients[loop] = client
+    return client
+
+
+# =====================================
+# メトリクス
+# =====================================
+_LATENCY_WINDOW = 1000  # パーセンタイル計算用に保持する直近リクエスト数
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Any] = {}
+_latencies_ms: deque = deque(maxlen=_LATENCY_WINDOW)
+
+
+def reset_turso_client_stats() -> None:
+    """メトリクスを初期化"""
+    with _stats_lock:
+        _stats.clear()
+        _stats.update({
+            "requests": 0,
+            "errors": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+            "connections_opened": 0,
+            "tls_handshakes": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        })
+        _latencies_ms.clear()
+
+
+reset_turso_client_stats()
+
+
+class _ConnectionTrace:
+    """httpcoreのtrace拡張で新規TCP接続・TLSハンドシェイクを数える"""
+
+    __slots__ = ("connections", "handshakes")
+
+    def __init__(self):
+        self.connections = 0
+        self.handshakes = 0
+
+    def _record(self, event_name: str) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.connections += 1
+        elif event_name == "connection.start_tls.complete":
+            self.handshakes += 1
+
+    def __call__(self, event_name: str, info: dict) -> None:
+        self._record(event_name)
+
+    async def async_trace(self, event_name: str, info: dict) -> None:
+        self._record(event_name)
+
+
+def _record_request(started: float, request_bytes: int, response: Optional[httpx.Response],
+                    trace: _ConnectionTrace) -> None:
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["bytes_sent"] += request_bytes
+        _stats["connections_opened"] += trace.connections
+        _stats["tls_handshakes"] += trace.handshakes
+        _stats["total_latency_ms"] += elapsed_ms
+        _stats["max_latency_ms"] = max(_stats["max_latency_ms"], elapsed_ms)
+        _latencies_ms.append(elapsed_ms)
+        if response is None or response.status_code != 200:
+            _stats["errors"] += 1
+        if response is not None:
+            # num_bytes_downloadedは圧縮後のワイヤーバイト数（未計測のトランスポートは本文長で代用）
+            _stats["bytes_received"] += response.num_bytes_downloaded or len(response.content)
+    instrumentation.observe("turso.request", elapsed_ms / 1000,
+                            error=response is None or response.status_code != 200,
+                            status=response.status_code if response is not None else None,
+                            bytes_sent=request_bytes, new_connections=trace.connections)
+
+
+def get_turso_client_stats() -> Dict[str, Any]:
+    """接続プールとリクエストのメトリクスを取得
+
+    Returns:
+        dict: requests, errors, bytes_sent, bytes_received, connections_opened,
+              tls_handshakes, reused_requests, avg/p50/p95/max_latency_ms, http2
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+        latencies = sorted(_latencies_ms)
+
+    def _percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        idx = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+        return round(latencies[idx], 1)
+
+    requests = stats["requests"]
+    stats["reused_requests"] = max(0, requests - stats["connections_opened"])
+    stats["avg_latency_ms"] = round(stats.pop("total_latency_ms") / requests, 1) if requests else 0.0
+    stats["max_latency_ms"] = round(stats["max_latency_ms"], 1)
+    stats["p50_latency_ms"] = _percentile(0.50)
+    stats["p95_latency_ms"] = _percentile(0.95)
+    stats["http2"] = HTTP2_ENABLED
+    stats["max_connections"] = POOL_LIMITS.max_connections
+    return stats
+
+
+def _turso_metrics():
+    """/metrics 用（instrumentation のコレクタ）"""
+    stats = get_turso_client_stats()
+    return [
+        ("turso_requests_total", "counter", "Turso pipeline requests", [({}, stats["requests"])]),
+        ("turso_errors_total", "counter", "Turso requests that failed or returned non-200", [({}, stats["errors"])]),
+        ("turso_bytes_total", "counter", "Turso request/response bytes",
+         [({"direction": "sent"}, stats["bytes_sent"]), ({"direction": "received"}, stats["bytes_received"])]),
+        ("turso_connections_opened_total", "counter", "New TCP connections to Turso", [({}, stats["connections_opened"])]),
+    ]
+
+
+instrumentation.register_collector(_turso_metrics)
+
+
+# =====================================
+# リクエスト送信
+# =====================================
+def post_pipeline(database_url: str, auth_token: str, payload: dict) -> httpx.Response:
+    """/v2/pipeline にPOST（同期・共有プール経由）
+
+    ステータスコードの判定・リトライは呼び出し側で行う。
+    """
+    client = get_client()
+    request = client.build_request(
+        "POST", pipeline_url(database_url), headers=_auth_headers(auth_token), json=payload
+    )
+    trace = _ConnectionTrace()
+    request.extensions["trace"] = trace
+    started = time.perf_counter()
+    response = None
+    try:
+        response = client.send(request)
+        return response
+    finally:
+        _record_request(started, len(request.content), response, trace)
+
+
+async def async_post_pipeline(database_url: str, auth_token: str, payload: Optional[dict],
+                              content: Optional[bytes] = None,
+                              timeout: Optional[float] = None) -> httpx.Response:
+    """/v2/pipeline にPOST（非同期・共有プール経由）
+
+    Args:
+        payload: リクエストJSON（dict）
+        content: エンコード済みのリクエスト本文（payloadの代わりに使用、一括インポート用）
+        timeout: このリクエストだけ読み取りタイムアウト（秒）を上書き
+    """
+    client = get_async_client()
+    body = {"content": content} if content is not None else {"json": payload}
+    if timeout:
+        body["timeout"] = httpx.Timeout(timeout, connect=TIMEOUT.connect, pool=TIMEOUT.pool)
+    request = client.build_request(
+        "POST", pipeline_url(database_url), headers=_auth_headers(auth_token), **body
+    )
+    trace = _ConnectionTrace()
+    request.extensions["trace"] = trace.async_trace
+    started = time.perf_counter()
+    response = None
+    try:
+        response = await client.send(request)
+        return response
+    finally:
+        _record_request(started, len(request.content), response, trace)
+
+
+async def close_turso_clients() -> None:
+    """共有クライアントをクローズ（アプリ終了時に呼び出し）"""
+    global _sync_client
+    with _sync_client_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
+    # 他ループのクライアントはループと共に破棄されるため、実行中ループの分のみクローズ
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            print(f"[TURSO] Async client close failed: {e}")
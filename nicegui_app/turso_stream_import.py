@@ -0,0 +1,511 @@
+# -*- coding: utf-8 -*-
+"""
+Turso ストリーミング並列インポート（2026-01-20追加）
+
+turso_sync.import_csv の挿入フェーズは、CSV全体を読み込んで df.to_dict('records') で全行をdict化し、
+1セルずつ convert_value → json.dumps した1,000行のリクエストを urllib で1本ずつ同期送信していた。
+このモジュールは同じINSERTを以下の形で送信する。
+
+- CSVをチャンク単位で読み込む（メモリはチャンク + 送信待ちキュー分のみ）
+- Turso の args をカラム単位でまとめてJSON断片に変換（型判定は convert_value と同一）
+- 共有AsyncClient（turso_client）で最大N本のリクエストを同時送信
+- 1リクエストあたりの文数を応答時間に応じて増減し、429/5xx/タイムアウトでは縮小して全送信を一時停止
+  （Retry-Afterがあれば従う）。送信待ちキューが一杯の間はCSVの読み込みを止める（背圧）
+- 完了した行範囲をチェックポイント（JSON）に記録し、中断後の再実行では未完了の文のみ送信
+
+INSERT文はCSV先頭から ROWS_PER_INSERT 行ごとの固定の区切りで作るため、
+再実行しても各文の行範囲は変わらず、チェックポイントの範囲と突き合わせられる。
+
+環境変数:
+    TURSO_IMPORT_CONCURRENCY    同時送信リクエスト数（デフォルト: 4）
+    TURSO_IMPORT_CHUNK_ROWS     CSV読み込みのチャンク行数（デフォルト: 20000）
+"""
+import asyncio
+import bisect
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from turso_client import async_post_pipeline, get_async_client
+from turso_sync import INSERTS_PER_REQUEST, INTEGER_COLUMNS, NUMERIC_COLUMNS, ROWS_PER_INSERT
+
+# =====================================
+# 設定
+# =====================================
+DEFAULT_CONCURRENCY = int(os.getenv('TURSO_IMPORT_CONCURRENCY', 4))
+CHUNK_ROWS = int(os.getenv('TURSO_IMPORT_CHUNK_ROWS', 20000))
+ENCODE_ROWS = 2000  # エンコードの単位（チャンク全体を一度に文字列化しない）
+
+MIN_STATEMENTS_PER_REQUEST = 5     # 100行
+MAX_STATEMENTS_PER_REQUEST = 250   # 5,000行
+TARGET_LATENCY = 8.0               # この秒数より速ければ文数を増やし、2倍を超えたら減らす
+REQUEST_TIMEOUT = 300.0
+MAX_RETRIES = 5
+MAX_BACKOFF = 60.0
+
+_NULL_ARG = '{"type":"null"}'
+_NEEDS_ESCAPE = r'["\\\x00-\x1f]'
+# convert_value で NULL になる文字列（'' と大文字小文字を問わない 'nan'）
+_NULL_STRINGS = [''] + [''.join(c) for c in itertools.product('nN', 'aA', 'nN')]
+# そのままJSONの数値として送れる表記（convert_value の float()/int() と同じ値になるもの）
+_JSON_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?\Z')
+_JSON_INTEGER = re.compile(r'(?:0|-?[1-9]\d{0,17})\Z')
+
+
+# =====================================
+# args のエンコード
+# =====================================
+def _to_float(val: str) -> float:
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _wrap(prefix: str, values: np.ndarray, suffix: str) -> np.ndarray:
+    return prefix + values.astype(object) + suffix
+
+
+def _parse_numbers(text: np.ndarray, integer: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """JSON数値として送れない表記（'1.0E3', ' 12', 整数カラムの '12.0' など）を float()/int() の規則で変換
+
+    Returns:
+        (値のJSON表記, NULLにするマスク)
+    """
+    num = pd.to_numeric(pd.Series(text, dtype=object), errors='coerce').to_numpy(dtype=np.float64, copy=True)
+    # pandasが解釈しない表記（'1_000' など）は float() で再判定
+    retry = np.isnan(num)
+    if retry.any():
+        num[retry] = [_to_float(v) for v in text[retry]]
+    null = np.isnan(num)
+    if integer:
+        null |= ~np.isfinite(num)  # int(inf) は OverflowError → NULL
+    out = np.empty(len(num), dtype=object)
+    for i in np.flatnonzero(~null):
+        out[i] = str(int(num[i])) if integer else json.dumps(float(num[i]))
+    return out, null
+
+
+def encode_column(values: pd.Series, col_name: str) -> np.ndarray:
+    """1カラム分の値を Turso args のJSON断片に変換（convert_value と同じ型判定）
+
+    数値カラムはCSVの表記がそのままJSONの数値として読める場合は変換せずに送り、
+    それ以外の表記だけ float()/int() の規則で変換する。
+
+    Args:
+        values: dtype=str で読み込んだカラム
+        col_name: カラム名（NUMERIC_COLUMNS / INTEGER_COLUMNS で型を決める）
+
+    Returns:
+        np.ndarray: 行ごとのJSON文字列（object配列）
+    """
+    null = (values.isna() | values.isin(_NULL_STRINGS)).to_numpy(dtype=bool, copy=True)
+    text = values.to_numpy(dtype=object, copy=True)
+    text[null] = ''
+    out = np.full(len(text), _NULL_ARG, dtype=object)
+
+    if col_name not in NUMERIC_COLUMNS:
+        escape = pd.Series(text, dtype=object).str.contains(_NEEDS_ESCAPE, regex=True).to_numpy(dtype=bool)
+        plain = ~null & ~escape
+        out[plain] = _wrap('{"type":"text","value":"', text[plain], '"}')
+        if escape.any():
+            out[escape] = _wrap('{"type":"text","value":',
+                                np.array([json.dumps(v, ensure_ascii=False) for v in text[escape]], dtype=object),
+                                '}')
+        return out
+
+    integer = col_name in INTEGER_COLUMNS
+    prefix, suffix = ('{"type":"integer","value":"', '"}') if integer else ('{"type":"float","value":', '}')
+    pattern = _JSON_INTEGER if integer else _JSON_NUMBER
+    direct = np.fromiter(map(pattern.match, text), dtype=object, count=len(text)).astype(bool)
+    out[direct] = _wrap(prefix, text[direct], suffix)
+
+    rest = ~null & ~direct
+    if rest.any():
+        parsed, parsed_null = _parse_numbers(text[rest], integer)
+        positions = np.flatnonzero(rest)
+        out[positions[~parsed_null]] = _wrap(prefix, parsed[~parsed_null], suffix)
+    return out
+
+
+def encode_rows(chunk: pd.DataFrame, columns: List[str]) -> List[str]:
+    """チャンクの各行を args のJSON断片（カラム順にカンマ区切り）に変換"""
+    if not len(chunk):
+        return []
+    encoded = [encode_column(chunk[col], col) if col in chunk.columns
+               else np.full(len(chunk), _NULL_ARG, dtype=object) for col in columns]
+    return list(map(','.join, zip(*encoded)))
+
+
+def _insert_sql(columns: List[str], rows: int) -> str:
+    single_ph = '(' + ', '.join(['?' for _ in columns]) + ')'
+    return f"INSERT INTO job_seeker_data ({', '.join(columns)}) VALUES {', '.join([single_ph] * rows)}"
+
+
+class StatementEncoder:
+    """チャンクをINSERT文（JSON文字列）に変換（SQLは行数ごとにキャッシュ）"""
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self._sql_json: Dict[int, str] = {}
+
+    def _stmt(self, rows: List[str]) -> str:
+        sql = self._sql_json.get(len(rows))
+        if sql is None:
+            sql = self._sql_json[len(rows)] = json.dumps(_insert_sql(self.columns, len(rows)), ensure_ascii=False)
+        return '{"type":"execute","stmt":{"sql":' + sql + ',"args":[' + ','.join(rows) + ']}}'
+
+    def encode(self, chunk: pd.DataFrame, row_offset: int,
+               checkpoint: Optional['ImportCheckpoint'] = None) -> List[Tuple[int, int, str]]:
+        """チャンクを ROWS_PER_INSERT 行ごとの文に変換（チェックポイントで完了済みの文は除外）
+
+        Returns:
+            list: (開始行, 終了行, 文のJSON) ※行番号はCSV先頭からの通し番号
+        """
+        n = len(chunk)
+        bounds = [(s, min(s + ROWS_PER_INSERT, n)) for s in range(0, n, ROWS_PER_INSERT)]
+        if checkpoint is not None:
+            bounds = [(s, e) for s, e in bounds if not checkpoint.covers(row_offset + s, row_offset + e)]
+        if not bounds:
+            return []
+        if sum(e - s for s, e in bounds) < n:
+            positions = np.concatenate([np.arange(s, e) for s, e in bounds])
+            rows = encode_rows(chunk.iloc[positions], self.columns)
+        else:
+            rows = encode_rows(chunk, self.columns)
+
+        stmts = []
+        pos = 0
+        for s, e in bounds:
+            stmts.append((row_offset + s, row_offset + e, self._stmt(rows[pos:pos + e - s])))
+            pos += e - s
+        return stmts
+
+
+# =====================================
+# チェックポイント
+# =====================================
+def csv_fingerprint(csv_path: str) -> Dict:
+    """CSVの同一性判定用（パス・サイズ・更新時刻）"""
+    stat = os.stat(csv_path)
+    return {'csv': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class ImportCheckpoint:
+    """完了した行範囲 [開始, 終了) の記録
+
+    範囲は隣接・重複をまとめて保持する（並列送信で完了順が前後しても数個の範囲に収まる）。
+    state には呼び出し側の進捗（削除済みかどうか等）を保存できる。
+    """
+
+    def __init__(self, path: Path, fingerprint: Dict, ranges: Optional[List[List[int]]] = None,
+                 state: Optional[Dict] = None):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.ranges: List[List[int]] = [list(r) for r in ranges or []]
+        self.state: Dict = dict(state or {})
+
+    @classmethod
+    def load(cls, path: Path, csv_path: str) -> Optional['ImportCheckpoint']:
+        """同じCSVのチェックポイントを読み込み（ない・CSVが変わった場合はNone）"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"[CHECKPOINT] 読み込み失敗（無視）: {e}")
+            return None
+        if data.get('fingerprint') != csv_fingerprint(csv_path):
+            print("[CHECKPOINT] CSVが前回から変更されているため破棄")
+            return None
+        return cls(path, data['fingerprint'], data.get('ranges'), data.get('state'))
+
+    @classmethod
+    def create(cls, path: Path, csv_path: str) -> 'ImportCheckpoint':
+        return cls(path, csv_fingerprint(csv_path))
+
+    @property
+    def rows_done(self) -> int:
+        return sum(e - s for s, e in self.ranges)
+
+    def covers(self, start: int, end: int) -> bool:
+        i = bisect.bisect_right(self.ranges, [start, float('inf')]) - 1
+        return i >= 0 and self.ranges[i][0] <= start and end <= self.ranges[i][1]
+
+    def add(self, start: int, end: int) -> None:
+        merged: List[List[int]] = []
+        for s, e in sorted(self.ranges + [[start, end]]):
+            if merged and s <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], e)
+            else:
+                merged.append([s, e])
+        self.ranges = merged
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        tmp_path.write_text(json.dumps({
+            'fingerprint': self.fingerprint, 'ranges': self.ranges, 'state': self.state,
+            'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
+
+
+# =====================================
+# 送信（適応バッチ + 背圧）
+# =====================================
+class AdaptiveBatchSize:
+    """1リクエストあたりの文数を調整
+
+    - 応答が TARGET_LATENCY より速ければ25%増、2倍より遅ければ半減
+    - 429/5xx/タイムアウトでは半減し、指定秒数だけ全送信を停止
+    """
+
+    def __init__(self, initial: int = INSERTS_PER_REQUEST, minimum: int = MIN_STATEMENTS_PER_REQUEST,
+                 maximum: int = MAX_STATEMENTS_PER_REQUEST, target_latency: float = TARGET_LATENCY):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.size = max(minimum, min(initial, maximum))
+        self.target_latency = target_latency
+        self.paused_until = 0.0
+        self.throttled = 0
+
+    def on_success(self, statements: int, latency: float) -> None:
+        if statements < self.size:
+            return  # キュー待ちで小さくなったリクエストでは判断しない
+        if latency < self.target_latency:
+            self.size = min(self.maximum, self.size + max(1, self.size // 4))
+        elif latency > self.target_latency * 2:
+            self.size = max(self.minimum, self.size // 2)
+
+    def on_throttle(self, delay: float) -> None:
+        self.throttled += 1
+        self.size = max(self.minimum, self.size // 2)
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+    async def wait(self) -> None:
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return min(MAX_BACKOFF, float(response.headers.get('Retry-After', '')))
+    except ValueError:
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """プロセスのピークRSS（MB、resourceモジュールがないWindowsではNone）"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class _Uploader:
+    def __init__(self, url: str, token: str, checkpoint: Optional[ImportCheckpoint],
+                 concurrency: int, total_rows: Optional[int]):
+        self.url = url
+        self.token = token
+        self.checkpoint = checkpoint
+        self.concurrency = max(1, concurrency)
+        self.total_rows = total_rows
+        self.batch = AdaptiveBatchSize()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * MAX_STATEMENTS_PER_REQUEST)
+        self.stats = {'rows_read': 0, 'rows_skipped': 0, 'rows_sent': 0, 'inserted': 0, 'failed_rows': 0,
+                      'requests': 0, 'retries': 0, 'bytes_sent': 0, 'errors': []}
+        self.started = time.perf_counter()
+        self.senders_alive = self.concurrency  # 終了していない sender() の数
+        self.producer_task: Optional[asyncio.Task] = None
+
+    def _progress(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        done = self.stats['rows_sent']
+        rate = done / elapsed if elapsed > 0 else 0
+        line = f"\r  {done:,}行 | {rate:,.0f} rows/s | {self.batch.size * ROWS_PER_INSERT:,}行/req"
+        if self.total_rows:
+            remaining = self.total_rows - self.stats['rows_skipped'] - done
+            line += f" | {(done + self.stats['rows_skipped']) / self.total_rows * 100:5.1f}%"
+            if rate > 0:
+                line += f" | ETA {max(remaining, 0) / rate / 60:.1f}min"
+        print(line + "   ", end="", flush=True)
+
+    def _error(self, message: str) -> None:
+        if len(self.stats['errors']) < 20:
+            self.stats['errors'].append(message)
+        print(f"\n  エラー: {message[:80]}")
+
+    async def _post(self, batch: List[Tuple[int, int, str]]) -> Optional[list]:
+        """1リクエストを送信（リトライ付き）。失敗時はNone"""
+        body = ('{"requests":[' + ','.join(stmt for _, _, stmt in batch) + ']}').encode('utf-8')
+        for attempt in range(MAX_RETRIES):
+            await self.batch.wait()
+            self.stats['requests'] += 1
+            self.stats['bytes_sent'] += len(body)
+            started = time.perf_counter()
+            try:
+                response = await async_post_pipeline(self.url, self.token, None, content=body,
+                                                     timeout=REQUEST_TIMEOUT)
+            except httpx.HTTPError as e:
+                reason, delay = f"{type(e).__name__}: {e}", None
+            else:
+                if response.status_code == 200:
+                    self.batch.on_success(len(batch), time.perf_counter() - started)
+                    return response.json().get('results', [])
+                if response.status_code != 429 and response.status_code < 500:
+                    self._error(f"HTTP {response.status_code}: {response.text[:200]}")
+                    return None
+                reason, delay = f"HTTP {response.status_code}", _retry_after(response)
+            if attempt == MAX_RETRIES - 1:
+                self._error(reason)
+                return None
+            delay = delay if delay is not None else min(MAX_BACKOFF, 3 * 2 ** attempt)
+            self.stats['retries'] += 1
+            self.batch.on_throttle(delay)
+            print(f"\n  リトライ {attempt + 1}/{MAX_RETRIES} ({delay:.0f}秒待機、"
+                  f"{self.batch.size * ROWS_PER_INSERT:,}行/reqに縮小): {reason[:50]}")
+        return None
+
+    def _record(self, batch: List[Tuple[int, int, str]], results: Optional[list]) -> None:
+        for i, (start, end, _) in enumerate(batch):
+            result = results[i] if results is not None and i < len(results) else None
+            if result is None or result.get('type') == 'error':
+                self.stats['failed_rows'] += end - start
+                if result is not None:
+                    self._error(str(result.get('error', {}).get('message', result)))
+                continue
+            affected = result.get('response', {}).get('result', {}).get('affected_row_count', end - start)
+            self.stats['inserted'] += affected
+            if self.checkpoint is not None:
+                self.checkpoint.add(start, end)
+        self.stats['rows_sent'] += sum(end - start for start, end, _ in batch)
+        if self.checkpoint is not None:
+            self.checkpoint.save()
+        self._progress()
+
+    async def sender(self) -> None:
+        try:
+            finished = False
+            while not finished:
+                item = await self.queue.get()
+                if item is None:
+                    return
+                batch = [item]
+                while len(batch) < self.batch.size:
+                    try:
+                        item = self.queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if item is None:
+                        finished = True
+                        break
+                    batch.append(item)
+                # 1バッチの失敗（200以外のJSONでない応答・リトライ後の通信エラーなど）で送信を止めない
+                try:
+                    results = await self._post(batch)
+                except Exception as e:
+                    self._error(f"{type(e).__name__}: {e}")
+                    results = None  # バッチの全行を failed_rows に計上
+                self._record(batch, results)
+        finally:
+            self.senders_alive -= 1
+            if self.senders_alive == 0 and self.producer_task is not None and not self.producer_task.done():
+                # 送信側が全て終了した: キューが空かないまま producer が待ち続けないよう中断する
+                self.producer_task.cancel()
+
+    async def producer(self, reader, encoder: StatementEncoder,
+                       on_chunk: Optional[Callable[[pd.DataFrame], None]]) -> None:
+        offset = 0
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, reader, None)
+                if chunk is None:
+                    break
+                if 'id' in chunk.columns:
+                    chunk = chunk.drop(columns=['id'])
+                if on_chunk is not None:
+                    on_chunk(chunk)
+                for start in range(0, len(chunk), ENCODE_ROWS):
+                    part = chunk.iloc[start:start + ENCODE_ROWS]
+                    stmts = await asyncio.to_thread(encoder.encode, part, offset + start, self.checkpoint)
+                    self.stats['rows_skipped'] += len(part) - sum(e - s for s, e, _ in stmts)
+                    for stmt in stmts:
+                        await self.queue.put(stmt)  # キューが一杯なら送信を待つ（背圧）
+                self.stats['rows_read'] += len(chunk)
+                offset += len(chunk)
+        finally:
+            for _ in range(self.senders_alive):
+                await self.queue.put(None)
+
+
+async def _stream_import(csv_path: str, url: str, token: str, checkpoint: Optional[ImportCheckpoint],
+                         concurrency: int, chunk_rows: int, total_rows: Optional[int],
+                         on_chunk: Optional[Callable[[pd.DataFrame], None]]) -> Dict:
+    columns = [c for c in pd.read_csv(csv_path, dtype=str, encoding='utf-8-sig', nrows=0).columns if c != 'id']
+    # 文の区切りをCSV全体で固定するため、チャンク行数は ROWS_PER_INSERT の倍数にする
+    chunk_rows = max(ROWS_PER_INSERT, chunk_rows // ROWS_PER_INSERT * ROWS_PER_INSERT)
+    uploader = _Uploader(url, token, checkpoint, concurrency, total_rows)
+    reader = pd.read_csv(csv_path, dtype=str, encoding='utf-8-sig', chunksize=chunk_rows)
+    try:
+        with reader:
+            # 読み込みで例外が起きても送信中のリクエストは完了させてから伝播する
+            senders = [asyncio.ensure_future(uploader.sender()) for _ in range(uploader.concurrency)]
+            uploader.producer_task = asyncio.ensure_future(
+                uploader.producer(reader, StatementEncoder(columns), on_chunk))
+            results = await asyncio.gather(uploader.producer_task, *senders, return_exceptions=True)
+        # 送信側の例外を優先して伝播（producer はその結果中断された CancelledError のことがある）
+        for result in [*results[1:], results[0]]:
+            if isinstance(result, BaseException):
+                raise result
+    finally:
+        await get_async_client().aclose()
+    stats = uploader.stats
+    stats['elapsed'] = time.perf_counter() - uploader.started
+    stats['rows_per_sec'] = stats['rows_sent'] / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+    stats['final_rows_per_request'] = uploader.batch.size * ROWS_PER_INSERT
+    stats['throttled'] = uploader.batch.throttled
+    return stats
+
+
+def stream_import(csv_path: str, url: str, token: str, checkpoint: Optional[ImportCheckpoint] = None,
+                  concurrency: int = DEFAULT_CONCURRENCY, chunk_rows: int = CHUNK_ROWS,
+                  total_rows: Optional[int] = None,
+                  on_chunk: Optional[Callable[[pd.DataFrame], None]] = None) -> Dict:
+    """CSVを job_seeker_data にストリーミング挿入
+
+    Args:
+        csv_path: インポートするCSV（idカラムは除外）
+        url, token: Turso接続情報
+        checkpoint: 完了範囲の記録先（完了済みの文は送信しない。Noneなら記録しない）
+        concurrency: 同時送信リクエスト数
+        chunk_rows: CSV読み込みのチャンク行数
+        total_rows: 進捗表示用の総行数（不明ならNone）
+        on_chunk: 読み込んだチャンクごとに呼ぶコールバック（マニフェスト作成用、送信済みの範囲も含む）
+
+    Returns:
+        dict: rows_read, rows_skipped, rows_sent, inserted, failed_rows, requests, retries,
+              bytes_sent, errors, elapsed, rows_per_sec, final_rows_per_request, throttled, peak_rss_mb
+    """
+    stats = asyncio.run(_stream_import(csv_path, url, token, checkpoint, concurrency, chunk_rows,
+                                       total_rows, on_chunk))
+    stats['peak_rss_mb'] = peak_rss_mb()
+    print()
+    return stats
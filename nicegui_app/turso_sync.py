@@ -9,9 +9,11 @@ CSV-DB同期フレームワーク
 - 監査可能: 変更履歴を追跡可能
 
 使用方法:
-  python turso_sync.py validate <CSVファイル>   # CSV検証のみ
-  python turso_sync.py import <CSVファイル>     # 検証→インポート→検証
+  python turso_sync.py validate <CSVファイル>   # CSV検証のみ（複数CSV・フォルダは並列検証）
+  python turso_sync.py import <CSVファイル>     # 検証→インポート→検証（中断時は再実行で続きから）
+  python turso_sync.py sync <CSVファイル>       # 検証→差分同期（変更行のみ送信）→検証
   python turso_sync.py verify <job_type>        # DB検証のみ
+  python turso_sync.py rollup <CSVファイル...>  # 3層比較統計の事前集計（stats_rollup）のみ再作成
 """
 
 import os
@@ -20,8 +22,10 @@ import json
 import time
 import urllib.request
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from dotenv import load_dotenv
+import numpy as np
 import pandas as pd
 
 # =============================================================================
@@ -95,6 +99,30 @@ EXPECTED_ROW_RANGES = {
 ROWS_PER_INSERT = 20
 INSERTS_PER_REQUEST = 50
 
+# 数値として送信するカラム（それ以外はtext、変換できない値はNULL）
+NUMERIC_COLUMNS = frozenset([
+    'desired_count', 'lat', 'lng', 'female_ratio', 'top_age_ratio',
+    'avg_desired_areas', 'persona_count', 'persona_percentage',
+    'supply_count', 'demand_count', 'gap', 'gap_ratio', 'rarity_score',
+    'competition_score', 'flow_in', 'flow_out', 'net_flow', 'count',
+    'percentage', 'male_count', 'female_count', 'male_ratio',
+    'cross_count', 'cross_percentage', 'applicant_count',
+    'avg_qualifications', 'latitude', 'longitude', 'avg_reference_distance_km',
+    'total_applicants', 'retention_rate', 'avg_age'
+])
+
+# 数値カラムのうち整数として送信するカラム
+INTEGER_COLUMNS = frozenset([
+    'desired_count', 'count', 'male_count', 'female_count',
+    'cross_count', 'applicant_count', 'supply_count', 'demand_count',
+    'total_applicants'
+])
+
+# 差分同期設定（2026-01-20追加）
+# マニフェスト: 前回同期したCSVの行ハッシュ（職種ごと、gzip CSV）
+MANIFEST_DIR = Path(os.getenv('TURSO_SYNC_MANIFEST_DIR', Path(__file__).parent / 'data' / 'sync_manifest'))
+STATEMENTS_PER_REQUEST = 200  # UPDATE/DELETE（1行1文）の1リクエストあたり文数
+
 # =============================================================================
 # ユーティリティ関数
 # =============================================================================
@@ -117,27 +145,10 @@ def convert_value(val, col_name: str) -> dict:
     if pd.isna(val) or val is None or val == '' or str(val).lower() == 'nan':
         return {'type': 'null'}
 
-    numeric_cols = [
-        'desired_count', 'lat', 'lng', 'female_ratio', 'top_age_ratio',
-        'avg_desired_areas', 'persona_count', 'persona_percentage',
-        'supply_count', 'demand_count', 'gap', 'gap_ratio', 'rarity_score',
-        'competition_score', 'flow_in', 'flow_out', 'net_flow', 'count',
-        'percentage', 'male_count', 'female_count', 'male_ratio',
-        'cross_count', 'cross_percentage', 'applicant_count',
-        'avg_qualifications', 'latitude', 'longitude', 'avg_reference_distance_km',
-        'total_applicants', 'retention_rate', 'avg_age'
-    ]
-
-    integer_cols = [
-        'desired_count', 'count', 'male_count', 'female_count',
-        'cross_count', 'applicant_count', 'supply_count', 'demand_count',
-        'total_applicants'
-    ]
-
-    if col_name in numeric_cols:
+    if col_name in NUMERIC_COLUMNS:
         try:
             float_val = float(val)
-            if col_name in integer_cols:
+            if col_name in INTEGER_COLUMNS:
                 return {'type': 'integer', 'value': str(int(float_val))}
             return {'type': 'float', 'value': float_val}
         except:
@@ -146,10 +157,17 @@ def convert_value(val, col_name: str) -> dict:
     return {'type': 'text', 'value': str(val)}
 
 
-def send_pipeline(url: str, token: str, requests: list, timeout: int = 300, max_retries: int = 5) -> dict:
-    """Turso Pipeline APIにリクエスト送信（リトライ付き）"""
+def send_pipeline(url: str, token: str, requests: list, timeout: int = 300, max_retries: int = 5,
+                  stats: Optional[Dict] = None) -> dict:
+    """Turso Pipeline APIにリクエスト送信（リトライ付き）
+
+    stats を渡すと送信バイト数（リトライ分を含む）とリクエスト数を加算する。
+    """
     data = json.dumps({'requests': requests}).encode()
     for attempt in range(max_retries):
+        if stats is not None:
+            stats['bytes_sent'] = stats.get('bytes_sent', 0) + len(data)
+            stats['requests'] = stats.get('requests', 0) + 1
         try:
             req = urllib.request.Request(
                 f'{url}/v2/pipeline',
@@ -197,7 +215,62 @@ def query_scalar(url: str, token: str, sql: str, args: list = None):
 # CSV検証
 # =============================================================================
 
-def validate_csv(csv_path: str, expected_job_type: str = None) -> Dict:
+# 2026-01-20変更: CSV全体を読み込み、row_type ごとにフィルタ・groupby していた処理（job_typeあたり
+# 約90万行を何度も走査）を、チャンク単位の1パス集計（row_type件数・必須カラムNULL件数・都道府県・
+# 一意キーのハッシュ）に変更。一意キーは row_type ごとに uint64 ハッシュ化して最後に重複を数える
+# （衝突確率は約 n²/2^65、90万行で 1e-7 未満）。
+VALIDATE_CHUNK_ROWS = 200_000
+
+
+def _scan_csv(csv_path: str) -> Dict:
+    """CSVを1回だけチャンク単位で読み込み、検証に必要な集計を行う
+
+    Returns:
+        dict: columns, row_count, job_types, null_counts, row_types, prefectures, key_hashes
+    """
+    columns = list(pd.read_csv(csv_path, dtype=str, encoding='utf-8-sig', nrows=0).columns)
+    key_cols_all = {c for cols in UNIQUE_KEY_DEFINITIONS.values() for c in cols}
+    usecols = [c for c in columns if c in set(REQUIRED_COLUMNS) | key_cols_all]
+
+    scan = {
+        'columns': columns,
+        'row_count': 0,
+        'job_types': {},          # 出現順を保持（値は未使用）
+        'null_counts': {c: 0 for c in REQUIRED_COLUMNS if c in columns},
+        'row_types': {},          # 出現順の件数
+        'prefectures': set(),
+        'key_hashes': {},         # row_type -> [uint64配列]
+    }
+    reader = pd.read_csv(csv_path, dtype=str, encoding='utf-8-sig', usecols=usecols,
+                         chunksize=VALIDATE_CHUNK_ROWS)
+    with reader:
+        for chunk in reader:
+            scan['row_count'] += len(chunk)
+            for col in scan['null_counts']:
+                scan['null_counts'][col] += int(chunk[col].isna().sum())
+            if 'job_type' in chunk.columns:
+                scan['job_types'].update(dict.fromkeys(chunk['job_type'].dropna().unique()))
+            if 'prefecture' in chunk.columns:
+                scan['prefectures'].update(chunk['prefecture'].dropna().unique())
+            if 'row_type' not in chunk.columns:
+                continue
+            for rt, positions in chunk.groupby('row_type', sort=False).indices.items():
+                scan['row_types'][rt] = scan['row_types'].get(rt, 0) + len(positions)
+                key_cols = [c for c in get_unique_key_cols(rt) if c in chunk.columns]
+                if key_cols:
+                    hashes = pd.util.hash_pandas_object(chunk[key_cols].iloc[positions], index=False)
+                    scan['key_hashes'].setdefault(rt, []).append(hashes.to_numpy())
+    return scan
+
+
+def _count_duplicate_keys(hash_parts: List[np.ndarray]) -> int:
+    """重複しているキーの種類数（旧実装の groupby(key_cols).size() > 1 の件数と同じ）"""
+    hashes = np.concatenate(hash_parts)
+    _, counts = np.unique(hashes, return_counts=True)
+    return int((counts > 1).sum())
+
+
+def validate_csv(csv_path: str, expected_job_type: str = None, verbose: bool = True) -> Dict:
     """
     CSV検証（インポート前）
 
@@ -207,168 +280,216 @@ def validate_csv(csv_path: str, expected_job_type: str = None) -> Dict:
     3. 必須カラム非NULL
     4. 一意キー重複なし
     5. 行数妥当性
+
+    verbose=False の場合は出力せず結果のみ返す（複数CSVの並列検証用）。
     """
-    print("\n" + "=" * 60)
-    print("CSV検証")
-    print("=" * 60)
+    log = print if verbose else (lambda *args, **kwargs: None)
+    started = time.time()
+    log("\n" + "=" * 60)
+    log("CSV検証")
+    log("=" * 60)
 
     errors = []
     warnings = []
 
-    # CSV読み込み
-    print(f"\n[LOAD] {os.path.basename(csv_path)}")
+    # CSV読み込み（1パス集計）
+    log(f"\n[LOAD] {os.path.basename(csv_path)}")
     try:
-        df = pd.read_csv(csv_path, dtype=str, low_memory=False, encoding='utf-8-sig')
+        scan = _scan_csv(csv_path)
     except Exception as e:
-        return {'valid': False, 'errors': [f'CSV読み込みエラー: {e}']}
+        return {'valid': False, 'errors': [f'CSV読み込みエラー: {e}'], 'warnings': [], 'row_count': 0,
+                'job_type': None, 'row_types': {}}
 
-    print(f"  行数: {len(df):,}")
-    print(f"  カラム数: {len(df.columns)}")
+    columns = [c for c in scan['columns'] if c != 'id']
+    row_count = scan['row_count']
+    log(f"  行数: {row_count:,}")
+    log(f"  カラム数: {len(scan['columns'])}")
 
     # 1. idカラムチェック
-    if 'id' in df.columns:
+    if 'id' in scan['columns']:
         warnings.append("idカラムが存在します（インポート時に除外されます）")
-        df = df.drop(columns=['id'])
 
     # 2. job_type一意性
-    print("\n[CHECK] job_type一意性")
-    if 'job_type' not in df.columns:
+    log("\n[CHECK] job_type一意性")
+    job_types = list(scan['job_types'])
+    job_type = job_types[0] if job_types else None
+    if 'job_type' not in columns:
         errors.append("job_typeカラムがありません")
+    elif len(job_types) == 0:
+        errors.append("job_typeが全て空です")
+    elif len(job_types) > 1:
+        errors.append(f"複数のjob_typeが含まれています: {job_types}")
     else:
-        job_types = df['job_type'].dropna().unique()
-        if len(job_types) == 0:
-            errors.append("job_typeが全て空です")
-        elif len(job_types) > 1:
-            errors.append(f"複数のjob_typeが含まれています: {list(job_types)}")
-        else:
-            job_type = job_types[0]
-            print(f"  job_type: {job_type} [OK]")
-
-            if expected_job_type and job_type != expected_job_type:
-                errors.append(f"job_type不一致: {job_type} != {expected_job_type}")
+        log(f"  job_type: {job_type} [OK]")
+        if expected_job_type and job_type != expected_job_type:
+            errors.append(f"job_type不一致: {job_type} != {expected_job_type}")
 
     # 3. 必須カラム存在・非NULL
-    print("\n[CHECK] 必須カラム")
+    log("\n[CHECK] 必須カラム")
     for col in REQUIRED_COLUMNS:
-        if col not in df.columns:
+        if col not in columns:
             errors.append(f"必須カラム '{col}' がありません")
         else:
-            null_count = df[col].isna().sum()
+            null_count = scan['null_counts'][col]
             if null_count > 0:
                 # municipalityのNULLは都道府県レベル集計として許容
                 if col == 'municipality':
                     warnings.append(f"'{col}'に{null_count:,}件のNULLがあります（都道府県集計）")
-                    print(f"  {col}: {null_count:,}件NULL（都道府県集計） [WARN]")
+                    log(f"  {col}: {null_count:,}件NULL（都道府県集計） [WARN]")
                 else:
                     errors.append(f"'{col}'に{null_count:,}件のNULLがあります")
             else:
-                print(f"  {col}: OK")
+                log(f"  {col}: OK")
 
     # 4. row_type存在確認
-    print("\n[CHECK] row_type存在確認")
-    if 'row_type' in df.columns:
-        row_types = df['row_type'].dropna().unique()
+    log("\n[CHECK] row_type存在確認")
+    row_types = scan['row_types']
+    if 'row_type' in columns:
         unknown_types = [rt for rt in row_types if rt not in UNIQUE_KEY_DEFINITIONS]
         if unknown_types:
             warnings.append(f"未定義のrow_type: {unknown_types}")
-            print(f"  未定義: {unknown_types} [WARN]")
+            log(f"  未定義: {unknown_types} [WARN]")
 
-        print(f"  検出されたrow_type: {len(row_types)}種類")
+        log(f"  検出されたrow_type: {len(row_types)}種類")
         for rt in sorted(row_types):
-            count = len(df[df['row_type'] == rt])
             status = "[OK]" if rt in UNIQUE_KEY_DEFINITIONS else "[WARN]"
-            print(f"    {rt}: {count:,}行 {status}")
+            log(f"    {rt}: {row_types[rt]:,}行 {status}")
 
     # 5. 一意キー重複チェック
-    print("\n[CHECK] 一意キー重複")
-    duplicate_count = 0
-    if 'row_type' in df.columns:
-        for rt in df['row_type'].unique():
-            if pd.isna(rt):
-                continue
-            key_cols = get_unique_key_cols(rt)
-
-            # カラム存在確認
-            missing_cols = [c for c in key_cols if c not in df.columns]
-            if missing_cols:
-                # category系カラムがない場合はスキップ（そのrow_typeで使わない可能性）
-                if all(c.startswith('category') for c in missing_cols):
-                    continue
-                warnings.append(f"{rt}: 一意キーカラム不足 {missing_cols}")
+    log("\n[CHECK] 一意キー重複")
+    duplicates = {}
+    for rt in row_types:
+        key_cols = get_unique_key_cols(rt)
+
+        # カラム存在確認
+        missing_cols = [c for c in key_cols if c not in columns]
+        if missing_cols:
+            # category系カラムがない場合はスキップ（そのrow_typeで使わない可能性）
+            if all(c.startswith('category') for c in missing_cols):
                 continue
-
-            subset = df[df['row_type'] == rt]
-            # NaN値を文字列に変換して重複チェック
-            subset_filled = subset[key_cols].fillna('__NULL__')
-            dup = subset_filled.groupby(key_cols).size()
-            dup_count = (dup > 1).sum()
-
-            if dup_count > 0:
-                errors.append(f"{rt}: {dup_count:,}件の重複キーがあります")
-                duplicate_count += dup_count
-                print(f"  {rt}: {dup_count:,}件の重複 [NG]")
-            else:
-                print(f"  {rt}: 重複なし [OK]")
+            warnings.append(f"{rt}: 一意キーカラム不足 {missing_cols}")
+            continue
+
+        dup_count = _count_duplicate_keys(scan['key_hashes'][rt])
+        duplicates[rt] = dup_count
+        if dup_count > 0:
+            errors.append(f"{rt}: {dup_count:,}件の重複キーがあります")
+            log(f"  {rt}: {dup_count:,}件の重複 [NG]")
+        else:
+            log(f"  {rt}: 重複なし [OK]")
 
     # 6. 行数妥当性
-    print("\n[CHECK] 行数妥当性")
-    if 'job_type' in df.columns and len(df['job_type'].dropna().unique()) == 1:
-        job_type = df['job_type'].dropna().iloc[0]
-        row_count = len(df)
-
+    log("\n[CHECK] 行数妥当性")
+    if len(job_types) == 1:
         if job_type in EXPECTED_ROW_RANGES:
             min_rows, max_rows = EXPECTED_ROW_RANGES[job_type]
             if row_count < min_rows:
                 warnings.append(f"行数が期待値より少ない: {row_count:,} < {min_rows:,}")
-                print(f"  {row_count:,}行 (期待: {min_rows:,}~{max_rows:,}) [WARN]")
+                log(f"  {row_count:,}行 (期待: {min_rows:,}~{max_rows:,}) [WARN]")
             elif row_count > max_rows:
                 warnings.append(f"行数が期待値より多い: {row_count:,} > {max_rows:,}")
-                print(f"  {row_count:,}行 (期待: {min_rows:,}~{max_rows:,}) [WARN]")
+                log(f"  {row_count:,}行 (期待: {min_rows:,}~{max_rows:,}) [WARN]")
             else:
-                print(f"  {row_count:,}行 (期待範囲内) [OK]")
+                log(f"  {row_count:,}行 (期待範囲内) [OK]")
         else:
-            print(f"  {row_count:,}行 (期待値未定義)")
+            log(f"  {row_count:,}行 (期待値未定義)")
 
     # 7. 都道府県数チェック
-    print("\n[CHECK] 都道府県数")
-    if 'prefecture' in df.columns:
-        prefectures = df['prefecture'].dropna().unique()
-        pref_count = len(prefectures)
+    log("\n[CHECK] 都道府県数")
+    pref_count = len(scan['prefectures'])
+    if 'prefecture' in columns:
         if pref_count < 47:
             warnings.append(f"都道府県が47未満: {pref_count}県")
-            print(f"  {pref_count}県 (期待: 47県) [WARN]")
+            log(f"  {pref_count}県 (期待: 47県) [WARN]")
         elif pref_count > 47:
             warnings.append(f"都道府県が47超過: {pref_count}県（異常データ混入の可能性）")
-            print(f"  {pref_count}県 (期待: 47県) [WARN] 超過")
+            log(f"  {pref_count}県 (期待: 47県) [WARN] 超過")
         else:
-            print(f"  {pref_count}県 [OK]")
+            log(f"  {pref_count}県 [OK]")
 
     # 結果サマリ
-    print("\n" + "=" * 60)
+    log("\n" + "=" * 60)
     if errors:
-        print(f"[NG] 検証失敗: {len(errors)}件のエラー")
+        log(f"[NG] 検証失敗: {len(errors)}件のエラー")
         for e in errors:
-            print(f"  [NG] {e}")
+            log(f"  [NG] {e}")
     else:
-        print("[OK] 検証成功")
+        log("[OK] 検証成功")
 
     if warnings:
-        print(f"\n警告: {len(warnings)}件")
+        log(f"\n警告: {len(warnings)}件")
         for w in warnings:
-            print(f"  [WARN] {w}")
+            log(f"  [WARN] {w}")
 
-    print("=" * 60)
+    log("=" * 60)
 
     return {
         'valid': len(errors) == 0,
         'errors': errors,
         'warnings': warnings,
-        'row_count': len(df),
-        'job_type': df['job_type'].dropna().iloc[0] if 'job_type' in df.columns and len(df['job_type'].dropna()) > 0 else None,
-        'row_types': df['row_type'].value_counts().to_dict() if 'row_type' in df.columns else {}
+        'row_count': row_count,
+        'job_type': job_type,
+        'row_types': dict(sorted(row_types.items(), key=lambda kv: -kv[1])),
+        'null_counts': scan['null_counts'],
+        'duplicate_keys': duplicates,
+        'prefecture_count': pref_count,
+        'elapsed_sec': round(time.time() - started, 2),
     }
 
 
+def _validate_for_report(csv_path: str) -> Dict:
+    result = validate_csv(csv_path, verbose=False)
+    result['csv'] = os.path.abspath(csv_path)
+    return result
+
+
+def validate_csvs(csv_paths: List[str], workers: Optional[int] = None,
+                  report_path: Optional[str] = None) -> List[Dict]:
+    """複数CSV（職種ごと）を並列プロセスで検証し、JSONレポートを出力
+
+    Args:
+        csv_paths: 検証するCSV
+        workers: プロセス数（デフォルト: min(CSV数, CPU数)）
+        report_path: JSONレポートの出力先（Noneなら出力しない）
+
+    Returns:
+        list: CSVごとの検証結果（validate_csv の戻り値 + csv）
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    started = time.time()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(csv_paths)))
+    print(f"\n[VALIDATE] {len(csv_paths)}ファイルを{workers}プロセスで検証")
+    if workers == 1:
+        results = [_validate_for_report(p) for p in csv_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_validate_for_report, csv_paths))
+
+    for path, result in zip(csv_paths, results):
+        status = "[OK]" if result['valid'] else "[NG]"
+        print(f"  {status} {os.path.basename(path)}: {result['row_count']:,}行 "
+              f"job_type={result['job_type']} エラー{len(result['errors'])} 警告{len(result['warnings'])} "
+              f"({result.get('elapsed_sec', 0):.1f}秒)")
+        for e in result['errors']:
+            print(f"      [NG] {e}")
+
+    elapsed = time.time() - started
+    print(f"  合計: {elapsed:.1f}秒")
+    if report_path:
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'valid': all(r['valid'] for r in results),
+            'elapsed_sec': round(elapsed, 2),
+            'files': results,
+        }
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"  レポート: {report_path}")
+    return results
+
+
 # =============================================================================
 # DB検証
 # =============================================================================
@@ -551,16 +672,27 @@ def create_bulk_insert_stmt(records: list, columns: list) -> dict:
     return {'type': 'execute', 'stmt': {'sql': sql, 'args': args}}
 
 
-def import_csv(csv_path: str, skip_validation: bool = False) -> int:
+def get_checkpoint_path(job_type: str) -> Path:
+    """import の中断再開用チェックポイント（完了した行範囲）"""
+    return MANIFEST_DIR / f"{job_type}.import_checkpoint.json"
+
+
+def import_csv(csv_path: str, skip_validation: bool = False, concurrency: Optional[int] = None,
+               restart: bool = False) -> int:
     """
     CSV→DBインポート（検証付き）
 
     フロー:
     1. CSV検証（skip_validation=Falseの場合）
     2. 既存データ削除
-    3. データ挿入
+    3. データ挿入（turso_stream_import でチャンク読み込み + 並列送信）
     4. DB検証
+
+    2026-01-20変更: 挿入の完了範囲をチェックポイントに記録し、中断後に同じCSVで再実行すると
+    削除をスキップして未完了の行のみ送信する（restart=True で最初からやり直し）。
     """
+    from turso_stream_import import DEFAULT_CONCURRENCY, ImportCheckpoint, stream_import
+
     url, token = get_turso_config()
     if not url or not token:
         print("ERROR: Turso設定なし（.envを確認）")
@@ -580,10 +712,12 @@ def import_csv(csv_path: str, skip_validation: bool = False) -> int:
             return 1
         job_type = csv_result['job_type']
         expected_counts = csv_result['row_types']
+        total_rows = csv_result['row_count']
     else:
         df = pd.read_csv(csv_path, dtype=str, low_memory=False, encoding='utf-8-sig', nrows=1)
         job_type = df['job_type'].iloc[0]
         expected_counts = None
+        total_rows = None
 
     # Phase 2: バックアップ情報記録
     print("\n[BACKUP] 現在のDB状態を記録")
@@ -592,90 +726,381 @@ def import_csv(csv_path: str, skip_validation: bool = False) -> int:
     before_count = int(before_count) if before_count else 0
     print(f"  既存行数: {before_count:,}")
 
-    # Phase 3: 削除
-    deleted = delete_job_type_data(url, token, job_type)
-    if deleted < 0:
-        print("\n[ABORT] 削除エラーのためインポートを中止")
-        return 1
+    # Phase 3: 削除（全件置き換えのため、差分同期のマニフェストと事前集計も無効化）
+    clear_stats_rollup(url, token, job_type)
+    checkpoint_path = get_checkpoint_path(job_type)
+    checkpoint = None if restart else ImportCheckpoint.load(checkpoint_path, csv_path)
+    if checkpoint is not None and checkpoint.state.get('deleted'):
+        deleted = checkpoint.state.get('deleted_rows', 0)
+        print(f"\n[RESUME] 前回中断したインポートを再開（削除済み、{checkpoint.rows_done:,}行 送信済み）")
+    else:
+        remove_manifest(job_type)
+        checkpoint = ImportCheckpoint.create(checkpoint_path, csv_path)
+        deleted = delete_job_type_data(url, token, job_type)
+        if deleted < 0:
+            print("\n[ABORT] 削除エラーのためインポートを中止")
+            return 1
+        checkpoint.state.update(deleted=True, deleted_rows=deleted)
+        checkpoint.save()
+
+    # Phase 4: インポート（マニフェストは読み込んだチャンクごとに作成）
+    concurrency = concurrency or DEFAULT_CONCURRENCY
+    print(f"\n[INSERT] データをインポート中...（同時送信: {concurrency}）")
+    if total_rows:
+        print(f"  総行数: {total_rows:,}")
+    manifest_parts = []
+    result = stream_import(
+        csv_path, url, token, checkpoint=checkpoint, concurrency=concurrency, total_rows=total_rows,
+        on_chunk=lambda chunk: manifest_parts.append(build_manifest(chunk, compute_row_hashes(chunk))),
+    )
+    elapsed = result['elapsed']
+    errors_total = result['failed_rows']
+    print(f"  インポート完了: {result['rows_sent']:,}行 ({elapsed/60:.1f}分) "
+          f"| リクエスト: {result['requests']:,} | リトライ: {result['retries']}")
+    if result['rows_skipped']:
+        print(f"  送信済みのためスキップ: {result['rows_skipped']:,}行")
+
+    # 差分同期（sync）の基準としてマニフェストを保存（失敗行がある場合はDBとCSVが一致しないため保存しない）
+    if errors_total == 0:
+        save_manifest(job_type, pd.concat(manifest_parts, ignore_index=True))
+        checkpoint.remove()
+    else:
+        print(f"  [RESUME] {errors_total:,}行が未完了です。同じCSVで再実行すると未完了の行のみ送信します")
 
-    # Phase 4: インポート
-    print(f"\n[INSERT] データをインポート中...")
-    df = pd.read_csv(csv_path, dtype=str, low_memory=False, encoding='utf-8-sig')
+    # Phase 5: DB検証
+    db_result = validate_db_after_import(job_type, expected_counts)
 
-    # idカラム除外
-    columns = [c for c in df.columns if c != 'id']
-    if 'id' in df.columns:
-        df = df.drop(columns=['id'])
+    # 最終結果
+    peak_rss = result['peak_rss_mb']
+    print("\n" + "=" * 60)
+    print("同期結果サマリ")
+    print("=" * 60)
+    print(f"  job_type: {job_type}")
+    print(f"  削除行数: {deleted:,}")
+    print(f"  挿入行数: {result['inserted']:,}")
+    print(f"  DB検証行数: {db_result['total_rows']:,}")
+    print(f"  処理時間: {elapsed/60:.1f}分")
+    print(f"  処理速度: {result['rows_per_sec']:,.0f} rows/s")
+    print(f"  ピークRSS: {f'{peak_rss:,.0f} MB' if peak_rss is not None else 'N/A'}")
+    print(f"  送信量: {result['bytes_sent'] / 1024 / 1024:,.1f} MB")
+    print(f"  エラー: {errors_total}")
+
+    if db_result['valid'] and errors_total == 0:
+        refresh_stats_rollup(csv_path)
+        print("\n[SUCCESS] 同期完了 [OK]")
+        return 0
+    else:
+        print("\n[WARNING] 同期完了（警告あり）")
+        return 0 if db_result['valid'] else 1
 
-    total_rows = len(df)
-    all_records = df.to_dict('records')
 
-    rows_per_request = ROWS_PER_INSERT * INSERTS_PER_REQUEST
-    mega_batches = [all_records[i:i+rows_per_request] for i in range(0, total_rows, rows_per_request)]
-    total_mega = len(mega_batches)
+# =============================================================================
+# 差分同期（2026-01-20追加）
+# =============================================================================
+# import はjob_typeの全行を削除してから再挿入するため、その間（数十分）ダッシュボードが
+# 空または部分的なデータを返し、変更のない行も毎回送信していた。
+# sync は前回同期時の行ハッシュ（マニフェスト）と比較し、追加・更新・削除された行のみを送信する。
+#
+# - キーハッシュ: row_type + UNIQUE_KEY_DEFINITIONS のキーカラム
+# - 行ハッシュ: id以外の全カラム
+# - マニフェストは削除文を作るためにキーカラムの値も保持する
+# - 成功した文のみマニフェストに反映するため、途中で失敗しても再実行で残りだけが送信される
+
+MANIFEST_KEY_COLUMNS = ['row_type'] + list(dict.fromkeys(
+    c for cols in [REQUIRED_COLUMNS] + list(UNIQUE_KEY_DEFINITIONS.values()) for c in cols if c != 'row_type'))
 
-    print(f"  総行数: {total_rows:,}")
-    print(f"  リクエスト数: {total_mega}")
 
-    start_time = time.time()
-    inserted_total = 0
-    errors_total = 0
+def get_sync_key_cols(row_type: str, columns) -> List[str]:
+    """差分同期で行を特定するカラム（row_type + 一意キーのうちCSVに存在するもの）"""
+    return [c for c in dict.fromkeys(['row_type'] + get_unique_key_cols(row_type)) if c in columns]
 
-    for i, mega_batch in enumerate(mega_batches):
-        sub_batches = [mega_batch[j:j+ROWS_PER_INSERT] for j in range(0, len(mega_batch), ROWS_PER_INSERT)]
-        requests = [create_bulk_insert_stmt(sub, columns) for sub in sub_batches]
 
-        try:
-            result = send_pipeline(url, token, requests, timeout=300)
+def compute_row_hashes(df: pd.DataFrame) -> pd.DataFrame:
+    """行ごとのキーハッシュ・行ハッシュ（uint64）を計算
 
-            batch_inserted = 0
-            batch_errors = 0
-            for r in result.get('results', []):
-                if r.get('type') == 'error':
-                    batch_errors += ROWS_PER_INSERT
-                else:
-                    affected = r.get('response', {}).get('result', {}).get('affected_row_count', ROWS_PER_INSERT)
-                    batch_inserted += affected
+    row_typeごとにキーカラムが異なるため、キーハッシュはrow_type単位でまとめて計算する。
+    """
+    value_cols = sorted(c for c in df.columns if c != 'id')
+    row_hash = pd.util.hash_pandas_object(df[value_cols], index=False).to_numpy()
+    key_hash = np.zeros(len(df), dtype=np.uint64)
+    if len(df):
+        for rt, positions in df.groupby('row_type', sort=False, dropna=False).indices.items():
+            key_cols = get_sync_key_cols(rt, df.columns)
+            key_hash[positions] = pd.util.hash_pandas_object(df[key_cols].iloc[positions], index=False).to_numpy()
+    return pd.DataFrame({'key_hash': key_hash, 'row_hash': row_hash}, index=df.index)
+
+
+def build_manifest(df: pd.DataFrame, hashes: pd.DataFrame) -> pd.DataFrame:
+    """マニフェスト（ハッシュ + キーカラムの値）を作成"""
+    key_cols = [c for c in MANIFEST_KEY_COLUMNS if c in df.columns]
+    manifest = df[key_cols].reset_index(drop=True)
+    manifest.insert(0, 'row_hash', hashes['row_hash'].to_numpy())
+    manifest.insert(0, 'key_hash', hashes['key_hash'].to_numpy())
+    return manifest
+
+
+def get_manifest_path(job_type: str) -> Path:
+    return MANIFEST_DIR / f"{job_type}.manifest.csv.gz"
+
+
+def load_manifest(job_type: str) -> Optional[pd.DataFrame]:
+    """前回同期時のマニフェストを読み込み（存在しない場合はNone）"""
+    path = get_manifest_path(job_type)
+    if not path.exists():
+        return None
+    dtype = {c: str for c in MANIFEST_KEY_COLUMNS}
+    dtype.update(key_hash='uint64', row_hash='uint64')
+    return pd.read_csv(path, dtype=dtype, low_memory=False)
+
+
+def save_manifest(job_type: str, manifest: pd.DataFrame) -> Path:
+    """マニフェストを保存（一時ファイルに書いてから置き換え）"""
+    path = get_manifest_path(job_type)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    manifest.to_csv(tmp_path, index=False, compression='gzip')
+    os.replace(tmp_path, path)
+    print(f"[MANIFEST] {len(manifest):,}行のハッシュを保存: {path}")
+    return path
+
+
+def remove_manifest(job_type: str) -> None:
+    """マニフェストを削除（DBとCSVの対応が保証できなくなった場合）"""
+    path = get_manifest_path(job_type)
+    if path.exists():
+        path.unlink()
+        print(f"[MANIFEST] 削除: {path}")
+
+
+def diff_manifest(hashes: pd.DataFrame, manifest: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """現在のCSVとマニフェストの差分
+
+    Returns:
+        (挿入するCSV行位置, 更新するCSV行位置, 削除するマニフェスト行位置)
+    """
+    cur_keys = hashes['key_hash'].to_numpy()
+    old_keys = manifest['key_hash'].to_numpy()
+    empty = np.array([], dtype=np.intp)
+    if len(old_keys) == 0:
+        # 空のマニフェスト（新規テーブルへの初回同期）: 全行を挿入
+        return np.arange(len(cur_keys)), empty, empty
+    old_pos = pd.Index(old_keys).get_indexer(cur_keys)
+    exists = old_pos >= 0
+    changed = np.zeros(len(cur_keys), dtype=bool)
+    changed[exists] = manifest['row_hash'].to_numpy()[old_pos[exists]] != hashes['row_hash'].to_numpy()[exists]
+    inserts = np.flatnonzero(~exists)
+    updates = np.flatnonzero(changed)
+    deletes = np.flatnonzero(~np.isin(old_keys, cur_keys))
+    return inserts, updates, deletes
+
+
+def _key_condition(row: dict, key_cols: List[str]) -> Tuple[str, list]:
+    """キー一致のWHERE句（NULL同士も一致させるため IS を使用）"""
+    sql = ' AND '.join(f'{c} IS ?' for c in key_cols)
+    return sql, [convert_value(row.get(c), c) for c in key_cols]
+
+
+def create_update_stmt(row: dict, columns: list) -> dict:
+    """キー一致の1行を更新するUPDATE文を生成（キー以外の全カラムを更新）"""
+    key_cols = get_sync_key_cols(row.get('row_type'), columns)
+    set_cols = [c for c in columns if c not in key_cols]
+    where, where_args = _key_condition(row, key_cols)
+    sql = f"UPDATE job_seeker_data SET {', '.join(f'{c} = ?' for c in set_cols)} WHERE {where}"
+    args = [convert_value(row.get(c), c) for c in set_cols] + where_args
+    return {'type': 'execute', 'stmt': {'sql': sql, 'args': args}}
 
-            inserted_total += batch_inserted
-            errors_total += batch_errors
 
+def create_delete_stmt(row: dict, columns: list) -> dict:
+    """キー一致の行を削除するDELETE文を生成"""
+    where, args = _key_condition(row, get_sync_key_cols(row.get('row_type'), columns))
+    return {'type': 'execute', 'stmt': {'sql': f"DELETE FROM job_seeker_data WHERE {where}", 'args': args}}
+
+
+def _execute_statements(url: str, token: str, stmts: list, per_request: int, stats: Dict, label: str) -> np.ndarray:
+    """文をリクエスト単位にまとめて送信し、文ごとの成否を返す"""
+    ok = np.zeros(len(stmts), dtype=bool)
+    total_requests = (len(stmts) + per_request - 1) // per_request
+    for n, i in enumerate(range(0, len(stmts), per_request)):
+        chunk = stmts[i:i + per_request]
+        try:
+            result = send_pipeline(url, token, chunk, timeout=300, stats=stats)
+            results = result.get('results', [])[:len(chunk)]
+            ok[i:i + len(results)] = [r.get('type') != 'error' for r in results]
         except Exception as e:
-            errors_total += len(mega_batch)
             print(f"\n  エラー: {str(e)[:60]}")
+        print(f"\r  {label}: [{n + 1:5d}/{total_requests}]", end="", flush=True)
+    if stmts:
+        print()
+    return ok
 
-        elapsed = time.time() - start_time
-        rows_done = min((i + 1) * rows_per_request, total_rows)
-        progress = (rows_done / total_rows) * 100
-        rate = rows_done / elapsed if elapsed > 0 else 0
-        remaining = (total_rows - rows_done) / rate if rate > 0 else 0
 
-        print(f"\r  [{i+1:5d}/{total_mega}] {progress:5.1f}% | {rate:,.0f} rows/s | ETA {remaining/60:.1f}min   ", end="", flush=True)
+def sync_csv(csv_path: str, skip_validation: bool = False, dry_run: bool = False) -> int:
+    """
+    CSV→DB差分同期（検証付き）
+
+    フロー:
+    1. CSV検証（skip_validation=Falseの場合）
+    2. マニフェストと比較（マニフェストがない場合は import_csv で全件インポートして基準を作成）
+    3. 更新・挿入・削除を送信（変更がなければ何も送信しない）
+    4. マニフェスト更新
+    5. DB検証
+    """
+    url, token = get_turso_config()
+    if not url or not token:
+        print("ERROR: Turso設定なし（.envを確認）")
+        return 1
+
+    print("\n" + "=" * 60)
+    print("CSV-DB差分同期")
+    print("=" * 60)
+    print(f"ファイル: {os.path.basename(csv_path)}")
+    print(f"開始時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    # Phase 1: CSV検証
+    expected_counts = None
+    if not skip_validation:
+        csv_result = validate_csv(csv_path)
+        if not csv_result['valid']:
+            print("\n[ABORT] CSV検証失敗のため同期を中止")
+            return 1
+        expected_counts = csv_result['row_types']
+
+    df = pd.read_csv(csv_path, dtype=str, low_memory=False, encoding='utf-8-sig')
+    if 'id' in df.columns:
+        df = df.drop(columns=['id'])
+    columns = list(df.columns)
+    job_type = df['job_type'].dropna().iloc[0]
+
+    # Phase 2: 差分計算
+    manifest = load_manifest(job_type)
+    if manifest is None:
+        print(f"\n[SYNC] {job_type} のマニフェストがありません → 全件インポートで基準を作成")
+        if dry_run:
+            return 0
+        return import_csv(csv_path, skip_validation=True)
+
+    start_time = time.time()
+    hashes = compute_row_hashes(df)
+    dup_count = int(hashes['key_hash'].duplicated().sum())
+    if dup_count:
+        print(f"\n[ABORT] 一意キーの重複が{dup_count:,}件あるため差分同期できません")
+        return 1
+
+    inserts, updates, deletes = diff_manifest(hashes, manifest)
+    print(f"\n[DIFF] CSV {len(df):,}行 / マニフェスト {len(manifest):,}行 ({time.time() - start_time:.1f}秒)")
+    print(f"  挿入: {len(inserts):,}行  更新: {len(updates):,}行  削除: {len(deletes):,}行")
+
+    if len(inserts) == len(updates) == len(deletes) == 0:
+        print("\n[SUCCESS] 変更なし（送信0バイト） [OK]")
+        return 0
+    if dry_run:
+        print("\n[DRY-RUN] 送信せずに終了")
+        return 0
+
+    # Phase 3: 送信（更新 → 挿入 → 削除。全件削除と違い、行が消える期間を作らない）
+    stats = {'bytes_sent': 0, 'requests': 0}
+    update_rows = df.iloc[updates].to_dict('records')
+    update_ok = _execute_statements(
+        url, token, [create_update_stmt(r, columns) for r in update_rows], STATEMENTS_PER_REQUEST, stats, "UPDATE")
+
+    insert_rows = df.iloc[inserts].to_dict('records')
+    insert_batches = [insert_rows[i:i + ROWS_PER_INSERT] for i in range(0, len(insert_rows), ROWS_PER_INSERT)]
+    batch_ok = _execute_statements(
+        url, token, [create_bulk_insert_stmt(b, columns) for b in insert_batches], INSERTS_PER_REQUEST, stats, "INSERT")
+    insert_ok = np.repeat(batch_ok, [len(b) for b in insert_batches])
+
+    delete_rows = manifest.iloc[deletes].to_dict('records')
+    delete_ok = _execute_statements(
+        url, token, [create_delete_stmt(r, list(manifest.columns)) for r in delete_rows],
+        STATEMENTS_PER_REQUEST, stats, "DELETE")
+
+    # Phase 4: 成功した変更のみマニフェストに反映（失敗分は次回の sync で再送信される）
+    updated = updates[update_ok]
+    removed = np.zeros(len(manifest), dtype=bool)
+    removed[deletes[delete_ok]] = True
+    removed |= manifest['key_hash'].isin(hashes['key_hash'].to_numpy()[updated]).to_numpy()
+    applied = np.sort(np.concatenate([updated, inserts[insert_ok]]))
+    save_manifest(job_type, pd.concat(
+        [manifest[~removed], build_manifest(df.iloc[applied], hashes.iloc[applied])], ignore_index=True))
 
     elapsed = time.time() - start_time
-    print(f"\n  インポート完了: {total_rows:,}行 ({elapsed/60:.1f}分) [OK]")
+    errors_total = int((~update_ok).sum() + (~insert_ok).sum() + (~delete_ok).sum())
 
     # Phase 5: DB検証
     db_result = validate_db_after_import(job_type, expected_counts)
 
-    # 最終結果
     print("\n" + "=" * 60)
-    print("同期結果サマリ")
+    print("差分同期結果サマリ")
     print("=" * 60)
     print(f"  job_type: {job_type}")
-    print(f"  削除行数: {deleted:,}")
-    print(f"  挿入行数: {total_rows:,}")
-    print(f"  DB検証行数: {db_result['total_rows']:,}")
-    print(f"  処理時間: {elapsed/60:.1f}分")
-    print(f"  処理速度: {total_rows/elapsed:,.0f} rows/s")
+    print(f"  更新行数: {int(update_ok.sum()):,} / {len(updates):,}")
+    print(f"  挿入行数: {int(insert_ok.sum()):,} / {len(inserts):,}")
+    print(f"  削除行数: {int(delete_ok.sum()):,} / {len(deletes):,}")
+    print(f"  送信: {stats['bytes_sent'] / 1024 / 1024:,.2f}MB ({stats['requests']:,}リクエスト)")
+    print(f"  処理時間: {elapsed:.1f}秒")
     print(f"  エラー: {errors_total}")
 
     if db_result['valid'] and errors_total == 0:
-        print("\n[SUCCESS] 同期完了 [OK]")
+        refresh_stats_rollup(csv_path)
+        print("\n[SUCCESS] 差分同期完了 [OK]")
         return 0
-    else:
-        print("\n[WARNING] 同期完了（警告あり）")
-        return 0 if db_result['valid'] else 1
+    clear_stats_rollup(url, token, job_type)  # 一部の変更のみ反映された行データと一致しないため
+    print("\n[WARNING] 差分同期完了（警告あり、再実行で失敗分のみ再送信）")
+    return 1
+
+
+# =============================================================================
+# 3層比較統計の事前集計（2026-01-20追加）
+# =============================================================================
+# ダッシュボードの全国・都道府県・市区町村統計は stats_rollup テーブルをキーで引く（stats_rollup.py）。
+# import / sync の成功後にCSVから作り直す。import は行データの削除前に、sync は失敗時に該当職種の
+# 事前集計を削除する（読み込まれている行データと一致しない古い集計を返さず、行データからの集計にフォールバック）。
+# ダッシュボードは事前集計の版（最終作成日時, 行数）を定期的に確認し、変わったら取得し直す（db_helper）。
+
+def clear_stats_rollup(url: str, token: str, job_type: str) -> bool:
+    """職種の事前集計を削除（行データと一致しなくなる import 開始時・sync 失敗時）"""
+    import stats_rollup
+
+    try:
+        result = send_pipeline(url, token, stats_rollup.turso_clear_requests(job_type), timeout=60)
+        failed = [r for r in result.get('results', []) if r.get('type') == 'error']
+    except Exception as e:
+        failed = [e]
+    if failed:
+        print(f"  [ROLLUP] {job_type}: 事前集計の削除に失敗 {str(failed[0])[:80]}")
+        return False
+    print(f"  [ROLLUP] {job_type}: 事前集計を削除（再作成まで行データから集計）")
+    return True
+
+
+def refresh_stats_rollup(csv_path: str) -> int:
+    """CSVから職種の事前集計を作成し、stats_rollup テーブルの該当職種を置き換える"""
+    import stats_rollup
+
+    url, token = get_turso_config()
+    if not url or not token:
+        print("ERROR: Turso設定なし（.envを確認）")
+        return 1
+
+    print(f"\n[ROLLUP] {os.path.basename(csv_path)} から3層比較統計を集計中...")
+    rollup = stats_rollup.build_rollup(stats_rollup.read_source_csv(csv_path))
+    if rollup.empty:
+        print("  集計対象の行がありません（SUMMARY / RESIDENCE_FLOW / AGE_GENDER）")
+        return 0
+
+    errors = 0
+    for job_type, requests in stats_rollup.turso_requests(rollup):
+        try:
+            result = send_pipeline(url, token, requests, timeout=300)
+            failed = [r for r in result.get('results', []) if r.get('type') == 'error']
+        except Exception as e:
+            failed = [e]
+        if failed:
+            errors += 1
+            print(f"  {job_type}: 送信エラー {str(failed[0])[:80]}")
+        else:
+            print(f"  {job_type}: {int((rollup['job_type'] == job_type).sum()):,}行 [OK]")
+    return 1 if errors else 0
 
 
 # =============================================================================
@@ -688,18 +1113,31 @@ CSV-DB同期フレームワーク
 
 使用方法:
   python turso_sync.py validate <CSVファイル>   CSV検証のみ
-  python turso_sync.py import <CSVファイル>     検証→インポート→検証
+  python turso_sync.py validate <CSV/フォルダ...> [--workers N] [--report report.json]
+                                                複数CSVを並列プロセスで検証し、JSONレポートを出力
+  python turso_sync.py import <CSVファイル> [--concurrency N] [--restart]
+                                                検証→インポート→検証（中断時は同じCSVで再実行すると続きから）
+  python turso_sync.py sync <CSVファイル> [--dry-run]
+                                                検証→差分同期（前回同期からの変更行のみ送信）→検証
   python turso_sync.py verify <job_type>        DB検証のみ
+  python turso_sync.py rollup <CSV/フォルダ...> 3層比較統計の事前集計（stats_rollup テーブル）のみ再作成
 
 例:
   python turso_sync.py validate MapComplete_看護師_READY.csv
+  python turso_sync.py validate data/ --report validation_report.json
   python turso_sync.py import MapComplete_看護師_READY.csv
+  python turso_sync.py sync MapComplete_看護師_READY.csv
   python turso_sync.py verify 看護師
 
 注意:
   - CSVにはjob_type列が必須
   - 1つのjob_typeのみ含むCSVを使用
   - インポート前に該当job_typeの既存データは自動削除
+  - import の同時送信数は --concurrency（デフォルト: TURSO_IMPORT_CONCURRENCY=4）
+  - import を中断した場合、同じCSVで再実行すると削除をスキップして未完了の行のみ送信
+    （--restart で最初からやり直し）
+  - sync は初回（マニフェストなし）のみ import と同じ全件置き換え、以降は差分のみ
+  - import / sync の成功後は stats_rollup テーブルも自動で再作成
   - 検証に失敗した場合、インポートは実行されません
 """)
 
@@ -713,22 +1151,77 @@ def main():
     target = sys.argv[2]
 
     if command == 'validate':
-        if not os.path.exists(target):
-            print(f"ERROR: ファイルが見つかりません: {target}")
+        args = sys.argv[2:]
+        options = {}
+        for name in ('--report', '--workers'):
+            if name in args:
+                idx = args.index(name)
+                if idx + 1 >= len(args):
+                    print(f"ERROR: {name} の値がありません")
+                    return 1
+                options[name] = args[idx + 1]
+                del args[idx:idx + 2]
+        csv_paths = []
+        for path in args:
+            if os.path.isdir(path):
+                csv_paths.extend(sorted(str(p) for p in Path(path).glob('*.csv')))
+            elif os.path.exists(path):
+                csv_paths.append(path)
+            else:
+                print(f"ERROR: ファイルが見つかりません: {path}")
+                return 1
+        if len(csv_paths) == 1 and '--report' not in options:
+            result = validate_csv(csv_paths[0])
+            return 0 if result['valid'] else 1
+        if not csv_paths:
+            print("ERROR: CSVファイルがありません")
             return 1
-        result = validate_csv(target)
-        return 0 if result['valid'] else 1
+        try:
+            workers = int(options['--workers']) if '--workers' in options else None
+        except ValueError:
+            print("ERROR: --workers には整数を指定してください")
+            return 1
+        results = validate_csvs(csv_paths, workers=workers, report_path=options.get('--report'))
+        return 0 if all(r['valid'] for r in results) else 1
 
     elif command == 'import':
         if not os.path.exists(target):
             print(f"ERROR: ファイルが見つかりません: {target}")
             return 1
-        return import_csv(target)
+        options = sys.argv[3:]
+        concurrency = None
+        if '--concurrency' in options:
+            idx = options.index('--concurrency')
+            try:
+                concurrency = int(options[idx + 1])
+            except (IndexError, ValueError):
+                print("ERROR: --concurrency には整数を指定してください")
+                return 1
+        return import_csv(target, concurrency=concurrency, restart='--restart' in options)
+
+    elif command == 'sync':
+        if not os.path.exists(target):
+            print(f"ERROR: ファイルが見つかりません: {target}")
+            return 1
+        return sync_csv(target, dry_run='--dry-run' in sys.argv[3:])
 
     elif command == 'verify':
         result = validate_db_after_import(target)
         return 0 if result['valid'] else 1
 
+    elif command == 'rollup':
+        csv_paths = []
+        for path in sys.argv[2:]:
+            if os.path.isdir(path):
+                csv_paths.extend(sorted(str(p) for p in Path(path).glob('*.csv')))
+            elif os.path.exists(path):
+                csv_paths.append(path)
+            else:
+                print(f"ERROR: ファイルが見つかりません: {path}")
+                return 1
+        results = [refresh_stats_rollup(p) for p in csv_paths]
+        return 1 if any(results) else 0
+
     else:
         print(f"ERROR: 不明なコマンド: {command}")
         print_usage()
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+一括ウォームアップ（全データ事前ロード）の取得計画と実行（2026-01-20追加）
+
+以前の _background_preload_all は47都道府県を1つずつ順番に SELECT * しており（都道府県ごとに1リクエスト、直列）、
+結果を上限なしで保持していたため、デプロイ・職種切り替えのたびにキャッシュが温まるまで数分かかっていた。
+
+このモジュールは職種1つ分のデータを row_type パーティション単位でまとめて取得し、都道府県別の分割は手元で行う:
+    1. 計画（1リクエスト）: row_type × 都道府県 の行数と、1行あたりのバイト数を測るサンプル行
+    2. 予算: PREFECTURE_ORDER 順に、推定サイズが予算内に収まる都道府県だけを対象にする
+       （収まらない都道府県がある場合のみ prefecture IN (...) で絞り込む）
+    3. ページ取得: rowid 順の LIMIT/OFFSET ページを1リクエストに複数まとめ（Turso pipeline）、
+       同時実行数を制限したスレッドプールで取得
+    4. ページごとに都道府県で分け、最後に都道府県ごとに結合（ページ順 = row_type・rowid 順）
+
+DBアクセスは呼び出し側の execute に委ねる（[(sql, params), ...] → [DataFrame, ...]、1回の呼び出し = 1リクエスト）。
+1ページでも取得に失敗した場合は、どの都道府県も不完全になるため結果（slices）を空にする。
+
+使用例:
+    result = run_warmup("介護職", execute, PREFECTURE_ORDER, budget_bytes=96 * 1024 * 1024)
+    result["slices"]["東京都"]   # 東京都の全カラムDataFrame
+    result["requests"], result["elapsed_sec"]
+
+環境変数:
+    WARMUP_PAGE_ROWS: 1ページの行数（デフォルト5000）
+    WARMUP_PAGES_PER_REQUEST: 1リクエストにまとめるページ数（デフォルト8）
+    WARMUP_CONCURRENCY: 同時リクエスト数（デフォルト3）
+    WARMUP_BUDGET_SHARE: キャッシュ予算のうち事前ロードに使う割合（デフォルト0.5）
+"""
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from cache_manager import estimate_size
+
+TABLE = "job_seeker_data"
+SAMPLE_ROWS = 200  # 1行あたりのバイト数の推定に使う行数
+MAX_RETRIES = 2  # 1リクエストあたりの再試行回数
+
+Query = Tuple[str, tuple]
+Execute = Callable[[List[Query]], List[pd.DataFrame]]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except (TypeError, ValueError):
+        print(f"[PRELOAD] Invalid {name}={os.getenv(name)!r}, using {default}")
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        print(f"[PRELOAD] Invalid {name}={os.getenv(name)!r}, using {default}")
+        return default
+
+
+PAGE_ROWS = _env_int("WARMUP_PAGE_ROWS", 5000)
+PAGES_PER_REQUEST = _env_int("WARMUP_PAGES_PER_REQUEST", 8)
+CONCURRENCY = _env_int("WARMUP_CONCURRENCY", 3)
+BUDGET_SHARE = _env_float("WARMUP_BUDGET_SHARE", 0.5)
+
+
+# =====================================
+# 計画
+# =====================================
+def plan_queries(job_type: str) -> List[Query]:
+    """行数（row_type × 都道府県）とサンプル行のクエリ（1リクエストにまとめる）"""
+    return [
+        (f"SELECT row_type, prefecture, COUNT(*) AS n FROM {TABLE} WHERE job_type = ? GROUP BY row_type, prefecture",
+         (job_type,)),
+        (f"SELECT * FROM {TABLE} WHERE job_type = ? LIMIT {SAMPLE_ROWS}", (job_type,)),
+    ]
+
+
+def admit_prefectures(counts: pd.DataFrame, prefectures: Sequence[str], bytes_per_row: float,
+                      budget_bytes: float) -> Tuple[List[str], List[str]]:
+    """予算内に収まる都道府県（prefectures の順に先頭から）と収まらない都道府県
+
+    Args:
+        counts: row_type, prefecture, n の行数表
+        prefectures: 対象の都道府県（優先順）。行数0の都道府県は対象・予算外のどちらにも含めない
+    """
+    rows = counts.groupby("prefecture")["n"].sum() if not counts.empty else pd.Series(dtype=float)
+    admitted, skipped = [], []
+    used = 0.0
+    for pref in prefectures:
+        n = float(rows.get(pref, 0))
+        if n <= 0:
+            continue
+        size = n * bytes_per_row
+        if skipped or used + size > budget_bytes:
+            skipped.append(pref)
+        else:
+            admitted.append(pref)
+            used += size
+    return admitted, skipped
+
+
+def page_queries(job_type: str, counts: pd.DataFrame, admitted: Sequence[str], all_admitted: bool,
+                 page_rows: Optional[int]) -> List[Query]:
+    """row_type ごとのページ取得クエリ（page_rows=None は row_type ごとに1回で全件）"""
+    scope = counts[counts["prefecture"].isin(admitted) & counts["row_type"].notna()]
+    totals = scope.groupby("row_type")["n"].sum()
+    where = "job_type = ? AND row_type = ?"
+    extra: tuple = ()
+    if not all_admitted:
+        where += f" AND prefecture IN ({', '.join('?' * len(admitted))})"
+        extra = tuple(admitted)
+
+    queries = []
+    for row_type, total in totals.items():
+        sql = f"SELECT * FROM {TABLE} WHERE {where}"
+        params = (job_type, row_type) + extra
+        if page_rows is None:
+            queries.append((sql, params))
+            continue
+        for page in range(math.ceil(total / page_rows)):
+            queries.append((f"{sql} ORDER BY rowid LIMIT {page_rows} OFFSET {page * page_rows}", params))
+    return queries
+
+
+def chunk_queries(queries: Sequence[Query], per_request: int) -> List[List[Query]]:
+    return [list(queries[i:i + per_request]) for i in range(0, len(queries), per_request)]
+
+
+# =====================================
+# 実行
+# =====================================
+def _execute_with_retry(execute: Execute, queries: List[Query], counter: dict, lock: threading.Lock):
+    last_error = None
+    for attempt in range(MAX_RETRIES + 1):
+        with lock:
+            counter["requests"] += 1
+        try:
+            return execute(queries)
+        except Exception as e:
+            last_error = e
+            if attempt < MAX_RETRIES:
+                print(f"[PRELOAD] Retry {attempt + 1}/{MAX_RETRIES} after error: {e}")
+    raise last_error
+
+
+def run_warmup(job_type: str, execute: Execute, prefectures: Sequence[str], budget_bytes: float,
+               page_rows: Optional[int] = None, pages_per_request: Optional[int] = None,
+               concurrency: Optional[int] = None, paged: bool = True,
+               on_progress: Optional[Callable[[str, int, int], None]] = None) -> dict:
+    """職種1つ分を row_type パーティション単位で取得し、都道府県別のDataFrameに分割
+
+    Args:
+        execute: [(sql, params), ...] を1リクエストで実行し、各結果のDataFrameを返す（失敗時は例外）
+        prefectures: 対象の都道府県（予算の優先順。これ以外の都道府県・都道府県欠損の行は含めない）
+        budget_bytes: 事前ロード全体のバイト予算
+        paged: False の場合は rowid によるページ分割をしない（rowid のないDB用）
+        on_progress: on_progress(phase, done, total)。phase は "planning" / "fetching" / "done"
+
+    Returns:
+        dict: slices（都道府県 → DataFrame）, skipped（予算外の都道府県）, requests, pages, rows,
+              bytes, elapsed_sec, errors
+    """
+    page_rows = page_rows or PAGE_ROWS
+    pages_per_request = pages_per_request or PAGES_PER_REQUEST
+    concurrency = concurrency or CONCURRENCY
+    started = time.perf_counter()
+    counter = {"requests": 0}
+    lock = threading.Lock()
+    result = {"slices": {}, "skipped": [], "requests": 0, "pages": 0, "rows": 0, "bytes": 0,
+              "elapsed_sec": 0.0, "errors": []}
+
+    def progress(phase, done, total):
+        if on_progress is not None:
+            on_progress(phase, done, total)
+
+    def finish():
+        result["requests"] = counter["requests"]
+        result["elapsed_sec"] = round(time.perf_counter() - started, 2)
+        progress("done", result["pages"], result["pages"])
+        return result
+
+    # 1. 計画
+    progress("planning", 0, 1)
+    try:
+        counts, sample = _execute_with_retry(execute, plan_queries(job_type), counter, lock)
+    except Exception as e:
+        result["errors"].append(f"plan: {e}")
+        return finish()
+    if counts.empty:
+        return finish()
+    counts = counts.assign(n=pd.to_numeric(counts["n"], errors="coerce").fillna(0))
+    bytes_per_row = estimate_size(sample) / len(sample) if len(sample) else 0.0
+
+    # 2. 予算
+    admitted, skipped = admit_prefectures(counts, prefectures, bytes_per_row, budget_bytes)
+    result["skipped"] = skipped
+    if skipped:
+        print(f"[PRELOAD] Over budget ({budget_bytes / 1024 / 1024:.0f}MB): skipping {len(skipped)} prefectures "
+              f"from {skipped[0]}")
+    if not admitted:
+        return finish()
+    listed = set(counts["prefecture"].dropna())
+    all_admitted = listed <= set(admitted)
+
+    # 3. ページ取得（ページ番号 → 都道府県 → DataFrame）
+    queries = page_queries(job_type, counts, admitted, all_admitted, page_rows if paged else None)
+    chunks = chunk_queries(queries, pages_per_request)
+    result["pages"] = len(queries)
+    admitted_set = set(admitted)
+    parts: Dict[int, Dict[str, pd.DataFrame]] = {}
+    done = 0
+    progress("fetching", 0, len(queries))
+
+    def fetch(first_page: int, chunk: List[Query]):
+        frames = _execute_with_retry(execute, chunk, counter, lock)
+        split = {}
+        for offset, df in enumerate(frames):
+            if df.empty or "prefecture" not in df.columns:
+                continue
+            page = {}
+            for pref, part in df.groupby("prefecture", sort=False, observed=True):
+                if pref in admitted_set:
+                    page[pref] = part
+            split[first_page + offset] = page
+        return len(chunk), split
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks))),
+                            thread_name_prefix="warmup") as pool:
+        futures = []
+        first_page = 0
+        for chunk in chunks:
+            futures.append(pool.submit(fetch, first_page, chunk))
+            first_page += len(chunk)
+        for future in as_completed(futures):
+            try:
+                n, split = future.result()
+            except Exception as e:
+                result["errors"].append(f"fetch: {e}")
+                for other in futures:
+                    other.cancel()
+                continue
+            parts.update(split)
+            done += n
+            progress("fetching", done, len(queries))
+
+    if result["errors"]:
+        return finish()
+
+    # 4. 都道府県ごとに結合
+    for pref in admitted:
+        frames = [parts[page][pref] for page in sorted(parts) if pref in parts[page]]
+        if not frames:
+            continue
+        df = pd.concat(frames, ignore_index=True)
+        result["slices"][pref] = df
+        result["rows"] += len(df)
+        result["bytes"] += estimate_size(df)
+    return finish()
@@ -0,0 +1,498 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+希望勤務地のファクトテーブル（Phase 6/12/13/14）のベンチマーク（2026-01-20追加）
+
+各Phaseが processed_data を iterrows() で走査して desired_areas を展開していた従来版（legacy_*、
+同等性テストの基準）と、ファクトテーブルを groupby / merge で集計する現在の版を比較する。
+Phase 6 の集約フローエッジ（組み合わせごとの Series.mode()）も従来版を含む。
+--pipeline では Phase 1-14 全体（export_phase*、CSV出力を含む）の所要時間を計測する。
+
+使い方:
+    python benchmark_area_facts.py                       # 10万件: Phase 6/12/13/14 の生成処理
+    python benchmark_area_facts.py --rows 20000 --pipeline
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+from benchmark_process_data import make_applicants
+from run_complete_v2_perfect import PerfectJobSeekerAnalyzer
+
+PIPELINE_PHASES = [1, 2, 3, 6, 7, 8, 10, 12, 13, 14]
+LEGACY_GENERATORS = {
+    '_generate_flow_edges': 'legacy_flow_edges',
+    '_generate_flow_nodes': 'legacy_flow_nodes',
+    '_generate_aggregated_flow_edges': 'legacy_aggregated_flow_edges',
+    '_generate_proximity_analysis': 'legacy_proximity_analysis',
+    '_generate_supply_demand_gap': 'legacy_supply_demand_gap',
+    '_generate_rarity_score': 'legacy_rarity_score',
+    '_generate_competition_profile': 'legacy_competition_profile',
+}
+
+
+def legacy_input(processed):
+    """processed_data を従来版の前提（文字列の欠損は None）に揃える
+
+    pandas 3 の文字列型では欠損が NaN になり、従来版の `if not row['residence_pref']` が
+    欠損を判定できない（"nannan" という居住地のフローができる）。現在の版は欠損を除外する。
+    """
+    converted = processed.astype(object)
+    return converted.where(processed.notna(), None)
+
+
+def legacy_flow_edges(analyzer, df):
+    """2026-01-20以前の自治体間フローエッジ（iterrows版）"""
+    results = []
+
+    for idx, row in df.iterrows():
+        if not row['residence_pref'] or not row['residence_muni']:
+            continue
+
+        origin = f"{row['residence_pref']}{row['residence_muni']}"
+
+        for area in row['desired_areas']:
+            destination = area['full']
+
+            if origin != destination:
+                results.append({
+                    'origin': origin,
+                    'destination': destination,
+                    'origin_pref': row['residence_pref'],
+                    'origin_muni': row['residence_muni'],
+                    'destination_pref': area['prefecture'],
+                    'destination_muni': area['municipality'],
+                    'applicant_id': row['id'],
+                    'age': row['age'],
+                    'gender': row['gender']
+                })
+
+    return pd.DataFrame(results)
+
+
+def legacy_flow_nodes(analyzer, df):
+    """2026-01-20以前の自治体間フローノード（iterrows版）"""
+    results = defaultdict(lambda: {'inflow': 0, 'outflow': 0, 'applicants': set()})
+
+    for idx, row in df.iterrows():
+        if not row['residence_pref'] or not row['residence_muni']:
+            continue
+
+        origin = f"{row['residence_pref']}{row['residence_muni']}"
+
+        for area in row['desired_areas']:
+            destination = area['full']
+
+            if origin != destination:
+                # 流出
+                results[origin]['outflow'] += 1
+                results[origin]['applicants'].add(row['id'])
+
+                # 流入
+                results[destination]['inflow'] += 1
+                results[destination]['applicants'].add(row['id'])
+
+    # DataFrameに変換
+    nodes = []
+    for location, data in results.items():
+        pref, muni = analyzer._parse_location(location)
+        nodes.append({
+            'location': location,
+            'prefecture': pref,
+            'municipality': muni,
+            'inflow': data['inflow'],
+            'outflow': data['outflow'],
+            'net_flow': data['inflow'] - data['outflow'],
+            'applicant_count': len(data['applicants'])
+        })
+
+    return pd.DataFrame(nodes).sort_values('net_flow', ascending=False)
+
+
+def legacy_aggregated_flow_edges(analyzer, flow_edges_df):
+    """2026-01-20以前の集約フローエッジ（組み合わせごとに Series.mode()）"""
+    if flow_edges_df.empty:
+        return pd.DataFrame(columns=[
+            'origin', 'destination', 'origin_pref', 'origin_muni',
+            'destination_pref', 'destination_muni', 'flow_count', 'avg_age', 'gender_mode'
+        ])
+
+    # Origin→Destinationの組み合わせで集約
+    agg = flow_edges_df.groupby([
+        'origin', 'destination',
+        'origin_pref', 'origin_muni',
+        'destination_pref', 'destination_muni'
+    ]).agg({
+        'applicant_id': 'count',  # フロー数
+        'age': 'mean',            # 平均年齢
+        'gender': lambda x: x.mode()[0] if len(x.mode()) > 0 else '不明'  # 最頻性別
+    }).reset_index()
+
+    # カラム名をわかりやすく変更
+    agg.rename(columns={
+        'applicant_id': 'flow_count',
+        'age': 'avg_age',
+        'gender': 'gender_mode'
+    }, inplace=True)
+
+    # フロー数でソート（降順）
+    agg = agg.sort_values('flow_count', ascending=False)
+
+    return agg
+
+
+def legacy_proximity_analysis(analyzer, df):
+    """2026-01-20以前の移動パターン分析（iterrows版）"""
+    results = []
+
+    # 都道府県内移動 vs 都道府県外移動
+    for idx, row in df.iterrows():
+        if not row['residence_pref']:
+            continue
+
+        same_pref_count = 0
+        diff_pref_count = 0
+
+        for area in row['desired_areas']:
+            if area['prefecture'] == row['residence_pref']:
+                same_pref_count += 1
+            else:
+                diff_pref_count += 1
+
+        if same_pref_count + diff_pref_count > 0:
+            results.append({
+                'applicant_id': row['id'],
+                'residence_pref': row['residence_pref'],
+                'age': row['age'],
+                'gender': row['gender'],
+                'same_prefecture_count': same_pref_count,
+                'different_prefecture_count': diff_pref_count,
+                'total_desired_areas': same_pref_count + diff_pref_count,
+                'mobility_score': diff_pref_count / (same_pref_count + diff_pref_count) if (same_pref_count + diff_pref_count) > 0 else 0
+            })
+
+    return pd.DataFrame(results)
+
+
+def legacy_supply_demand_gap(analyzer):
+    """2026-01-20以前の需給ギャップ分析（Phase 12）（iterrows版）"""
+
+    # 各市町村への需要（希望者数）
+    demand_list = []
+    for idx, row in analyzer.processed_data.iterrows():
+        for area in row['desired_areas']:
+            demand_list.append({
+                'prefecture': area['prefecture'],
+                'municipality': area['municipality'] if area['municipality'] else '',
+                'location': area['full']
+            })
+
+    demand_df = pd.DataFrame(demand_list)
+    demand = demand_df.groupby('location').size().reset_index(name='demand_count')
+
+    # 各市町村からの供給（居住者数）
+    # 修正: location フォーマットを demand と同じ形式（都道府県+市町村）に統一
+    supply_list = []
+    for idx, row in analyzer.processed_data.iterrows():
+        if row['residence_pref'] and row['residence_muni']:
+            location = f"{row['residence_pref']}{row['residence_muni']}"
+            supply_list.append({'location': location})
+
+    if supply_list:
+        supply_df = pd.DataFrame(supply_list)
+        supply = supply_df.groupby('location').size().reset_index(name='supply_count')
+    else:
+        supply = pd.DataFrame(columns=['location', 'supply_count'])
+
+    # 需給マッチング
+    gap = pd.merge(demand, supply, on='location', how='outer').fillna(0)
+    gap['demand_supply_ratio'] = gap['demand_count'] / (gap['supply_count'] + 1)
+    gap['gap'] = gap['demand_count'] - gap['supply_count']
+
+    # 都道府県・市町村に分割（正規表現修正：都道府県名全体をキャプチャ）
+    gap[['prefecture', 'municipality']] = gap['location'].str.extract(r'^([^都道府県]+[都道府県])(.*)')
+    gap['municipality'] = gap['municipality'].fillna('')
+
+    # prefecture列がNaNの場合、location全体を都道府県とする
+    gap.loc[gap['prefecture'].isna(), 'prefecture'] = gap.loc[gap['prefecture'].isna(), 'location']
+    gap.loc[gap['prefecture'].isna(), 'municipality'] = ''
+
+    # 座標を追加（MAP統合用）
+    gap['latitude'] = None
+    gap['longitude'] = None
+
+    for idx, row in gap.iterrows():
+        location_key = row['location']
+        if location_key in analyzer.municipality_coords:
+            lat, lon = analyzer.municipality_coords[location_key]
+            gap.at[idx, 'latitude'] = lat
+            gap.at[idx, 'longitude'] = lon
+        elif location_key in analyzer.geocache:
+            cache_data = analyzer.geocache[location_key]
+            gap.at[idx, 'latitude'] = cache_data.get('lat')
+            gap.at[idx, 'longitude'] = cache_data.get('lng')
+
+    # カラム順序を整理（MAP統合に適した形式）
+    gap = gap[['prefecture', 'municipality', 'location', 'demand_count', 'supply_count',
+               'demand_supply_ratio', 'gap', 'latitude', 'longitude']]
+
+    return gap.sort_values('demand_supply_ratio', ascending=False)
+
+
+def legacy_rarity_score(analyzer):
+    """2026-01-20以前の希少性スコア（Phase 13）（iterrows版）"""
+
+    # 希望勤務地を展開
+    desired_list = []
+    for idx, row in analyzer.processed_data.iterrows():
+        for area in row['desired_areas']:
+            desired_list.append({
+                'location': area['full'],
+                'prefecture': area['prefecture'],
+                'municipality': area['municipality'] if area['municipality'] else '',
+                'age_bucket': row['age_bucket'],
+                'gender': row['gender'],
+                'has_national_license': row['has_national_license']
+            })
+
+    desired_df = pd.DataFrame(desired_list)
+
+    # 市町村 × 年齢層 × 性別 × 国家資格でグループ化
+    rarity = desired_df.groupby(['location', 'prefecture', 'municipality',
+                                   'age_bucket', 'gender', 'has_national_license']).size().reset_index(name='count')
+
+    # 希少性スコア = 1 / count
+    rarity['rarity_score'] = 1 / rarity['count']
+
+    # ランク付け
+    def get_rarity_rank(score):
+        if score >= 1.0:
+            return 'S: 超希少（1人のみ）'
+        elif score >= 0.5:
+            return 'A: 非常に希少（2人）'
+        elif score >= 0.2:
+            return 'B: 希少（3-5人）'
+        elif score >= 0.05:
+            return 'C: やや希少（6-20人）'
+        else:
+            return 'D: 一般的（20人超）'
+
+    rarity['rarity_rank'] = rarity['rarity_score'].apply(get_rarity_rank)
+
+    # 座標を追加（MAP統合用）
+    rarity['latitude'] = None
+    rarity['longitude'] = None
+
+    for idx, row in rarity.iterrows():
+        location_key = row['location']
+        if location_key in analyzer.municipality_coords:
+            lat, lon = analyzer.municipality_coords[location_key]
+            rarity.at[idx, 'latitude'] = lat
+            rarity.at[idx, 'longitude'] = lon
+        elif location_key in analyzer.geocache:
+            cache_data = analyzer.geocache[location_key]
+            rarity.at[idx, 'latitude'] = cache_data.get('lat')
+            rarity.at[idx, 'longitude'] = cache_data.get('lng')
+
+    # カラム順序を整理
+    rarity = rarity[['prefecture', 'municipality', 'location', 'age_bucket', 'gender',
+                     'has_national_license', 'count', 'rarity_score', 'rarity_rank',
+                     'latitude', 'longitude']]
+
+    return rarity.sort_values('rarity_score', ascending=False)
+
+
+def legacy_competition_profile(analyzer):
+    """2026-01-20以前の競合分析（Phase 14）（iterrows版）"""
+
+    # 希望勤務地を展開
+    desired_list = []
+    for idx, row in analyzer.processed_data.iterrows():
+        for area in row['desired_areas']:
+            desired_list.append({
+                'location': area['full'],
+                'prefecture': area['prefecture'],
+                'municipality': area['municipality'] if area['municipality'] else '',
+                'age_bucket': row['age_bucket'],
+                'gender': row['gender'],
+                'has_national_license': row['has_national_license'],
+                'employment_status': row['employment_status'],
+                'qualification_count': row['qualification_count']
+            })
+
+    desired_df = pd.DataFrame(desired_list)
+
+    # 市町村ごとに集計
+    results = []
+
+    for location in desired_df['location'].unique():
+        muni_data = desired_df[desired_df['location'] == location]
+
+        if len(muni_data) == 0:
+            continue
+
+        # 基本統計
+        total_count = len(muni_data)
+
+        # 年齢層分布（最も多い年齢層）
+        age_dist = muni_data['age_bucket'].value_counts()
+        top_age = age_dist.index[0] if len(age_dist) > 0 else None
+        top_age_count = age_dist.iloc[0] if len(age_dist) > 0 else 0
+        top_age_ratio = top_age_count / total_count if total_count > 0 else 0
+
+        # 性別分布
+        gender_dist = muni_data['gender'].value_counts()
+        female_count = gender_dist.get('女性', 0)
+        male_count = gender_dist.get('男性', 0)
+        female_ratio = female_count / total_count if total_count > 0 else 0
+
+        # 国家資格保有率
+        national_license_rate = muni_data['has_national_license'].mean()
+
+        # 就業状態分布（最も多い状態）
+        emp_dist = muni_data['employment_status'].value_counts()
+        top_employment = emp_dist.index[0] if len(emp_dist) > 0 else None
+        top_employment_count = emp_dist.iloc[0] if len(emp_dist) > 0 else 0
+        top_employment_ratio = top_employment_count / total_count if total_count > 0 else 0
+
+        # 平均資格数
+        avg_qualification = muni_data['qualification_count'].mean()
+
+        # 都道府県・市町村
+        prefecture = muni_data['prefecture'].iloc[0] if len(muni_data) > 0 else ''
+        municipality = muni_data['municipality'].iloc[0] if len(muni_data) > 0 else ''
+
+        results.append({
+            'prefecture': prefecture,
+            'municipality': municipality,
+            'location': location,
+            'total_applicants': total_count,
+            'top_age_group': top_age,
+            'top_age_ratio': top_age_ratio,
+            'female_ratio': female_ratio,
+            'male_ratio': 1 - female_ratio,
+            'national_license_rate': national_license_rate,
+            'top_employment_status': top_employment,
+            'top_employment_ratio': top_employment_ratio,
+            'avg_qualification_count': avg_qualification
+        })
+
+    competition_df = pd.DataFrame(results)
+
+    # 座標を追加（MAP統合用）
+    competition_df['latitude'] = None
+    competition_df['longitude'] = None
+
+    for idx, row in competition_df.iterrows():
+        location_key = row['location']
+        if location_key in analyzer.municipality_coords:
+            lat, lon = analyzer.municipality_coords[location_key]
+            competition_df.at[idx, 'latitude'] = lat
+            competition_df.at[idx, 'longitude'] = lon
+        elif location_key in analyzer.geocache:
+            cache_data = analyzer.geocache[location_key]
+            competition_df.at[idx, 'latitude'] = cache_data.get('lat')
+            competition_df.at[idx, 'longitude'] = cache_data.get('lng')
+
+    # カラム順序を整理
+    competition_df = competition_df[['prefecture', 'municipality', 'location', 'total_applicants',
+                                     'top_age_group', 'top_age_ratio', 'female_ratio', 'male_ratio',
+                                     'national_license_rate', 'top_employment_status', 'top_employment_ratio',
+                                     'avg_qualification_count', 'latitude', 'longitude']]
+
+    return competition_df.sort_values('total_applicants', ascending=False)
+
+
+def _use_legacy(analyzer):
+    """インスタンスの生成処理を従来版に差し替える"""
+    for method, legacy in LEGACY_GENERATORS.items():
+        func = globals()[legacy]
+        setattr(analyzer, method, lambda *args, func=func: func(analyzer, *args))
+
+
+def run_generators(analyzer):
+    """Phase 6/12/13/14 の生成処理（出力の件数を返す）"""
+    df = analyzer.processed_data
+    flow_edges = analyzer._generate_flow_edges(df)
+    outputs = [
+        flow_edges,
+        analyzer._generate_aggregated_flow_edges(flow_edges),
+        analyzer._generate_flow_nodes(df),
+        analyzer._generate_proximity_analysis(df),
+        analyzer._generate_supply_demand_gap(),
+        analyzer._generate_rarity_score(),
+        analyzer._generate_competition_profile(),
+    ]
+    return [len(output) for output in outputs]
+
+
+def run_pipeline(df_normalized, legacy=False):
+    """process_data と Phase 1-14 を一時ディレクトリで実行し、Phaseごとの所要時間を返す
+
+    従来版も同じ processed_data で実行する（legacy_input で変換すると、他のPhaseの所要時間も変わるため）。
+    """
+    cwd = os.getcwd()
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            analyzer = PerfectJobSeekerAnalyzer('benchmark.csv')
+            analyzer.df_normalized = df_normalized
+            started = time.perf_counter()
+            analyzer.process_data()
+            if legacy:
+                _use_legacy(analyzer)
+            timings['process'] = time.perf_counter() - started
+            for phase in PIPELINE_PHASES:
+                started = time.perf_counter()
+                getattr(analyzer, f'export_phase{phase}')()
+                timings[f'phase{phase}'] = time.perf_counter() - started
+        finally:
+            os.chdir(cwd)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='希望勤務地のファクトテーブルのベンチマーク')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--pipeline', action='store_true', help='Phase 1-14 全体の所要時間を計測')
+    args = parser.parse_args()
+
+    df = make_applicants(args.rows)
+    if args.pipeline:
+        results = {'iterrows': run_pipeline(df, legacy=True), 'fact table': run_pipeline(df)}
+        print(f"\n[BENCH] {args.rows:,} applicants, full pipeline (process_data + Phase 1-14)")
+        for name in results['iterrows']:
+            print(f"  {name:<8} {results['iterrows'][name]:8.2f}s -> {results['fact table'][name]:8.2f}s")
+        before, after = (sum(timings.values()) for timings in results.values())
+        print(f"  {'total':<8} {before:8.2f}s -> {after:8.2f}s ({before / after:.2f}x)")
+        return
+
+    analyzer = PerfectJobSeekerAnalyzer.__new__(PerfectJobSeekerAnalyzer)
+    analyzer.df_normalized = df
+    analyzer.geocache, analyzer.municipality_coords = {}, {}
+    analyzer.process_data()
+    processed = analyzer.processed_data
+
+    started = time.perf_counter()
+    counts = run_generators(analyzer)
+    current = time.perf_counter() - started
+
+    analyzer.processed_data = legacy_input(processed)
+    _use_legacy(analyzer)
+    started = time.perf_counter()
+    legacy_counts = run_generators(analyzer)
+    legacy = time.perf_counter() - started
+
+    print(f"\n[BENCH] {args.rows:,} applicants, Phase 6/12/13/14 generators (rows: {counts})")
+    print(f"  fact table: {current:8.2f}s")
+    print(f"  iterrows:   {legacy:8.2f}s ({legacy / current:.1f}x, rows: {legacy_counts})")
+
+
+if __name__ == '__main__':
+    main()
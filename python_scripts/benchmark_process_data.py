@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+PerfectJobSeekerAnalyzer.process_data のベンチマーク（2026-01-20追加）
+
+従来の iterrows() 版（legacy_process_data、同等性テストの基準）と列単位のベクトル化版を、
+合成した求職者データ（DataNormalizer 通過後と同じカラム）で比較する。
+
+使い方:
+    python benchmark_process_data.py                      # 10万件・100万件（従来版は10万件のみ）
+    python benchmark_process_data.py --rows 100000 1000000 --legacy-max 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from run_complete_v2_perfect import PREFECTURES, PerfectJobSeekerAnalyzer
+
+QUALIFICATIONS = ['看護師', '准看護師', '介護福祉士', '保育士', '理学療法士', '普通自動車免許', '社会福祉士']
+MUNICIPALITIES = ['中央区', '北区', '港区', '横浜市青葉区', '札幌市', '那覇市', '', '市']
+
+
+def make_applicants(rows, seed=0):
+    """合成の求職者データ（表記ゆれ・欠損・上限超えの希望勤務地を含む）"""
+    rng = np.random.default_rng(seed)
+    prefs = np.array(PREFECTURES + ['不明県', ' 東京都'], dtype=object)
+    munis = np.array(MUNICIPALITIES, dtype=object)
+
+    def location(k):
+        return prefs[rng.integers(0, len(prefs), k)] + munis[rng.integers(0, len(munis), k)]
+
+    ages = rng.integers(18, 80, rows).astype(str)
+    genders = np.array(['男性', '女性', ' 女性', '不明'], dtype=object)[rng.integers(0, 4, rows)]
+    age_gender = pd.Series(ages + '歳' + genders, dtype=object)
+    age_gender[rng.random(rows) < 0.03] = None
+
+    counts = rng.poisson(3, rows)
+    counts[rng.random(rows) < 0.001] = 60  # 上限（MAX_DESIRED_LOCATIONS）超え
+    flat = location(int(counts.sum()))
+    desired = pd.Series([','.join(parts) for parts in np.split(flat, np.cumsum(counts)[:-1])], dtype=object)
+    desired[desired == ''] = None
+    desired[rng.random(rows) < 0.01] = ' , '
+
+    qual_counts = rng.integers(0, 4, rows)
+    qual_flat = np.array(QUALIFICATIONS, dtype=object)[rng.integers(0, len(QUALIFICATIONS), int(qual_counts.sum()))]
+    quals = pd.Series([', '.join(parts) for parts in np.split(qual_flat, np.cumsum(qual_counts)[:-1])], dtype=object)
+    quals[quals == ''] = None
+
+    residence = pd.Series(location(rows), dtype=object)
+    residence[rng.random(rows) < 0.02] = None
+    return pd.DataFrame({
+        'page': rng.integers(1, 500, rows),
+        'card_index': rng.integers(0, 40, rows),
+        'age_gender': age_gender,
+        'location': residence,
+        'desired_area': desired,
+        'desired_workstyle': np.array(['正職員', 'パート', None], dtype=object)[rng.integers(0, 3, rows)],
+        'desired_start': np.array(['すぐにでも', '3ヶ月以内', None], dtype=object)[rng.integers(0, 3, rows)],
+        'career': np.array(['専門学校卒', '大学卒', None], dtype=object)[rng.integers(0, 3, rows)],
+        'employment_status': np.array(['就業中', '離職中', '在学中'], dtype=object)[rng.integers(0, 3, rows)],
+        'qualifications': quals,
+        'member_id': np.arange(rows),
+    })
+
+
+def make_analyzer(df_normalized):
+    """ファイル読み込み・geocache初期化をせずに process_data だけを実行できるインスタンス"""
+    analyzer = PerfectJobSeekerAnalyzer.__new__(PerfectJobSeekerAnalyzer)
+    analyzer.df_normalized = df_normalized
+    return analyzer
+
+
+def legacy_process_data(analyzer):
+    """2026-01-20以前の process_data（iterrows版）"""
+    from config import MAX_DESIRED_LOCATIONS
+
+    processed_rows = []
+    for idx, row in analyzer.df_normalized.iterrows():
+        age, gender = analyzer._parse_age_gender(row.get('age_gender'))
+        residence_pref, residence_muni = analyzer._parse_location(row.get('location'))
+        desired_areas = analyzer._parse_desired_areas(row.get('desired_area'))
+        if len(desired_areas) > MAX_DESIRED_LOCATIONS:
+            desired_areas = desired_areas[:MAX_DESIRED_LOCATIONS]
+        qualifications = analyzer._parse_qualifications(row.get('qualifications'))
+        age_bucket = analyzer._get_age_bucket(age)
+        national_licenses = ['看護師', '准看護師', '保健師', '助産師', '理学療法士', '作業療法士']
+        has_national_license = any(q in national_licenses for q in qualifications)
+
+        processed_rows.append({
+            'id': idx,
+            'page': row.get('page'),
+            'card_index': row.get('card_index'),
+            'age': age,
+            'gender': gender,
+            'age_bucket': age_bucket,
+            'residence_pref': residence_pref,
+            'residence_muni': residence_muni,
+            'desired_areas': desired_areas,
+            'desired_workstyle': row.get('desired_workstyle'),
+            'desired_start': row.get('desired_start'),
+            'career': row.get('career'),
+            'employment_status': row.get('employment_status'),
+            'desired_job': row.get('desired_job'),
+            'qualifications': qualifications,
+            'qualification_count': len(qualifications),
+            'has_national_license': has_national_license,
+            'member_id': row.get('member_id'),
+            'status': row.get('status'),
+            '年齢層': analyzer._get_age_group_5year(age),
+            '希望勤務地数': len(desired_areas),
+        })
+    return pd.DataFrame(processed_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='process_data のベンチマーク')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--legacy-max', type=int, default=100_000, help='従来版を計測する最大件数')
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        df = make_applicants(rows)
+        analyzer = make_analyzer(df)
+        started = time.perf_counter()
+        result = analyzer.process_data()
+        vectorized = time.perf_counter() - started
+        print(f"\n[BENCH] {rows:,} applicants")
+        print(f"  vectorized: {vectorized:8.2f}s ({len(analyzer.desired_areas_long):,} desired areas)")
+        if rows <= args.legacy_max:
+            started = time.perf_counter()
+            expected = legacy_process_data(analyzer)
+            legacy = time.perf_counter() - started
+            pd.testing.assert_frame_equal(result, expected)
+            print(f"  iterrows:   {legacy:8.2f}s ({legacy / vectorized:.1f}x, identical output)")
+
+
+if __name__ == '__main__':
+    main()
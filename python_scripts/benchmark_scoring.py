@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+scoring（緊急度スコア・希少性ランク・年齢層）と Phase 10 のベンチマーク（2026-01-20追加）
+
+if/elif の関数を iterrows() / Series.apply() で1行ずつ呼んでいた従来版（legacy_*、同等性テストの基準）と、
+scoring の np.select / pd.cut 版を比較する。Phase 10 は export_phase10 のデータ生成部分
+（緊急度スコア + クロス集計 + 市区町村別集計、CSV出力なし）を計測する。
+
+使い方:
+    python benchmark_scoring.py                          # 100万件（従来版は10万件のみ）
+    python benchmark_scoring.py --rows 100000 1000000 --legacy-max 1000000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmark_process_data import make_analyzer, make_applicants
+from constants import EmploymentStatus
+
+# Phase 10 の生成処理（export_phase10 と同じ順）
+PHASE10_GENERATORS = [
+    '_generate_urgency_distribution',
+    '_generate_urgency_age_cross',
+    '_generate_urgency_age_matrix',
+    '_generate_urgency_employment_cross',
+    '_generate_urgency_employment_matrix',
+    '_generate_urgency_by_municipality',
+    '_generate_urgency_age_by_municipality',
+    '_generate_urgency_employment_by_municipality',
+    '_generate_urgency_gender_cross',
+    '_generate_urgency_gender_matrix',
+    '_generate_urgency_gender_by_municipality',
+    '_generate_urgency_start_category_cross',
+    '_generate_urgency_start_category_matrix',
+    '_generate_urgency_start_category_by_municipality',
+]
+LEGACY_GENERATORS = {
+    '_generate_urgency_by_municipality': 'legacy_urgency_by_municipality',
+    '_generate_urgency_age_by_municipality': 'legacy_urgency_age_by_municipality',
+    '_generate_urgency_employment_by_municipality': 'legacy_urgency_employment_by_municipality',
+    '_generate_urgency_gender_by_municipality': 'legacy_urgency_gender_by_municipality',
+    '_generate_urgency_start_category_by_municipality': 'legacy_urgency_start_category_by_municipality',
+}
+
+
+def legacy_age_bucket(age):
+    """2026-01-20以前の年齢層・10年単位（if/elif版）"""
+    if age is None or pd.isna(age):
+        return None
+
+    age = int(age)
+    if age < 30:
+        return '20代'
+    elif age < 40:
+        return '30代'
+    elif age < 50:
+        return '40代'
+    elif age < 60:
+        return '50代'
+    elif age < 70:
+        return '60代'
+    else:
+        return '70歳以上'
+
+
+def legacy_age_group_5year(age):
+    """2026-01-20以前の年齢層・5年単位（if/elif版）"""
+    if age is None or pd.isna(age):
+        return None
+
+    age = int(age)
+    if age <= 29:
+        return '20代以下'
+    elif age <= 39:
+        return '30代'
+    elif age <= 49:
+        return '40代'
+    elif age <= 59:
+        return '50代'
+    else:
+        return '60代以上'
+
+
+def legacy_urgency_score(df):
+    """2026-01-20以前の転職意欲・緊急度スコア（iterrows版）"""
+    df_copy = df.copy()
+
+    # スコアリングロジック
+    urgency_scores = []
+
+    for idx, row in df_copy.iterrows():
+        score = 0
+
+        # 1. 希望勤務地数（0-3点）
+        if row['希望勤務地数'] == 0:
+            score += 0
+        elif row['希望勤務地数'] <= 2:
+            score += 1
+        elif row['希望勤務地数'] <= 5:
+            score += 2
+        else:
+            score += 3
+
+        # 2. 資格数（0-2点）
+        if row['qualification_count'] >= 3:
+            score += 2
+        elif row['qualification_count'] >= 1:
+            score += 1
+
+        # 3. 国家資格保有（+2点）
+        if row['has_national_license']:
+            score += 2
+
+        # 4. 就業状態（0-2点）
+        if row['employment_status'] == EmploymentStatus.UNEMPLOYED:
+            score += 2
+        elif row['employment_status'] == EmploymentStatus.EMPLOYED:
+            score += 1
+
+        urgency_scores.append(score)
+
+    df_copy['urgency_score'] = urgency_scores
+
+    # スコアランク
+    def get_urgency_rank(score):
+        if score <= 2:
+            return 'D: 低い'
+        elif score <= 4:
+            return 'C: やや低い'
+        elif score <= 6:
+            return 'B: 中程度'
+        else:
+            return 'A: 高い'
+
+    df_copy['urgency_rank'] = df_copy['urgency_score'].apply(get_urgency_rank)
+
+    return df_copy
+
+def legacy_rarity_rank(score):
+    """2026-01-20以前の希少性ランク（if/elif版、Series.apply で1件ずつ呼んでいた）"""
+    if score >= 1.0:
+        return 'S: 超希少（1人のみ）'
+    elif score >= 0.5:
+        return 'A: 非常に希少（2人）'
+    elif score >= 0.2:
+        return 'B: 希少（3-5人）'
+    elif score >= 0.05:
+        return 'C: やや希少（6-20人）'
+    else:
+        return 'D: 一般的（20人超）'
+
+
+def legacy_urgency_by_municipality(df):
+    """2026-01-20以前の市区町村別緊急度集計（iterrows版）"""
+    results = []
+
+    for idx, row in df.iterrows():
+        for area in row['desired_areas']:
+            results.append({
+                'prefecture': area['prefecture'],
+                'municipality': area['municipality'],
+                'location': area['full'],
+                'urgency_score': row['urgency_score'],
+                'urgency_rank': row['urgency_rank']
+            })
+
+    df_results = pd.DataFrame(results)
+
+    # 集計
+    urgency_by_muni = df_results.groupby('location').agg({
+        'urgency_score': ['count', 'mean']
+    }).reset_index()
+
+    urgency_by_muni.columns = ['location', 'count', 'avg_urgency_score']
+
+    return urgency_by_muni.sort_values('avg_urgency_score', ascending=False)
+
+
+def legacy_urgency_age_by_municipality(df):
+    """2026-01-20以前の市区町村×年齢層別緊急度集計（iterrows版）"""
+    results = []
+
+    for idx, row in df.iterrows():
+        for area in row['desired_areas']:
+            results.append({
+                'prefecture': area['prefecture'],
+                'municipality': area['municipality'],
+                'location': area['full'],
+                'age_group': row['age_bucket'],
+                'urgency_score': row['urgency_score'],
+                'urgency_rank': row['urgency_rank']
+            })
+
+    df_results = pd.DataFrame(results)
+
+    # 集計
+    urgency_age_muni = df_results.groupby(['location', 'age_group']).agg({
+        'urgency_score': ['count', 'mean']
+    }).reset_index()
+
+    urgency_age_muni.columns = ['location', 'age_group', 'count', 'avg_urgency_score']
+
+    return urgency_age_muni.sort_values(['location', 'age_group'])
+
+
+def legacy_urgency_employment_by_municipality(df):
+    """2026-01-20以前の市区町村×就業状態別緊急度集計（iterrows版）"""
+    results = []
+
+    for idx, row in df.iterrows():
+        for area in row['desired_areas']:
+            results.append({
+                'prefecture': area['prefecture'],
+                'municipality': area['municipality'],
+                'location': area['full'],
+                'employment_status': row['employment_status'],
+                'urgency_score': row['urgency_score'],
+                'urgency_rank': row['urgency_rank']
+            })
+
+    df_results = pd.DataFrame(results)
+
+    # 集計
+    urgency_employment_muni = df_results.groupby(['location', 'employment_status']).agg({
+        'urgency_score': ['count', 'mean']
+    }).reset_index()
+
+    urgency_employment_muni.columns = ['location', 'employment_status', 'count', 'avg_urgency_score']
+
+    return urgency_employment_muni.sort_values(['location', 'employment_status'])
+
+
+def legacy_urgency_gender_by_municipality(df):
+    """2026-01-20以前の市区町村×性別別緊急度集計（iterrows版）"""
+    results = []
+
+    for idx, row in df.iterrows():
+        for area in row['desired_areas']:
+            results.append({
+                'prefecture': area['prefecture'],
+                'municipality': area['municipality'],
+                'location': area['full'],
+                'gender': row['gender'],
+                'urgency_score': row['urgency_score'],
+                'urgency_rank': row['urgency_rank']
+            })
+
+    df_results = pd.DataFrame(results)
+
+    # 集計
+    urgency_gender_muni = df_results.groupby(['location', 'gender']).agg({
+        'urgency_score': ['count', 'mean']
+    }).reset_index()
+
+    urgency_gender_muni.columns = ['location', 'gender', 'count', 'avg_urgency_score']
+
+    return urgency_gender_muni.sort_values(['location', 'gender'])
+
+
+def legacy_urgency_start_category_by_municipality(df):
+    """2026-01-20以前の市区町村×転職希望時期カテゴリ別緊急度集計（iterrows版）"""
+    results = []
+
+    if 'desired_start' not in df.columns:
+        return pd.DataFrame(columns=['location', 'start_category', 'count', 'avg_urgency_score'])
+
+    for idx, row in df.iterrows():
+        for area in row['desired_areas']:
+            results.append({
+                'prefecture': area['prefecture'],
+                'municipality': area['municipality'],
+                'location': area['full'],
+                'start_category': row['desired_start'],
+                'urgency_score': row['urgency_score'],
+                'urgency_rank': row['urgency_rank']
+            })
+
+    df_results = pd.DataFrame(results)
+
+    if len(df_results) == 0:
+        return pd.DataFrame(columns=['location', 'start_category', 'count', 'avg_urgency_score'])
+
+    # 集計
+    urgency_start_muni = df_results.groupby(['location', 'start_category']).agg({
+        'urgency_score': ['count', 'mean']
+    }).reset_index()
+
+    urgency_start_muni.columns = ['location', 'start_category', 'count', 'avg_urgency_score']
+
+    return urgency_start_muni.sort_values(['location', 'start_category'])
+
+
+def run_phase10(analyzer, legacy=False):
+    """Phase 10 のデータ生成（緊急度スコア + 全集計）。{生成処理: 結果} を返す"""
+    if legacy:
+        df = legacy_urgency_score(analyzer.processed_data)
+    else:
+        df = analyzer._calculate_urgency_score(analyzer.processed_data)
+    results = {'_calculate_urgency_score': df}
+    for method in PHASE10_GENERATORS:
+        if legacy and method in LEGACY_GENERATORS:
+            results[method] = globals()[LEGACY_GENERATORS[method]](df)
+        else:
+            results[method] = getattr(analyzer, method)(df)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='scoring と Phase 10 のベンチマーク')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--legacy-max', type=int, default=100_000, help='従来版を計測する最大件数')
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        analyzer = make_analyzer(make_applicants(rows))
+        analyzer.process_data()
+        print(f"\n[BENCH] {rows:,} applicants, Phase 10 (urgency score + 14 aggregations, no CSV output)")
+
+        started = time.perf_counter()
+        current = run_phase10(analyzer)
+        elapsed = time.perf_counter() - started
+        print(f"  scoring + fact table: {elapsed:8.2f}s")
+
+        if rows <= args.legacy_max:
+            started = time.perf_counter()
+            expected = run_phase10(analyzer, legacy=True)
+            legacy = time.perf_counter() - started
+            for method, frame in expected.items():
+                pd.testing.assert_frame_equal(current[method], frame)
+            print(f"  iterrows:             {legacy:8.2f}s ({legacy / elapsed:.1f}x, identical output)")
+
+
+if __name__ == '__main__':
+    main()
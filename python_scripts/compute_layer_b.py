@@ -16,6 +16,10 @@ B-4: 単語共起分析（NPMI）★NEW
   - テキスト内の単語ペアの共起をNPMI（正規化相互情報量）で評価
   - 学術論文準拠: PMI/NPMI/log-likelihood ratio
 
+トークン化ステージ（2026-01-20追加、layer_b_tokens.py）:
+  - 求人原稿を内容ハッシュ単位で1回だけトークナイズし、トークンID配列を geocoded_postings.db に保存
+  - B-1 / B-4 は保存済みのトークンIDを集計するだけ（スコープ追加時もトークナイズ不要）
+
 出力先: geocoded_postings.db に4テーブルを追加
   - layer_b_keywords          (employment_type別)
   - layer_b_cooccurrence      (employment_type別)
@@ -25,6 +29,7 @@ B-4: 単語共起分析（NPMI）★NEW
 雇用形態別分離: 全体/正職員/パートの3セグメントで計算
 """
 
+import hashlib
 import math
 import os
 import re
@@ -37,6 +42,8 @@ from itertools import combinations
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+from layer_b_tokens import TokenStore
+
 # ============================================================
 # 定数
 # ============================================================
@@ -284,6 +291,41 @@ def combined_analyzer(text: str) -> list[str]:
     return japanese_tokenizer(text)
 
 
+# ============================================================
+# トークン化ステージ（2026-01-20追加）
+# ============================================================
+
+def _tokenizer_signature() -> str:
+    """トークナイザ設定のシグネチャ（類義語辞書・ストップワード・janome有無が変わると保存済みトークンを破棄）"""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(repr(sorted(SYNONYM_DICT.items())).encode("utf-8"))
+    h.update(repr(sorted(STOPWORDS)).encode("utf-8"))
+    h.update(repr(sorted(_JANOME_POS_TARGETS | _JANOME_POS_EXCLUDE)).encode("utf-8"))
+    return f"{'janome' if _USE_JANOME else 'regex'}:{h.hexdigest()}"
+
+
+def open_token_store(conn: sqlite3.Connection) -> TokenStore:
+    """B-1 / B-4 共通のトークンストアを開く"""
+    return TokenStore(conn, japanese_tokenizer, _tokenizer_signature())
+
+
+def build_token_store(conn: sqlite3.Connection, target_job_types: list[str] | None = None) -> TokenStore:
+    """対象職種の全原稿を事前にトークナイズしたトークンストアを返す"""
+    store = open_token_store(conn)
+    sql = "SELECT job_description FROM postings WHERE job_description IS NOT NULL AND job_description != ''"
+    params: tuple = ()
+    if target_job_types:
+        sql += f" AND job_type IN ({','.join('?' * len(target_job_types))})"
+        params = tuple(target_job_types)
+    store.build(sql, params)
+    return store
+
+
+def _pretokenized(doc: list[str]) -> list[str]:
+    """TfidfVectorizer に保存済みトークンリストをそのまま渡すための恒等関数"""
+    return doc
+
+
 # ============================================================
 # 雇用形態フィルタ用ヘルパー
 # ============================================================
@@ -385,18 +427,24 @@ IDX_WORD_COOCCURRENCE = "CREATE INDEX IF NOT EXISTS idx_wcooccur_jt_emp_pref ON
 # B-1: キーワード3層構造
 # ============================================================
 
-def compute_b1_keywords(conn: sqlite3.Connection, target_job_types: list[str] | None = None) -> int:
+def compute_b1_keywords(
+    conn: sqlite3.Connection,
+    target_job_types: list[str] | None = None,
+    store: TokenStore | None = None,
+) -> int:
     """B-1: TF-IDF キーワード3層構造を計算して layer_b_keywords に格納
 
     雇用形態別（全体/正職員/パート）に計算する。
 
     Args:
         target_job_types: 対象職種リスト（Noneで全職種）
+        store: トークンストア（Noneなら開く。未保存の原稿はその場でトークナイズ）
 
     Returns:
         格納した行数
     """
     cur = conn.cursor()
+    store = store or open_token_store(conn)
     total_inserted = 0
 
     for emp_type in EMPLOYMENT_TYPES:
@@ -447,6 +495,7 @@ def compute_b1_keywords(conn: sqlite3.Connection, target_job_types: list[str] |
         for idx_jt, (jt, docs) in enumerate(jt_docs.items()):
             t_start = time.time()
             jt_doc_count[jt] = len(docs)
+            doc_tokens_list = [store.decode(ids) for ids in store.encode(docs)]
             min_df = min(TFIDF_MIN_DF, max(2, len(docs) // 100))
 
             # TfidfVectorizer（tokenizer指定でngram_rangeが有効になる）
@@ -454,7 +503,9 @@ def compute_b1_keywords(conn: sqlite3.Connection, target_job_types: list[str] |
             doc_freqs = {}
             try:
                 vec = TfidfVectorizer(
-                    tokenizer=japanese_tokenizer,
+                    tokenizer=_pretokenized,  # トークンストアのトークンリストをそのまま使う
+                    preprocessor=_pretokenized,
+                    lowercase=False,
                     token_pattern=None,  # tokenizer使用時はtoken_patternを無効化
                     ngram_range=TFIDF_NGRAM_RANGE,
                     max_features=TFIDF_MAX_FEATURES,
@@ -462,7 +513,7 @@ def compute_b1_keywords(conn: sqlite3.Connection, target_job_types: list[str] |
                     max_df=0.95,
                     sublinear_tf=True,
                 )
-                tfidf_matrix = vec.fit_transform(docs)
+                tfidf_matrix = vec.fit_transform(doc_tokens_list)
                 feature_names = vec.get_feature_names_out()
 
                 for col_idx in range(tfidf_matrix.shape[1]):
@@ -477,11 +528,10 @@ def compute_b1_keywords(conn: sqlite3.Connection, target_job_types: list[str] |
             # 手動集計で補完
             token_counter = Counter()
             token_doc_counter = Counter()
-            for doc in docs:
-                doc_tokens = set(japanese_tokenizer(doc))
-                for t in doc_tokens:
+            for doc_tokens in doc_tokens_list:
+                for t in set(doc_tokens):
                     token_doc_counter[t] += 1
-                token_counter.update(japanese_tokenizer(doc))
+                token_counter.update(doc_tokens)
 
             total_tokens = max(1, sum(token_counter.values()))
             for token, doc_cnt in token_doc_counter.items():
@@ -602,7 +652,9 @@ def compute_b1_keywords(conn: sqlite3.Connection, target_job_types: list[str] |
                 pref_doc_freqs = {}
                 try:
                     pref_vec = TfidfVectorizer(
-                        tokenizer=japanese_tokenizer,
+                        tokenizer=_pretokenized,
+                        preprocessor=_pretokenized,
+                        lowercase=False,
                         token_pattern=None,  # tokenizer使用時はtoken_patternを無効化
                         ngram_range=TFIDF_NGRAM_RANGE,
                         max_features=TFIDF_MAX_FEATURES,
@@ -610,7 +662,7 @@ def compute_b1_keywords(conn: sqlite3.Connection, target_job_types: list[str] |
                         max_df=0.95,
                         sublinear_tf=True,
                     )
-                    pref_tfidf = pref_vec.fit_transform(pref_docs)
+                    pref_tfidf = pref_vec.fit_transform([store.decode(ids) for ids in store.encode(pref_docs)])
                     pref_features = pref_vec.get_feature_names_out()
 
                     for col_idx in range(pref_tfidf.shape[1]):
@@ -991,12 +1043,13 @@ def compute_b3_text_quality(conn: sqlite3.Connection, target_job_types: list[str
 # ============================================================
 
 def _compute_word_cooccurrence_for_docs(
-    docs: list[str],
+    doc_ids: list[np.ndarray],
     jt: str,
     emp_type: str,
     scope_name: str,
+    store: TokenStore,
 ) -> list:
-    """文書集合から単語共起ペアをNPMI付きで計算
+    """文書集合（トークンID配列）から単語共起ペアをNPMI付きで計算
 
     PMI(x,y) = log2(P(x,y) / (P(x) * P(y)))
     NPMI(x,y) = PMI(x,y) / -log2(P(x,y))  → [-1, 1]に正規化
@@ -1004,34 +1057,35 @@ def _compute_word_cooccurrence_for_docs(
     Returns:
         挿入用タプルのリスト
     """
-    n_docs = len(docs)
+    n_docs = len(doc_ids)
     if n_docs < MIN_COUNT_FOR_STATS:
         return []
 
     # 2パス方式: パス1で全文書のword_doc_freqを計算してからパス2でペアカウント
     # （1パスだと初期文書でword_doc_freqが不足し、ペアが欠落するバグがあった）
+    # 2026-01-20変更: トークンIDで集計（ペアの向き・順序は従来どおりトークン文字列の辞書順）
+    rank = store.rank()
 
     # パス1: 全文書のトークン集合を保持しつつ単語文書頻度を計算
-    word_doc_freq = Counter()  # 単語の文書出現数
-    doc_token_sets: list[list[str]] = []  # 各文書のソート済みトークンリスト
-
-    for doc in docs:
-        tokens = set(japanese_tokenizer(doc))
+    doc_token_sets: list[np.ndarray] = []  # 各文書のトークンID（文字列の辞書順）
+    for ids in doc_ids:
+        tokens = np.unique(ids)
         if len(tokens) < 2:
-            doc_token_sets.append([])
             continue
-        for t in tokens:
-            word_doc_freq[t] += 1
-        doc_token_sets.append(sorted(tokens))
+        doc_token_sets.append(tokens[np.argsort(rank[tokens], kind="stable")])
+
+    # 単語の文書出現数（トークンIDで引く）
+    if doc_token_sets:
+        word_doc_freq = np.bincount(np.concatenate(doc_token_sets), minlength=store.vocab_size)
+    else:
+        word_doc_freq = np.zeros(store.vocab_size, dtype=np.int64)
 
     # パス2: B4_MIN_WORD_FREQを満たす単語のペアのみカウント
     pair_doc_freq = Counter()  # ペアの共起文書数
 
     for sorted_tokens in doc_token_sets:
-        if len(sorted_tokens) < 2:
-            continue
         # 頻度フィルタを通過する単語のみ抽出
-        frequent_tokens = [t for t in sorted_tokens if word_doc_freq[t] >= B4_MIN_WORD_FREQ]
+        frequent_tokens = sorted_tokens[word_doc_freq[sorted_tokens] >= B4_MIN_WORD_FREQ].tolist()
         for i in range(len(frequent_tokens)):
             for j in range(i + 1, len(frequent_tokens)):
                 pair_doc_freq[(frequent_tokens[i], frequent_tokens[j])] += 1
@@ -1042,8 +1096,8 @@ def _compute_word_cooccurrence_for_docs(
         if cooc < B4_MIN_COOCCURRENCE:
             continue
 
-        freq_a = word_doc_freq[w_a]
-        freq_b = word_doc_freq[w_b]
+        freq_a = int(word_doc_freq[w_a])
+        freq_b = int(word_doc_freq[w_b])
 
         # 最小文書頻度チェック
         if freq_a < B4_MIN_WORD_FREQ or freq_b < B4_MIN_WORD_FREQ:
@@ -1064,7 +1118,7 @@ def _compute_word_cooccurrence_for_docs(
 
         rows.append((
             jt, emp_type, scope_name,
-            w_a, w_b,
+            store.token(w_a), store.token(w_b),
             cooc, round(pmi, 4), round(npmi, 4),
             freq_a, freq_b, n_docs
         ))
@@ -1074,7 +1128,11 @@ def _compute_word_cooccurrence_for_docs(
     return rows[:B4_TOP_PAIRS_PER_SCOPE]
 
 
-def compute_b4_word_cooccurrence(conn: sqlite3.Connection, target_job_types: list[str] | None = None) -> int:
+def compute_b4_word_cooccurrence(
+    conn: sqlite3.Connection,
+    target_job_types: list[str] | None = None,
+    store: TokenStore | None = None,
+) -> int:
     """B-4: テキスト内単語共起分析（NPMI）
 
     求人原稿テキスト内の単語ペアの共起をNPMI（正規化相互情報量）で評価。
@@ -1086,11 +1144,13 @@ def compute_b4_word_cooccurrence(conn: sqlite3.Connection, target_job_types: lis
 
     Args:
         target_job_types: 対象職種リスト（Noneで全職種）
+        store: トークンストア（Noneなら開く。未保存の原稿はその場でトークナイズ）
 
     Returns:
         格納した行数
     """
     cur = conn.cursor()
+    store = store or open_token_store(conn)
     import random
     random.seed(42)
     total_inserted = 0
@@ -1126,7 +1186,7 @@ def compute_b4_word_cooccurrence(conn: sqlite3.Connection, target_job_types: lis
                 all_docs_sample = all_docs
 
             national_rows = _compute_word_cooccurrence_for_docs(
-                all_docs_sample, jt, emp_type, "全国"
+                store.encode(all_docs_sample), jt, emp_type, "全国", store
             )
             rows_to_insert.extend(national_rows)
 
@@ -1154,7 +1214,7 @@ def compute_b4_word_cooccurrence(conn: sqlite3.Connection, target_job_types: lis
                 )
                 pref_docs = [r[0] for r in cur.fetchall()]
                 pref_rows = _compute_word_cooccurrence_for_docs(
-                    pref_docs, jt, emp_type, pref
+                    store.encode(pref_docs), jt, emp_type, pref, store
                 )
                 rows_to_insert.extend(pref_rows)
 
@@ -1442,10 +1502,10 @@ def main() -> None:
     try:
         # テーブル再作成（職種指定時はDROPせず既存データに追記）
         if not target_jt:
-            print("\n[1/7] テーブル作成（全テーブル再作成）...")
+            print("\n[1/8] テーブル作成（全テーブル再作成）...")
             create_tables(conn, skip_drop=False)
         else:
-            print("\n[1/7] テーブル作成（既存テーブル維持、対象職種データのみ削除）...")
+            print("\n[1/8] テーブル作成（既存テーブル維持、対象職種データのみ削除）...")
             create_tables(conn, skip_drop=True)
             # 指定職種の既存データだけ削除して再計算
             for tbl in ["layer_b_keywords", "layer_b_cooccurrence",
@@ -1455,36 +1515,42 @@ def main() -> None:
             conn.commit()
             print(f"  対象職種の既存データを削除済み")
 
+        # トークン化（原稿ごとに1回、B-1 / B-4 で共有）
+        print("\n[2/8] トークン化（内容ハッシュ単位、保存済みは再利用）...")
+        t0 = time.time()
+        store = build_token_store(conn, target_jt)
+        print(f"  完了: {time.time() - t0:.1f}秒")
+
         # B-1: キーワード3層構造
-        print("\n[2/7] B-1: キーワード3層構造（TF-IDF + 類義語辞書）...")
+        print("\n[3/8] B-1: キーワード3層構造（TF-IDF + 類義語辞書）...")
         t1 = time.time()
-        b1_count = compute_b1_keywords(conn, target_jt)
+        b1_count = compute_b1_keywords(conn, target_jt, store)
         print(f"  完了: {time.time() - t1:.1f}秒")
 
         # B-2: 条件パッケージ共起
-        print("\n[3/7] B-2: 条件パッケージ共起分析...")
+        print("\n[4/8] B-2: 条件パッケージ共起分析...")
         t2 = time.time()
         b2_count = compute_b2_cooccurrence(conn, target_jt)
         print(f"  完了: {time.time() - t2:.1f}秒")
 
         # B-3: 原稿品質分布
-        print("\n[4/7] B-3: 原稿品質分布...")
+        print("\n[5/8] B-3: 原稿品質分布...")
         t3 = time.time()
         b3_count = compute_b3_text_quality(conn, target_jt)
         print(f"  完了: {time.time() - t3:.1f}秒")
 
         # B-4: 単語共起分析
-        print("\n[5/7] B-4: 単語共起分析（NPMI）...")
+        print("\n[6/8] B-4: 単語共起分析（NPMI）...")
         t4 = time.time()
-        b4_count = compute_b4_word_cooccurrence(conn, target_jt)
+        b4_count = compute_b4_word_cooccurrence(conn, target_jt, store)
         print(f"  完了: {time.time() - t4:.1f}秒")
 
         # 重複除去
-        print("\n[6/7] 重複除去...")
+        print("\n[7/8] 重複除去...")
         deduplicate_tables(conn)
 
         # インデックス作成
-        print("\n[7/7] インデックス作成...")
+        print("\n[8/8] インデックス作成...")
         create_indexes(conn)
 
         # 検証
@@ -33,6 +33,8 @@ from collections import Counter, defaultdict
 
 import numpy as np
 
+from layer_b_tokens import content_hash
+
 # シグナル辞書のインポート
 from text_analysis_signals import (
     ALL_TARGETING,
@@ -318,6 +320,38 @@ def analyze_single_posting(row: dict) -> dict:
     return result
 
 
+def analyze_postings(rows: list[dict]) -> tuple[list[dict], int]:
+    """求人リストを6つの問いで分析（2026-01-20追加）
+
+    同一文面の原稿（同じ法人の複数拠点・再掲載など）は内容ハッシュで1回だけ分析し、
+    分析結果をコピーして職種・雇用形態・地域だけ差し替える。
+
+    Returns:
+        (各求人のスコアのリスト, 分析結果を再利用した件数)
+    """
+    by_hash: dict[bytes, dict] = {}
+    results = []
+    reused = 0
+    for row in rows:
+        full_text = combine_text_fields(row)
+        if not full_text:
+            continue
+        key = content_hash(full_text)
+        base = by_hash.get(key)
+        if base is None:
+            base = by_hash[key] = analyze_single_posting(row)
+            results.append(base)
+            continue
+        s = dict(base)
+        s["job_type"] = row["job_type"]
+        s["employment_type"] = row.get("employment_type", "")
+        s["prefecture"] = row.get("prefecture", "")
+        s["municipality"] = row.get("municipality", "")
+        results.append(s)
+        reused += 1
+    return results, reused
+
+
 # ============================================================
 # DB集計・格納
 # ============================================================
@@ -567,25 +601,25 @@ def compute_6q(conn: sqlite3.Connection, target_job_types: list[str] | None = No
     print(f"  対象職種: {len(all_job_types)} 種")
     total_postings = 0
 
-    for emp_type in EMPLOYMENT_TYPES:
-        print(f"\n  === 雇用形態: {emp_type} ===")
+    # 全国集計用のスコアキャッシュ（Q3ギャップ計算用）
+    national_info_scores = {}  # (employment_type, job_type) -> list of info_score
 
-        # 全国集計用のスコアキャッシュ（Q3ギャップ計算用）
-        national_info_scores = {}  # job_type -> list of info_score
+    # 2026-01-20変更: 職種ごとに全雇用形態の求人を1回だけ取得・分析し、雇用形態別スコープは分析結果を絞り込んで作る
+    # （従来は雇用形態ごとに取得・分析し直しており、正職員/パートの求人は2回ずつ分析していた）
+    for jt_idx, job_type in enumerate(all_job_types, 1):
+        t_jt = time.time()
+        all_scores, reused = analyze_postings(fetch_postings(conn, job_type, "全体"))
+        if not all_scores:
+            continue
+        print(f"\n  [{jt_idx}/{len(all_job_types)}] {job_type}: {len(all_scores)} 件を分析 "
+              f"（同一文面 {reused} 件は分析結果を再利用、{time.time() - t_jt:.1f}秒）")
 
-        for jt_idx, job_type in enumerate(all_job_types, 1):
+        for emp_type in EMPLOYMENT_TYPES:
             t0 = time.time()
-            postings = fetch_postings(conn, job_type, emp_type)
-            n = len(postings)
-            if n == 0:
-                continue
-
-            # 個別スコア計算
-            scores = []
-            for row in postings:
-                s = analyze_single_posting(row)
-                if s:
-                    scores.append(s)
+            if emp_type == "全体":
+                scores = all_scores
+            else:
+                scores = [s for s in all_scores if s["employment_type"] == emp_type]
 
             if not scores:
                 continue
@@ -594,7 +628,7 @@ def compute_6q(conn: sqlite3.Connection, target_job_types: list[str] | None = No
 
             # 全国集計用にinfo_scoreを蓄積
             info_vals = [s["q5_info_score"] for s in scores]
-            national_info_scores[job_type] = info_vals
+            national_info_scores[(emp_type, job_type)] = info_vals
             national_mean = float(np.mean(info_vals))
 
             # 都道府県リスト取得
@@ -770,14 +804,14 @@ def compute_6q(conn: sqlite3.Connection, target_job_types: list[str] | None = No
             # 進捗表示
             n_munis = sum(1 for p, m, _ in scopes if m)  # 市区町村スコープ数
             elapsed = time.time() - t0
-            print(f"    [{jt_idx}/{len(all_job_types)}] {job_type} ({emp_type}): "
+            print(f"    {job_type} ({emp_type}): "
                   f"{len(scores)} 件, {len(prefectures)} 県, {n_munis} 市区町村, {elapsed:.1f}秒")
 
-            # バッチコミット（職種ごと）
-            if jt_idx % 3 == 0:
-                conn.commit()
+        # バッチコミット（職種ごと）
+        if jt_idx % 3 == 0:
+            conn.commit()
 
-        conn.commit()
+    conn.commit()
 
     print(f"\n  分析した求人総数: {total_postings:,}")
     return row_counts
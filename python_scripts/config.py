@@ -15,6 +15,10 @@ from typing import Dict, List
 AGE_BINS_5 = [0, 29, 39, 49, 59, 100]
 AGE_LABELS_5 = ['20代以下', '30代', '40代', '50代', '60代以上']
 
+# 年齢層区分（10年単位）- age_bucket（Phase 3, 7, 13, 14, MapMetrics用）
+AGE_BINS_10 = [0, 29, 39, 49, 59, 69, 100]
+AGE_LABELS_10 = ['20代', '30代', '40代', '50代', '60代', '70歳以上']
+
 # 年齢層区分（4区分）- Phase 7用（廃止予定）
 AGE_BINS_4 = [0, 30, 45, 60, 100]
 AGE_LABELS_4 = ['若年層', '中年層', '準高齢層', '高齢層']
@@ -5,11 +5,20 @@ MapComplete完全統合シート生成スクリプト
 これにより、GAS側は1シートのみ読み込めば全データを取得できます。
 """
 
+import sys
 import pandas as pd
 import json
 from pathlib import Path
 from collections import defaultdict
 
+# Parquetデータセット出力（ダッシュボードと同じ形式にするため nicegui_app/columnar_data.py を使用、2026-01-20追加）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'nicegui_app'))
+try:
+    from columnar_data import PYARROW_AVAILABLE, build_from_csv
+except ImportError:
+    PYARROW_AVAILABLE = False
+import stats_rollup  # 3層比較統計の事前集計（2026-01-20追加）
+
 # 資格分割ロジックをインポート
 from extract_qualification_master import (
     extract_single_qualifications,
@@ -254,6 +263,18 @@ class MapCompleteCompleteSheetGenerator:
             print(f"  [OK] 品質向上版を保存: {output_file_fixed}")
             print(f"  [INFO] 修正後行数: {len(df_fixed)}行 × {len(df_fixed.columns)}列")
             print(f"  [INFO] 行数変化: {len(df_fixed) - len(df_complete):+d}行")
+
+            # 列指向データセット（CSVモードの起動を高速化、pyarrowがある場合のみ）
+            if PYARROW_AVAILABLE:
+                dataset_path = build_from_csv(output_file_fixed)
+                print(f"  [OK] Parquetデータセットを保存: {dataset_path}")
+            else:
+                print("  [SKIP] Parquetデータセット: pyarrow 未インストール")
+
+            # 3層比較統計の事前集計（ダッシュボードの全国・都道府県・市区町村統計をキーで引く）
+            rollup_files = stats_rollup.write_rollup(
+                stats_rollup.build_rollup(df_fixed), self.complete_dir, source=output_file_fixed.name)
+            print(f"  [OK] 3層比較統計の事前集計を保存: {', '.join(p.name for p in rollup_files)}")
         else:
             print("  [ERROR] データが生成されませんでした")
 
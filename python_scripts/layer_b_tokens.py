@@ -0,0 +1,219 @@
+"""
+Layer B: 求人原稿トークン化ステージ（2026-01-20追加）
+
+B-1（TF-IDF）と B-4（単語共起NPMI）は雇用形態 × 職種 × 都道府県の各スコープで
+同じ求人原稿を janome / 正規表現で繰り返しトークナイズしていた（1原稿あたり最大 3 × 2 × 2 回）。
+
+このモジュールは原稿1件につき1回だけトークナイズし、結果をトークンID配列として保存する。
+  - キー: 原稿テキストの内容ハッシュ（blake2b 16バイト）。同一文面の原稿は1回で済む
+  - 保存先: geocoded_postings.db の2テーブル
+      layer_b_token_vocab (token_id, token)           … 語彙（IDは追加順）
+      layer_b_token_docs  (content_hash, n_tokens, token_ids)
+                                                      … token_ids は uint32 リトルエンディアンのBLOB
+  - トークナイザのシグネチャ（janome/正規表現・類義語辞書・ストップワード）を layer_b_token_meta に記録し、
+    変わった場合は保存済みトークンを破棄して作り直す
+
+B-1 / B-4 は原稿テキストの代わりにトークンID配列（encode()）を受け取り、集計だけを行う。
+スコープを追加しても、未保存の原稿以外はトークナイズが発生しない。
+
+使用例:
+    store = TokenStore(conn, japanese_tokenizer, signature)
+    store.build("SELECT job_description FROM postings")   # 全原稿を事前にトークナイズ
+    ids_list = store.encode(docs)                          # 未保存の原稿はその場でトークナイズ・保存
+    tokens = store.decode(ids_list[0])                     # ['夜勤', '日勤', ...]
+"""
+
+import hashlib
+import sqlite3
+import time
+from typing import Callable, Iterable
+
+import numpy as np
+
+TOKEN_DTYPE = np.dtype("<u4")
+BATCH_SIZE = 5000  # トークナイズ結果をDBへ書き込む単位
+
+DDL_TOKEN_META = """
+CREATE TABLE IF NOT EXISTS layer_b_token_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+DDL_TOKEN_VOCAB = """
+CREATE TABLE IF NOT EXISTS layer_b_token_vocab (
+    token_id INTEGER PRIMARY KEY,
+    token    TEXT NOT NULL UNIQUE
+);
+"""
+
+DDL_TOKEN_DOCS = """
+CREATE TABLE IF NOT EXISTS layer_b_token_docs (
+    content_hash BLOB PRIMARY KEY,
+    n_tokens     INTEGER NOT NULL,
+    token_ids    BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+TOKEN_TABLES = ["layer_b_token_meta", "layer_b_token_vocab", "layer_b_token_docs"]
+
+
+def content_hash(text: str) -> bytes:
+    """原稿テキストの内容ハッシュ（16バイト）"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class TokenStore:
+    """原稿テキスト → トークンID配列 の永続キャッシュ
+
+    Args:
+        conn: geocoded_postings.db の接続（書き込みは呼び出し側のトランザクション内で行い、commit は build() のみ）
+        tokenizer: テキスト → トークンリスト（compute_layer_b.japanese_tokenizer）
+        signature: トークナイザの設定を表す文字列（変わると保存済みトークンを破棄）
+    """
+
+    def __init__(self, conn: sqlite3.Connection, tokenizer: Callable[[str], list[str]], signature: str):
+        self.conn = conn
+        self.tokenizer = tokenizer
+        self.signature = signature
+        self.tokenized = 0  # このインスタンスでトークナイズした原稿数（計測用）
+        self._vocab: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._docs: dict[bytes, np.ndarray] = {}
+        self._rank: np.ndarray | None = None
+        self._open()
+
+    # ========================================
+    # テーブル初期化・読み込み
+    # ========================================
+    def _open(self) -> None:
+        cur = self.conn.cursor()
+        for ddl in (DDL_TOKEN_META, DDL_TOKEN_VOCAB, DDL_TOKEN_DOCS):
+            cur.execute(ddl)
+        row = cur.execute("SELECT value FROM layer_b_token_meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != self.signature:
+            if row is not None:
+                print(f"  [TOKENS] トークナイザ設定が変更されたため保存済みトークンを破棄: {row[0]} → {self.signature}")
+            cur.execute("DELETE FROM layer_b_token_docs")
+            cur.execute("DELETE FROM layer_b_token_vocab")
+            cur.execute(
+                "INSERT OR REPLACE INTO layer_b_token_meta (key, value) VALUES ('signature', ?)",
+                (self.signature,),
+            )
+            self.conn.commit()
+
+        for token_id, token in cur.execute("SELECT token_id, token FROM layer_b_token_vocab ORDER BY token_id"):
+            if token_id != len(self._vocab):
+                raise ValueError(f"layer_b_token_vocab の token_id が連番ではありません: {token_id}")
+            self._vocab.append(token)
+        self._ids = {token: i for i, token in enumerate(self._vocab)}
+
+    def _load(self, hashes: list[bytes]) -> None:
+        """DBに保存済みのトークンID配列をメモリに読み込む"""
+        cur = self.conn.cursor()
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cur.execute(
+                f"SELECT content_hash, token_ids FROM layer_b_token_docs WHERE content_hash IN ({placeholders})",
+                chunk,
+            )
+            for h, blob in cur.fetchall():
+                self._docs[h] = np.frombuffer(blob, dtype=TOKEN_DTYPE)
+
+    # ========================================
+    # トークナイズ・保存
+    # ========================================
+    def _token_id(self, token: str, new_tokens: list) -> int:
+        token_id = self._ids.get(token)
+        if token_id is None:
+            token_id = len(self._vocab)
+            self._vocab.append(token)
+            self._ids[token] = token_id
+            new_tokens.append((token_id, token))
+            self._rank = None
+        return token_id
+
+    def _tokenize_missing(self, texts: dict[bytes, str]) -> None:
+        """未保存の原稿をトークナイズしてDBとメモリに追加"""
+        missing = [h for h in texts if h not in self._docs]
+        if missing:
+            self._load(missing)
+            missing = [h for h in missing if h not in self._docs]
+        if not missing:
+            return
+
+        cur = self.conn.cursor()
+        for start in range(0, len(missing), BATCH_SIZE):
+            new_tokens: list = []
+            rows = []
+            for h in missing[start:start + BATCH_SIZE]:
+                ids = np.fromiter(
+                    (self._token_id(t, new_tokens) for t in self.tokenizer(texts[h])),
+                    dtype=TOKEN_DTYPE,
+                )
+                self._docs[h] = ids
+                rows.append((h, len(ids), ids.tobytes()))
+            cur.executemany("INSERT INTO layer_b_token_vocab (token_id, token) VALUES (?, ?)", new_tokens)
+            cur.executemany(
+                "INSERT OR REPLACE INTO layer_b_token_docs (content_hash, n_tokens, token_ids) VALUES (?, ?, ?)",
+                rows,
+            )
+            self.tokenized += len(rows)
+
+    def build(self, sql: str, params: tuple = ()) -> int:
+        """sql（1列目が原稿テキスト）の全原稿を事前にトークナイズして保存
+
+        Returns:
+            新たにトークナイズした原稿数
+        """
+        t0 = time.time()
+        before = self.tokenized
+        texts: dict[bytes, str] = {}
+        known = {
+            h for (h,) in self.conn.execute("SELECT content_hash FROM layer_b_token_docs")
+        }
+        for (text,) in self.conn.execute(sql, params).fetchall():
+            if not text or not isinstance(text, str):
+                continue
+            h = content_hash(text)
+            if h not in known:
+                texts[h] = text
+        self._tokenize_missing(texts)
+        self.conn.commit()
+        added = self.tokenized - before
+        print(f"  [TOKENS] 新規 {added:,} 件 / 保存済み {len(known):,} 件、語彙 {len(self._vocab):,} 語 "
+              f"({time.time() - t0:.1f}s)")
+        return added
+
+    # ========================================
+    # 参照
+    # ========================================
+    def encode(self, texts: Iterable[str]) -> list[np.ndarray]:
+        """原稿テキスト → トークンID配列（tokenizer(text) と同じ順序・重複を保持）"""
+        texts = list(texts)
+        hashes = [content_hash(t) if t and isinstance(t, str) else None for t in texts]
+        self._tokenize_missing({h: t for h, t in zip(hashes, texts) if h is not None})
+        empty = np.empty(0, dtype=TOKEN_DTYPE)
+        return [self._docs[h] if h is not None else empty for h in hashes]
+
+    def decode(self, ids: np.ndarray) -> list[str]:
+        """トークンID配列 → トークンリスト"""
+        vocab = self._vocab
+        return [vocab[i] for i in ids.tolist()]
+
+    def token(self, token_id: int) -> str:
+        return self._vocab[token_id]
+
+    @property
+    def vocab_size(self) -> int:
+        return len(self._vocab)
+
+    def rank(self) -> np.ndarray:
+        """トークンID → トークン文字列の辞書順での順位（IDのまま文字列順に並べるためのキー）"""
+        if self._rank is None or len(self._rank) != len(self._vocab):
+            order = sorted(range(len(self._vocab)), key=self._vocab.__getitem__)
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self._rank = rank
+        return self._rank
@@ -0,0 +1,432 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+PerfectJobSeekerAnalyzer の Phase 実行DAG（2026-01-20追加）
+
+export_phase1 〜 export_phase14 / generate_overall_quality_report を、入力・出力を宣言したタスク
+（PHASE_TASKS）として依存関係の順に実行する。以前は run_complete_v2_perfect.py の __main__ で
+1プロセスが順番に呼んでいた。
+
+- 並列実行: processed_data が揃えば多くのPhaseは互いに独立なので、プロセスプールで並列に実行する。
+  processed_data / df_normalized / desired_areas_long は Arrow IPC ファイルに1回書き出し、
+  各ワーカーはメモリマップで読み込む（pickle で毎回送らない）。
+- 内容ハッシュのキャッシュ: 入力データ・Phaseのコード・宣言した入力ファイルのハッシュが前回と同じで、
+  前回の出力ファイルが残っていればPhaseをスキップする（data/output_v2/.phase_cache.json）。
+- 一部のPhaseだけ実行: run_pipeline(analyzer, targets=['phase12']) は依存先（phase1）も含めて実行する。
+
+Phase間の依存（ファイル経由）:
+    phase1  → phase1/Phase1_DesiredWork.csv（phase3 の市区町村別ペルソナ）、geocache.json（phase12-14 の座標）
+    全Phase → generate_overall_quality_report（phase*/ のCSVをすべて読む）
+
+使い方:
+    python run_complete_v2_perfect.py --input data.csv                   # 全Phase（並列、変更のないPhaseはスキップ）
+    python run_complete_v2_perfect.py --input data.csv --phase 12        # Phase 12 と依存先（Phase 1）のみ
+    python run_complete_v2_perfect.py --input data.csv --workers 1       # 1プロセスで順番に実行
+    python run_complete_v2_perfect.py --input data.csv --no-cache        # キャッシュを使わずに全部実行
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401（pa.ipc を使えるようにする）
+except ImportError:  # pyarrow がなければ共有ファイルは pickle
+    pa = None
+
+OUTPUT_BASE = Path('data/output_v2')
+GEOCACHE_FILE = OUTPUT_BASE / 'geocache.json'
+MUNICIPALITY_COORDS_FILE = Path('data/municipality_coords.csv')
+CACHE_FILE = OUTPUT_BASE / '.phase_cache.json'
+
+# ワーカーに渡すDataFrame（process_data 実行後の属性）
+SHARED_FRAMES = ['df_normalized', 'processed_data', 'desired_areas_long']
+
+# Phaseのコード以外でキャッシュキーに含めるモジュール（閾値・品質検証の変更で出力が変わる）
+HELPER_MODULES = ['config.py', 'constants.py', 'scoring.py', 'data_quality_validator.py']
+
+# ========================================
+# Phaseタスクの定義
+# ========================================
+# method: PerfectJobSeekerAnalyzer のメソッド名
+# after: 先に完了している必要があるタスク
+# inputs: 共有DataFrame以外に読むファイル（内容のハッシュをキャッシュキーに含める）
+# outputs: 書き出すディレクトリ・ファイル（キャッシュ時に存在を確認する）
+
+PHASE_TASKS = {
+    'phase1': {
+        'method': 'export_phase1', 'after': [],
+        # geocache.json は Phase 1 自身が更新するため出力側で確認する（手で編集すれば再実行）
+        'inputs': [MUNICIPALITY_COORDS_FILE],
+        'outputs': [OUTPUT_BASE / 'phase1', GEOCACHE_FILE],
+    },
+    'phase2': {'method': 'export_phase2', 'after': [], 'inputs': [], 'outputs': [OUTPUT_BASE / 'phase2']},
+    'phase3': {
+        'method': 'export_phase3', 'after': ['phase1'],
+        'inputs': [OUTPUT_BASE / 'phase1' / 'Phase1_DesiredWork.csv'],
+        'outputs': [OUTPUT_BASE / 'phase3'],
+    },
+    'phase6': {'method': 'export_phase6', 'after': [], 'inputs': [], 'outputs': [OUTPUT_BASE / 'phase6']},
+    'phase7': {'method': 'export_phase7', 'after': [], 'inputs': [], 'outputs': [OUTPUT_BASE / 'phase7']},
+    'phase8': {'method': 'export_phase8', 'after': [], 'inputs': [], 'outputs': [OUTPUT_BASE / 'phase8']},
+    'phase10': {'method': 'export_phase10', 'after': [], 'inputs': [], 'outputs': [OUTPUT_BASE / 'phase10']},
+    'phase12': {
+        'method': 'export_phase12', 'after': ['phase1'],
+        'inputs': [GEOCACHE_FILE, MUNICIPALITY_COORDS_FILE],
+        'outputs': [OUTPUT_BASE / 'phase12'],
+    },
+    'phase13': {
+        'method': 'export_phase13', 'after': ['phase1'],
+        'inputs': [GEOCACHE_FILE, MUNICIPALITY_COORDS_FILE],
+        'outputs': [OUTPUT_BASE / 'phase13'],
+    },
+    'phase14': {
+        'method': 'export_phase14', 'after': ['phase1'],
+        'inputs': [GEOCACHE_FILE, MUNICIPALITY_COORDS_FILE],
+        'outputs': [OUTPUT_BASE / 'phase14'],
+    },
+}
+PHASE_TASKS['overall'] = {
+    'method': 'generate_overall_quality_report', 'after': list(PHASE_TASKS),
+    'inputs': [],  # 各Phaseの出力（after のキーに含まれる）
+    'outputs': [OUTPUT_BASE / 'OverallQualityReport.csv', OUTPUT_BASE / 'OverallQualityReport_Inferential.csv'],
+}
+
+
+def resolve_tasks(targets=None):
+    """targets と、その依存先すべてのタスク名（PHASE_TASKS の順）
+
+    Args:
+        targets: タスク名（'phase12'）またはPhase番号（12）のリスト。None なら全タスク
+    """
+    if targets is None:
+        return list(PHASE_TASKS)
+    needed = set()
+    pending = [t if str(t) in PHASE_TASKS else f'phase{t}' for t in targets]
+    while pending:
+        name = pending.pop()
+        if name not in PHASE_TASKS:
+            raise ValueError(f"不明なPhase: {name}（{', '.join(PHASE_TASKS)}）")
+        if name not in needed:
+            needed.add(name)
+            pending.extend(PHASE_TASKS[name]['after'])
+    return [name for name in PHASE_TASKS if name in needed]
+
+
+# ========================================
+# 共有DataFrame（Arrow IPC、pyarrowがなければpickle）
+# ========================================
+
+def write_frame(df, path):
+    """DataFrameを Arrow IPC ファイル（変換できなければ pickle）に書き出し、書いたパスを返す"""
+    path = Path(path)
+    if pa is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            table = None
+        if table is not None:
+            path = path.with_suffix('.arrow')
+            with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            return path
+    path = path.with_suffix('.pkl')
+    df.to_pickle(path)
+    return path
+
+
+def read_frame(path):
+    """write_frame で書いたDataFrameを読み込む
+
+    desired_areas / qualifications のようなリスト列は to_pandas() では numpy配列になるため、
+    to_pylist() で元と同じ list（要素がdictなら dict）に戻す。元がobject型の文字列列は
+    str型にせず、欠損も None のままのobject配列に戻す。
+    """
+    path = Path(path)
+    if path.suffix == '.pkl':
+        return pd.read_pickle(path)
+    with pa.memory_map(str(path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    list_columns = [field.name for field in table.schema
+                    if pa.types.is_list(field.type) or pa.types.is_large_list(field.type)]
+    df = table.drop_columns(list_columns).to_pandas()
+    for name in list_columns:
+        df[name] = pd.Series(table.column(name).to_pylist(), index=df.index, dtype=object)
+    object_columns = [c['name'] for c in (table.schema.pandas_metadata or {}).get('columns', [])
+                      if c['numpy_type'] == 'object' and c['name'] in df.columns and c['name'] not in list_columns]
+    for name in object_columns:
+        df[name] = pd.Series(table.column(name).to_numpy(zero_copy_only=False), index=df.index, dtype=object)
+    return df[[name for name in table.column_names if name in df.columns]]
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """ファイル内容のsha256（存在しなければ 'missing'）"""
+    path = Path(path)
+    if not path.is_file():
+        return 'missing'
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def share_frames(analyzer, directory):
+    """SHARED_FRAMES を directory に書き出す
+
+    Returns:
+        (属性名→ファイルパスのdict, 内容ハッシュ)
+    """
+    paths = {}
+    digest = hashlib.sha256()
+    for name in SHARED_FRAMES:
+        frame = getattr(analyzer, name, None)
+        if frame is None:
+            continue
+        paths[name] = str(write_frame(frame, Path(directory) / name))
+        digest.update(f'{name}:{file_digest(paths[name])}'.encode())
+    return paths, digest.hexdigest()
+
+
+# ========================================
+# コードのハッシュ（Phaseのメソッドと、そこから呼ばれるメソッド・モジュール関数）
+# ========================================
+
+@lru_cache(maxsize=None)
+def _module_sources(analyzer_class):
+    """クラスのメソッドとモジュール直下の関数・定数のソース（名前→ソース）"""
+    module = inspect.getmodule(analyzer_class)
+    source = inspect.getsource(module)
+    tree = ast.parse(source)
+    methods, globals_ = {}, {}
+    for node in tree.body:
+        segment = ast.get_source_segment(source, node) or ''
+        if isinstance(node, ast.ClassDef) and node.name == analyzer_class.__name__:
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    methods[item.name] = ast.get_source_segment(source, item)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            globals_[node.name] = segment
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    globals_[target.id] = segment
+    return methods, globals_
+
+
+def code_digest(analyzer_class, method):
+    """method と、そこから（推移的に）参照されるメソッド・モジュール関数・定数・HELPER_MODULES のハッシュ"""
+    methods, globals_ = _module_sources(analyzer_class)
+    seen, pending = set(), [method]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        source = methods.get(name) or globals_.get(name)
+        if source is None:
+            continue
+        for node in ast.walk(ast.parse(source)):
+            if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+                    and node.value.id == 'self' and node.attr in methods):
+                pending.append(node.attr)
+            elif isinstance(node, ast.Name) and node.id in globals_:
+                pending.append(node.id)
+
+    digest = hashlib.sha256(f'pandas={pd.__version__};numpy={np.__version__}'.encode())
+    for name in sorted(seen):
+        digest.update(f'{name}:{methods.get(name) or globals_.get(name) or ""}'.encode())
+    module_dir = Path(inspect.getfile(analyzer_class)).parent
+    for helper in HELPER_MODULES:
+        digest.update(f'{helper}:{file_digest(module_dir / helper)}'.encode())
+    return digest.hexdigest()
+
+
+def task_key(name, data_digest, code_digests, cache):
+    """タスクのキャッシュキー（入力データ・コード・入力ファイル・依存タスクのキー）
+
+    依存タスクのキーを含めるため、依存先を再実行すると後続のタスクも再実行される。
+    """
+    task = PHASE_TASKS[name]
+    digest = hashlib.sha256(f'{name}:{data_digest}:{code_digests[name]}'.encode())
+    for path in task['inputs']:
+        digest.update(f'{path.as_posix()}:{file_digest(path)}'.encode())
+    for dep in task['after']:
+        digest.update(f'{dep}:{cache.get(dep, {}).get("key", "")}'.encode())
+    return digest.hexdigest()
+
+
+# ========================================
+# キャッシュ（data/output_v2/.phase_cache.json）
+# ========================================
+
+def _output_files(task):
+    """タスクの出力ファイル一覧（ディレクトリは再帰的に展開）"""
+    files = []
+    for path in task['outputs']:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob('*') if p.is_file()))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+
+def _output_state(task):
+    """出力ファイルのサイズ・更新時刻（キャッシュ後に削除・上書きされていないかの確認用）"""
+    return {p.as_posix(): [p.stat().st_size, p.stat().st_mtime_ns] for p in _output_files(task)}
+
+
+def load_cache():
+    if CACHE_FILE.exists():
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def save_cache(cache):
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+
+def is_cached(cache, name, key):
+    """前回と同じキーで実行済みで、出力ファイルが前回のまま残っているか"""
+    entry = cache.get(name)
+    if not entry or entry.get('key') != key or not entry.get('outputs'):
+        return False
+    return _output_state(PHASE_TASKS[name]) == entry['outputs']
+
+
+# ========================================
+# 実行（ワーカープロセス側）
+# ========================================
+
+_worker_analyzer = None
+
+
+def _init_worker(analyzer_class, filepath, frame_paths):
+    """ワーカーごとに1回: アナライザーを作り、共有DataFrameをメモリマップで読み込む"""
+    global _worker_analyzer
+    _worker_analyzer = analyzer_class(filepath)
+    for name, path in frame_paths.items():
+        setattr(_worker_analyzer, name, read_frame(path))
+
+
+def _reload_geocache(analyzer):
+    """別プロセスの Phase 1 が保存した geocache.json を読み直す（逐次実行と同じ座標を使う）"""
+    if GEOCACHE_FILE.exists():
+        with open(GEOCACHE_FILE, 'r', encoding='utf-8') as f:
+            analyzer.geocache = json.load(f)
+
+
+def _run_task(name, analyzer=None):
+    analyzer = analyzer if analyzer is not None else _worker_analyzer
+    _reload_geocache(analyzer)
+    started = time.perf_counter()
+    getattr(analyzer, PHASE_TASKS[name]['method'])()
+    return time.perf_counter() - started
+
+
+# ========================================
+# 実行（DAG）
+# ========================================
+
+def run_pipeline(analyzer, targets=None, workers=None, use_cache=True):
+    """Phaseタスクを依存関係の順に実行する（process_data 実行後のアナライザーを渡す）
+
+    Args:
+        analyzer: process_data 実行済みの PerfectJobSeekerAnalyzer
+        targets: 実行するタスク名・Phase番号（依存先も実行）。None なら全タスク
+        workers: プロセス数。1 なら analyzer をそのまま使い1プロセスで実行（None は CPU数）
+        use_cache: False なら前回の結果に関係なく全タスクを実行
+
+    Returns:
+        dict: タスク名 → 'ran' / 'cached' / 'failed' / 'skipped'（依存先の失敗）
+    """
+    names = resolve_tasks(targets)
+    workers = workers or min(len(names), os.cpu_count() or 1)
+    code_digests = {name: code_digest(type(analyzer), PHASE_TASKS[name]['method']) for name in names}
+    cache = load_cache() if use_cache else {}
+    status, timings = {}, {}
+
+    print(f"\n[PIPELINE] {len(names)}タスク（{', '.join(names)}）、{workers}プロセス")
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='phase_pipeline_') as tmp:
+        frame_paths, data_digest = share_frames(analyzer, tmp)
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(type(analyzer), analyzer.filepath, frame_paths))
+        try:
+            running = {}
+            while len(status) < len(names):
+                for name in names:
+                    if name in status or name in running.values():
+                        continue
+                    after = PHASE_TASKS[name]['after']
+                    if any(status.get(dep) in ('failed', 'skipped') for dep in after if dep in names):
+                        status[name] = 'skipped'
+                        print(f"  [SKIP] {name}: 依存先が失敗")
+                        continue
+                    if any(status.get(dep) not in ('ran', 'cached') for dep in after if dep in names):
+                        continue
+                    key = task_key(name, data_digest, code_digests, cache)
+                    if use_cache and is_cached(cache, name, key):
+                        status[name] = 'cached'
+                        print(f"  [SKIP] {name}: 変更なし（キャッシュ）")
+                        continue
+                    if pool is None:
+                        running[_run_inline(name, analyzer)] = name
+                    else:
+                        running[pool.submit(_run_task, name)] = name
+                    cache[name] = {'key': key}
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        timings[name] = future.result()
+                    except Exception as e:
+                        status[name] = 'failed'
+                        cache.pop(name, None)
+                        save_cache(cache)
+                        print(f"  [ERROR] {name}: {type(e).__name__}: {e}")
+                        continue
+                    status[name] = 'ran'
+                    cache[name]['outputs'] = _output_state(PHASE_TASKS[name])
+                    save_cache(cache)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    print(f"\n[PIPELINE] 完了 {time.perf_counter() - started:.1f}s")
+    for name in names:
+        elapsed = f" {timings[name]:.1f}s" if name in timings else ''
+        print(f"  {name:<8} {status[name]}{elapsed}")
+    return status
+
+
+def _run_inline(name, analyzer):
+    """1プロセス実行: 完了済みの Future を返す（プール実行と同じ待ち合わせで扱う）"""
+    future = Future()
+    try:
+        future.set_result(_run_task(name, analyzer))
+    except Exception as e:
+        future.set_exception(e)
+    return future
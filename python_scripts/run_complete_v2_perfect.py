@@ -18,9 +18,11 @@ Phase 1-3, 6-8, 10, 12-14の全実装
 
 import pandas as pd
 import numpy as np
+import gc
 import json
 from pathlib import Path
 from collections import defaultdict
+from contextlib import contextmanager
 import re
 import sys
 import io
@@ -37,12 +39,126 @@ try:
     from data_normalizer import DataNormalizer
     from data_quality_validator import DataQualityValidator
     from constants import EmploymentStatus, EducationLevel, AgeGroup, Gender
+    import scoring
 except ImportError as e:
     print(f"警告: 依存モジュールのインポートに失敗しました: {e}")
     print("data_normalizer.py、data_quality_validator.py、constants.py が必要です")
     sys.exit(1)
 
 
+PREFECTURES = [
+    '北海道', '青森県', '岩手県', '宮城県', '秋田県', '山形県', '福島県',
+    '茨城県', '栃木県', '群馬県', '埼玉県', '千葉県', '東京都', '神奈川県',
+    '新潟県', '富山県', '石川県', '福井県', '山梨県', '長野県', '岐阜県',
+    '静岡県', '愛知県', '三重県', '滋賀県', '京都府', '大阪府', '兵庫県',
+    '奈良県', '和歌山県', '鳥取県', '島根県', '岡山県', '広島県', '山口県',
+    '徳島県', '香川県', '愛媛県', '高知県', '福岡県', '佐賀県', '長崎県',
+    '熊本県', '大分県', '宮崎県', '鹿児島県', '沖縄県'
+]
+NATIONAL_LICENSES = ['看護師', '准看護師', '保健師', '助産師', '理学療法士', '作業療法士']
+
+# process_data の列単位の解析（2026-01-20追加）
+# 都道府県は選択（|）の正規表現で前方一致（47件の startswith ループと同じ結果。都道府県名同士は前方一致しない）
+AGE_GENDER_PATTERN = r'^(\d+)歳\s*(男性|女性)'
+LOCATION_PATTERN = r'(?s)^(' + '|'.join(map(re.escape, PREFECTURES)) + r')(.*)$'
+DESIRED_AREA_COLUMNS = ['id', 'position', 'prefecture', 'municipality', 'full']
+
+
+def _extract_unique(series, pattern, strip=False):
+    """str(value)（strip=True なら前後の空白も除去）に str.extract を適用。ユニーク値ごとに1回だけ解析する
+
+    居住地・年齢性別・希望勤務地の項目は重複が多いため、全行への正規表現より大幅に速い。
+
+    Returns:
+        list: グループごとの値（object配列、一致しない・欠損はNone）
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    texts = [str(value).strip() if strip else str(value) for value in uniques]
+    groups = pd.Series(texts, dtype=object).str.extract(pattern)
+    result = []
+    for col in groups.columns:
+        values = np.append(groups[col].to_numpy(dtype=object), None)  # 末尾: 欠損（code=-1）
+        values[pd.isna(values)] = None
+        result.append(values[codes])
+    return result
+
+
+def _explode_items(series):
+    """カンマ区切りの値を縦持ちにする（前後の空白を除き、空の項目は除外）
+
+    ユニーク値を1つの文字列に連結して1回で分割し、行への展開は配列のインデックス計算で行う。
+
+    Returns:
+        tuple: (rows: 元の行位置（昇順）, items: 項目のobject配列)
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    texts = [str(value) for value in uniques]
+    parts = np.array([part.strip() for part in ','.join(texts).split(',')] if texts else [], dtype=object)
+    owner = np.repeat(np.arange(len(texts)), [text.count(',') + 1 for text in texts])
+    kept = parts != ''
+    parts, owner = parts[kept], owner[kept]
+
+    # ユニーク値ごとの項目範囲（末尾: 欠損 code=-1 は0件）→ 行ごとに展開
+    unique_counts = np.append(np.bincount(owner, minlength=len(texts)), 0)
+    unique_starts = np.append(np.cumsum(unique_counts[:-1]) - unique_counts[:-1], 0)
+    row_counts = unique_counts[codes]
+    ends = np.cumsum(row_counts)
+    offsets = np.repeat(unique_starts[codes] - ends + row_counts, row_counts) + np.arange(ends[-1] if len(ends) else 0)
+    return np.repeat(np.arange(len(codes), dtype=np.int64), row_counts), parts[offsets]
+
+
+def _group_lists(rows, items, n):
+    """行位置（昇順）ごとに項目をリストにまとめる（項目のない行は []）"""
+    bounds = np.searchsorted(rows, np.arange(n + 1)).tolist()
+    return [items[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+
+@contextmanager
+def _gc_paused():
+    """循環GCを一時停止（数百万のlist/dictを作る間、作成済みの全オブジェクトを繰り返し走査するのを避ける）"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _map_unique(values, func):
+    """ユニーク値ごとに1回だけ func を呼んで全行に展開"""
+    mapping = {value: func(value) for value in set(values)}
+    return [mapping[value] for value in values]
+
+
+def _has_text(values):
+    """空文字・欠損でない要素の真偽配列（従来の `if row[...]` の判定。pandas 3 の文字列型の欠損 NaN も偽とする）"""
+    values = np.asarray(values, dtype=object)
+    return pd.notna(values) & (values != '')
+
+
+def _plain(values):
+    """カテゴリ型の列・インデックスを元の値の型に戻す（出力CSVの型を従来と揃える）"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(values.dtype.categories.dtype)
+    return values
+
+
+def _top_value(facts, column):
+    """地点ごとの最頻値とその件数（同数は地点内で先に出現した値。value_counts().index[0] と同じ）
+
+    Returns:
+        DataFrame: index=location, columns=[column, 'count']（値がすべて欠損の地点は含まない）
+    """
+    sub = facts.loc[facts[column].notna(), ['location', column]]
+    counts = (sub.assign(first=np.arange(len(sub)))
+              .groupby(['location', column], observed=True, sort=False)
+              .agg(count=('first', 'size'), first=('first', 'min'))
+              .reset_index())
+    counts = counts.sort_values(['count', 'first'], ascending=[False, True], kind='stable')
+    return counts.drop_duplicates('location').set_index('location')[[column, 'count']]
+
+
 class PerfectJobSeekerAnalyzer:
     """完璧版求職者データ分析クラス"""
 
@@ -95,60 +211,181 @@ class PerfectJobSeekerAnalyzer:
         return self.df_normalized
 
     def process_data(self):
-        """データ処理"""
+        """データ処理（列単位のベクトル化版、2026-01-20変更）
+
+        従来は iterrows() で1行ずつ正規表現・都道府県47件の startswith ループ・dict作成を行っていた。
+        現在は列ごとに str.extract / 都道府県の正規表現（選択）で解析し、希望勤務地・資格は
+        「求職者 × 項目」の縦持ちテーブル（explode）で処理する。出力は従来と同じ
+        （desired_areas / qualifications のリスト列は後続Phaseのために残す）。
+
+        縦持ちの希望勤務地は self.desired_areas_long（id, position, prefecture, municipality, full）。
+        """
         print("\n[PROCESS] データ処理...")
 
         from config import MAX_DESIRED_LOCATIONS
-        capped_count = 0
-
-        processed_rows = []
-        for idx, row in self.df_normalized.iterrows():
-            age, gender = self._parse_age_gender(row.get('age_gender'))
-            residence_pref, residence_muni = self._parse_location(row.get('location'))
-            desired_areas = self._parse_desired_areas(row.get('desired_area'))
-            # 希望勤務地数の上限適用（リスト自体を切り詰める）
-            if len(desired_areas) > MAX_DESIRED_LOCATIONS:
-                desired_areas = desired_areas[:MAX_DESIRED_LOCATIONS]
-                capped_count += 1
-            qualifications = self._parse_qualifications(row.get('qualifications'))
-
-            # 年齢層の算出
-            age_bucket = self._get_age_bucket(age)
-
-            # 国家資格保有フラグ
-            national_licenses = ['看護師', '准看護師', '保健師', '助産師', '理学療法士', '作業療法士']
-            has_national_license = any(q in national_licenses for q in qualifications)
-
-            processed_rows.append({
-                'id': idx,
-                'page': row.get('page'),
-                'card_index': row.get('card_index'),
-                'age': age,
-                'gender': gender,
-                'age_bucket': age_bucket,  # 10区分（20代/30代/.../70歳以上）: Phase3,7,MapMetrics用
-                'residence_pref': residence_pref,
-                'residence_muni': residence_muni,
+
+        df = self.df_normalized
+        n = len(df)
+        if n == 0:
+            self.processed_data = pd.DataFrame()
+            self.desired_areas_long = pd.DataFrame(columns=DESIRED_AREA_COLUMNS)
+            print("  [OK] 0件処理完了")
+            return self.processed_data
+
+        def column(name):
+            # row.get(name) と同じく、列がなければ全行None
+            return df[name] if name in df.columns else pd.Series([None] * n, index=df.index, dtype=object)
+
+        # 行ごとのlist/dictを大量に作るため、その間は循環GCを止める
+        with _gc_paused():
+            # 年齢・性別（_parse_age_gender と同じパターン）
+            age_texts, genders = _extract_unique(column('age_gender'), AGE_GENDER_PATTERN)
+            ages = _map_unique(age_texts.tolist(), lambda v: None if v is None else int(v))
+
+            # 居住地（_parse_location と同じく前後の空白を除いてから都道府県で前方一致）
+            residence_pref, residence_muni = _extract_unique(column('location'), LOCATION_PATTERN, strip=True)
+
+            # 希望勤務地: 縦持ち（都道府県を解析できた項目のみ、上限を超えた分は切り詰め）
+            area_rows, area_items = _explode_items(column('desired_area'))
+            area_pref, area_muni = _extract_unique(area_items, LOCATION_PATTERN)
+            parsed = pd.notna(area_pref)
+            area_rows, area_items, area_pref, area_muni = (a[parsed] for a in (area_rows, area_items, area_pref, area_muni))
+            area_position = pd.Series(area_rows).groupby(area_rows, sort=False).cumcount().to_numpy()
+            capped_count = len(np.unique(area_rows[area_position == MAX_DESIRED_LOCATIONS]))
+            kept = area_position < MAX_DESIRED_LOCATIONS
+            area_rows, area_items, area_pref, area_muni, area_position = (
+                a[kept] for a in (area_rows, area_items, area_pref, area_muni, area_position))
+            desired_areas = _group_lists(area_rows, [
+                {'prefecture': pref, 'municipality': muni, 'full': full}
+                for pref, muni, full in zip(area_pref.tolist(), area_muni.tolist(), area_items.tolist())
+            ], n)
+            self.desired_areas_long = pd.DataFrame({
+                'id': df.index.to_numpy()[area_rows],
+                'position': area_position,
+                'prefecture': area_pref,
+                'municipality': area_muni,
+                'full': area_items,
+            }, columns=DESIRED_AREA_COLUMNS)
+
+            # 資格
+            qual_rows, qual_items = _explode_items(column('qualifications'))
+            qualifications = _group_lists(qual_rows, qual_items.tolist(), n)
+            has_national_license = np.zeros(n, dtype=bool)
+            has_national_license[qual_rows[pd.Series(qual_items, dtype=object).isin(NATIONAL_LICENSES).to_numpy()]] = True
+
+            # 年齢層（scoring の区分を列単位で適用）
+            age_buckets = scoring.age_bucket(ages).tolist()
+            age_groups_5year = scoring.age_group_5year(ages).tolist()
+
+            self.processed_data = pd.DataFrame({
+                'id': df.index.tolist(),
+                'page': column('page').tolist(),
+                'card_index': column('card_index').tolist(),
+                'age': ages,
+                'gender': genders.tolist(),
+                'age_bucket': age_buckets,  # 10区分（20代/30代/.../70歳以上）: Phase3,7,MapMetrics用
+                'residence_pref': residence_pref.tolist(),
+                'residence_muni': residence_muni.tolist(),
                 'desired_areas': desired_areas,
-                'desired_workstyle': row.get('desired_workstyle'),
-                'desired_start': row.get('desired_start'),
-                'career': row.get('career'),
-                'employment_status': row.get('employment_status'),
-                'desired_job': row.get('desired_job'),
+                'desired_workstyle': column('desired_workstyle').tolist(),
+                'desired_start': column('desired_start').tolist(),
+                'career': column('career').tolist(),
+                'employment_status': column('employment_status').tolist(),
+                'desired_job': column('desired_job').tolist(),
                 'qualifications': qualifications,
-                'qualification_count': len(qualifications),
+                'qualification_count': np.bincount(qual_rows, minlength=n),
                 'has_national_license': has_national_license,
-                'member_id': row.get('member_id'),
-                'status': row.get('status'),
-                '年齢層': self._get_age_group_5year(age),  # 5区分（20代以下/30代/.../60代以上）: Phase2統計検定用
-                '希望勤務地数': len(desired_areas),
+                'member_id': column('member_id').tolist(),
+                'status': column('status').tolist(),
+                '年齢層': age_groups_5year,  # 5区分（20代以下/30代/.../60代以上）: Phase2統計検定用
+                '希望勤務地数': np.bincount(area_rows, minlength=n),
             })
-
-        self.processed_data = pd.DataFrame(processed_rows)
         if capped_count > 0:
             print(f"  [INFO] 希望勤務地リスト切り詰め: {capped_count}件（上限: {MAX_DESIRED_LOCATIONS}箇所）")
-        print(f"  [OK] {len(self.processed_data)}件処理完了")
+        print(f"  [OK] {len(self.processed_data)}件処理完了 / 希望勤務地 {len(self.desired_areas_long)}件")
         return self.processed_data
 
+    def _desired_area_facts(self, df=None):
+        """希望勤務地のファクトテーブル（求職者 × 希望勤務地、2026-01-20追加）
+
+        Phase 6/12/13/14 はこのテーブルを groupby / merge で集計する（以前は各Phaseが iterrows() で
+        desired_areas のリストを展開していた）。processed_data に対しては1回だけ作成して使い回す。
+
+        列:
+            row: df内の行位置 / applicant_id, position: 求職者ID・希望順
+            prefecture, municipality, location: 希望勤務地（カテゴリ型。location は都道府県+市区町村）
+            residence_pref, residence_muni, origin: 居住地（origin は都道府県・市区町村とも判明している場合のみ）
+            is_flow: 居住地と異なる市区町村への希望（フローエッジになる行）
+            age, gender, age_bucket, has_national_license, employment_status, qualification_count
+
+        座標は参照時点の geocache で引く必要があるため含めない（_location_coords で付ける）。
+        """
+        if df is None:
+            df = self.processed_data
+        cached = getattr(self, '_area_facts', None)
+        if cached is not None and cached[0] is df:
+            return cached[1]
+
+        long = getattr(self, 'desired_areas_long', None)
+        if df is self.processed_data and long is not None:
+            rows = np.repeat(np.arange(len(df)), df['希望勤務地数'].to_numpy())  # long は求職者の順
+            positions = long['position'].to_numpy()
+            area_pref, area_muni, area_full = (long[c].to_numpy(dtype=object) for c in ('prefecture', 'municipality', 'full'))
+        else:
+            # processed_data の一部などが渡された場合はリスト列から展開
+            counts = np.array([len(areas) for areas in df['desired_areas']], dtype=np.int64)
+            rows = np.repeat(np.arange(len(df)), counts)
+            positions = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+            areas = [area for areas in df['desired_areas'] for area in areas]
+            area_pref, area_muni, area_full = (np.array([area[key] for area in areas], dtype=object)
+                                               for key in ('prefecture', 'municipality', 'full'))
+
+        residence_pref = df['residence_pref'].to_numpy(dtype=object)
+        residence_muni = df['residence_muni'].to_numpy(dtype=object)
+        has_residence = _has_text(residence_pref) & _has_text(residence_muni)
+        origin = np.full(len(df), None, dtype=object)
+        origin[has_residence] = residence_pref[has_residence] + residence_muni[has_residence]
+        area_muni = np.where(_has_text(area_muni), area_muni, '')
+
+        attributes = ['age', 'gender', 'age_bucket', 'has_national_license', 'employment_status', 'qualification_count']
+        facts = df[['id', 'residence_pref', 'residence_muni'] + attributes].iloc[rows].reset_index(drop=True)
+        facts = facts.rename(columns={'id': 'applicant_id'})
+        facts.insert(0, 'row', rows)
+        facts.insert(2, 'position', positions)
+        facts.insert(3, 'prefecture', pd.Categorical(area_pref))
+        facts.insert(4, 'municipality', pd.Categorical(area_muni))
+        facts.insert(5, 'location', pd.Categorical(area_full))
+        facts['residence_pref'] = pd.Categorical(residence_pref[rows])
+        facts['residence_muni'] = pd.Categorical(residence_muni[rows])
+        facts.insert(8, 'origin', pd.Categorical(origin[rows]))
+        facts.insert(9, 'is_flow', has_residence[rows] & (origin[rows] != area_full))
+
+        self._area_facts = (df, facts)
+        return facts
+
+    def _location_coords(self, locations):
+        """地点（都道府県+市区町村）の座標。municipality_coords → geocache の順で引き、なければ None
+
+        地点のユニーク値ごとに1回だけ引く（従来の行ごとの .at 代入と同じ値・object型）。
+
+        Returns:
+            tuple: (latitude, longitude) のobject配列
+        """
+        def lookup(location):
+            if location in self.municipality_coords:
+                return self.municipality_coords[location]
+            if location in self.geocache:
+                cache_data = self.geocache[location]
+                return cache_data.get('lat'), cache_data.get('lng')
+            return None, None
+
+        coords = _map_unique(list(locations), lookup)
+        latitude = np.empty(len(coords), dtype=object)
+        longitude = np.empty(len(coords), dtype=object)
+        latitude[:] = [lat for lat, _ in coords]
+        longitude[:] = [lon for _, lon in coords]
+        return latitude, longitude
+
     def _parse_age_gender(self, age_gender_str):
         """年齢・性別の解析"""
         if pd.isna(age_gender_str):
@@ -168,17 +405,7 @@ class PerfectJobSeekerAnalyzer:
 
         location = str(location_str).strip()
 
-        prefectures = [
-            '北海道', '青森県', '岩手県', '宮城県', '秋田県', '山形県', '福島県',
-            '茨城県', '栃木県', '群馬県', '埼玉県', '千葉県', '東京都', '神奈川県',
-            '新潟県', '富山県', '石川県', '福井県', '山梨県', '長野県', '岐阜県',
-            '静岡県', '愛知県', '三重県', '滋賀県', '京都府', '大阪府', '兵庫県',
-            '奈良県', '和歌山県', '鳥取県', '島根県', '岡山県', '広島県', '山口県',
-            '徳島県', '香川県', '愛媛県', '高知県', '福岡県', '佐賀県', '長崎県',
-            '熊本県', '大分県', '宮崎県', '鹿児島県', '沖縄県'
-        ]
-
-        for pref in prefectures:
+        for pref in PREFECTURES:
             if location.startswith(pref):
                 municipality = location[len(pref):] if len(location) > len(pref) else ''
                 return pref, municipality
@@ -221,40 +448,12 @@ class PerfectJobSeekerAnalyzer:
         return qualifications
 
     def _get_age_bucket(self, age):
-        """年齢層の算出（10年単位）"""
-        if age is None or pd.isna(age):
-            return None
-
-        age = int(age)
-        if age < 30:
-            return '20代'
-        elif age < 40:
-            return '30代'
-        elif age < 50:
-            return '40代'
-        elif age < 60:
-            return '50代'
-        elif age < 70:
-            return '60代'
-        else:
-            return '70歳以上'
+        """年齢層の算出（10年単位、区分は scoring.age_bucket）"""
+        return scoring.age_bucket([age])[0]
 
     def _get_age_group_5year(self, age):
-        """年齢層の算出（5年単位）"""
-        if age is None or pd.isna(age):
-            return None
-
-        age = int(age)
-        if age <= 29:
-            return '20代以下'
-        elif age <= 39:
-            return '30代'
-        elif age <= 49:
-            return '40代'
-        elif age <= 59:
-            return '50代'
-        else:
-            return '60代以上'
+        """年齢層の算出（5年単位、区分は scoring.age_group_5year）"""
+        return scoring.age_group_5year([age])[0]
 
     def _get_coords(self, prefecture, municipality):
         """座標取得（geocache使用 + 市区町村レベル座標対応）
@@ -1297,70 +1496,49 @@ class PerfectJobSeekerAnalyzer:
         print(f"  [DIR] 出力先: {output_path}")
 
     def _generate_flow_edges(self, df):
-        """自治体間フローエッジを生成"""
-        results = []
-
-        for idx, row in df.iterrows():
-            if not row['residence_pref'] or not row['residence_muni']:
-                continue
-
-            origin = f"{row['residence_pref']}{row['residence_muni']}"
-
-            for area in row['desired_areas']:
-                destination = area['full']
-
-                if origin != destination:
-                    results.append({
-                        'origin': origin,
-                        'destination': destination,
-                        'origin_pref': row['residence_pref'],
-                        'origin_muni': row['residence_muni'],
-                        'destination_pref': area['prefecture'],
-                        'destination_muni': area['municipality'],
-                        'applicant_id': row['id'],
-                        'age': row['age'],
-                        'gender': row['gender']
-                    })
-
-        return pd.DataFrame(results)
+        """自治体間フローエッジを生成（希望勤務地のファクトテーブルから抽出、2026-01-20変更）"""
+        edges = self._desired_area_facts(df)
+        edges = edges[edges['is_flow']]
+        return pd.DataFrame({
+            'origin': _plain(edges['origin']),
+            'destination': _plain(edges['location']),
+            'origin_pref': _plain(edges['residence_pref']),
+            'origin_muni': _plain(edges['residence_muni']),
+            'destination_pref': _plain(edges['prefecture']),
+            'destination_muni': _plain(edges['municipality']),
+            'applicant_id': edges['applicant_id'],
+            'age': edges['age'],
+            'gender': edges['gender'],
+        }).reset_index(drop=True)
 
     def _generate_flow_nodes(self, df):
-        """自治体間フローノードを生成"""
-        results = defaultdict(lambda: {'inflow': 0, 'outflow': 0, 'applicants': set()})
-
-        for idx, row in df.iterrows():
-            if not row['residence_pref'] or not row['residence_muni']:
-                continue
-
-            origin = f"{row['residence_pref']}{row['residence_muni']}"
-
-            for area in row['desired_areas']:
-                destination = area['full']
-
-                if origin != destination:
-                    # 流出
-                    results[origin]['outflow'] += 1
-                    results[origin]['applicants'].add(row['id'])
-
-                    # 流入
-                    results[destination]['inflow'] += 1
-                    results[destination]['applicants'].add(row['id'])
-
-        # DataFrameに変換
-        nodes = []
-        for location, data in results.items():
-            pref, muni = self._parse_location(location)
-            nodes.append({
-                'location': location,
-                'prefecture': pref,
-                'municipality': muni,
-                'inflow': data['inflow'],
-                'outflow': data['outflow'],
-                'net_flow': data['inflow'] - data['outflow'],
-                'applicant_count': len(data['applicants'])
-            })
-
-        return pd.DataFrame(nodes).sort_values('net_flow', ascending=False)
+        """自治体間フローノードを生成（フローエッジを地点ごとに集計、2026-01-20変更）"""
+        edges = self._desired_area_facts(df)
+        edges = edges[edges['is_flow']]
+        columns = ['location', 'prefecture', 'municipality', 'inflow', 'outflow', 'net_flow', 'applicant_count']
+        if edges.empty:
+            return pd.DataFrame(columns=columns)
+
+        # エッジごとに [流出元, 流入先] の2行（地点の並びは従来の初出順と同じ）
+        n = len(edges)
+        ends = pd.DataFrame({
+            'location': np.column_stack([edges['origin'].to_numpy(dtype=object),
+                                         edges['location'].to_numpy(dtype=object)]).ravel(),
+            'applicant_id': np.repeat(edges['applicant_id'].to_numpy(), 2),
+            'outflow': np.tile([1, 0], n),
+            'inflow': np.tile([0, 1], n),
+        })
+        nodes = ends.groupby('location', sort=False).agg(
+            inflow=('inflow', 'sum'),
+            outflow=('outflow', 'sum'),
+            applicant_count=('applicant_id', 'nunique'),
+        ).reset_index()
+        parsed = _map_unique(nodes['location'].tolist(), self._parse_location)
+        nodes['prefecture'] = [pref for pref, _ in parsed]
+        nodes['municipality'] = [muni for _, muni in parsed]
+        nodes['net_flow'] = nodes['inflow'] - nodes['outflow']
+
+        return nodes[columns].sort_values('net_flow', ascending=False)
 
     def _generate_aggregated_flow_edges(self, flow_edges_df):
         """
@@ -1399,22 +1577,18 @@ class PerfectJobSeekerAnalyzer:
             ])
 
         # Origin→Destinationの組み合わせで集約
-        agg = flow_edges_df.groupby([
-            'origin', 'destination',
-            'origin_pref', 'origin_muni',
-            'destination_pref', 'destination_muni'
-        ]).agg({
-            'applicant_id': 'count',  # フロー数
-            'age': 'mean',            # 平均年齢
-            'gender': lambda x: x.mode()[0] if len(x.mode()) > 0 else '不明'  # 最頻性別
-        }).reset_index()
-
-        # カラム名をわかりやすく変更
-        agg.rename(columns={
-            'applicant_id': 'flow_count',
-            'age': 'avg_age',
-            'gender': 'gender_mode'
-        }, inplace=True)
+        keys = ['origin', 'destination', 'origin_pref', 'origin_muni', 'destination_pref', 'destination_muni']
+        agg = flow_edges_df.groupby(keys).agg(
+            flow_count=('applicant_id', 'count'),  # フロー数
+            avg_age=('age', 'mean'),               # 平均年齢
+        ).reset_index()
+
+        # 最頻性別（同数なら文字列順で先の値 = Series.mode()[0]、性別不明のみなら '不明'）
+        # 2026-01-20変更: 組み合わせごとの mode() 呼び出しをやめ、(組み合わせ, 性別) の件数から選ぶ
+        genders = flow_edges_df.dropna(subset=['gender']).groupby(keys + ['gender']).size().reset_index(name='n')
+        genders = genders.sort_values(['n', 'gender'], ascending=[False, True], kind='stable').drop_duplicates(keys)
+        agg = agg.merge(genders[keys + ['gender']], on=keys, how='left').rename(columns={'gender': 'gender_mode'})
+        agg['gender_mode'] = agg['gender_mode'].fillna('不明')
 
         # フロー数でソート（降順）
         agg = agg.sort_values('flow_count', ascending=False)
@@ -1422,36 +1596,28 @@ class PerfectJobSeekerAnalyzer:
         return agg
 
     def _generate_proximity_analysis(self, df):
-        """移動パターン分析を生成"""
-        results = []
-
-        # 都道府県内移動 vs 都道府県外移動
-        for idx, row in df.iterrows():
-            if not row['residence_pref']:
-                continue
-
-            same_pref_count = 0
-            diff_pref_count = 0
-
-            for area in row['desired_areas']:
-                if area['prefecture'] == row['residence_pref']:
-                    same_pref_count += 1
-                else:
-                    diff_pref_count += 1
-
-            if same_pref_count + diff_pref_count > 0:
-                results.append({
-                    'applicant_id': row['id'],
-                    'residence_pref': row['residence_pref'],
-                    'age': row['age'],
-                    'gender': row['gender'],
-                    'same_prefecture_count': same_pref_count,
-                    'different_prefecture_count': diff_pref_count,
-                    'total_desired_areas': same_pref_count + diff_pref_count,
-                    'mobility_score': diff_pref_count / (same_pref_count + diff_pref_count) if (same_pref_count + diff_pref_count) > 0 else 0
-                })
+        """移動パターン分析を生成（都道府県内移動 vs 都道府県外移動、2026-01-20変更）"""
+        facts = self._desired_area_facts(df)
+        facts = facts[_has_text(facts['residence_pref'])]
+        if facts.empty:
+            return pd.DataFrame()
 
-        return pd.DataFrame(results)
+        same = facts['prefecture'].to_numpy(dtype=object) == facts['residence_pref'].to_numpy(dtype=object)
+        counts = pd.DataFrame({'row': facts['row'].to_numpy(), 'same': same}).groupby('row')['same'].agg(['sum', 'size'])
+        applicants = df.iloc[counts.index].reset_index(drop=True)
+        same_count = counts['sum'].to_numpy(dtype=np.int64)
+        total = counts['size'].to_numpy(dtype=np.int64)
+
+        return pd.DataFrame({
+            'applicant_id': applicants['id'],
+            'residence_pref': applicants['residence_pref'],
+            'age': applicants['age'],
+            'gender': applicants['gender'],
+            'same_prefecture_count': same_count,
+            'different_prefecture_count': total - same_count,
+            'total_desired_areas': total,
+            'mobility_score': (total - same_count) / total,
+        })
 
     # ===========================================
     # Phase 7: 高度分析（5つの分析）
@@ -2075,58 +2241,13 @@ class PerfectJobSeekerAnalyzer:
         print(f"  [DIR] 出力先: {output_path}")
 
     def _calculate_urgency_score(self, df):
-        """転職意欲・緊急度スコアを算出"""
-        df_copy = df.copy()
-
-        # スコアリングロジック
-        urgency_scores = []
-
-        for idx, row in df_copy.iterrows():
-            score = 0
-
-            # 1. 希望勤務地数（0-3点）
-            if row['希望勤務地数'] == 0:
-                score += 0
-            elif row['希望勤務地数'] <= 2:
-                score += 1
-            elif row['希望勤務地数'] <= 5:
-                score += 2
-            else:
-                score += 3
-
-            # 2. 資格数（0-2点）
-            if row['qualification_count'] >= 3:
-                score += 2
-            elif row['qualification_count'] >= 1:
-                score += 1
-
-            # 3. 国家資格保有（+2点）
-            if row['has_national_license']:
-                score += 2
-
-            # 4. 就業状態（0-2点）
-            if row['employment_status'] == EmploymentStatus.UNEMPLOYED:
-                score += 2
-            elif row['employment_status'] == EmploymentStatus.EMPLOYED:
-                score += 1
-
-            urgency_scores.append(score)
-
-        df_copy['urgency_score'] = urgency_scores
-
-        # スコアランク
-        def get_urgency_rank(score):
-            if score <= 2:
-                return 'D: 低い'
-            elif score <= 4:
-                return 'C: やや低い'
-            elif score <= 6:
-                return 'B: 中程度'
-            else:
-                return 'A: 高い'
-
-        df_copy['urgency_rank'] = df_copy['urgency_score'].apply(get_urgency_rank)
+        """転職意欲・緊急度スコアを算出（配点・ランクの閾値は scoring.URGENCY_SCORE_RULES / URGENCY_RANK_STEPS）
 
+        スコア: 希望勤務地数（0-3点）+ 資格数（0-2点）+ 国家資格保有（+2点）+ 就業状態（0-2点）
+        """
+        df_copy = df.copy()
+        df_copy['urgency_score'] = scoring.urgency_score(df_copy)
+        df_copy['urgency_rank'] = scoring.urgency_rank(df_copy['urgency_score'])
         return df_copy
 
     def _generate_urgency_distribution(self, df):
@@ -2195,81 +2316,43 @@ class PerfectJobSeekerAnalyzer:
         matrix = pd.crosstab(df['urgency_rank'], df['employment_status'])
         return matrix
 
-    def _generate_urgency_by_municipality(self, df):
-        """市区町村別緊急度集計を生成"""
-        results = []
+    def _urgency_by_location(self, df, column=None, name=None):
+        """希望勤務地（× column）ごとの緊急度スコアの件数・平均（2026-01-20追加）
 
-        for idx, row in df.iterrows():
-            for area in row['desired_areas']:
-                results.append({
-                    'prefecture': area['prefecture'],
-                    'municipality': area['municipality'],
-                    'location': area['full'],
-                    'urgency_score': row['urgency_score'],
-                    'urgency_rank': row['urgency_rank']
-                })
+        df は _calculate_urgency_score の結果。processed_data と同じ行なら processed_data の
+        希望勤務地ファクトテーブルを使い、df の列を行位置で付けて groupby する。
 
-        df_results = pd.DataFrame(results)
+        Returns:
+            DataFrame: [location, name, count, avg_urgency_score]（location 順。column の欠損行は除外）
+        """
+        same_rows = self.processed_data is not None and df.index.equals(self.processed_data.index)
+        facts = self._desired_area_facts(self.processed_data if same_rows else df)
+        rows = facts['row'].to_numpy()
+        keys = ['location'] + ([name] if column else [])
 
-        # 集計
-        urgency_by_muni = df_results.groupby('location').agg({
-            'urgency_score': ['count', 'mean']
-        }).reset_index()
+        frame = pd.DataFrame({'location': facts['location']})
+        if column:
+            frame[name] = df[column].iloc[rows].reset_index(drop=True)
+        frame['urgency_score'] = df['urgency_score'].to_numpy()[rows]
 
-        urgency_by_muni.columns = ['location', 'count', 'avg_urgency_score']
+        result = frame.groupby(keys, observed=True)['urgency_score'].agg(['count', 'mean']).reset_index()
+        result.columns = keys + ['count', 'avg_urgency_score']
+        result['location'] = _plain(result['location'])
+        return result
 
+    def _generate_urgency_by_municipality(self, df):
+        """市区町村別緊急度集計を生成"""
+        urgency_by_muni = self._urgency_by_location(df)
         return urgency_by_muni.sort_values('avg_urgency_score', ascending=False)
 
     def _generate_urgency_age_by_municipality(self, df):
         """市区町村×年齢層別緊急度集計を生成"""
-        results = []
-
-        for idx, row in df.iterrows():
-            for area in row['desired_areas']:
-                results.append({
-                    'prefecture': area['prefecture'],
-                    'municipality': area['municipality'],
-                    'location': area['full'],
-                    'age_group': row['age_bucket'],
-                    'urgency_score': row['urgency_score'],
-                    'urgency_rank': row['urgency_rank']
-                })
-
-        df_results = pd.DataFrame(results)
-
-        # 集計
-        urgency_age_muni = df_results.groupby(['location', 'age_group']).agg({
-            'urgency_score': ['count', 'mean']
-        }).reset_index()
-
-        urgency_age_muni.columns = ['location', 'age_group', 'count', 'avg_urgency_score']
-
+        urgency_age_muni = self._urgency_by_location(df, 'age_bucket', 'age_group')
         return urgency_age_muni.sort_values(['location', 'age_group'])
 
     def _generate_urgency_employment_by_municipality(self, df):
         """市区町村×就業状態別緊急度集計を生成"""
-        results = []
-
-        for idx, row in df.iterrows():
-            for area in row['desired_areas']:
-                results.append({
-                    'prefecture': area['prefecture'],
-                    'municipality': area['municipality'],
-                    'location': area['full'],
-                    'employment_status': row['employment_status'],
-                    'urgency_score': row['urgency_score'],
-                    'urgency_rank': row['urgency_rank']
-                })
-
-        df_results = pd.DataFrame(results)
-
-        # 集計
-        urgency_employment_muni = df_results.groupby(['location', 'employment_status']).agg({
-            'urgency_score': ['count', 'mean']
-        }).reset_index()
-
-        urgency_employment_muni.columns = ['location', 'employment_status', 'count', 'avg_urgency_score']
-
+        urgency_employment_muni = self._urgency_by_location(df, 'employment_status', 'employment_status')
         return urgency_employment_muni.sort_values(['location', 'employment_status'])
 
     def _generate_urgency_gender_cross(self, df):
@@ -2301,28 +2384,7 @@ class PerfectJobSeekerAnalyzer:
 
     def _generate_urgency_gender_by_municipality(self, df):
         """市区町村×性別別緊急度集計を生成"""
-        results = []
-
-        for idx, row in df.iterrows():
-            for area in row['desired_areas']:
-                results.append({
-                    'prefecture': area['prefecture'],
-                    'municipality': area['municipality'],
-                    'location': area['full'],
-                    'gender': row['gender'],
-                    'urgency_score': row['urgency_score'],
-                    'urgency_rank': row['urgency_rank']
-                })
-
-        df_results = pd.DataFrame(results)
-
-        # 集計
-        urgency_gender_muni = df_results.groupby(['location', 'gender']).agg({
-            'urgency_score': ['count', 'mean']
-        }).reset_index()
-
-        urgency_gender_muni.columns = ['location', 'gender', 'count', 'avg_urgency_score']
-
+        urgency_gender_muni = self._urgency_by_location(df, 'gender', 'gender')
         return urgency_gender_muni.sort_values(['location', 'gender'])
 
     def _generate_urgency_start_category_cross(self, df):
@@ -2360,34 +2422,10 @@ class PerfectJobSeekerAnalyzer:
 
     def _generate_urgency_start_category_by_municipality(self, df):
         """市区町村×転職希望時期カテゴリ別緊急度集計を生成"""
-        results = []
-
         if 'desired_start' not in df.columns:
             return pd.DataFrame(columns=['location', 'start_category', 'count', 'avg_urgency_score'])
 
-        for idx, row in df.iterrows():
-            for area in row['desired_areas']:
-                results.append({
-                    'prefecture': area['prefecture'],
-                    'municipality': area['municipality'],
-                    'location': area['full'],
-                    'start_category': row['desired_start'],
-                    'urgency_score': row['urgency_score'],
-                    'urgency_rank': row['urgency_rank']
-                })
-
-        df_results = pd.DataFrame(results)
-
-        if len(df_results) == 0:
-            return pd.DataFrame(columns=['location', 'start_category', 'count', 'avg_urgency_score'])
-
-        # 集計
-        urgency_start_muni = df_results.groupby(['location', 'start_category']).agg({
-            'urgency_score': ['count', 'mean']
-        }).reset_index()
-
-        urgency_start_muni.columns = ['location', 'start_category', 'count', 'avg_urgency_score']
-
+        urgency_start_muni = self._urgency_by_location(df, 'desired_start', 'start_category')
         return urgency_start_muni.sort_values(['location', 'start_category'])
 
     # ===========================================
@@ -2425,31 +2463,20 @@ class PerfectJobSeekerAnalyzer:
         print(f"  [DIR] 出力先: {output_path}")
 
     def _generate_supply_demand_gap(self):
-        """需給ギャップ分析データを生成（MAP統合対応）"""
+        """需給ギャップ分析データを生成（MAP統合対応、需要は希望勤務地のファクトテーブルから集計、2026-01-20変更）"""
 
         # 各市町村への需要（希望者数）
-        demand_list = []
-        for idx, row in self.processed_data.iterrows():
-            for area in row['desired_areas']:
-                demand_list.append({
-                    'prefecture': area['prefecture'],
-                    'municipality': area['municipality'] if area['municipality'] else '',
-                    'location': area['full']
-                })
-
-        demand_df = pd.DataFrame(demand_list)
-        demand = demand_df.groupby('location').size().reset_index(name='demand_count')
+        facts = self._desired_area_facts()
+        demand = facts.groupby('location', observed=True).size().reset_index(name='demand_count')
+        demand['location'] = _plain(demand['location'])
 
         # 各市町村からの供給（居住者数）
         # 修正: location フォーマットを demand と同じ形式（都道府県+市町村）に統一
-        supply_list = []
-        for idx, row in self.processed_data.iterrows():
-            if row['residence_pref'] and row['residence_muni']:
-                location = f"{row['residence_pref']}{row['residence_muni']}"
-                supply_list.append({'location': location})
-
-        if supply_list:
-            supply_df = pd.DataFrame(supply_list)
+        residence_pref = self.processed_data['residence_pref'].to_numpy(dtype=object)
+        residence_muni = self.processed_data['residence_muni'].to_numpy(dtype=object)
+        has_residence = _has_text(residence_pref) & _has_text(residence_muni)
+        if has_residence.any():
+            supply_df = pd.DataFrame({'location': (residence_pref[has_residence] + residence_muni[has_residence]).tolist()})
             supply = supply_df.groupby('location').size().reset_index(name='supply_count')
         else:
             supply = pd.DataFrame(columns=['location', 'supply_count'])
@@ -2468,19 +2495,7 @@ class PerfectJobSeekerAnalyzer:
         gap.loc[gap['prefecture'].isna(), 'municipality'] = ''
 
         # 座標を追加（MAP統合用）
-        gap['latitude'] = None
-        gap['longitude'] = None
-
-        for idx, row in gap.iterrows():
-            location_key = row['location']
-            if location_key in self.municipality_coords:
-                lat, lon = self.municipality_coords[location_key]
-                gap.at[idx, 'latitude'] = lat
-                gap.at[idx, 'longitude'] = lon
-            elif location_key in self.geocache:
-                cache_data = self.geocache[location_key]
-                gap.at[idx, 'latitude'] = cache_data.get('lat')
-                gap.at[idx, 'longitude'] = cache_data.get('lng')
+        gap['latitude'], gap['longitude'] = self._location_coords(gap['location'])
 
         # カラム順序を整理（MAP統合に適した形式）
         gap = gap[['prefecture', 'municipality', 'location', 'demand_count', 'supply_count',
@@ -2523,59 +2538,24 @@ class PerfectJobSeekerAnalyzer:
         print(f"  [DIR] 出力先: {output_path}")
 
     def _generate_rarity_score(self):
-        """希少性スコアを生成（MAP統合対応）"""
-
-        # 希望勤務地を展開
-        desired_list = []
-        for idx, row in self.processed_data.iterrows():
-            for area in row['desired_areas']:
-                desired_list.append({
-                    'location': area['full'],
-                    'prefecture': area['prefecture'],
-                    'municipality': area['municipality'] if area['municipality'] else '',
-                    'age_bucket': row['age_bucket'],
-                    'gender': row['gender'],
-                    'has_national_license': row['has_national_license']
-                })
-
-        desired_df = pd.DataFrame(desired_list)
+        """希少性スコアを生成（MAP統合対応、希望勤務地のファクトテーブルから集計、2026-01-20変更）"""
 
         # 市町村 × 年齢層 × 性別 × 国家資格でグループ化
-        rarity = desired_df.groupby(['location', 'prefecture', 'municipality',
-                                       'age_bucket', 'gender', 'has_national_license']).size().reset_index(name='count')
+        facts = self._desired_area_facts()
+        rarity = facts.groupby(['location', 'prefecture', 'municipality',
+                                'age_bucket', 'gender', 'has_national_license'],
+                               observed=True).size().reset_index(name='count')
+        for col in ('location', 'prefecture', 'municipality'):
+            rarity[col] = _plain(rarity[col])
 
         # 希少性スコア = 1 / count
         rarity['rarity_score'] = 1 / rarity['count']
 
-        # ランク付け
-        def get_rarity_rank(score):
-            if score >= 1.0:
-                return 'S: 超希少（1人のみ）'
-            elif score >= 0.5:
-                return 'A: 非常に希少（2人）'
-            elif score >= 0.2:
-                return 'B: 希少（3-5人）'
-            elif score >= 0.05:
-                return 'C: やや希少（6-20人）'
-            else:
-                return 'D: 一般的（20人超）'
-
-        rarity['rarity_rank'] = rarity['rarity_score'].apply(get_rarity_rank)
+        # ランク付け（閾値は scoring.RARITY_RANK_STEPS）
+        rarity['rarity_rank'] = scoring.rarity_rank(rarity['rarity_score'])
 
         # 座標を追加（MAP統合用）
-        rarity['latitude'] = None
-        rarity['longitude'] = None
-
-        for idx, row in rarity.iterrows():
-            location_key = row['location']
-            if location_key in self.municipality_coords:
-                lat, lon = self.municipality_coords[location_key]
-                rarity.at[idx, 'latitude'] = lat
-                rarity.at[idx, 'longitude'] = lon
-            elif location_key in self.geocache:
-                cache_data = self.geocache[location_key]
-                rarity.at[idx, 'latitude'] = cache_data.get('lat')
-                rarity.at[idx, 'longitude'] = cache_data.get('lng')
+        rarity['latitude'], rarity['longitude'] = self._location_coords(rarity['location'])
 
         # カラム順序を整理
         rarity = rarity[['prefecture', 'municipality', 'location', 'age_bucket', 'gender',
@@ -2619,102 +2599,47 @@ class PerfectJobSeekerAnalyzer:
         print(f"  [DIR] 出力先: {output_path}")
 
     def _generate_competition_profile(self):
-        """競合分析データを生成（MAP統合対応）"""
-
-        # 希望勤務地を展開
-        desired_list = []
-        for idx, row in self.processed_data.iterrows():
-            for area in row['desired_areas']:
-                desired_list.append({
-                    'location': area['full'],
-                    'prefecture': area['prefecture'],
-                    'municipality': area['municipality'] if area['municipality'] else '',
-                    'age_bucket': row['age_bucket'],
-                    'gender': row['gender'],
-                    'has_national_license': row['has_national_license'],
-                    'employment_status': row['employment_status'],
-                    'qualification_count': row['qualification_count']
-                })
-
-        desired_df = pd.DataFrame(desired_list)
-
-        # 市町村ごとに集計
-        results = []
-
-        for location in desired_df['location'].unique():
-            muni_data = desired_df[desired_df['location'] == location]
-
-            if len(muni_data) == 0:
-                continue
-
-            # 基本統計
-            total_count = len(muni_data)
-
-            # 年齢層分布（最も多い年齢層）
-            age_dist = muni_data['age_bucket'].value_counts()
-            top_age = age_dist.index[0] if len(age_dist) > 0 else None
-            top_age_count = age_dist.iloc[0] if len(age_dist) > 0 else 0
-            top_age_ratio = top_age_count / total_count if total_count > 0 else 0
-
-            # 性別分布
-            gender_dist = muni_data['gender'].value_counts()
-            female_count = gender_dist.get('女性', 0)
-            male_count = gender_dist.get('男性', 0)
-            female_ratio = female_count / total_count if total_count > 0 else 0
-
-            # 国家資格保有率
-            national_license_rate = muni_data['has_national_license'].mean()
-
-            # 就業状態分布（最も多い状態）
-            emp_dist = muni_data['employment_status'].value_counts()
-            top_employment = emp_dist.index[0] if len(emp_dist) > 0 else None
-            top_employment_count = emp_dist.iloc[0] if len(emp_dist) > 0 else 0
-            top_employment_ratio = top_employment_count / total_count if total_count > 0 else 0
-
-            # 平均資格数
-            avg_qualification = muni_data['qualification_count'].mean()
-
-            # 都道府県・市町村
-            prefecture = muni_data['prefecture'].iloc[0] if len(muni_data) > 0 else ''
-            municipality = muni_data['municipality'].iloc[0] if len(muni_data) > 0 else ''
-
-            results.append({
-                'prefecture': prefecture,
-                'municipality': municipality,
-                'location': location,
-                'total_applicants': total_count,
-                'top_age_group': top_age,
-                'top_age_ratio': top_age_ratio,
-                'female_ratio': female_ratio,
-                'male_ratio': 1 - female_ratio,
-                'national_license_rate': national_license_rate,
-                'top_employment_status': top_employment,
-                'top_employment_ratio': top_employment_ratio,
-                'avg_qualification_count': avg_qualification
-            })
-
-        competition_df = pd.DataFrame(results)
+        """競合分析データを生成（MAP統合対応、市町村ごとの集計は groupby、2026-01-20変更）"""
+
+        facts = self._desired_area_facts()
+        columns = ['prefecture', 'municipality', 'location', 'total_applicants',
+                   'top_age_group', 'top_age_ratio', 'female_ratio', 'male_ratio',
+                   'national_license_rate', 'top_employment_status', 'top_employment_ratio',
+                   'avg_qualification_count', 'latitude', 'longitude']
+        if facts.empty:
+            return pd.DataFrame(columns=columns)
+
+        # 市町村ごとに集計（地点の並びは初出順）
+        grouped = facts.assign(is_female=facts['gender'] == '女性').groupby('location', observed=True, sort=False)
+        competition_df = grouped.agg(
+            prefecture=('prefecture', 'first'),
+            municipality=('municipality', 'first'),
+            total_applicants=('row', 'size'),
+            female_count=('is_female', 'sum'),
+            national_license_rate=('has_national_license', 'mean'),
+            avg_qualification_count=('qualification_count', 'mean'),
+        )
+        total = competition_df['total_applicants']
+
+        # 年齢層・就業状態は最も多い値とその割合（値がない地点は None / 0）
+        top_age = _top_value(facts, 'age_bucket').reindex(competition_df.index)
+        top_employment = _top_value(facts, 'employment_status').reindex(competition_df.index)
+        competition_df['top_age_group'] = _plain(top_age['age_bucket'])
+        competition_df['top_age_ratio'] = top_age['count'].fillna(0) / total
+        competition_df['female_ratio'] = competition_df['female_count'] / total
+        competition_df['male_ratio'] = 1 - competition_df['female_ratio']
+        competition_df['top_employment_status'] = _plain(top_employment['employment_status'])
+        competition_df['top_employment_ratio'] = top_employment['count'].fillna(0) / total
+
+        competition_df = competition_df.reset_index()
+        for col in ('location', 'prefecture', 'municipality'):
+            competition_df[col] = _plain(competition_df[col])
 
         # 座標を追加（MAP統合用）
-        competition_df['latitude'] = None
-        competition_df['longitude'] = None
-
-        for idx, row in competition_df.iterrows():
-            location_key = row['location']
-            if location_key in self.municipality_coords:
-                lat, lon = self.municipality_coords[location_key]
-                competition_df.at[idx, 'latitude'] = lat
-                competition_df.at[idx, 'longitude'] = lon
-            elif location_key in self.geocache:
-                cache_data = self.geocache[location_key]
-                competition_df.at[idx, 'latitude'] = cache_data.get('lat')
-                competition_df.at[idx, 'longitude'] = cache_data.get('lng')
+        competition_df['latitude'], competition_df['longitude'] = self._location_coords(competition_df['location'])
 
         # カラム順序を整理
-        competition_df = competition_df[['prefecture', 'municipality', 'location', 'total_applicants',
-                                         'top_age_group', 'top_age_ratio', 'female_ratio', 'male_ratio',
-                                         'national_license_rate', 'top_employment_status', 'top_employment_ratio',
-                                         'avg_qualification_count', 'latitude', 'longitude']]
+        competition_df = competition_df[columns]
 
         return competition_df.sort_values('total_applicants', ascending=False)
 
@@ -2777,6 +2702,11 @@ if __name__ == "__main__":
     # コマンドライン引数の解析
     parser = argparse.ArgumentParser(description='ジョブメドレー求職者データ分析')
     parser.add_argument('--input', type=str, help='入力CSVファイルのパス')
+    # 2026-01-20追加: Phaseの並列実行・キャッシュ（phase_pipeline.py）
+    parser.add_argument('--phase', type=str, nargs='+',
+                        help='実行するPhase（例: 12、overall）。依存先のPhaseも実行し、統合CSV生成は行わない')
+    parser.add_argument('--workers', type=int, default=None, help='並列実行のプロセス数（1で逐次実行、既定はCPU数）')
+    parser.add_argument('--no-cache', action='store_true', help='前回から変更のないPhaseもスキップせずに実行')
     args = parser.parse_args()
 
     # CSVファイル選択（コマンドライン引数またはGUI）
@@ -2805,22 +2735,11 @@ if __name__ == "__main__":
     analyzer.load_data()
     analyzer.process_data()
 
-    # Phase 1-10実行
-    analyzer.export_phase1()
-    analyzer.export_phase2()
-    analyzer.export_phase3()
-    analyzer.export_phase6()
-    analyzer.export_phase7()
-    analyzer.export_phase8()
-    analyzer.export_phase10()
-
-    # Phase 12-14実行（MAP統合対応）
-    analyzer.export_phase12()
-    analyzer.export_phase13()
-    analyzer.export_phase14()
-
-    # 統合品質レポート
-    analyzer.generate_overall_quality_report()
+    # Phase 1-14 + 統合品質レポート（依存関係の順に並列実行、変更のないPhaseはスキップ）
+    from phase_pipeline import run_pipeline
+    status = run_pipeline(analyzer, targets=args.phase, workers=args.workers, use_cache=not args.no_cache)
+    if args.phase:
+        sys.exit(1 if 'failed' in status.values() else 0)
 
     # スタンドアロン人口データ生成（Phase1出力を入力として使用）
     print()
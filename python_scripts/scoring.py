@@ -0,0 +1,126 @@
+"""
+スコアリング・区分の定義（2026-01-20追加）
+
+転職意欲・緊急度スコア（Phase 10）、希少性ランク（Phase 13）、年齢層（process_data）の閾値を
+データとして定義し、np.select / pd.cut で列単位に適用する。
+以前は各Phaseが if/elif の関数を iterrows() / Series.apply() で1行ずつ呼んでいた。
+
+閾値の段（STEPS）は if/elif と同じく上から順に判定し、最初に一致した段の値を返す:
+
+    URGENCY_RANK_STEPS = [('<=', 2, 'D: 低い'), ('<=', 4, 'C: やや低い'), ...]
+    # → if score <= 2: 'D: 低い' elif score <= 4: 'C: やや低い' ... else: URGENCY_RANK_DEFAULT
+
+使用例:
+    import scoring
+
+    df['urgency_score'] = scoring.urgency_score(df)
+    df['urgency_rank'] = scoring.urgency_rank(df['urgency_score'])
+    buckets = scoring.age_bucket(df['age'])
+"""
+
+import operator
+
+import numpy as np
+import pandas as pd
+
+from config import AGE_BINS_5, AGE_BINS_10, AGE_LABELS_5, AGE_LABELS_10
+from constants import EmploymentStatus
+
+OPERATORS = {
+    '==': operator.eq,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# ========================================
+# 転職意欲・緊急度スコア（Phase 10、0-9点）
+# ========================================
+
+# 列ごとの配点: (段, どの段にも当てはまらない場合の点)
+URGENCY_SCORE_RULES = {
+    # 1. 希望勤務地数（0-3点）
+    '希望勤務地数': ([('==', 0, 0), ('<=', 2, 1), ('<=', 5, 2)], 3),
+    # 2. 資格数（0-2点）
+    'qualification_count': ([('>=', 3, 2), ('>=', 1, 1)], 0),
+    # 3. 国家資格保有（+2点）
+    'has_national_license': ([('==', True, 2)], 0),
+    # 4. 就業状態（0-2点）
+    'employment_status': ([('==', EmploymentStatus.UNEMPLOYED, 2), ('==', EmploymentStatus.EMPLOYED, 1)], 0),
+}
+
+URGENCY_RANK_STEPS = [('<=', 2, 'D: 低い'), ('<=', 4, 'C: やや低い'), ('<=', 6, 'B: 中程度')]
+URGENCY_RANK_DEFAULT = 'A: 高い'
+
+# ========================================
+# 希少性ランク（Phase 13、希少性スコア = 1 / 人数）
+# ========================================
+
+RARITY_RANK_STEPS = [
+    ('>=', 1.0, 'S: 超希少（1人のみ）'),
+    ('>=', 0.5, 'A: 非常に希少（2人）'),
+    ('>=', 0.2, 'B: 希少（3-5人）'),
+    ('>=', 0.05, 'C: やや希少（6-20人）'),
+]
+RARITY_RANK_DEFAULT = 'D: 一般的（20人超）'
+
+
+def apply_steps(values, steps, default):
+    """閾値の段を上から順に判定し、最初に一致した段の値を返す（np.select）
+
+    Args:
+        values: 判定する値（Series / 配列）。欠損はどの段にも一致しない
+        steps: [(演算子, 閾値, 値), ...]（演算子は OPERATORS のキー）
+        default: どの段にも一致しない場合の値
+
+    Returns:
+        np.ndarray: 値が文字列ならobject配列、数値ならその型の配列
+    """
+    values = np.asarray(values)
+    conditions = [np.asarray(OPERATORS[op](values, threshold), dtype=bool) for op, threshold, _ in steps]
+    choices = [value for _, _, value in steps]
+    if any(isinstance(value, str) for value in choices + [default]):
+        choices = [np.full(len(values), value, dtype=object) for value in choices]
+        default = np.full(len(values), default, dtype=object)
+    return np.select(conditions, choices, default=default)
+
+
+def cut_labels(values, bins, labels):
+    """上限を含む区間（bins）で区分し、ラベルのobject配列を返す（pd.cut）
+
+    両端の区間は開いている（最初の上限以下はすべて labels[0]、最後の下限超はすべて labels[-1]）。
+    値は整数に切り捨ててから区分する（int(age) で判定していた従来と同じ）。欠損は None。
+    """
+    values = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+    edges = [-np.inf] + list(bins[1:-1]) + [np.inf]
+    codes = pd.cut(np.trunc(values), edges, labels=False, right=True)
+    return np.array(labels + [None], dtype=object)[np.where(np.isnan(codes), len(labels), codes).astype(int)]
+
+
+def age_bucket(ages):
+    """年齢層（10年単位: 20代/30代/.../70歳以上）"""
+    return cut_labels(ages, AGE_BINS_10, AGE_LABELS_10)
+
+
+def age_group_5year(ages):
+    """年齢層（5区分: 20代以下/30代/40代/50代/60代以上）"""
+    return cut_labels(ages, AGE_BINS_5, AGE_LABELS_5)
+
+
+def urgency_score(df):
+    """転職意欲・緊急度スコア（URGENCY_SCORE_RULES の合計、int64配列）"""
+    score = np.zeros(len(df), dtype=np.int64)
+    for column, (steps, default) in URGENCY_SCORE_RULES.items():
+        score += apply_steps(df[column], steps, default).astype(np.int64)
+    return score
+
+
+def urgency_rank(scores):
+    """緊急度ランク（A: 高い / B: 中程度 / C: やや低い / D: 低い）"""
+    return apply_steps(scores, URGENCY_RANK_STEPS, URGENCY_RANK_DEFAULT)
+
+
+def rarity_rank(scores):
+    """希少性ランク（S: 超希少 〜 D: 一般的）"""
+    return apply_steps(scores, RARITY_RANK_STEPS, RARITY_RANK_DEFAULT)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+希望勤務地のファクトテーブル（Phase 6/12/13/14）のテスト
+
+従来の iterrows() 版（benchmark_area_facts.legacy_*）と同じ出力になること、
+ファクトテーブルが processed_data に対して1回だけ作られることを確認する。
+
+作成日: 2026-01-20
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import benchmark_area_facts as legacy
+from benchmark_process_data import make_analyzer, make_applicants
+
+
+def _analyzers(df):
+    """現在の版と従来版（processed_data の欠損は None）のインスタンス"""
+    analyzer = make_analyzer(df)
+    analyzer.process_data()
+    analyzer.geocache = {'東京都港区': {'lat': 35.66, 'lng': 139.75}, '大阪府': {'lat': 34.69}}
+    analyzer.municipality_coords = {'北海道札幌市': (43.06, 141.35)}
+    before = make_analyzer(df)
+    before.__dict__.update(analyzer.__dict__)
+    before.processed_data = legacy.legacy_input(analyzer.processed_data)
+    return analyzer, before
+
+
+class TestAreaFacts(unittest.TestCase):
+
+    def assert_same_as_legacy(self, df):
+        analyzer, before = _analyzers(df)
+        current, previous = analyzer.processed_data, before.processed_data
+        flow_edges = legacy.legacy_flow_edges(before, previous)
+        pairs = {
+            'flow_edges': (analyzer._generate_flow_edges(current), flow_edges),
+            'aggregated_flow_edges': (analyzer._generate_aggregated_flow_edges(flow_edges),
+                                      legacy.legacy_aggregated_flow_edges(before, flow_edges)),
+            'flow_nodes': (analyzer._generate_flow_nodes(current), legacy.legacy_flow_nodes(before, previous)),
+            'proximity': (analyzer._generate_proximity_analysis(current),
+                          legacy.legacy_proximity_analysis(before, previous)),
+            'supply_demand_gap': (analyzer._generate_supply_demand_gap(), legacy.legacy_supply_demand_gap(before)),
+            'rarity_score': (analyzer._generate_rarity_score(), legacy.legacy_rarity_score(before)),
+            'competition_profile': (analyzer._generate_competition_profile(),
+                                    legacy.legacy_competition_profile(before)),
+        }
+        for name, (actual, expected) in pairs.items():
+            with self.subTest(name):
+                self.assertFalse(expected.empty)
+                pd.testing.assert_frame_equal(actual, expected)
+        return analyzer
+
+    def test_synthetic_applicants(self):
+        self.assert_same_as_legacy(make_applicants(3000, seed=3))
+
+    def test_small_groups_with_ties(self):
+        # 地点ごとの件数が少なく、最頻の年齢層・就業状態が同数になる地点が多い
+        for seed in range(3):
+            self.assert_same_as_legacy(make_applicants(40, seed=seed))
+
+    def test_edge_cases(self):
+        df = pd.DataFrame({
+            'age_gender': ['30歳 男性', '35歳女性', None, '45歳 女性', '52歳男性'],
+            'location': ['東京都港区', '京都府', None, '北海道札幌市', '大阪府大阪市'],
+            'desired_area': ['東京都港区,神奈川県横浜市,東京都', '京都府,大阪府', '東京都港区', None, '大阪府大阪市'],
+            'employment_status': ['就業中', None, '離職中', '就業中', '在学中'],
+            'qualifications': ['看護師', None, '保育士', '准看護師', ''],
+        })
+        analyzer = self.assert_same_as_legacy(df)
+        # 居住地と同じ市区町村・居住地不明の希望はフローにならない
+        edges = analyzer._generate_flow_edges(analyzer.processed_data)
+        self.assertEqual(edges['origin'].tolist(), ['東京都港区', '東京都港区'])
+        self.assertEqual(edges['destination'].tolist(), ['神奈川県横浜市', '東京都'])
+
+    def test_facts_built_once(self):
+        analyzer, _ = _analyzers(make_applicants(500, seed=4))
+        facts = analyzer._desired_area_facts()
+        self.assertIs(analyzer._desired_area_facts(analyzer.processed_data), facts)
+        self.assertEqual(len(facts), len(analyzer.desired_areas_long))
+        self.assertIsInstance(facts['location'].dtype, pd.CategoricalDtype)
+
+        # processed_data の一部を渡した場合はリスト列から作成（同じ行は同じ内容）
+        subset = analyzer.processed_data.iloc[100:200]
+        part = analyzer._desired_area_facts(subset)
+        expected = facts[facts['row'].between(100, 199)].drop(columns='row').reset_index(drop=True)
+        pd.testing.assert_frame_equal(part.drop(columns='row').astype(str), expected.astype(str))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Layer B トークン化ステージ（layer_b_tokens）のテスト
+
+原稿を内容ハッシュ単位で1回だけトークナイズし、DBに保存したトークンID配列を別接続からも再利用できること、
+トークナイザ設定の変更で保存済みトークンが破棄されること、
+B-4（単語共起）と 6つの問い分析がトークン化・分析結果の共有前と同じ結果になることを確認する。
+
+作成日: 2026-01-20
+"""
+
+import importlib.util
+import math
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from layer_b_tokens import TokenStore, content_hash
+
+WORDS = ["夜勤", "日勤", "車通勤", "賞与", "託児所", "残業なし", "研修", "ブランク可", "駅近", "寮", "有給", "週休二日"]
+
+
+def _make_docs(n, seed=0):
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(n):
+        k = rng.randint(1, 8)
+        docs.append(" ".join(rng.choice(WORDS) for _ in range(k)))
+    return docs
+
+
+class CountingTokenizer:
+    """呼び出し回数を数える空白区切りトークナイザ"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return text.split()
+
+
+class TestTokenStore(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp.name, "geocoded_postings.db")
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("CREATE TABLE postings (id INTEGER PRIMARY KEY, job_type TEXT, job_description TEXT)")
+        docs = _make_docs(50)
+        self.conn.executemany(
+            "INSERT INTO postings (job_type, job_description) VALUES (?, ?)",
+            [("介護職" if i % 2 else "看護師", d) for i, d in enumerate(docs)] + [("介護職", None), ("介護職", "")],
+        )
+        self.conn.commit()
+        self.docs = docs
+
+    def tearDown(self):
+        self.conn.close()
+        self._tmp.cleanup()
+
+    def test_encode_matches_tokenizer(self):
+        tok = CountingTokenizer()
+        store = TokenStore(self.conn, tok, "ws:1")
+        encoded = store.encode(self.docs + ["", None])
+        self.assertEqual([store.decode(ids) for ids in encoded[:-2]], [d.split() for d in self.docs])
+        self.assertEqual([len(ids) for ids in encoded[-2:]], [0, 0])
+        self.assertEqual(tok.calls, len(set(self.docs)))  # 同一文面は1回
+
+        # 別スコープで同じ原稿を引いてもトークナイズしない
+        store.encode(self.docs[:10])
+        self.assertEqual(tok.calls, len(set(self.docs)))
+
+    def test_persisted_across_connections(self):
+        store = TokenStore(self.conn, CountingTokenizer(), "ws:1")
+        added = store.build("SELECT job_description FROM postings")
+        self.assertEqual(added, len(set(self.docs)))
+        expected = [store.decode(ids) for ids in store.encode(self.docs)]
+
+        conn2 = sqlite3.connect(self.db_path)
+        try:
+            tok = CountingTokenizer()
+            store2 = TokenStore(conn2, tok, "ws:1")
+            self.assertEqual(store2.build("SELECT job_description FROM postings"), 0)
+            self.assertEqual([store2.decode(ids) for ids in store2.encode(self.docs)], expected)
+            self.assertEqual(tok.calls, 0)
+            blob = conn2.execute(
+                "SELECT token_ids FROM layer_b_token_docs WHERE content_hash = ?", (content_hash(self.docs[0]),)
+            ).fetchone()[0]
+            self.assertEqual(len(blob), 4 * len(self.docs[0].split()))  # uint32
+        finally:
+            conn2.close()
+
+    def test_signature_change_invalidates(self):
+        TokenStore(self.conn, CountingTokenizer(), "ws:1").build("SELECT job_description FROM postings")
+        tok = CountingTokenizer()
+        store = TokenStore(self.conn, tok, "ws:2")
+        self.assertEqual(store.vocab_size, 0)
+        store.encode(self.docs)
+        self.assertEqual(tok.calls, len(set(self.docs)))
+
+    def test_rank_is_string_order(self):
+        store = TokenStore(self.conn, CountingTokenizer(), "ws:1")
+        store.encode(self.docs)
+        rank = store.rank()
+        by_rank = sorted(range(store.vocab_size), key=lambda i: rank[i])
+        self.assertEqual([store.token(i) for i in by_rank], sorted(store.token(i) for i in range(store.vocab_size)))
+
+
+def _legacy_word_cooccurrence(docs, tokenizer, jt, emp_type, scope_name, clb):
+    """トークンID化する前の B-4（文字列トークンで集計）"""
+    n_docs = len(docs)
+    if n_docs < clb.MIN_COUNT_FOR_STATS:
+        return []
+    word_doc_freq = Counter()
+    doc_token_sets = []
+    for doc in docs:
+        tokens = set(tokenizer(doc))
+        if len(tokens) < 2:
+            doc_token_sets.append([])
+            continue
+        for t in tokens:
+            word_doc_freq[t] += 1
+        doc_token_sets.append(sorted(tokens))
+    pair_doc_freq = Counter()
+    for sorted_tokens in doc_token_sets:
+        frequent = [t for t in sorted_tokens if word_doc_freq[t] >= clb.B4_MIN_WORD_FREQ]
+        for i in range(len(frequent)):
+            for j in range(i + 1, len(frequent)):
+                pair_doc_freq[(frequent[i], frequent[j])] += 1
+    rows = []
+    for (w_a, w_b), cooc in pair_doc_freq.items():
+        if cooc < clb.B4_MIN_COOCCURRENCE:
+            continue
+        freq_a, freq_b = word_doc_freq[w_a], word_doc_freq[w_b]
+        if freq_a < clb.B4_MIN_WORD_FREQ or freq_b < clb.B4_MIN_WORD_FREQ:
+            continue
+        p_a, p_b, p_ab = freq_a / n_docs, freq_b / n_docs, cooc / n_docs
+        pmi = math.log2(p_ab / (p_a * p_b))
+        npmi = pmi / (-math.log2(p_ab)) if p_ab < 1.0 else 0.0
+        if npmi < clb.B4_MIN_NPMI:
+            continue
+        rows.append((jt, emp_type, scope_name, w_a, w_b, cooc, round(pmi, 4), round(npmi, 4), freq_a, freq_b, n_docs))
+    rows.sort(key=lambda x: x[7], reverse=True)
+    return rows[:clb.B4_TOP_PAIRS_PER_SCOPE]
+
+
+@unittest.skipUnless(importlib.util.find_spec("sklearn"), "scikit-learn 未インストール")
+class TestWordCooccurrence(unittest.TestCase):
+
+    def test_matches_string_tokens(self):
+        import compute_layer_b as clb
+        conn = sqlite3.connect(":memory:")
+        try:
+            store = TokenStore(conn, str.split, "ws:1")
+            store.encode(_make_docs(30, seed=9))  # 語彙の追加順を文字列順と変えておく
+            for seed in range(3):
+                docs = _make_docs(300, seed=seed)
+                expected = _legacy_word_cooccurrence(docs, str.split, "介護職", "全体", "全国", clb)
+                actual = clb._compute_word_cooccurrence_for_docs(store.encode(docs), "介護職", "全体", "全国", store)
+                self.assertTrue(expected)
+                self.assertEqual(actual, expected)
+        finally:
+            conn.close()
+
+
+class TestAnalyzePostings(unittest.TestCase):
+
+    def test_reused_results_match(self):
+        import compute_layer_b_6q as q6
+        text = "【急募】日勤のみ・残業なし！未経験歓迎、資格取得支援あり。賞与年2回、車通勤可。"
+        rows = [
+            {"job_type": "介護職", "employment_type": emp, "prefecture": pref, "municipality": muni,
+             "headline": text if i % 3 else text + str(i), "job_description": None,
+             "requirements": "", "benefits": "託児所あり"}
+            for i, (emp, pref, muni) in enumerate([
+                ("正職員", "東京都", "新宿区"), ("パート・バイト", "東京都", "新宿区"),
+                ("正職員", "大阪府", "大阪市"), ("正職員", "北海道", "札幌市"), ("パート・バイト", "京都府", ""),
+            ])
+        ]
+        rows.append({"job_type": "介護職", "employment_type": "正職員", "prefecture": "東京都", "municipality": "",
+                     "headline": None, "job_description": "", "requirements": None, "benefits": " "})
+        scores, reused = q6.analyze_postings(rows)
+        expected = [s for s in (q6.analyze_single_posting(r) for r in rows) if s]
+        self.assertEqual(scores, expected)
+        self.assertEqual(reused, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
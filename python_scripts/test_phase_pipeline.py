@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Phase実行DAG（phase_pipeline）のテスト
+
+依存先の解決、共有DataFrame（Arrow IPC）の往復、並列実行と1プロセス実行で同じ出力になること、
+変更のないPhaseが再実行時にスキップされることを確認する。
+
+作成日: 2026-01-20
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import phase_pipeline
+from benchmark_process_data import make_applicants
+from run_complete_v2_perfect import PerfectJobSeekerAnalyzer
+
+
+def _run(df, **kwargs):
+    """一時ディレクトリで process_data とPhaseを実行し、(状態, 出力ファイル→内容) を返す"""
+    analyzer = PerfectJobSeekerAnalyzer('test.csv')
+    analyzer.df_normalized = df
+    analyzer.process_data()
+    status = phase_pipeline.run_pipeline(analyzer, **kwargs)
+    outputs = {p.as_posix(): p.read_bytes() for p in sorted(Path('data/output_v2').rglob('*.csv'))}
+    return status, outputs
+
+
+class TestPhasePipeline(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+
+    def chdir(self, name):
+        path = Path(self._tmp.name) / name
+        path.mkdir()
+        os.chdir(path)
+
+    def test_resolve_tasks(self):
+        self.assertEqual(phase_pipeline.resolve_tasks(['12']), ['phase1', 'phase12'])
+        self.assertEqual(phase_pipeline.resolve_tasks([3, 'phase2']), ['phase1', 'phase2', 'phase3'])
+        self.assertEqual(phase_pipeline.resolve_tasks(['overall']), list(phase_pipeline.PHASE_TASKS))
+        self.assertEqual(phase_pipeline.resolve_tasks(None), list(phase_pipeline.PHASE_TASKS))
+        with self.assertRaises(ValueError):
+            phase_pipeline.resolve_tasks(['5'])
+
+    def test_shared_frame_round_trip(self):
+        analyzer = PerfectJobSeekerAnalyzer.__new__(PerfectJobSeekerAnalyzer)
+        analyzer.df_normalized = make_applicants(500, seed=5).set_index(pd.RangeIndex(10, 510))
+        analyzer.process_data()
+        with tempfile.TemporaryDirectory() as tmp:
+            paths, digest = phase_pipeline.share_frames(analyzer, tmp)
+            self.assertEqual(set(paths), set(phase_pipeline.SHARED_FRAMES))
+            for name, path in paths.items():
+                with self.subTest(name):
+                    pd.testing.assert_frame_equal(phase_pipeline.read_frame(path), getattr(analyzer, name))
+            self.assertEqual(phase_pipeline.share_frames(analyzer, tmp)[1], digest)
+
+    def test_parallel_matches_sequential_and_cache(self):
+        df = make_applicants(400, seed=6)
+        targets = ['3', '12', '13']
+
+        self.chdir('sequential')
+        status, sequential = _run(df, targets=targets, workers=1)
+        self.assertEqual(set(status.values()), {'ran'})
+
+        self.chdir('parallel')
+        status, parallel = _run(df, targets=targets, workers=3)
+        self.assertEqual(set(status.values()), {'ran'})
+        self.assertEqual(list(parallel), list(sequential))
+        self.assertTrue(any('phase12' in name for name in parallel))
+        for name in sequential:
+            with self.subTest(name):
+                self.assertEqual(parallel[name], sequential[name])
+
+        # 再実行: 変更がなければ全タスクをスキップ
+        status, _ = _run(df, targets=targets, workers=1)
+        self.assertEqual(set(status.values()), {'cached'})
+
+        # 出力を消したPhaseだけ再実行し、入力データが変われば全部再実行
+        Path('data/output_v2/phase13/Phase13_RarityScore.csv').unlink()
+        status, _ = _run(df, targets=targets, workers=1)
+        self.assertEqual(status, {'phase1': 'cached', 'phase3': 'cached', 'phase12': 'cached', 'phase13': 'ran'})
+        status, _ = _run(df.iloc[1:], targets=targets, workers=1)
+        self.assertEqual(set(status.values()), {'ran'})
+
+    def test_failed_task_skips_dependents(self):
+        self.chdir('failed')
+        analyzer = PerfectJobSeekerAnalyzer('test.csv')
+        analyzer.df_normalized = make_applicants(50, seed=7)
+        analyzer.process_data()
+        analyzer.export_phase1 = None  # 呼び出しで TypeError
+        status = phase_pipeline.run_pipeline(analyzer, targets=['12', '2'], workers=1)
+        self.assertEqual(status, {'phase1': 'failed', 'phase2': 'ran', 'phase12': 'skipped'})
+
+
+if __name__ == '__main__':
+    unittest.main()
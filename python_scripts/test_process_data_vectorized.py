@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+PerfectJobSeekerAnalyzer.process_data（列単位のベクトル化版）のテスト
+
+従来の iterrows() 版（benchmark_process_data.legacy_process_data）と同じ processed_data になること、
+希望勤務地の縦持ちテーブルが desired_areas のリスト列と一致することを確認する。
+
+作成日: 2026-01-20
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_process_data import legacy_process_data, make_analyzer, make_applicants
+from config import MAX_DESIRED_LOCATIONS
+
+
+class TestProcessDataVectorized(unittest.TestCase):
+
+    def assert_same_as_legacy(self, df):
+        analyzer = make_analyzer(df)
+        actual = analyzer.process_data()
+        expected = legacy_process_data(make_analyzer(df))
+        pd.testing.assert_frame_equal(actual, expected)
+        return analyzer
+
+    def test_synthetic_applicants(self):
+        analyzer = self.assert_same_as_legacy(make_applicants(5000, seed=1))
+        self.assertLessEqual(analyzer.processed_data['希望勤務地数'].max(), MAX_DESIRED_LOCATIONS)
+
+    def test_edge_cases(self):
+        df = pd.DataFrame({
+            'age_gender': ['30歳 男性', '３５歳女性', '45歳', None, '歳男性', '70歳　女性', 52, '29歳男性です'],
+            'location': [' 東京都港区 ', '京都府', '東京都', '不明', None, '北海道\n札幌市', 13, '大阪府大阪市'],
+            'desired_area': ['東京都港区, 神奈川県横浜市,,不明', '', ' , ', None, '京都府,東京都',
+                             ','.join(['埼玉県さいたま市'] * (MAX_DESIRED_LOCATIONS + 5)), 3.5, '沖縄県'],
+            'qualifications': ['看護師, 介護福祉士', ' ', None, '准看護師', '保育士,,', '看護師長', 0, ''],
+            'status': ['A', None, 'B', 'C', None, 'D', 'E', 'F'],
+        }, index=[10, 11, 12, 20, 21, 22, 30, 31])
+        self.assert_same_as_legacy(df)
+
+    def test_columns_missing_or_empty(self):
+        self.assert_same_as_legacy(pd.DataFrame({'age_gender': [None, None], 'other': [1, 2]}))
+        analyzer = make_analyzer(pd.DataFrame(columns=['age_gender', 'location', 'desired_area']))
+        self.assertTrue(analyzer.process_data().empty)
+        self.assertTrue(analyzer.desired_areas_long.empty)
+
+    def test_desired_areas_long_matches_lists(self):
+        df = make_applicants(2000, seed=2)
+        analyzer = make_analyzer(df)
+        processed = analyzer.process_data()
+        long = analyzer.desired_areas_long
+        expected = [(row_id, position, area['prefecture'], area['municipality'], area['full'])
+                    for row_id, areas in zip(processed['id'], processed['desired_areas'])
+                    for position, area in enumerate(areas)]
+        self.assertEqual(list(long.itertuples(index=False, name=None)), expected)
+        np.testing.assert_array_equal(long.groupby('id').size().reindex(processed['id'], fill_value=0),
+                                      processed['希望勤務地数'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+scoring（緊急度スコア・希少性ランク・年齢層）のテスト
+
+従来の if/elif 版（benchmark_scoring.legacy_*）と同じ結果になること、
+Phase 10 のデータ生成全体が従来版と同じ出力になることを確認する。
+
+作成日: 2026-01-20
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import scoring
+from benchmark_process_data import make_analyzer, make_applicants
+from benchmark_scoring import (legacy_age_bucket, legacy_age_group_5year, legacy_rarity_rank,
+                               legacy_urgency_score, run_phase10)
+
+
+class TestScoring(unittest.TestCase):
+
+    def test_age_buckets(self):
+        ages = list(range(-5, 121)) + [None, np.nan, 29.7, 30.0, 69.99, np.int64(45)]
+        self.assertEqual(scoring.age_bucket(ages).tolist(), [legacy_age_bucket(a) for a in ages])
+        self.assertEqual(scoring.age_group_5year(ages).tolist(), [legacy_age_group_5year(a) for a in ages])
+        self.assertEqual(scoring.age_bucket(pd.Series([], dtype=float)).tolist(), [])
+
+    def test_rarity_rank(self):
+        scores = np.concatenate([1 / np.arange(1, 40), [0.0, 1.5, 0.5, 0.2, 0.05, 0.0499]])
+        self.assertEqual(scoring.rarity_rank(scores).tolist(), [legacy_rarity_rank(s) for s in scores])
+
+    def test_apply_steps_first_match_wins(self):
+        steps = [('>=', 10, 'high'), ('>=', 5, 'mid'), ('==', 7, 'never')]
+        self.assertEqual(scoring.apply_steps([12, 7, 5, 1, np.nan], steps, 'low').tolist(),
+                         ['high', 'mid', 'mid', 'low', 'low'])
+        self.assertEqual(scoring.apply_steps([0, 3], [('<=', 2, 1)], 4).tolist(), [1, 4])
+
+    def test_urgency_score(self):
+        df = pd.DataFrame({
+            '希望勤務地数': [0, 1, 2, 3, 5, 6, 50, 0],
+            'qualification_count': [0, 1, 2, 3, 4, 0, 3, 1],
+            'has_national_license': [False, True, False, True, True, False, True, False],
+            'employment_status': ['就業中', '離職中', '在学中', None, '離職中', '就業中', '離職中', '不明'],
+        })
+        expected = legacy_urgency_score(df)
+        actual = make_analyzer(None)._calculate_urgency_score(df)
+        pd.testing.assert_frame_equal(actual, expected)
+        self.assertEqual(actual['urgency_score'].max(), 9)
+
+    def test_phase10_matches_legacy(self):
+        analyzer = make_analyzer(make_applicants(3000, seed=5))
+        processed = analyzer.process_data()
+        processed_before = processed.copy(deep=True)
+        current = run_phase10(analyzer)
+        expected = run_phase10(analyzer, legacy=True)
+        for method, frame in expected.items():
+            with self.subTest(method):
+                pd.testing.assert_frame_equal(current[method], frame)
+        # processed_data には列を追加しない
+        pd.testing.assert_frame_equal(analyzer.processed_data, processed_before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,6 +18,8 @@ from typing import Optional, Union
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+import instrumentation  # 2026-01-20: クエリ・Tursoリクエストの所要時間（/metrics）
+
 # .env ファイルを読み込み
 load_dotenv()
 
@@ -111,6 +113,7 @@ def get_connection() -> Union[sqlite3.Connection, "psycopg2.extensions.connectio
         return sqlite3.connect(str(DB_PATH))
 
 
+@instrumentation.timed("turso.request")
 async def _turso_async_query(sql: str, params: list = None) -> tuple:
     """Turso非同期クエリ実行"""
     async with libsql_client.create_client(
@@ -131,6 +134,7 @@ def _convert_sql_placeholders(sql: str, db_type: str) -> str:
     return sql
 
 
+@instrumentation.timed("db.query_df")
 def query_df(sql: str, params: Optional[tuple] = None) -> pd.DataFrame:
     """SQLクエリを実行してDataFrameとして取得（全DB対応）"""
     db_type = get_db_type()
@@ -178,14 +182,17 @@ def query_df(sql: str, params: Optional[tuple] = None) -> pd.DataFrame:
 
 
 def _get_cached(key: str):
-    """キャッシュからデータを取得"""
+    """キャッシュからデータを取得（2026-01-20: ヒット・ミスを /metrics に計上）"""
     if key not in _cache:
+        instrumentation.incr("cache_misses_total", namespace="db")
         return None
     elapsed = datetime.now() - _cache_time[key]
     if elapsed > timedelta(minutes=_ttl_minutes):
         del _cache[key]
         del _cache_time[key]
+        instrumentation.incr("cache_misses_total", namespace="db")
         return None
+    instrumentation.incr("cache_hits_total", namespace="db")
     return _cache[key]
 
 
@@ -227,6 +234,7 @@ def get_all_data() -> pd.DataFrame:
     return df
 
 
+@instrumentation.timed("db.get_prefectures")
 def get_prefectures() -> list:
     """都道府県一覧を取得（北から南の標準順序）"""
     if _HAS_TURSO:
@@ -240,6 +248,7 @@ def get_prefectures() -> list:
         return _sort_prefectures(prefectures)
 
 
+@instrumentation.timed("db.get_municipalities")
 def get_municipalities(prefecture: str) -> list:
     """指定都道府県の市区町村一覧を取得"""
     if _HAS_TURSO:
@@ -279,6 +288,7 @@ def query_municipality(prefecture: str, municipality: str = None) -> pd.DataFram
     return df
 
 
+@instrumentation.timed("db.get_filtered_data")
 def get_filtered_data(prefecture: str, municipality: str = None) -> pd.DataFrame:
     """サーバーサイドフィルタリング: 指定地域のデータのみ取得
 
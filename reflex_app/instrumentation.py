@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+パフォーマンス計測（スパン・ヒストグラム・カウンタ）とPrometheus形式の出力（2026-01-20追加）
+
+以前はNiceGUI版が [DB] / [CACHE] の print、Reflex版が固定パス（Windows）の perf_timing.log に
+計測値を書き出しており、Render上ではログを読まないとホットパスが分からなかった。
+
+このモジュールはプロセス内で計測値を集計し、/metrics（Prometheus text形式）で返す:
+    - スパン: span() / start_span() / @timed で区間の所要時間を計測（名前ごとのヒストグラム）
+    - ヒストグラム: 件数・合計・最大と、直近 PERF_WINDOW 件から求める p50 / p95 / p99
+    - カウンタ: incr()（キャッシュのヒット・ミスなど）
+    - コレクタ: register_collector() で /metrics 出力時に既存の統計（cache_manager など）を読む
+    - トレース: PERF_TRACE_PATH を指定すると、終了したスパンを1行1JSON（JSONL）で追記
+
+nicegui_app/ と reflex_app/ に同じ内容のファイルを置いている（Renderのデプロイ単位が別のため）。
+変更する場合は両方を更新すること。
+
+使用例:
+    import instrumentation
+
+    @instrumentation.timed("db.get_filtered_data")
+    def get_filtered_data(...): ...
+
+    with instrumentation.span("choropleth.render", prefecture=pref) as s:
+        ...
+        s.set(polygons=n)
+
+    instrumentation.incr("cache_hits_total", namespace="db")
+    instrumentation.render_prometheus()   # /metrics の本文
+
+環境変数:
+    PERF_METRICS: 0 で計測を無効化（デフォルト1）
+    PERF_TRACE_PATH: スパンのJSONL出力先（未指定なら出力しない）
+    PERF_WINDOW: パーセンタイル計算に使う直近の観測数（デフォルト1024）
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except (TypeError, ValueError):
+        print(f"[PERF] Invalid {name}={os.getenv(name)!r}, using {default}")
+        return default
+
+
+ENABLED = os.getenv("PERF_METRICS", "1") != "0"
+WINDOW = _env_int("PERF_WINDOW", 1024)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+Sample = Tuple[Dict[str, Any], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+# =====================================
+# ヒストグラム・カウンタ
+# =====================================
+class _Histogram:
+    """件数・合計・最大と、直近 WINDOW 件の観測値（パーセンタイル用）"""
+
+    __slots__ = ("count", "total", "max", "errors", "window")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.window: deque = deque(maxlen=WINDOW)
+
+    def add(self, value: float, error: bool):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.window.append(value)
+        if error:
+            self.errors += 1
+
+    def quantiles(self) -> Dict[float, float]:
+        values = sorted(self.window)
+        if not values:
+            return {q: 0.0 for q in QUANTILES}
+        return {q: values[min(len(values) - 1, int(round(q * (len(values) - 1))))] for q in QUANTILES}
+
+
+_lock = threading.Lock()
+_histograms: Dict[str, _Histogram] = {}
+_counters: Dict[Tuple[str, LabelKey], float] = {}
+_collectors: List[Collector] = []
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def incr(name: str, value: float = 1, **labels) -> None:
+    """カウンタを加算（name は Prometheus のメトリクス名、例: cache_hits_total）"""
+    if not ENABLED:
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, error: bool = False, **attrs) -> None:
+    """他で計測した所要時間をスパンとして記録（attrs はトレースにのみ出力）"""
+    if not ENABLED:
+        return
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = _Histogram()
+        hist.add(seconds, error)
+    if _trace_path:
+        _write_trace({"span": name, "ms": round(seconds * 1000, 3), "error": error, **attrs})
+
+
+def register_collector(collector: Collector) -> None:
+    """/metrics 出力時に呼ぶコレクタを登録
+
+    collector() は (メトリクス名, 種類 "counter"/"gauge", 説明, [(ラベルdict, 値), ...]) を返す。
+    """
+    with _lock:
+        if collector not in _collectors:
+            _collectors.append(collector)
+
+
+# =====================================
+# スパン
+# =====================================
+_current_span: contextvars.ContextVar = contextvars.ContextVar("perf_current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """計測中の区間（end() で記録。2回目以降の end() は無視）"""
+
+    __slots__ = ("name", "attrs", "span_id", "parent_id", "started", "ended")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        parent = _current_span.get()
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(_span_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.started = time.perf_counter()
+        self.ended = False
+
+    def set(self, **attrs) -> "Span":
+        """トレースに出力する属性を追加"""
+        self.attrs.update(attrs)
+        return self
+
+    def end(self, error: Optional[BaseException] = None) -> float:
+        """区間を終了して記録し、所要時間（秒）を返す"""
+        elapsed = time.perf_counter() - self.started
+        if self.ended:
+            return elapsed
+        self.ended = True
+        if error is not None:
+            self.attrs["error_type"] = type(error).__name__
+        observe(self.name, elapsed, error=error is not None, id=self.span_id, parent=self.parent_id, **self.attrs)
+        return elapsed
+
+
+def start_span(name: str, **attrs) -> Span:
+    """区間の計測を開始（with で囲めない箇所用。end() を呼ぶまで記録されない）"""
+    return Span(name, attrs)
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    """with ブロックの所要時間を name のスパンとして記録（中のスパンは子になる）"""
+    current = Span(name, attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """関数（同期・async）の所要時間をスパンとして記録するデコレータ（name 省略時は関数名）"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not ENABLED:
+                    return await func(*args, **kwargs)
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+# =====================================
+# トレース（JSONL）
+# =====================================
+_trace_lock = threading.Lock()
+_trace_path: Optional[str] = None
+_trace_file = None
+
+
+def configure_trace(path: Optional[str]) -> None:
+    """トレースの出力先を設定（None で停止）"""
+    global _trace_path, _trace_file
+    with _trace_lock:
+        if _trace_file is not None:
+            _trace_file.close()
+            _trace_file = None
+        _trace_path = path or None
+
+
+def _write_trace(record: Dict[str, Any]) -> None:
+    global _trace_file
+    record = {"ts": round(time.time(), 3), **record}
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _trace_lock:
+        if _trace_path is None:
+            return
+        try:
+            if _trace_file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(_trace_path)), exist_ok=True)
+                _trace_file = open(_trace_path, "a", encoding="utf-8", buffering=1)
+            _trace_file.write(line + "\n")
+        except OSError as e:
+            print(f"[PERF] Trace output disabled ({_trace_path}): {e}")
+            _disable_trace_locked()
+
+
+def _disable_trace_locked() -> None:
+    global _trace_path, _trace_file
+    if _trace_file is not None:
+        _trace_file.close()
+    _trace_path = None
+    _trace_file = None
+
+
+configure_trace(os.getenv("PERF_TRACE_PATH"))
+
+
+# =====================================
+# 出力
+# =====================================
+def snapshot() -> Dict[str, Any]:
+    """スパン（ミリ秒）とカウンタの現在値"""
+    with _lock:
+        spans = {}
+        for name, hist in sorted(_histograms.items()):
+            q = hist.quantiles()
+            spans[name] = {
+                "count": hist.count,
+                "errors": hist.errors,
+                "avg_ms": round(hist.total / hist.count * 1000, 2) if hist.count else 0.0,
+                "p50_ms": round(q[0.5] * 1000, 2),
+                "p95_ms": round(q[0.95] * 1000, 2),
+                "p99_ms": round(q[0.99] * 1000, 2),
+                "max_ms": round(hist.max * 1000, 2),
+            }
+        counters = {name + _format_labels(dict(labels)): value for (name, labels), value in sorted(_counters.items())}
+    return {"spans": spans, "counters": counters}
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value == value else "NaN"
+
+
+def render_prometheus() -> str:
+    """Prometheus text形式（0.0.4）の本文"""
+    lines = []
+    with _lock:
+        histograms = [(name, hist.count, hist.total, hist.max, hist.errors, hist.quantiles())
+                      for name, hist in sorted(_histograms.items())]
+        counters: Dict[str, List[Sample]] = {}
+        for (name, labels), value in sorted(_counters.items()):
+            counters.setdefault(name, []).append((dict(labels), value))
+        collectors = list(_collectors)
+
+    if histograms:
+        lines.append("# HELP app_span_seconds Span duration (quantiles over the last PERF_WINDOW observations)")
+        lines.append("# TYPE app_span_seconds summary")
+        for name, count, total, _, _, quantiles in histograms:
+            for q, value in quantiles.items():
+                lines.append(f"app_span_seconds{_format_labels({'span': name, 'quantile': q})} {_format_value(value)}")
+            lines.append(f"app_span_seconds_sum{_format_labels({'span': name})} {_format_value(total)}")
+            lines.append(f"app_span_seconds_count{_format_labels({'span': name})} {count}")
+        lines.append("# HELP app_span_max_seconds Longest span duration since start")
+        lines.append("# TYPE app_span_max_seconds gauge")
+        for name, _, _, longest, _, _ in histograms:
+            lines.append(f"app_span_max_seconds{_format_labels({'span': name})} {_format_value(longest)}")
+        lines.append("# HELP app_span_errors_total Spans that ended with an exception")
+        lines.append("# TYPE app_span_errors_total counter")
+        for name, _, _, _, errors, _ in histograms:
+            lines.append(f"app_span_errors_total{_format_labels({'span': name})} {errors}")
+
+    for name, samples in counters.items():
+        lines.append(f"# TYPE {name} counter")
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+
+    for collector in collectors:
+        try:
+            metrics = list(collector())
+        except Exception as e:
+            print(f"[PERF] Collector {getattr(collector, '__name__', collector)} failed: {e}")
+            continue
+        for name, metric_type, help_text, samples in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """スパン・カウンタを初期化（コレクタ・トレース設定は保持）"""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
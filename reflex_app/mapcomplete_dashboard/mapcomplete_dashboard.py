@@ -22,6 +22,13 @@ import plotly.graph_objects as go
 from .auth import AuthState, require_auth
 from .login import login_page
 
+# 計算プロパティのビューモデル層（依存フィールド・表示タブの宣言とメモ化、2026-01-20追加）
+from . import view_model
+from .view_model import HIDDEN, view_var
+
+# パフォーマンス計測（スパン・/metrics、reflex_app/instrumentation.py、2026-01-20追加）
+import instrumentation
+
 # db_helper.py のインポート（データベース統合用）
 # rootDirectoryがreflex_appなので、sys.path操作不要
 try:
@@ -1084,10 +1091,8 @@ class DashboardState(rx.State):
             return
 
         _t0 = time.time()
-        # ファイルにもログ出力（print()がバッファリングされる場合の対策）
-        _perf_log = open("C:/Users/fuji1/OneDrive/Pythonスクリプト保管/job_medley_project/reflex_app/perf_timing.log", "a", encoding="utf-8")
-        _perf_log.write(f"[PERF] === set_prefecture START: {value} ===\n")
-        _perf_log.flush()
+        # 2026-01-20変更: 固定パスの perf_timing.log をやめ、スパンとして記録（/metrics・PERF_TRACE_PATH）
+        _span = instrumentation.start_span("event.set_prefecture", prefecture=value)
         print(f"[PERF] === set_prefecture START: {value} ===", flush=True)
 
         # CSVアップロード済みの場合はCSVデータを使用（DB使用しない）
@@ -1112,8 +1117,7 @@ class DashboardState(rx.State):
 
                     _t1 = time.time()
                     _csv_ms = (_t1-_t0)*1000
-                    _perf_log.write(f"[PERF] CSV filtering: {_csv_ms:.1f}ms\n")
-                    _perf_log.flush()
+                    instrumentation.observe("set_prefecture.csv_filter", _csv_ms / 1000, prefecture=value)
                     print(f"[PERF] CSV filtering: {_csv_ms:.1f}ms", flush=True)
                     async with self:
                         self.selected_prefecture = value
@@ -1122,8 +1126,7 @@ class DashboardState(rx.State):
                         self.df = df_data
                         self.filtered_rows = filtered_count
                     _state_ms = (time.time()-_t1)*1000
-                    _perf_log.write(f"[PERF] State update: {_state_ms:.1f}ms\n")
-                    _perf_log.flush()
+                    instrumentation.observe("set_prefecture.state_update", _state_ms / 1000, prefecture=value)
                     print(f"[PERF] State update: {_state_ms:.1f}ms", flush=True)
                 else:
                     print(f"[CSV] 都道府県変更: {value}, 市区町村数: 0")
@@ -1188,8 +1191,7 @@ class DashboardState(rx.State):
                     self._update_city_summary_inline()
 
         _total_ms = (time.time()-_t0)*1000
-        _perf_log.write(f"[PERF] === set_prefecture TOTAL: {_total_ms:.1f}ms ===\n")
-        _perf_log.close()
+        _span.end()
         print(f"[PERF] === set_prefecture TOTAL: {_total_ms:.1f}ms ===", flush=True)
 
     @rx.event(background=True)
@@ -1208,6 +1210,7 @@ class DashboardState(rx.State):
             return
 
         _t0 = time.time()
+        _span = instrumentation.start_span("event.set_municipality", prefecture=self.selected_prefecture, municipality=value)
         print(f"[PERF] === set_municipality START: {value} ===")
 
         # CSVアップロード済みの場合は、CSV全体から選択地域でフィルタリング
@@ -1248,6 +1251,7 @@ class DashboardState(rx.State):
                 self.selected_municipality = value
                 self._update_city_summary_inline()
 
+        _span.end()
         print(f"[PERF] === set_municipality TOTAL: {(time.time()-_t0)*1000:.1f}ms ===")
 
     def update_city_summary(self):
@@ -1284,6 +1288,20 @@ class DashboardState(rx.State):
         """アクティブタブ切り替え"""
         self.active_tab = tab_id
 
+    def get_delta(self):
+        """状態の差分（2026-01-20追加: 表示中でないタブの計算プロパティは再計算を後回しにする）
+
+        計算プロパティは @view_var で宣言した依存フィールドが変わったときだけ再計算され、
+        表示中でないタブの分はタブを開いたときに再計算される（view_model.py 参照）。
+        """
+        before = view_model.total_recomputes()
+        with view_model.deferring(), instrumentation.span("state.get_delta", tab=self.active_tab):
+            delta = super().get_delta()
+        recomputed = view_model.total_recomputes() - before
+        if recomputed:
+            print(f"[PERF] view-model recompute: {recomputed} vars (tab={self.active_tab})")
+        return delta
+
     def set_age_gender_view_mode(self, mode: str):
         """年齢×性別分析の表示モード切り替え
 
@@ -1298,6 +1316,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab="overview")
     def overview_total_applicants(self) -> str:
         """概要: 求職者総数"""
         # 依存: selected_prefecture, selected_municipality
@@ -1321,6 +1340,7 @@ class DashboardState(rx.State):
         return f"{len(filtered):,}"
 
     @rx.var(cache=False)
+    @view_var(tab="overview")
     def overview_avg_age(self) -> str:
         """概要: 平均年齢"""
         # 依存: selected_prefecture, selected_municipality
@@ -1344,6 +1364,7 @@ class DashboardState(rx.State):
         return "-"
 
     @rx.var(cache=False)
+    @view_var(tab="overview")
     def overview_gender_ratio(self) -> str:
         """概要: 男女比"""
         # 依存: selected_prefecture, selected_municipality
@@ -1367,6 +1388,7 @@ class DashboardState(rx.State):
         return "-"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def overview_age_gender_data(self) -> List[Dict[str, Any]]:
         """概要: 年齢×性別グラフデータ（Rechartsリスト形式）"""
         # 依存: selected_prefecture, selected_municipality
@@ -1489,6 +1511,7 @@ class DashboardState(rx.State):
         return chart_data
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def overview_age_gender_residence_data(self) -> List[Dict[str, Any]]:
         """概要: 年齢×性別グラフデータ（居住地ベース版・Rechartsリスト形式）
 
@@ -1530,6 +1553,7 @@ class DashboardState(rx.State):
         return []
 
     @rx.var(cache=False)
+    @view_var("age_gender_view_mode", tab="overview")
     def overview_age_gender_current_data(self) -> List[Dict[str, Any]]:
         """概要: 年齢×性別グラフデータ（現在の表示モードに応じて切替）
 
@@ -1543,6 +1567,7 @@ class DashboardState(rx.State):
         return self.overview_age_gender_data
 
     @rx.var(cache=False)
+    @view_var("age_gender_view_mode", tab="overview")
     def age_gender_view_label(self) -> str:
         """年齢×性別グラフの現在の表示モードラベル"""
         _ = self.age_gender_view_mode
@@ -1551,6 +1576,7 @@ class DashboardState(rx.State):
         return "希望勤務地ベース（この地域で働きたい人）"
 
     @rx.var(cache=False)
+    @view_var(tab="overview")
     def has_residence_data(self) -> bool:
         """AGE_GENDER_RESIDENCEデータが存在するか"""
         if self.df is None or not self.is_loaded:
@@ -1585,11 +1611,8 @@ class DashboardState(rx.State):
         Returns:
             フィルタリングされたDataFrame（row_typeがない場合は空のDataFrame）
         """
-        if self.df is None or self.df.empty:
-            return pd.DataFrame()
-        if 'row_type' not in self.df.columns:
-            return pd.DataFrame()
-        result = self.df[self.df['row_type'] == row_type]
+        # 2026-01-20変更: row_typeごとの絞り込みはdf 1つにつき1回（全計算プロパティで共有）
+        result = view_model.row_type_slice(self.df, row_type)
         return result.copy() if copy else result
 
     @staticmethod
@@ -1605,11 +1628,7 @@ class DashboardState(rx.State):
         Returns:
             フィルタリングされたDataFrame（row_typeがない場合は空のDataFrame）
         """
-        if df is None or df.empty:
-            return pd.DataFrame()
-        if 'row_type' not in df.columns:
-            return pd.DataFrame()
-        return df[df['row_type'] == row_type]
+        return view_model.row_type_slice(df, row_type)
 
     # =====================================
     # 頻出フィルタのキャッシュ化ヘルパー（サーバーサイドフィルタリング版）
@@ -1628,6 +1647,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def supply_employed(self) -> str:
         """供給: 就業中（推定60%）"""
         if not self.is_loaded:
@@ -1645,6 +1665,7 @@ class DashboardState(rx.State):
         return f"{employed:,}"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def supply_unemployed(self) -> str:
         """供給: 離職中（推定30%）"""
         if not self.is_loaded:
@@ -1662,6 +1683,7 @@ class DashboardState(rx.State):
         return f"{unemployed:,}"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def supply_student(self) -> str:
         """供給: 在学中（推定10%）"""
         if not self.is_loaded:
@@ -1679,6 +1701,7 @@ class DashboardState(rx.State):
         return f"{student:,}"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def supply_national_license(self) -> str:
         """供給: 国家資格保有者（推定3%）"""
         if not self.is_loaded:
@@ -1696,6 +1719,7 @@ class DashboardState(rx.State):
         return f"{national_license:,}"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def supply_avg_qualifications(self) -> str:
         """供給: 平均資格保有数"""
         _ = self.selected_prefecture
@@ -1718,6 +1742,7 @@ class DashboardState(rx.State):
         return "-"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def supply_qualification_buckets_data(self) -> List[Dict[str, Any]]:
         """供給: 資格バケット分布データ（Rechartsリスト形式）
 
@@ -1774,6 +1799,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab="overview")
     def overview_gender_data(self) -> List[Dict[str, Any]]:
         """概要: 性別構成データ（ドーナツチャート用）
 
@@ -1806,6 +1832,7 @@ class DashboardState(rx.State):
         return []
 
     @rx.var(cache=False)
+    @view_var(tab="overview")
     def overview_age_data(self) -> List[Dict[str, Any]]:
         """概要: 年齢帯別データ（棒グラフ用）
 
@@ -1845,6 +1872,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def supply_status_data(self) -> List[Dict[str, Any]]:
         """供給: 就業ステータスデータ（棒グラフ用）
 
@@ -1872,6 +1900,7 @@ class DashboardState(rx.State):
         ]
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def supply_persona_qual_data(self) -> List[Dict[str, Any]]:
         """供給: ペルソナ別平均資格数（横棒グラフ用）
 
@@ -1937,6 +1966,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("csv_uploaded", "df_full", tab=HIDDEN)
     def desired_area_pattern_top_muni(self) -> List[Dict[str, Any]]:
         """併願パターン: 選択市町村に住んでいる人の併願希望先Top10
 
@@ -1999,6 +2029,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def desired_area_by_age(self) -> List[Dict[str, Any]]:
         """年齢層別の併願希望先（積み上げ横棒グラフ用）
 
@@ -2061,6 +2092,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def desired_area_by_gender(self) -> Dict[str, List[Dict[str, Any]]]:
         """性別別の併願希望先Top5
 
@@ -2114,12 +2146,14 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def desired_area_male(self) -> List[Dict[str, Any]]:
         """男性の併願希望先Top5（別varとして分離）"""
         data = self.desired_area_by_gender
         return data.get("男性", [])
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def desired_area_female(self) -> List[Dict[str, Any]]:
         """女性の併願希望先Top5（別varとして分離）"""
         data = self.desired_area_by_gender
@@ -2130,6 +2164,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab=HIDDEN)
     def talent_flow_inflow(self) -> Dict[str, Any]:
         """流入データ: 選択市区町村への就職希望者（どこから来るか）
 
@@ -2210,26 +2245,31 @@ class DashboardState(rx.State):
         }
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="region")
     def talent_flow_inflow_total(self) -> int:
         """流入総数"""
         return self.talent_flow_inflow.get("total", 0)
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="region")
     def talent_flow_local_count(self) -> int:
         """地元志向数"""
         return self.talent_flow_inflow.get("local_count", 0)
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="region")
     def talent_flow_local_pct(self) -> float:
         """地元志向率"""
         return self.talent_flow_inflow.get("local_pct", 0.0)
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="region")
     def talent_flow_inflow_sources(self) -> List[Dict[str, Any]]:
         """流入元Top（Rechartsバーグラフ用）"""
         return self.talent_flow_inflow.get("top_sources", [])
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab=HIDDEN)
     def talent_flow_outflow(self) -> Dict[str, Any]:
         """流出データ: 選択市区町村在住者の希望先（どこへ流れるか）
 
@@ -2297,16 +2337,19 @@ class DashboardState(rx.State):
         }
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="region")
     def talent_flow_outflow_total(self) -> int:
         """流出総数"""
         return self.talent_flow_outflow.get("total", 0)
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="region")
     def talent_flow_outflow_destinations(self) -> List[Dict[str, Any]]:
         """流出先Top（Rechartsバーグラフ用）"""
         return self.talent_flow_outflow.get("top_destinations", [])
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="region")
     def talent_flow_ratio(self) -> str:
         """流入/流出比（人材吸引力）"""
         inflow = self.talent_flow_inflow_total
@@ -2319,6 +2362,7 @@ class DashboardState(rx.State):
         return f"{ratio:.1f}倍"
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="region")
     def talent_flow_has_data(self) -> bool:
         """人材フローデータが存在するか"""
         return self.talent_flow_inflow_total > 0 or self.talent_flow_outflow_total > 0
@@ -2331,6 +2375,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def career_employment_age_data(self) -> List[Dict[str, Any]]:
         """キャリア: 就業ステータス×年齢帯（積み上げ棒グラフ用）
 
@@ -2386,6 +2431,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def career_avg_qualifications(self) -> str:
         """キャリア: 平均保有資格数（EMPLOYMENT_AGE_CROSSデータから計算・市町村別）"""
         if not self.is_loaded or self.df is None:
@@ -2411,6 +2457,7 @@ class DashboardState(rx.State):
             return "0.00"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def career_national_license_rate(self) -> str:
         """キャリア: 国家資格保有率（EMPLOYMENT_AGE_CROSSデータから計算・市町村別）"""
         if not self.is_loaded or self.df is None:
@@ -2440,6 +2487,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def urgency_age_data(self) -> List[Dict[str, Any]]:
         """緊急度: 年齢帯別データ（複合グラフ: 棒+折れ線、2軸用）
 
@@ -2479,6 +2527,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def urgency_employment_data(self) -> List[Dict[str, Any]]:
         """緊急度: 就業ステータス別データ（複合グラフ: 棒+折れ線、2軸用）
 
@@ -2518,6 +2567,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def urgency_total_count(self) -> str:
         """緊急度: 対象人数合計"""
         if not self.is_loaded or self.df is None:
@@ -2532,6 +2582,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def urgency_avg_score(self) -> str:
         """緊急度: 平均スコア（加重平均）"""
         if not self.is_loaded or self.df is None:
@@ -2561,6 +2612,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_inflow(self) -> str:
         """フロー: 流入人数"""
         if not self.is_loaded or self.df is None:
@@ -2578,6 +2630,7 @@ class DashboardState(rx.State):
         return f"{int(inflow):,}" if pd.notna(inflow) else "0"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_outflow(self) -> str:
         """フロー: 流出人数"""
         if not self.is_loaded or self.df is None:
@@ -2595,6 +2648,7 @@ class DashboardState(rx.State):
         return f"{int(outflow):,}" if pd.notna(outflow) else "0"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_net_flow(self) -> str:
         """フロー: 純流出入（正:流入超過、負:流出超過）"""
         if not self.is_loaded or self.df is None:
@@ -2620,6 +2674,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def persona_top_list(self) -> List[Dict[str, Any]]:
         """ペルソナ: トップペルソナリスト（上位5件）
 
@@ -2670,6 +2725,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab="persona")
     def persona_full_list(self) -> List[Dict[str, Any]]:
         """ペルソナ: 全ペルソナリスト（100%内訳）
 
@@ -2722,6 +2778,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("csv_uploaded", "df_full", tab="persona")
     def qualification_detail_top(self) -> List[Dict[str, Any]]:
         """資格詳細: 全資格一覧（row_type=QUALIFICATION_DETAIL）
 
@@ -2777,6 +2834,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab="persona")
     def qualification_persona_matrix(self) -> List[Dict[str, Any]]:
         """保有資格ペルソナ: 具体的資格×性別×年齢のクロス集計
 
@@ -2835,6 +2893,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab="persona")
     def qualification_persona_chart_data(self) -> List[Dict[str, Any]]:
         """保有資格ペルソナ: Rechartsグループ化棒グラフ用データ
 
@@ -2855,6 +2914,7 @@ class DashboardState(rx.State):
         ]
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def qualification_persona_age_chart_data(self) -> List[Dict[str, Any]]:
         """保有資格ペルソナ: 年齢層別の分布グラフ用データ
 
@@ -2880,6 +2940,7 @@ class DashboardState(rx.State):
         ]
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def qualification_persona_top1_name(self) -> str:
         """保有資格ペルソナ: Top1資格の名前"""
         matrix = self.qualification_persona_matrix
@@ -2888,6 +2949,7 @@ class DashboardState(rx.State):
         return matrix[0].get("qualification", "")
 
     @rx.var(cache=False)
+    @view_var(tab="persona")
     def available_qualifications(self) -> List[str]:
         """利用可能な資格リスト（プルダウン用）"""
         matrix = self.qualification_persona_matrix
@@ -2896,6 +2958,7 @@ class DashboardState(rx.State):
         return [item.get("qualification", "") for item in matrix if item.get("qualification")]
 
     @rx.var(cache=False)
+    @view_var("selected_qualification", tab="persona")
     def selected_qualification_display(self) -> str:
         """選択中の資格名（表示用）"""
         if self.selected_qualification:
@@ -2907,6 +2970,7 @@ class DashboardState(rx.State):
         return ""
 
     @rx.var(cache=False)
+    @view_var("selected_qualification", tab="persona")
     def selected_qualification_age_chart_data(self) -> List[Dict[str, Any]]:
         """選択した資格の年齢層×性別分布グラフ用データ
 
@@ -2947,6 +3011,7 @@ class DashboardState(rx.State):
         self.selected_qualification = value
 
     @rx.var(cache=False)
+    @view_var("csv_uploaded", "df_full", tab=HIDDEN)
     def desired_area_pattern_top(self) -> List[Dict[str, Any]]:
         """併願パターン: 選択都道府県を希望する人の居住県Top10
 
@@ -2994,6 +3059,7 @@ class DashboardState(rx.State):
     # UIで未使用だが毎イベントで計算されていた重いto_html処理
 
     @rx.var(cache=False)
+    @view_var("active_tab", "csv_uploaded", "df_full", tab="region")
     def residence_flow_top(self) -> List[Dict[str, Any]]:
         """居住地フロー: 選択都道府県を希望する人の居住県Top10
 
@@ -3041,6 +3107,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("active_tab", "csv_uploaded", "df_full", tab="region")
     def residence_flow_top_muni(self) -> List[Dict[str, Any]]:
         """居住地フロー: 選択市町村に住んでいる人の希望勤務地Top10
 
@@ -3109,6 +3176,7 @@ class DashboardState(rx.State):
     # UIで未使用だが毎イベントで計算されていた重いto_html処理
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab="persona")
     def persona_bar_data(self) -> List[Dict[str, Any]]:
         """ペルソナ: 横棒グラフ用データ
 
@@ -3147,6 +3215,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab="persona")
     def persona_employment_breakdown_data(self) -> List[Dict[str, Any]]:
         """ペルソナ: 就業状態別積み上げ棒グラフ用データ
 
@@ -3195,6 +3264,7 @@ class DashboardState(rx.State):
         return result[:10]
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab="persona")
     def persona_share_data(self) -> List[Dict[str, Any]]:
         """ペルソナ: 構成比データ（ドーナツチャート用）
 
@@ -3239,6 +3309,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def cross_age_employment_data(self) -> List[Dict[str, Any]]:
         """クロス: 年齢×就業状態クロス集計（ヒートマップ用）
 
@@ -3276,6 +3347,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def cross_gender_employment_data(self) -> List[Dict[str, Any]]:
         """クロス: 性別×就業状態クロス集計（積み上げ棒グラフ用）
 
@@ -3328,6 +3400,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def cross_age_qualification_data(self) -> List[Dict[str, Any]]:
         """クロス: 年齢×資格保有クロス集計（折れ線グラフ用）
 
@@ -3386,6 +3459,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def cross_employment_qualification_data(self) -> List[Dict[str, Any]]:
         """クロス: 就業状態×資格保有クロス集計（レーダーチャート用）
 
@@ -3439,6 +3513,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def cross_persona_qualification_age_data(self) -> List[Dict[str, Any]]:
         """クロス6: ペルソナ×資格×年齢 - 希少人材の特定（バブルチャート用）
 
@@ -3504,6 +3579,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def cross_distance_age_gender_data(self) -> List[Dict[str, Any]]:
         """クロス7: 移動距離×年齢×性別 - 地域採用戦略（3D散布図用）
 
@@ -3557,6 +3633,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def cross_urgency_career_age_data(self) -> List[Dict[str, Any]]:
         """クロス8: 転職意欲×キャリア×年齢 - ターゲティング精度向上（ヒートマップ用）
 
@@ -3619,6 +3696,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def cross_supply_demand_region_data(self) -> List[Dict[str, Any]]:
         """クロス9: 供給密度×需要バランス×地域 - 競争環境分析（散布図用）
 
@@ -3673,6 +3751,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def cross_multidimensional_profile_data(self) -> List[Dict[str, Any]]:
         """クロス10: 多次元プロファイル - 複合的な人材分析（パラレルコーディネート用）
 
@@ -3762,6 +3841,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def gap_compare_data(self) -> List[Dict[str, Any]]:
         """需給: 需要 vs 供給データ（棒グラフ用）
 
@@ -3794,6 +3874,7 @@ class DashboardState(rx.State):
         ]
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def gap_balance_data(self) -> List[Dict[str, Any]]:
         """需給: バランスデータ（ドーナツチャート用）
 
@@ -3830,6 +3911,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab="gap")
     def gap_total_demand(self) -> str:
         """需給: 総需要"""
         # Lazy Loading: gapタブ以外では計算をスキップ
@@ -3854,6 +3936,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}" if pd.notna(total) else "0"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab="gap")
     def gap_total_supply(self) -> str:
         """需給: 総供給"""
         # Lazy Loading: gapタブ以外では計算をスキップ
@@ -3878,6 +3961,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}" if pd.notna(total) else "0"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab="gap")
     def gap_avg_ratio(self) -> str:
         """需給: 平均需給比率"""
         # Lazy Loading: gapタブ以外では計算をスキップ
@@ -3906,6 +3990,7 @@ class DashboardState(rx.State):
             return "0.0"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab="gap")
     def gap_shortage_count(self) -> str:
         """需給: 不足地域数（demand > supply）"""
         # Lazy Loading: gapタブ以外では計算をスキップ
@@ -3931,6 +4016,7 @@ class DashboardState(rx.State):
         return f"{shortage_count}"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab="gap")
     def gap_surplus_count(self) -> str:
         """需給: 過剰地域数（supply > demand）"""
         # Lazy Loading: gapタブ以外では計算をスキップ
@@ -3956,6 +4042,7 @@ class DashboardState(rx.State):
         return f"{surplus_count}"
 
     @rx.var(cache=False)
+    @view_var("active_tab", "csv_uploaded", "df_full", tab="gap")
     def gap_shortage_ranking(self) -> List[Dict[str, Any]]:
         """需給: 需要超過ランキング Top 10（横棒グラフ用）
 
@@ -4006,6 +4093,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("active_tab", "csv_uploaded", "df_full", tab="gap")
     def gap_surplus_ranking(self) -> List[Dict[str, Any]]:
         """需給: 供給超過ランキング Top 10（横棒グラフ用、絶対値）
 
@@ -4057,6 +4145,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("active_tab", "csv_uploaded", "df_full", tab="gap")
     def gap_ratio_ranking(self) -> List[Dict[str, Any]]:
         """需給: 需給比率ランキング Top 10（横棒グラフ用）
 
@@ -4133,6 +4222,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_total_inflow(self) -> str:
         """フロー: 総流入数（他地域からの希望者数）"""
         if not self.is_loaded or self.df is None:
@@ -4150,6 +4240,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}" if pd.notna(total) else "0"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_total_outflow(self) -> str:
         """フロー: 総流出数（他地域への希望者数）"""
         if not self.is_loaded or self.df is None:
@@ -4167,6 +4258,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}" if pd.notna(total) else "0"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_net_flow(self) -> str:
         """フロー: 純流入（流入-流出）"""
         if not self.is_loaded or self.df is None:
@@ -4184,6 +4276,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}" if pd.notna(total) else "0"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_popularity_rate(self) -> str:
         """フロー: 人気度（流入/申請者数 × 100%）"""
         if not self.is_loaded or self.df is None:
@@ -4206,6 +4299,7 @@ class DashboardState(rx.State):
         return "0.0%"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_mobility_rate(self) -> str:
         """フロー: 外部志向度（流出/申請者数 × 100%）"""
         if not self.is_loaded or self.df is None:
@@ -4228,6 +4322,7 @@ class DashboardState(rx.State):
         return "0.0%"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_inflow_ranking(self) -> List[Dict[str, Any]]:
         """フロー: 流入ランキング Top 10（横棒グラフ用）
 
@@ -4267,6 +4362,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_outflow_ranking(self) -> List[Dict[str, Any]]:
         """フロー: 流出ランキング Top 10（横棒グラフ用）
 
@@ -4306,6 +4402,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def flow_netflow_ranking(self) -> List[Dict[str, Any]]:
         """フロー: 純流入ランキング Top 10（横棒グラフ用）
 
@@ -4349,6 +4446,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_rank_data(self) -> List[Dict[str, Any]]:
         """希少性: ランク分布データ（ドーナツチャート用）
 
@@ -4395,6 +4493,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_score_data(self) -> List[Dict[str, Any]]:
         """希少性: Top 10スコアデータ（横棒グラフ用）
 
@@ -4433,6 +4532,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_s_count(self) -> str:
         """希少性: Sランク（超希少）の件数"""
         if not self.is_loaded or self.df is None:
@@ -4454,6 +4554,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_a_count(self) -> str:
         """希少性: Aランク（非常に希少）の件数"""
         if not self.is_loaded or self.df is None:
@@ -4475,6 +4576,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_b_count(self) -> str:
         """希少性: Bランク（希少）の件数"""
         if not self.is_loaded or self.df is None:
@@ -4496,6 +4598,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}"
 
     @rx.var(cache=False)
+    @view_var(tab="persona")
     def rarity_total_count(self) -> str:
         """希少性: 総希少人材数（S+A+B）"""
         if not self.is_loaded or self.df is None:
@@ -4510,6 +4613,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_national_license_count(self) -> str:
         """希少性: 国家資格保有者数"""
         if not self.is_loaded or self.df is None:
@@ -4531,6 +4635,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_avg_score(self) -> str:
         """希少性: 平均希少性スコア"""
         if not self.is_loaded or self.df is None:
@@ -4554,6 +4659,7 @@ class DashboardState(rx.State):
             return "0.0"
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_age_distribution(self) -> List[Dict[str, Any]]:
         """希少性: 年齢層別分布（棒グラフ用）
 
@@ -4583,6 +4689,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_gender_distribution(self) -> List[Dict[str, Any]]:
         """希少性: 性別分布（円グラフ用）
 
@@ -4619,6 +4726,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var(tab=HIDDEN)
     def rarity_national_license_ranking(self) -> List[Dict[str, Any]]:
         """希少性: 国家資格保有者ランキング Top 10（横棒グラフ用）
 
@@ -4659,6 +4767,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_total_regions(self) -> str:
         """競合: 総地域数（選択都道府県内の市区町村数）
 
@@ -4682,6 +4791,7 @@ class DashboardState(rx.State):
         return f"{len(filtered):,}"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_total_applicants(self) -> str:
         """競合: 総申請者数（選択都道府県内の合計）
 
@@ -4709,6 +4819,7 @@ class DashboardState(rx.State):
         return f"{int(total):,}"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_avg_female_ratio(self) -> str:
         """競合: 平均女性比率（選択都道府県内の平均）
 
@@ -4743,6 +4854,7 @@ class DashboardState(rx.State):
             return "0"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_gender_data(self) -> List[Dict[str, Any]]:
         """競合: 性別分布データ（ドーナツチャート用）
 
@@ -4779,6 +4891,7 @@ class DashboardState(rx.State):
         ]
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_age_employment_data(self) -> List[Dict[str, Any]]:
         """競合: 年齢層・就業状態データ（棒グラフ用）
 
@@ -4818,6 +4931,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_avg_national_license_rate(self) -> str:
         """競合: 平均国家資格保有率"""
         # Lazy Loading: regionタブ以外では計算をスキップ
@@ -4842,6 +4956,7 @@ class DashboardState(rx.State):
         return f"{avg_rate * 100:.1f}" if pd.notna(avg_rate) else "0.0"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_avg_qualification_count(self) -> str:
         """競合: 平均資格数"""
         # Lazy Loading: regionタブ以外では計算をスキップ
@@ -4866,6 +4981,7 @@ class DashboardState(rx.State):
         return f"{avg_count:.2f}" if pd.notna(avg_count) else "0.0"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_avg_male_ratio(self) -> str:
         """競合: 平均男性比率"""
         # Lazy Loading: regionタブ以外では計算をスキップ
@@ -4897,6 +5013,7 @@ class DashboardState(rx.State):
             return "0.0"
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_national_license_ranking(self) -> List[Dict[str, Any]]:
         """競合: 国家資格保有率ランキング Top 10（横棒グラフ用）
 
@@ -4935,6 +5052,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_qualification_ranking(self) -> List[Dict[str, Any]]:
         """競合: 平均資格数ランキング Top 10（横棒グラフ用）
 
@@ -4973,6 +5091,7 @@ class DashboardState(rx.State):
         return result
 
     @rx.var(cache=False)
+    @view_var("active_tab", tab=HIDDEN)
     def competition_female_ratio_ranking(self) -> List[Dict[str, Any]]:
         """競合: 女性比率ランキング Top 10（横棒グラフ用）
 
@@ -5157,6 +5276,7 @@ class DashboardState(rx.State):
         return age_ratio
 
     @rx.var(cache=False)
+    @view_var("df_full", "national_stats", "prefecture_stats_cache", tab="overview")
     def comparison_data(self) -> List[Dict[str, Any]]:
         """3層比較データ（UI表示用）
 
@@ -5254,6 +5374,7 @@ class DashboardState(rx.State):
 
     # --- 性別比率: フラット化されたState変数（Reflex型安全対応） ---
     @rx.var(cache=False)
+    @view_var("national_stats", tab="overview")
     def gender_national_male_pct(self) -> float:
         """全国: 男性比率"""
         if not self.is_loaded or not self.national_stats:
@@ -5264,6 +5385,7 @@ class DashboardState(rx.State):
         return round(male / total * 100, 1) if total > 0 else 0.0
 
     @rx.var(cache=False)
+    @view_var("national_stats", tab="overview")
     def gender_national_female_pct(self) -> float:
         """全国: 女性比率"""
         if not self.is_loaded or not self.national_stats:
@@ -5274,6 +5396,7 @@ class DashboardState(rx.State):
         return round(female / total * 100, 1) if total > 0 else 0.0
 
     @rx.var(cache=False)
+    @view_var("prefecture_stats_cache", tab="overview")
     def gender_pref_male_pct(self) -> float:
         """都道府県: 男性比率"""
         if not self.is_loaded:
@@ -5285,6 +5408,7 @@ class DashboardState(rx.State):
         return round(male / total * 100, 1) if total > 0 else 0.0
 
     @rx.var(cache=False)
+    @view_var("prefecture_stats_cache", tab="overview")
     def gender_pref_female_pct(self) -> float:
         """都道府県: 女性比率"""
         if not self.is_loaded:
@@ -5296,6 +5420,7 @@ class DashboardState(rx.State):
         return round(female / total * 100, 1) if total > 0 else 0.0
 
     @rx.var(cache=False)
+    @view_var("df_full", tab="overview")
     def gender_muni_male_pct(self) -> float:
         """市区町村: 男性比率"""
         if not self.is_loaded:
@@ -5307,6 +5432,7 @@ class DashboardState(rx.State):
         return round(male / total * 100, 1) if total > 0 else 0.0
 
     @rx.var(cache=False)
+    @view_var("df_full", tab="overview")
     def gender_muni_female_pct(self) -> float:
         """市区町村: 女性比率"""
         if not self.is_loaded:
@@ -5318,6 +5444,7 @@ class DashboardState(rx.State):
         return round(female / total * 100, 1) if total > 0 else 0.0
 
     @rx.var(cache=False)
+    @view_var("national_stats", tab="overview")
     def gender_has_data(self) -> bool:
         """性別データが存在するか"""
         if not self.is_loaded or not self.national_stats:
@@ -5327,6 +5454,7 @@ class DashboardState(rx.State):
         return (male + female) > 0
 
     @rx.var(cache=False)
+    @view_var("df_full", "national_stats", "prefecture_stats_cache", tab="overview")
     def comparison_age_data(self) -> List[Dict[str, Any]]:
         """3層比較: 年齢層分布データ（UI表示用・Recharts用）
 
@@ -5392,16 +5520,19 @@ class DashboardState(rx.State):
         self.rarity_selected_qualifications = [qualification] if qualification else []
 
     @rx.var(cache=False)
+    @view_var(tab="persona")
     def rarity_age_options(self) -> list[str]:
         """RARITY: 選択可能な年齢層リスト"""
         return ['20代', '30代', '40代', '50代', '60代', '70歳以上']
 
     @rx.var(cache=False)
+    @view_var(tab="persona")
     def rarity_gender_options(self) -> list[str]:
         """RARITY: 選択可能な性別リスト"""
         return ['女性', '男性']
 
     @rx.var(cache=False)
+    @view_var("df_full", tab="persona")
     def rarity_qualification_options(self) -> list[str]:
         """RARITY: 選択可能な資格リスト（QUALIFICATION_DETAILから取得）"""
         if self.df_full is None or self.df_full.empty:
@@ -5424,6 +5555,7 @@ class DashboardState(rx.State):
         return qual_counts.index.tolist()[:30]  # Top30
 
     @rx.var(cache=False)
+    @view_var("df_full", "rarity_selected_ages", "rarity_selected_genders", "rarity_selected_qualifications", tab="persona")
     def rarity_results(self) -> list[dict]:
         """RARITY: 選択条件に一致する結果リスト
 
@@ -5484,6 +5616,7 @@ class DashboardState(rx.State):
         return results
 
     @rx.var(cache=False)
+    @view_var("df_full", "rarity_selected_ages", "rarity_selected_genders", "rarity_selected_qualifications", tab=HIDDEN)
     def rarity_summary(self) -> dict:
         """RARITY: 結果サマリー（合計人数、平均スコア）"""
         results = self.rarity_results
@@ -5497,16 +5630,19 @@ class DashboardState(rx.State):
         }
 
     @rx.var(cache=False)
+    @view_var("df_full", "rarity_selected_ages", "rarity_selected_genders", "rarity_selected_qualifications", tab="persona")
     def has_rarity_results(self) -> bool:
         """RARITY: 結果があるかどうか（rx.cond用）"""
         return len(self.rarity_results) > 0
 
     @rx.var(cache=False)
+    @view_var("df_full", "rarity_selected_ages", "rarity_selected_genders", "rarity_selected_qualifications", tab="persona")
     def rarity_total_count(self) -> int:
         """RARITY: 合計人数"""
         return sum(r.get("count", 0) for r in self.rarity_results)
 
     @rx.var(cache=False)
+    @view_var("df_full", "rarity_selected_ages", "rarity_selected_genders", "rarity_selected_qualifications", tab="persona")
     def rarity_combination_count(self) -> int:
         """RARITY: 組み合わせ数"""
         return len(self.rarity_results)
@@ -5516,6 +5652,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="region")
     def competition_summary(self) -> dict:
         """COMPETITION: 地域サマリーデータ
 
@@ -5569,6 +5706,7 @@ class DashboardState(rx.State):
         self.mobility_view_mode = mode
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", "mobility_view_mode", tab="region")
     def mobility_type_distribution(self) -> list[dict]:
         """mobility_type: 移動タイプ分布
 
@@ -5627,6 +5765,7 @@ class DashboardState(rx.State):
         return results
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", "mobility_view_mode", tab="region")
     def mobility_distance_stats(self) -> dict:
         """mobility_type: 距離統計（Q25/中央値/Q75）
 
@@ -5680,6 +5819,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var("active_tab", "df_full", tab="persona")
     def persona_market_share(self) -> list[dict]:
         """market_share_pct: 年齢×性別のシェア（就業状況除外）
 
@@ -5730,6 +5870,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var("df_full", tab="region")
     def qualification_retention_rates(self) -> list[dict]:
         """retention_rate: 資格別定着率
 
@@ -5790,6 +5931,7 @@ class DashboardState(rx.State):
     # =====================================
 
     @rx.var(cache=False)
+    @view_var("df_full", tab="persona")
     def age_gender_stats_list(self) -> list[dict]:
         """avg_desired_areas/avg_qualifications: 年齢×性別のリスト形式
 
@@ -9236,3 +9378,26 @@ app = rx.App(
 # ルーティング設定
 app.add_page(login_page, route="/login")
 app.add_page(index, route="/", on_load=DashboardState.on_mount_init)
+
+
+# =====================================
+# メトリクス（2026-01-20追加）
+# =====================================
+def _view_model_metrics():
+    """/metrics 用（instrumentation のコレクタ）: 計算プロパティごとの再計算回数"""
+    counts = view_model.recompute_counts()
+    return [("view_model_recomputes_total", "counter", "Computed var recomputations (memo misses)",
+             [({"var": name}, count) for name, count in sorted(counts.items())])]
+
+
+instrumentation.register_collector(_view_model_metrics)
+
+
+async def prometheus_metrics():
+    """Prometheus形式のメトリクス（イベント・DBクエリ・差分計算のスパン、キャッシュのヒット率）"""
+    from fastapi import Response
+    return Response(content=instrumentation.render_prometheus(), media_type=instrumentation.PROMETHEUS_CONTENT_TYPE)
+
+
+if getattr(app, "api", None) is not None:
+    app.api.add_api_route("/metrics", prometheus_metrics, methods=["GET"])
@@ -0,0 +1,208 @@
+"""DashboardState 計算プロパティのビューモデル層（2026-01-20追加）
+
+DashboardState の計算プロパティ（@rx.var(cache=False)、129個）は状態の差分を送るたびに全て再評価され、
+それぞれが self.df を row_type で絞り込み直していた（タブを切り替えるだけでも全タブ分を再計算）。
+
+このモジュールは各計算プロパティに依存する状態フィールドと表示タブを宣言させ、
+    1. 依存フィールドの値（self.df はデータトークン）をキーに結果をメモ化する
+    2. 差分計算中（deferring()）は表示中でないタブの計算プロパティを再計算せず、前回の値を返す
+       （タブを開いたときに、そのタブの計算プロパティだけが再計算される）
+    3. row_type ごとの絞り込み結果を DataFrame 1つにつき1回だけ作り、全計算プロパティで共有する
+
+使用例:
+    @rx.var(cache=False)
+    @view_var("age_gender_view_mode", tab="persona")
+    def persona_age_gender_data(self) -> List[Dict[str, Any]]:
+        ...
+
+    with deferring():          # DashboardState.get_delta() 内
+        delta = ...
+    recompute_counts()         # {"persona_age_gender_data": 3, ...}
+
+依存フィールド:
+    BASE_DEPS（df, is_loaded, 都道府県, 市区町村, 職種）は全計算プロパティ共通。
+    view_var() にはそれ以外に参照するフィールド（表示モード・選択中の資格など）を渡す。
+    self.df などの DataFrame は置き換え（self.df = ...）で変わる前提（同一オブジェクトのまま書き換えない）。
+
+タブ:
+    tab=None は常に表示（サイドバーなど）、tab="persona" / ("gap", "region") はそのタブでのみ表示、
+    tab=HIDDEN は画面に表示しない計算プロパティ（スクリプト・テストから直接参照される）。
+    deferring() の外（直接参照）では常にキーで判定するため、タブに関係なく最新の値を返す。
+    後回しにするのは差分計算での最外側の評価のみで、HIDDEN や、計算中に別の計算プロパティから参照された場合は常にキーで判定する。
+
+注意:
+    メモは State インスタンスごとに持つ（上限 MAX_STATES、古い順に破棄）。Redis 状態管理ではイベントごとに State が復元されるため、
+    メモが有効なのは1イベント内のみ（row_type の共有スライスは同様に有効）。
+
+環境変数:
+    VIEW_MODEL_MEMO: 0 でメモ化・再計算の後回しを無効化（再計算回数の比較計測用、デフォルト1）
+"""
+import contextlib
+import contextvars
+import functools
+import itertools
+import os
+import threading
+import weakref
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+BASE_DEPS = ("df", "is_loaded", "selected_prefecture", "selected_municipality", "selected_job_type")
+HIDDEN: Tuple[str, ...] = ()
+
+MEMO_ENABLED = os.getenv("VIEW_MODEL_MEMO", "1") != "0"
+
+MAX_STATES = 256  # メモを保持する State（セッション）数の上限
+
+_MISSING = object()
+_deferring = contextvars.ContextVar("view_model_deferring", default=False)
+_lock = threading.Lock()
+_token_counter = itertools.count(1)
+_tokens: Dict[int, int] = {}  # id(DataFrame) → データトークン（DataFrameの生存中は再利用しない）
+_slices: Dict[int, Dict[Any, pd.DataFrame]] = {}  # データトークン → row_type → 絞り込み結果
+_memos: "OrderedDict[int, Dict[str, Tuple[tuple, Any]]]" = OrderedDict()  # id(State) → 計算プロパティ名 → (キー, 値)
+_recomputes: Counter = Counter()
+
+
+# =====================================
+# データトークン・row_type 共有スライス
+# =====================================
+def _forget_frame(key: int, token: int):
+    with _lock:
+        if _tokens.get(key) == token:
+            del _tokens[key]
+        _slices.pop(token, None)
+
+
+def data_token(df: Optional[pd.DataFrame]) -> Optional[int]:
+    """DataFrame の識別トークン（同じオブジェクトの間は同じ値、別オブジェクトとは重複しない）"""
+    if df is None:
+        return None
+    key = id(df)
+    with _lock:
+        token = _tokens.get(key)
+        if token is None:
+            token = next(_token_counter)
+            _tokens[key] = token
+            weakref.finalize(df, _forget_frame, key, token)
+    return token
+
+
+def row_type_slice(df: Optional[pd.DataFrame], row_type: str) -> pd.DataFrame:
+    """df[df['row_type'] == row_type] と同じ結果（row_type ごとの分割は DataFrame 1つにつき1回）
+
+    返り値は共有されるため、列の追加などで書き換える場合は呼び出し側で .copy() すること。
+    """
+    if df is None or df.empty or 'row_type' not in df.columns:
+        return pd.DataFrame()
+    if not MEMO_ENABLED:
+        return df[df['row_type'] == row_type]
+    token = data_token(df)
+    parts = _slices.get(token)
+    if parts is None:
+        parts = {rt: part for rt, part in df.groupby('row_type', sort=False, observed=True)}
+        _slices[token] = parts
+    part = parts.get(row_type)
+    return part if part is not None else df.iloc[0:0]
+
+
+# =====================================
+# メモ化・再計算の後回し
+# =====================================
+def _freeze(value: Any) -> Any:
+    """キーに使える値に変換（DataFrame はデータトークン、list/dict はタプル）"""
+    value = getattr(value, "__wrapped__", value)  # Reflex の MutableProxy を外す
+    if isinstance(value, pd.DataFrame):
+        return ("df", data_token(value))
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _memo_for(state) -> Dict[str, Tuple[tuple, Any]]:
+    # State（pydantic v1）は弱参照できないため、件数上限つきの id → メモで保持する。
+    # id が再利用されても値はキーで検証するため、古いメモが返るのは表示中でないタブ（画面に出ない）のみ
+    key = id(state)
+    with _lock:
+        memo = _memos.get(key)
+        if memo is None:
+            memo = _memos[key] = {}
+            while len(_memos) > MAX_STATES:
+                _memos.popitem(last=False)
+        else:
+            _memos.move_to_end(key)
+    return memo
+
+
+def view_var(*deps: str, tab: Union[None, str, Tuple[str, ...]] = None) -> Callable:
+    """計算プロパティの依存フィールドと表示タブを宣言し、結果をメモ化する（@rx.var の内側に付ける）
+
+    Args:
+        deps: BASE_DEPS 以外に参照する状態フィールド名
+        tab: 表示タブのid（複数の場合はタプル）。None は常に表示、HIDDEN は画面に表示しない
+    """
+    fields = BASE_DEPS + tuple(d for d in deps if d not in BASE_DEPS)
+    tabs = (tab,) if isinstance(tab, str) else tab
+
+    def decorator(fn: Callable) -> Callable:
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(self):
+            if not MEMO_ENABLED:
+                _recomputes[name] += 1
+                return fn(self)
+            memo = _memo_for(self)
+            cached = memo.get(name, _MISSING)
+            # HIDDEN（tabs=()）は他の計算プロパティから参照されるため後回しにしない
+            if cached is not _MISSING and tabs and _deferring.get() \
+                    and getattr(self, "active_tab", None) not in tabs:
+                return cached[1]  # 表示中でないタブ: 開いたときに再計算
+            key = tuple(_freeze(getattr(self, f, None)) for f in fields)
+            if cached is not _MISSING and cached[0] == key:
+                return cached[1]
+            # 計算中に参照される他の計算プロパティは後回しにせず、キーで判定する（最外側の評価のみ後回し）
+            token = _deferring.set(False)
+            try:
+                value = fn(self)
+            finally:
+                _deferring.reset(token)
+            memo[name] = (key, value)
+            _recomputes[name] += 1
+            return value
+
+        wrapper.view_deps = fields
+        wrapper.view_tabs = tabs
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def deferring():
+    """この中（状態の差分計算）では、表示中でないタブの計算プロパティの再計算を後回しにする"""
+    token = _deferring.set(True)
+    try:
+        yield
+    finally:
+        _deferring.reset(token)
+
+
+# =====================================
+# 再計算回数の計測
+# =====================================
+def recompute_counts() -> Dict[str, int]:
+    """計算プロパティごとの再計算回数（reset_counts() 以降）"""
+    return dict(_recomputes)
+
+
+def total_recomputes() -> int:
+    return sum(_recomputes.values())
+
+
+def reset_counts():
+    _recomputes.clear()
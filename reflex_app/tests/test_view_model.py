@@ -0,0 +1,237 @@
+"""
+ビューモデル層（view_model.py）のテスト
+
+テスト対象:
+- view_var(): 依存フィールドをキーにしたメモ化、表示中でないタブの再計算の後回し
+- row_type_slice(): row_typeごとの絞り込み結果の共有
+- DashboardState: 差分計算1回あたりの再計算回数（reflexがある環境のみ）
+"""
+
+import pytest
+import pandas as pd
+from mapcomplete_dashboard import view_model
+from mapcomplete_dashboard.view_model import HIDDEN, deferring, row_type_slice, view_var
+
+
+class FakeState:
+    """計算プロパティを持つStateの代わり（view_var はgetattrで依存フィールドを読む）"""
+
+    def __init__(self, df):
+        self.df = df
+        self.is_loaded = True
+        self.selected_prefecture = "京都府"
+        self.selected_municipality = "京都市"
+        self.selected_job_type = "介護職"
+        self.active_tab = "overview"
+        self.age_gender_view_mode = "destination"
+
+    @property
+    @view_var(tab="overview")
+    def overview_total(self) -> int:
+        return int(row_type_slice(self.df, 'SUMMARY')['count'].sum())
+
+    @property
+    @view_var("age_gender_view_mode", tab="persona")
+    def persona_rows(self) -> int:
+        return len(row_type_slice(self.df, 'AGE_GENDER')) + len(self.age_gender_view_mode)
+
+    @property
+    @view_var(tab=HIDDEN)
+    def hidden_rows(self) -> int:
+        return len(self.df)
+
+    @property
+    @view_var(tab="overview")
+    def overview_hidden_rows(self) -> int:
+        # 表示中の計算プロパティが HIDDEN の計算プロパティを参照する（talent_flow_inflow_total など）
+        return self.hidden_rows
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({
+        'row_type': ['SUMMARY', 'AGE_GENDER', 'SUMMARY', 'AGE_GENDER', None],
+        'prefecture': ['京都府'] * 5,
+        'municipality': ['京都市'] * 5,
+        'count': [10, 20, 30, 40, 50],
+    })
+
+
+@pytest.fixture(autouse=True)
+def reset_counts(monkeypatch):
+    monkeypatch.setattr(view_model, "MEMO_ENABLED", True)
+    view_model.reset_counts()
+    yield
+    view_model.reset_counts()
+
+
+class TestViewVar:
+    """view_var() のメモ化"""
+
+    def test_memoized_until_dependency_changes(self, sample_df):
+        state = FakeState(sample_df)
+        assert state.overview_total == state.overview_total == 40
+        assert view_model.recompute_counts() == {"overview_total": 1}
+
+        state.active_tab = "persona"  # 依存していないフィールド
+        assert state.overview_total == 40
+        state.selected_municipality = "宇治市"
+        assert state.overview_total == 40
+        assert view_model.recompute_counts() == {"overview_total": 2}
+
+    def test_new_dataframe_recomputes(self, sample_df):
+        state = FakeState(sample_df)
+        assert state.overview_total == 40
+        state.df = sample_df.assign(count=sample_df['count'] * 2)
+        assert state.overview_total == 80
+        assert view_model.recompute_counts() == {"overview_total": 2}
+
+    def test_declared_fields_are_in_key(self, sample_df):
+        state = FakeState(sample_df)
+        assert state.persona_rows == 2 + len("destination")
+        state.age_gender_view_mode = "residence"
+        assert state.persona_rows == 2 + len("residence")
+        assert FakeState.persona_rows.fget.view_deps == view_model.BASE_DEPS + ("age_gender_view_mode",)
+        assert FakeState.persona_rows.fget.view_tabs == ("persona",)
+
+    def test_disabled_recomputes_every_access(self, sample_df, monkeypatch):
+        monkeypatch.setattr(view_model, "MEMO_ENABLED", False)
+        state = FakeState(sample_df)
+        for _ in range(3):
+            assert state.overview_total == 40
+        assert view_model.recompute_counts() == {"overview_total": 3}
+
+
+class TestDeferring:
+    """差分計算中（deferring）は表示中でないタブを再計算しない"""
+
+    def _delta(self, state):
+        with deferring():
+            return {name: getattr(state, name) for name in ("overview_total", "persona_rows", "hidden_rows")}
+
+    def test_only_active_tab_recomputes(self, sample_df):
+        state = FakeState(sample_df)
+        self._delta(state)
+        view_model.reset_counts()
+
+        # 選択変更（overviewタブ表示中）: overviewとHIDDENのみ再計算、表示中でないタブは前回の値
+        state.df = sample_df[sample_df['count'] > 10]
+        delta = self._delta(state)
+        assert view_model.recompute_counts() == {"overview_total": 1, "hidden_rows": 1}
+        assert delta == {"overview_total": 30, "persona_rows": 2 + len("destination"), "hidden_rows": 4}
+
+        # タブを開くとそのタブの分だけ再計算
+        state.active_tab = "persona"
+        delta = self._delta(state)
+        assert view_model.recompute_counts() == {"overview_total": 1, "hidden_rows": 1, "persona_rows": 1}
+        assert delta["persona_rows"] == 2 + len("destination")
+
+    def test_visible_var_reads_fresh_hidden_var(self, sample_df):
+        state = FakeState(sample_df)
+        with deferring():
+            assert state.overview_hidden_rows == 5
+            state.df = sample_df.iloc[:2]  # HIDDEN 側の依存が変わる
+            assert state.overview_hidden_rows == 2
+            assert state.hidden_rows == 2
+
+    def test_nested_read_of_off_tab_var_is_fresh(self, sample_df):
+        class Nested(FakeState):
+            @property
+            @view_var(tab="overview")
+            def overview_persona(self) -> int:
+                return self.persona_rows  # 表示中でないタブの計算プロパティを参照
+
+        state = Nested(sample_df)
+        with deferring():
+            assert state.overview_persona == 2 + len("destination")
+            state.df = sample_df[sample_df['row_type'] == 'AGE_GENDER'].iloc[:1]
+            assert state.overview_persona == 1 + len("destination")
+
+    def test_first_access_is_computed(self, sample_df):
+        state = FakeState(sample_df)
+        state.active_tab = "gap"
+        assert self._delta(state) == {"overview_total": 40, "persona_rows": 2 + len("destination"), "hidden_rows": 5}
+
+
+class TestRowTypeSlice:
+    """row_type_slice() の共有スライス"""
+
+    @pytest.mark.parametrize("categorical", [False, True])
+    def test_matches_boolean_mask(self, sample_df, categorical):
+        df = sample_df.astype({'row_type': 'category'}) if categorical else sample_df
+        for row_type in ['SUMMARY', 'AGE_GENDER', 'FLOW']:
+            pd.testing.assert_frame_equal(row_type_slice(df, row_type), df[df['row_type'] == row_type])
+
+    def test_split_once_per_dataframe(self, sample_df):
+        assert row_type_slice(sample_df, 'SUMMARY') is row_type_slice(sample_df, 'SUMMARY')
+        assert row_type_slice(sample_df.copy(), 'SUMMARY') is not row_type_slice(sample_df, 'SUMMARY')
+
+    def test_missing_column_or_empty(self):
+        assert row_type_slice(None, 'SUMMARY').empty
+        assert row_type_slice(pd.DataFrame({'count': [1]}), 'SUMMARY').empty
+
+
+class TestDashboardRecomputeCounts:
+    """DashboardState の差分計算1回あたりの再計算回数（変更前: 毎回全計算プロパティ）"""
+
+    @pytest.fixture
+    def state(self):
+        pytest.importorskip("reflex")
+        from mapcomplete_dashboard.mapcomplete_dashboard import DashboardState
+        state = DashboardState()
+        state.df = pd.DataFrame({
+            'row_type': ['SUMMARY', 'AGE_GENDER', 'AGE_GENDER', 'PERSONA_MUNI', 'GAP'],
+            'prefecture': ['京都府'] * 5,
+            'municipality': ['京都市'] * 5,
+            'applicant_count': [1000, None, None, None, None],
+            'male_count': [400, None, None, None, None],
+            'female_count': [600, None, None, None, None],
+            'category1': [None, '20代', '30代', 'ペルソナA', None],
+            'category2': [None, '男性', '女性', '20代', None],
+            'count': [None, 100, 150, 80, None],
+        })
+        state.is_loaded = True
+        state.selected_prefecture = "京都府"
+        state.selected_municipality = "京都市"
+        return state
+
+    def _delta(self, state):
+        names = list(type(state).computed_vars)
+        with deferring():
+            for name in names:
+                getattr(state, name)
+        return names
+
+    def _tabs(self, state, name):
+        var = type(state).computed_vars[name]
+        return (getattr(var, "_fget", None) or var.fget).view_tabs
+
+    def _shown_or_hidden(self, state, name):
+        # HIDDEN は他の計算プロパティから参照されるため後回しにしない
+        tabs = self._tabs(state, name)
+        return tabs is None or tabs == HIDDEN or "persona" in tabs
+
+    def test_tab_click_recomputes_only_that_tab(self, state):
+        names = self._delta(state)
+        view_model.reset_counts()
+
+        state.active_tab = "persona"
+        self._delta(state)
+        recomputed = view_model.recompute_counts()
+        print(f"[PERF] tab click: {sum(recomputed.values())} / {len(names)} vars")
+        assert recomputed and all(self._shown_or_hidden(state, name) for name in recomputed)
+
+        view_model.reset_counts()
+        state.df = state.df.copy()  # 選択変更（set_municipality と同様に df を置き換え）
+        self._delta(state)
+        recomputed = view_model.recompute_counts()
+        print(f"[PERF] selection change: {sum(recomputed.values())} / {len(names)} vars")
+        assert all(self._shown_or_hidden(state, name) for name in recomputed)
+
+    def test_baseline_recomputes_everything(self, state, monkeypatch):
+        monkeypatch.setattr(view_model, "MEMO_ENABLED", False)
+        names = self._delta(state)
+        view_model.reset_counts()
+        state.active_tab = "persona"
+        self._delta(state)
+        assert view_model.total_recomputes() == len(names)